@@ -1,6 +1,7 @@
 from aiogram import Bot
 
 from app.services.backup_service import backup_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 from .startup_error_helpers import warn_startup_stage_error
@@ -20,8 +21,11 @@ async def initialize_backup_stage(
         try:
             backup_service.bot = bot
             settings_obj = await backup_service.get_backup_settings()
-            if settings_obj.auto_backup_enabled:
+            if not scheduler_leader_service.jobs_active:
+                stage.log('Автобекапы выполняются на ведущей реплике планировщика')
+            elif settings_obj.auto_backup_enabled:
                 await backup_service.start_auto_backup()
+                scheduler_leader_service.record_job_start('backup')
                 stage.log(
                     'Автобекапы включены: интервал '
                     f'{settings_obj.backup_interval_hours}ч, запуск {settings_obj.backup_time}'
@@ -4,8 +4,16 @@ from app.bot import setup_bot
 from app.utils.startup_timeline import StartupTimeline
 
 
-async def setup_bot_stage(timeline: StartupTimeline) -> tuple[Bot, Dispatcher]:
+async def setup_bot_stage(
+    timeline: StartupTimeline,
+    *,
+    start_maintenance_monitoring: bool = True,
+    require_redis_storage: bool = False,
+) -> tuple[Bot, Dispatcher]:
     async with timeline.stage('Настройка бота', '🤖', success_message='Бот настроен') as stage:
-        bot, dp = await setup_bot()
+        bot, dp = await setup_bot(
+            start_maintenance_monitoring=start_maintenance_monitoring,
+            require_redis_storage=require_redis_storage,
+        )
         stage.log('Кеш и FSM подготовлены')
         return bot, dp
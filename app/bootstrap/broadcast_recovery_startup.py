@@ -0,0 +1,38 @@
+from app.config import settings
+from app.services.broadcast_service import broadcast_service, email_broadcast_service
+from app.services.scheduler_leader_service import scheduler_leader_service
+from app.utils.startup_timeline import StartupTimeline
+
+from .startup_error_helpers import warn_startup_stage_error
+from .types import LoggerLike
+
+
+async def resume_interrupted_broadcasts_stage(timeline: StartupTimeline, logger: LoggerLike) -> None:
+    async with timeline.stage(
+        'Восстановление рассылок',
+        '📨',
+        success_message='Прерванные рассылки проверены',
+    ) as stage:
+        if not settings.BROADCAST_AUTO_RESUME_ENABLED:
+            stage.skip('Автопродолжение рассылок отключено настройками')
+            return
+
+        if not scheduler_leader_service.jobs_active:
+            stage.skip('Выполняется на ведущей реплике планировщика')
+            return
+
+        try:
+            telegram_ids = await broadcast_service.resume_interrupted()
+            email_ids = await email_broadcast_service.resume_interrupted()
+            if telegram_ids or email_ids:
+                stage.log(f'Продолжены рассылки: telegram {telegram_ids or "—"}, email {email_ids or "—"}')
+            else:
+                stage.log('Прерванных рассылок нет')
+        except Exception as error:
+            warn_startup_stage_error(
+                stage=stage,
+                logger=logger,
+                stage_error_message='Ошибка восстановления рассылок',
+                logger_error_message='❌ Ошибка восстановления рассылок',
+                error=error,
+            )
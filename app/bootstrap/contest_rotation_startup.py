@@ -1,6 +1,7 @@
 from aiogram import Bot
 
 from app.services.contest_rotation_service import contest_rotation_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 from .startup_error_helpers import warn_startup_stage_error
@@ -19,8 +20,12 @@ async def initialize_contest_rotation_stage(
     ) as stage:
         try:
             contest_rotation_service.set_bot(bot)
+            if not scheduler_leader_service.jobs_active:
+                stage.skip('Выполняется на ведущей реплике планировщика')
+                return
             await contest_rotation_service.start()
             if contest_rotation_service.is_running():
+                scheduler_leader_service.record_job_start('contest_rotation')
                 stage.log('Ротационные игры запущены')
             else:
                 stage.skip('Ротация игр выключена настройками')
@@ -1,9 +1,12 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
+from typing import Any
 
 from aiogram import Bot, Dispatcher
 
 from app.bootstrap.backup_startup import initialize_backup_stage
 from app.bootstrap.bot_startup import setup_bot_stage
+from app.bootstrap.broadcast_recovery_startup import resume_interrupted_broadcasts_stage
 from app.bootstrap.configuration_startup import load_bot_configuration_stage
 from app.bootstrap.contest_rotation_startup import initialize_contest_rotation_stage
 from app.bootstrap.database_initialization import initialize_database_stage
@@ -11,6 +14,7 @@ from app.bootstrap.database_startup import run_database_migration_stage
 from app.bootstrap.external_admin_startup import initialize_external_admin_stage
 from app.bootstrap.log_rotation_startup import initialize_log_rotation_stage
 from app.bootstrap.nalogo_queue_startup import start_nalogo_queue_stage
+from app.bootstrap.news_views_startup import initialize_news_views_stage
 from app.bootstrap.payment_methods_startup import initialize_payment_methods_stage
 from app.bootstrap.payment_runtime import setup_payment_runtime
 from app.bootstrap.payment_verification_startup import initialize_payment_verification_stage
@@ -18,8 +22,12 @@ from app.bootstrap.referral_contests_startup import initialize_referral_contests
 from app.bootstrap.remnawave_sync_startup import initialize_remnawave_sync_stage
 from app.bootstrap.reporting_startup import initialize_reporting_stage
 from app.bootstrap.runtime_mode import resolve_runtime_mode
+from app.bootstrap.runtime_sync_startup import start_runtime_sync_stage
+from app.bootstrap.scheduler_leader_startup import initialize_scheduler_leader_stage
+from app.bootstrap.server_status_startup import initialize_server_status_stage
 from app.bootstrap.servers_startup import sync_servers_stage
 from app.bootstrap.services_startup import connect_integration_services_stage, wire_core_services
+from app.bootstrap.startup_graph import StartupNode, run_startup_graph
 from app.bootstrap.tariffs_startup import sync_tariffs_stage
 from app.bootstrap.telegram_webhook_startup import configure_telegram_webhook_stage
 from app.bootstrap.types import LoggerLike, TelegramNotifierLike
@@ -75,30 +83,100 @@ def _resolve_runtime_flags() -> RuntimeModeFlags:
     )
 
 
-async def _run_pre_runtime_bootstrap(
+def _build_pre_runtime_graph(
     timeline: StartupTimeline,
     logger: LoggerLike,
     telegram_notifier: TelegramNotifierLike,
-) -> PreRuntimeBootstrapResult:
-    await run_database_migration_stage(timeline, logger)
-    await initialize_database_stage(timeline)
-    await sync_tariffs_stage(timeline, logger)
-    await sync_servers_stage(timeline, logger)
-    await initialize_payment_methods_stage(timeline, logger)
-    await load_bot_configuration_stage(timeline, logger)
-
-    bot, dp = await setup_bot_stage(timeline)
-    wire_core_services(bot, telegram_notifier)
-    await connect_integration_services_stage(timeline, bot)
-
-    await initialize_backup_stage(timeline, logger, bot)
-    await initialize_reporting_stage(timeline, logger, bot)
-    await initialize_referral_contests_stage(timeline, logger)
-    await initialize_contest_rotation_stage(timeline, logger, bot)
+) -> list[StartupNode]:
+    def bot_of(done: Mapping[str, Any]) -> Bot:
+        return done['setup_bot'][0]
+
+    nodes = [
+        StartupNode('db_migration', lambda _done: run_database_migration_stage(timeline, logger)),
+        StartupNode('db_init', lambda _done: initialize_database_stage(timeline), ('db_migration',)),
+        StartupNode('load_bot_config', lambda _done: load_bot_configuration_stage(timeline, logger), ('db_init',)),
+        StartupNode('sync_tariffs', lambda _done: sync_tariffs_stage(timeline, logger), ('load_bot_config',)),
+        StartupNode('sync_servers', lambda _done: sync_servers_stage(timeline, logger), ('load_bot_config',)),
+        StartupNode(
+            'payment_methods',
+            lambda _done: initialize_payment_methods_stage(timeline, logger),
+            ('load_bot_config',),
+        ),
+        StartupNode('setup_bot', lambda _done: setup_bot_stage(timeline), ('load_bot_config',)),
+        StartupNode(
+            'wire_core_services',
+            lambda done: wire_core_services(bot_of(done), telegram_notifier),
+            ('setup_bot',),
+        ),
+        StartupNode(
+            'connect_integrations',
+            lambda done: connect_integration_services_stage(timeline, bot_of(done)),
+            ('wire_core_services',),
+        ),
+        StartupNode(
+            'runtime_sync',
+            lambda _done: start_runtime_sync_stage(timeline, logger),
+            ('setup_bot',),
+        ),
+        StartupNode(
+            'scheduler_leader',
+            lambda _done: initialize_scheduler_leader_stage(timeline, logger),
+            ('setup_bot',),
+        ),
+        StartupNode(
+            'backup',
+            lambda done: initialize_backup_stage(timeline, logger, bot_of(done)),
+            ('wire_core_services', 'scheduler_leader'),
+        ),
+        StartupNode(
+            'reporting',
+            lambda done: initialize_reporting_stage(timeline, logger, bot_of(done)),
+            ('wire_core_services', 'scheduler_leader'),
+        ),
+        StartupNode(
+            'referral_contests',
+            lambda _done: initialize_referral_contests_stage(timeline, logger),
+            ('connect_integrations', 'scheduler_leader'),
+        ),
+        StartupNode(
+            'contest_rotation',
+            lambda done: initialize_contest_rotation_stage(timeline, logger, bot_of(done)),
+            ('wire_core_services', 'scheduler_leader'),
+        ),
+        StartupNode(
+            'remnawave_sync',
+            lambda _done: initialize_remnawave_sync_stage(timeline, logger),
+            ('scheduler_leader',),
+        ),
+        StartupNode(
+            'news_views',
+            lambda _done: initialize_news_views_stage(timeline, logger),
+            ('scheduler_leader',),
+        ),
+        StartupNode(
+            'server_status',
+            lambda _done: initialize_server_status_stage(timeline, logger),
+            ('load_bot_config',),
+        ),
+    ]
     if settings.is_log_rotation_enabled():
-        await initialize_log_rotation_stage(timeline, logger, bot)
+        nodes.append(
+            StartupNode(
+                'log_rotation',
+                lambda done: initialize_log_rotation_stage(timeline, logger, bot_of(done)),
+                ('wire_core_services',),
+            )
+        )
+    return nodes
 
-    await initialize_remnawave_sync_stage(timeline, logger)
+
+async def _run_pre_runtime_bootstrap(
+    timeline: StartupTimeline,
+    logger: LoggerLike,
+    telegram_notifier: TelegramNotifierLike,
+) -> PreRuntimeBootstrapResult:
+    graph = await run_startup_graph(timeline, _build_pre_runtime_graph(timeline, logger, telegram_notifier))
+    bot, dp = graph.results['setup_bot']
     return PreRuntimeBootstrapResult(bot=bot, dp=dp)
 
 
@@ -112,6 +190,7 @@ async def _run_post_payment_bootstrap(
     verification_providers, auto_verification_active = await initialize_payment_verification_stage(timeline)
     await start_nalogo_queue_stage(timeline, logger, payment_service)
     await initialize_external_admin_stage(timeline, logger, bot)
+    await resume_interrupted_broadcasts_stage(timeline, logger)
     return PostPaymentBootstrapResult(
         verification_providers=verification_providers,
         auto_verification_active=auto_verification_active,
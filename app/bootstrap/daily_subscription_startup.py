@@ -1,6 +1,7 @@
 import asyncio
 
 from app.services.daily_subscription_service import daily_subscription_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 
@@ -10,8 +11,13 @@ async def start_daily_subscription_stage(timeline: StartupTimeline) -> asyncio.T
         '💳',
         success_message='Сервис суточных подписок запущен',
     ) as stage:
+        if not scheduler_leader_service.jobs_active:
+            stage.skip('Выполняется на ведущей реплике планировщика')
+            return None
+
         if daily_subscription_service.is_enabled():
             daily_subscription_task = asyncio.create_task(daily_subscription_service.start_monitoring())
+            scheduler_leader_service.record_job_start('daily_subscriptions')
             interval_minutes = daily_subscription_service.get_check_interval_minutes()
             stage.log(f'Интервал проверки: {interval_minutes} мин')
             return daily_subscription_task
@@ -2,15 +2,21 @@ import asyncio
 
 from app.config import settings
 from app.services.monitoring_service import monitoring_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 
-async def start_monitoring_stage(timeline: StartupTimeline) -> asyncio.Task:
+async def start_monitoring_stage(timeline: StartupTimeline) -> asyncio.Task | None:
     async with timeline.stage(
         'Служба мониторинга',
         '📈',
         success_message='Служба мониторинга запущена',
     ) as stage:
+        if not scheduler_leader_service.jobs_active:
+            stage.skip('Выполняется на ведущей реплике планировщика')
+            return None
+
         monitoring_task = asyncio.create_task(monitoring_service.start_monitoring())
+        scheduler_leader_service.record_job_start('monitoring')
         stage.log(f'Интервал опроса: {settings.MONITORING_INTERVAL}с')
         return monitoring_task
@@ -1,6 +1,7 @@
 from app.config import settings
 from app.services.nalogo_queue_service import nalogo_queue_service
 from app.services.payment_service import PaymentService
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 from .startup_error_helpers import warn_startup_stage_error
@@ -17,10 +18,13 @@ async def start_nalogo_queue_stage(
         '🧾',
         success_message='Сервис очереди чеков запущен',
     ) as stage:
-        if settings.is_nalogo_enabled():
+        if not scheduler_leader_service.jobs_active:
+            stage.skip('Выполняется на ведущей реплике планировщика')
+        elif settings.is_nalogo_enabled():
             try:
                 await nalogo_queue_service.start()
                 if nalogo_queue_service.is_running():
+                    scheduler_leader_service.record_job_start('nalogo_queue')
                     queue_len = await payment_service.nalogo_service.get_queue_length()
                     if queue_len > 0:
                         stage.log(f'В очереди ожидает {queue_len} чек(ов)')
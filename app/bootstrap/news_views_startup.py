@@ -0,0 +1,28 @@
+from app.services.news_view_counter_service import news_view_counter_service
+from app.services.scheduler_leader_service import scheduler_leader_service
+from app.utils.startup_timeline import StartupTimeline
+
+from .startup_error_helpers import warn_startup_stage_error
+from .types import LoggerLike
+
+
+async def initialize_news_views_stage(timeline: StartupTimeline, logger: LoggerLike) -> None:
+    async with timeline.stage(
+        'Просмотры новостей',
+        '👁',
+        success_message='Сброс просмотров новостей запущен',
+    ) as stage:
+        try:
+            if not scheduler_leader_service.jobs_active:
+                stage.skip('Выполняется на ведущей реплике планировщика')
+                return
+            await news_view_counter_service.start()
+            scheduler_leader_service.record_job_start('news_views')
+        except Exception as error:
+            warn_startup_stage_error(
+                stage=stage,
+                logger=logger,
+                stage_error_message='Ошибка запуска сброса просмотров новостей',
+                logger_error_message='❌ Ошибка запуска сброса просмотров новостей',
+                error=error,
+            )
@@ -7,6 +7,7 @@ from app.services.payment_verification_service import (
     get_enabled_auto_methods,
     method_display_name,
 )
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 
@@ -52,9 +53,13 @@ async def initialize_payment_verification_stage(timeline: StartupTimeline) -> tu
         else:
             stage.log('Автопроверка отключена настройками')
 
-        await auto_payment_verification_service.start()
-        auto_verification_active = auto_payment_verification_service.is_running()
-        if auto_verification_active:
-            stage.log('Фоновая автопроверка запущена')
+        if not scheduler_leader_service.jobs_active:
+            stage.log('Фоновая автопроверка выполняется на ведущей реплике планировщика')
+        else:
+            await auto_payment_verification_service.start()
+            auto_verification_active = auto_payment_verification_service.is_running()
+            if auto_verification_active:
+                scheduler_leader_service.record_job_start('payment_verification')
+                stage.log('Фоновая автопроверка запущена')
 
     return verification_providers, auto_verification_active
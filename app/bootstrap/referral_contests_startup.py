@@ -1,4 +1,5 @@
 from app.services.referral_contest_service import referral_contest_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 from .startup_error_helpers import warn_startup_stage_error
@@ -12,8 +13,12 @@ async def initialize_referral_contests_stage(timeline: StartupTimeline, logger:
         success_message='Сервис конкурсов готов',
     ) as stage:
         try:
+            if not scheduler_leader_service.jobs_active:
+                stage.skip('Выполняется на ведущей реплике планировщика')
+                return
             await referral_contest_service.start()
             if referral_contest_service.is_running():
+                scheduler_leader_service.record_job_start('referral_contests')
                 stage.log('Автосводки по конкурсам запущены')
             else:
                 stage.skip('Сервис конкурсов выключен настройками')
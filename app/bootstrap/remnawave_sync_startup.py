@@ -1,4 +1,5 @@
 from app.services.remnawave_sync_service import remnawave_sync_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 from .startup_error_helpers import warn_startup_stage_error
@@ -12,9 +13,13 @@ async def initialize_remnawave_sync_stage(timeline: StartupTimeline, logger: Log
         success_message='Сервис автосинхронизации готов',
     ) as stage:
         try:
+            if not scheduler_leader_service.jobs_active:
+                stage.skip('Выполняется на ведущей реплике планировщика')
+                return
             await remnawave_sync_service.initialize()
             status = remnawave_sync_service.get_status()
             if status.enabled:
+                scheduler_leader_service.record_job_start('remnawave_sync')
                 times_text = ', '.join(t.strftime('%H:%M') for t in status.times) or '—'
                 if status.next_run:
                     next_run_text = status.next_run.strftime('%d.%m.%Y %H:%M')
@@ -1,6 +1,7 @@
 from aiogram import Bot
 
 from app.services.reporting_service import reporting_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.utils.startup_timeline import StartupTimeline
 
 from .startup_error_helpers import warn_startup_stage_error
@@ -19,7 +20,12 @@ async def initialize_reporting_stage(
     ) as stage:
         try:
             reporting_service.set_bot(bot)
+            if not scheduler_leader_service.jobs_active:
+                stage.skip('Выполняется на ведущей реплике планировщика')
+                return
             await reporting_service.start()
+            if reporting_service.is_running():
+                scheduler_leader_service.record_job_start('reporting')
         except Exception as error:
             warn_startup_stage_error(
                 stage=stage,
@@ -3,10 +3,11 @@ from app.config import settings
 
 def resolve_runtime_mode() -> tuple[bool, bool, bool]:
     bot_run_mode = settings.get_bot_run_mode()
-    polling_enabled = bot_run_mode == 'polling'
-    telegram_webhook_enabled = bot_run_mode == 'webhook'
+    process_role = settings.get_process_role()
+    polling_enabled = bot_run_mode == 'polling' and process_role in {'all', 'bot'}
+    telegram_webhook_enabled = bot_run_mode == 'webhook' and process_role in {'all', 'web'}
 
-    payment_webhooks_enabled = any(
+    payment_webhooks_enabled = process_role in {'all', 'web'} and any(
         [
             settings.TRIBUTE_ENABLED,
             settings.is_cryptobot_enabled(),
@@ -0,0 +1,24 @@
+from app.services.runtime_sync_service import runtime_sync_service
+from app.utils.startup_timeline import StartupTimeline
+
+from .startup_error_helpers import warn_startup_stage_error
+from .types import LoggerLike
+
+
+async def start_runtime_sync_stage(timeline: StartupTimeline, logger: LoggerLike) -> None:
+    async with timeline.stage(
+        'Синхронизация процессов',
+        '🔁',
+        success_message='Подписка на изменения из других процессов активна',
+    ) as stage:
+        try:
+            if not await runtime_sync_service.start():
+                stage.skip('Redis недоступен: изменения применяются только в этом процессе')
+        except Exception as error:
+            warn_startup_stage_error(
+                stage=stage,
+                logger=logger,
+                stage_error_message='Ошибка запуска синхронизации процессов',
+                logger_error_message='❌ Ошибка запуска синхронизации процессов',
+                error=error,
+            )
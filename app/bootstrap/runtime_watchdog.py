@@ -2,12 +2,14 @@ import asyncio
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 
+from app.bootstrap.scheduler_jobs import start_leader_service_jobs, stop_leader_service_jobs
 from app.bootstrap.types import KillerLike, LoggerLike
 from app.config import settings
 from app.services.daily_subscription_service import daily_subscription_service
 from app.services.maintenance_service import maintenance_service
 from app.services.monitoring_service import monitoring_service
 from app.services.payment_verification_service import auto_payment_verification_service
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.services.traffic_monitoring_service import traffic_monitoring_scheduler
 from app.services.version_service import version_service
 
@@ -30,6 +32,7 @@ def _restart_task_on_exception(
     restart_factory: Callable[[], Awaitable[None]] | None = None,
     restart_message: str | None = None,
     restart_condition: Callable[[], bool] | None = None,
+    job_name: str | None = None,
 ) -> asyncio.Task | None:
     if task is None or not task.done():
         return task
@@ -39,6 +42,8 @@ def _restart_task_on_exception(
         return task
 
     logger.error(error_message, error=exception)
+    if job_name is not None:
+        scheduler_leader_service.record_job_failure(job_name, exception)
     if restart_factory is None:
         return task
 
@@ -47,9 +52,70 @@ def _restart_task_on_exception(
 
     if restart_message is not None:
         logger.info(restart_message)
+    if job_name is not None:
+        scheduler_leader_service.record_job_start(job_name)
     return asyncio.create_task(restart_factory())
 
 
+def _scheduler_jobs_active() -> bool:
+    return scheduler_leader_service.jobs_active
+
+
+async def _stop_leader_task(task: asyncio.Task | None, stop_call: Callable[[], object], job_name: str) -> None:
+    if task is None or task.done():
+        return
+    result = stop_call()
+    if asyncio.iscoroutine(result):
+        await result
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    scheduler_leader_service.record_job_stop(job_name)
+
+
+async def _reconcile_scheduler_leadership(
+    logger: LoggerLike,
+    tasks: RuntimeTasks,
+    auto_verification_active: bool,
+) -> bool:
+    """Запускает или останавливает периодические задачи при смене ведущей реплики."""
+    is_leader = scheduler_leader_service.is_leader
+    if is_leader == scheduler_leader_service.jobs_active:
+        return auto_verification_active
+
+    if is_leader:
+        logger.info('🗳️ Процесс стал ведущим планировщиком, запускаем периодические задачи')
+        tasks.monitoring_task = asyncio.create_task(monitoring_service.start_monitoring())
+        scheduler_leader_service.record_job_start('monitoring')
+        if traffic_monitoring_scheduler.is_enabled():
+            tasks.traffic_monitoring_task = asyncio.create_task(traffic_monitoring_scheduler.start_monitoring())
+            scheduler_leader_service.record_job_start('traffic_monitoring')
+        if daily_subscription_service.is_enabled():
+            tasks.daily_subscription_task = asyncio.create_task(daily_subscription_service.start_monitoring())
+            scheduler_leader_service.record_job_start('daily_subscriptions')
+        await start_leader_service_jobs(logger)
+        auto_verification_active = auto_payment_verification_service.is_running()
+    else:
+        logger.warning('🗳️ Процесс больше не ведущий планировщик, останавливаем периодические задачи')
+        await _stop_leader_task(tasks.monitoring_task, monitoring_service.stop_monitoring, 'monitoring')
+        await _stop_leader_task(
+            tasks.traffic_monitoring_task, traffic_monitoring_scheduler.stop_monitoring, 'traffic_monitoring'
+        )
+        await _stop_leader_task(
+            tasks.daily_subscription_task, daily_subscription_service.stop_monitoring, 'daily_subscriptions'
+        )
+        tasks.monitoring_task = None
+        tasks.traffic_monitoring_task = None
+        tasks.daily_subscription_task = None
+        await stop_leader_service_jobs(logger)
+        auto_verification_active = False
+
+    scheduler_leader_service.jobs_active = is_leader
+    return auto_verification_active
+
+
 async def run_runtime_watchdog_loop(
     killer: KillerLike,
     logger: LoggerLike,
@@ -59,11 +125,15 @@ async def run_runtime_watchdog_loop(
     while not killer.exit:
         await asyncio.sleep(1)
 
+        auto_verification_active = await _reconcile_scheduler_leadership(logger, tasks, auto_verification_active)
+
         tasks.monitoring_task = _restart_task_on_exception(
             logger,
             tasks.monitoring_task,
             error_message='Служба мониторинга завершилась с ошибкой',
             restart_factory=monitoring_service.start_monitoring,
+            restart_condition=_scheduler_jobs_active,
+            job_name='monitoring',
         )
         tasks.maintenance_task = _restart_task_on_exception(
             logger,
@@ -85,7 +155,8 @@ async def run_runtime_watchdog_loop(
             error_message='Мониторинг трафика завершился с ошибкой',
             restart_factory=traffic_monitoring_scheduler.start_monitoring,
             restart_message='🔄 Перезапуск мониторинга трафика...',
-            restart_condition=traffic_monitoring_scheduler.is_enabled,
+            restart_condition=lambda: _scheduler_jobs_active() and traffic_monitoring_scheduler.is_enabled(),
+            job_name='traffic_monitoring',
         )
         tasks.daily_subscription_task = _restart_task_on_exception(
             logger,
@@ -93,7 +164,8 @@ async def run_runtime_watchdog_loop(
             error_message='Сервис суточных подписок завершился с ошибкой',
             restart_factory=daily_subscription_service.start_monitoring,
             restart_message='🔄 Перезапуск сервиса суточных подписок...',
-            restart_condition=daily_subscription_service.is_enabled,
+            restart_condition=lambda: _scheduler_jobs_active() and daily_subscription_service.is_enabled(),
+            job_name='daily_subscriptions',
         )
 
         if auto_verification_active and not auto_payment_verification_service.is_running():
@@ -0,0 +1,75 @@
+"""Периодические задачи, которые выполняет только ведущая реплика планировщика.
+
+Задачи-сервисы со своими start/stop перечислены здесь; задачи-корутины
+(мониторинг, трафик, суточные подписки) принадлежат runtime watchdog.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.bootstrap.types import LoggerLike
+from app.config import settings
+from app.services.backup_service import backup_service
+from app.services.contest_rotation_service import contest_rotation_service
+from app.services.nalogo_queue_service import nalogo_queue_service
+from app.services.news_view_counter_service import news_view_counter_service
+from app.services.payment_verification_service import auto_payment_verification_service
+from app.services.referral_contest_service import referral_contest_service
+from app.services.remnawave_sync_service import remnawave_sync_service
+from app.services.reporting_service import reporting_service
+from app.services.scheduler_leader_service import scheduler_leader_service
+
+
+@dataclass(frozen=True)
+class LeaderServiceJob:
+    name: str
+    start: Callable[[], Awaitable[Any]]
+    stop: Callable[[], Awaitable[Any]]
+
+
+async def _start_auto_backup() -> None:
+    backup_settings = await backup_service.get_backup_settings()
+    if backup_settings.auto_backup_enabled:
+        await backup_service.start_auto_backup()
+
+
+async def _start_nalogo_queue() -> None:
+    if settings.is_nalogo_enabled():
+        await nalogo_queue_service.start()
+
+
+LEADER_SERVICE_JOBS: tuple[LeaderServiceJob, ...] = (
+    LeaderServiceJob('backup', _start_auto_backup, backup_service.stop_auto_backup),
+    LeaderServiceJob('reporting', reporting_service.start, reporting_service.stop),
+    LeaderServiceJob('referral_contests', referral_contest_service.start, referral_contest_service.stop),
+    LeaderServiceJob('contest_rotation', contest_rotation_service.start, contest_rotation_service.stop),
+    LeaderServiceJob('remnawave_sync', remnawave_sync_service.initialize, remnawave_sync_service.stop),
+    LeaderServiceJob('nalogo_queue', _start_nalogo_queue, nalogo_queue_service.stop),
+    LeaderServiceJob('news_views', news_view_counter_service.start, news_view_counter_service.stop),
+    LeaderServiceJob(
+        'payment_verification',
+        auto_payment_verification_service.start,
+        auto_payment_verification_service.stop,
+    ),
+)
+
+
+async def start_leader_service_jobs(logger: LoggerLike) -> None:
+    for job in LEADER_SERVICE_JOBS:
+        try:
+            await job.start()
+            scheduler_leader_service.record_job_start(job.name)
+        except Exception as error:
+            scheduler_leader_service.record_job_failure(job.name, error)
+            logger.error('Ошибка запуска периодической задачи', job=job.name, error=error)
+
+
+async def stop_leader_service_jobs(logger: LoggerLike) -> None:
+    for job in LEADER_SERVICE_JOBS:
+        try:
+            await job.stop()
+            scheduler_leader_service.record_job_stop(job.name)
+        except Exception as error:
+            scheduler_leader_service.record_job_failure(job.name, error)
+            logger.error('Ошибка остановки периодической задачи', job=job.name, error=error)
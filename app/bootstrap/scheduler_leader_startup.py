@@ -0,0 +1,31 @@
+from app.config import settings
+from app.services.scheduler_leader_service import scheduler_leader_service
+from app.utils.startup_timeline import StartupTimeline
+
+from .startup_error_helpers import warn_startup_stage_error
+from .types import LoggerLike
+
+
+async def initialize_scheduler_leader_stage(timeline: StartupTimeline, logger: LoggerLike) -> None:
+    async with timeline.stage(
+        'Планировщик задач',
+        '🗳️',
+        success_message='Роль процесса определена',
+    ) as stage:
+        try:
+            jobs_active = await scheduler_leader_service.start()
+            stage.log(f'Роль процесса: {settings.get_process_role()}')
+            if jobs_active:
+                stage.success('Периодические задачи выполняются в этом процессе')
+            elif settings.is_scheduler_candidate():
+                stage.skip('Ведущий планировщик — другая реплика, процесс в резерве')
+            else:
+                stage.skip('Периодические задачи отключены для этой роли')
+        except Exception as error:
+            warn_startup_stage_error(
+                stage=stage,
+                logger=logger,
+                stage_error_message='Ошибка выбора ведущего планировщика',
+                logger_error_message='❌ Ошибка выбора ведущего планировщика',
+                error=error,
+            )
@@ -0,0 +1,28 @@
+from app.config import settings
+from app.services.server_status_service import server_status_service
+from app.utils.startup_timeline import StartupTimeline
+
+from .startup_error_helpers import warn_startup_stage_error
+from .types import LoggerLike
+
+
+async def initialize_server_status_stage(timeline: StartupTimeline, logger: LoggerLike) -> None:
+    async with timeline.stage(
+        'Статус серверов',
+        '📡',
+        success_message='Фоновое обновление статуса серверов запущено',
+    ) as stage:
+        try:
+            if settings.get_server_status_mode() != 'xray' or not settings.get_server_status_metrics_url():
+                stage.skip('Интеграция с XrayChecker не настроена')
+                return
+            await server_status_service.start()
+            stage.log(f'Интервал обновления: {settings.get_server_status_refresh_seconds()} сек')
+        except Exception as error:
+            warn_startup_stage_error(
+                stage=stage,
+                logger=logger,
+                stage_error_message='Ошибка запуска обновления статуса серверов',
+                logger_error_message='❌ Ошибка запуска обновления статуса серверов',
+                error=error,
+            )
@@ -27,6 +27,9 @@ def wire_core_services(bot: Bot, telegram_notifier: TelegramNotifierLike) -> Non
 
     email_broadcast_service.set_email_service(email_service)
 
+    # Сброс кеша принципалов кабинета при бане/удалении пользователя в любом процессе
+    import app.services.cabinet_principal_cache_service  # noqa: F401
+
 
 async def connect_integration_services_stage(timeline: StartupTimeline, bot: Bot) -> None:
     from app.services.admin_notification_service import AdminNotificationService
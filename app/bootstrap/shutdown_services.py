@@ -14,10 +14,15 @@ from app.services.log_rotation_service import log_rotation_service
 from app.services.maintenance_service import maintenance_service
 from app.services.monitoring_service import monitoring_service
 from app.services.nalogo_queue_service import nalogo_queue_service
+from app.services.news_view_counter_service import news_view_counter_service
 from app.services.payment_verification_service import auto_payment_verification_service
 from app.services.referral_contest_service import referral_contest_service
+from app.services.referral_diagnostics_service import referral_diagnostics_service
 from app.services.remnawave_sync_service import remnawave_sync_service
 from app.services.reporting_service import reporting_service
+from app.services.runtime_sync_service import runtime_sync_service
+from app.services.scheduler_leader_service import scheduler_leader_service
+from app.services.server_status_service import server_status_service
 from app.services.traffic_monitoring_service import traffic_monitoring_scheduler
 
 
@@ -155,6 +160,26 @@ async def shutdown_runtime_services(
                 'Ошибка остановки ротации игр',
                 contest_rotation_service.stop,
             ),
+            (
+                'ℹ️ Остановка сброса просмотров новостей...',
+                'Ошибка остановки сброса просмотров новостей',
+                news_view_counter_service.stop,
+            ),
+            (
+                'ℹ️ Остановка обновления статуса серверов...',
+                'Ошибка остановки обновления статуса серверов',
+                server_status_service.stop,
+            ),
+            (
+                'ℹ️ Остановка синхронизации процессов...',
+                'Ошибка остановки синхронизации процессов',
+                runtime_sync_service.stop,
+            ),
+            (
+                'ℹ️ Остановка пула разбора логов рефералов...',
+                'Ошибка остановки пула разбора логов рефералов',
+                referral_diagnostics_service.close,
+            ),
         ),
     )
 
@@ -172,13 +197,18 @@ async def shutdown_runtime_services(
             (
                 'ℹ️ Остановка очереди чеков NaloGO...',
                 'Ошибка остановки очереди чеков NaloGO',
-                nalogo_queue_service.stop,
+                nalogo_queue_service.shutdown,
             ),
             (
                 'ℹ️ Остановка сервиса бекапов...',
                 'Ошибка остановки сервиса бекапов',
                 backup_service.stop_auto_backup,
             ),
+            (
+                'ℹ️ Освобождение аренды планировщика...',
+                'Ошибка освобождения аренды планировщика',
+                scheduler_leader_service.stop,
+            ),
         ),
     )
 
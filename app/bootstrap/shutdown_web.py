@@ -1,6 +1,7 @@
 from aiogram import Bot
 
 from app.bootstrap.types import LoggerLike, WebAPIServerLike
+from app.utils.http_clients import http_clients
 
 
 async def _safe_web_shutdown_call(
@@ -48,3 +49,10 @@ async def shutdown_web_runtime(
             error_message='Ошибка закрытия сессии бота',
             shutdown_call=bot.session.close,
         )
+
+    await _safe_web_shutdown_call(
+        logger,
+        success_message='✅ HTTP-клиенты интеграций закрыты',
+        error_message='Ошибка закрытия HTTP-клиентов интеграций',
+        shutdown_call=http_clients.close,
+    )
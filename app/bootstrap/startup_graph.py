@@ -0,0 +1,137 @@
+"""Параллельный запуск этапов по графу зависимостей.
+
+Каждый узел объявляет, от каких узлов он зависит, и стартует сразу после
+их завершения; независимые узлы выполняются одновременно. По замерам
+узлов вычисляется критический путь — цепочка, определяющая время запуска.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.utils.startup_timeline import StartupTimeline, current_startup_node
+
+
+StartupNodeRunner = Callable[[Mapping[str, Any]], Awaitable[Any] | Any]
+
+
+@dataclass(frozen=True)
+class StartupNode:
+    name: str
+    run: StartupNodeRunner
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class StartupGraphResult:
+    results: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, tuple[float, float]] = field(default_factory=dict)
+    critical_path: list[str] = field(default_factory=list)
+    duration: float = 0.0
+
+
+def _topological_order(nodes: Sequence[StartupNode]) -> list[StartupNode]:
+    by_name: dict[str, StartupNode] = {}
+    for node in nodes:
+        if node.name in by_name:
+            raise ValueError(f'Узел запуска {node.name!r} объявлен дважды')
+        by_name[node.name] = node
+
+    for node in nodes:
+        unknown = [dependency for dependency in node.depends_on if dependency not in by_name]
+        if unknown:
+            raise ValueError(f'Узел запуска {node.name!r} зависит от неизвестных узлов: {", ".join(unknown)}')
+
+    ordered: list[StartupNode] = []
+    state: dict[str, str] = {}
+
+    def visit(node: StartupNode) -> None:
+        mark = state.get(node.name)
+        if mark == 'done':
+            return
+        if mark == 'visiting':
+            raise ValueError(f'Цикл в графе запуска через узел {node.name!r}')
+        state[node.name] = 'visiting'
+        for dependency in node.depends_on:
+            visit(by_name[dependency])
+        state[node.name] = 'done'
+        ordered.append(node)
+
+    for node in nodes:
+        visit(node)
+    return ordered
+
+
+def _critical_path(
+    nodes: Sequence[StartupNode],
+    timings: Mapping[str, tuple[float, float]],
+) -> list[str]:
+    if not timings:
+        return []
+    by_name = {node.name: node for node in nodes}
+    current = max(timings, key=lambda name: timings[name][1])
+    path = [current]
+    while by_name[current].depends_on:
+        # Узел ждал последнюю из завершившихся зависимостей
+        current = max(by_name[current].depends_on, key=lambda name: timings[name][1])
+        path.append(current)
+    path.reverse()
+    return path
+
+
+async def run_startup_graph(
+    timeline: StartupTimeline,
+    nodes: Sequence[StartupNode],
+) -> StartupGraphResult:
+    """Выполняет узлы с максимальным параллелизмом.
+
+    Ошибка любого узла отменяет ещё не завершённые узлы и пробрасывается
+    вызывающему — как и при последовательном запуске.
+    """
+    ordered = _topological_order(nodes)
+    result = StartupGraphResult()
+    tasks: dict[str, asyncio.Task] = {}
+    origin = time.perf_counter()
+
+    async def run_node(node: StartupNode) -> Any:
+        if node.depends_on:
+            await asyncio.gather(*(tasks[dependency] for dependency in node.depends_on))
+        current_startup_node.set(node.name)
+        started_at = time.perf_counter() - origin
+        try:
+            value = node.run(result.results)
+            if inspect.isawaitable(value):
+                value = await value
+        finally:
+            result.timings[node.name] = (started_at, time.perf_counter() - origin)
+        result.results[node.name] = value
+        return value
+
+    for node in ordered:
+        tasks[node.name] = asyncio.create_task(run_node(node), name=f'startup:{node.name}')
+
+    await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+    first_error = next(
+        (
+            task.exception()
+            for task in tasks.values()
+            if task.done() and not task.cancelled() and task.exception() is not None
+        ),
+        None,
+    )
+    if first_error is not None:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise first_error
+
+    result.duration = time.perf_counter() - origin
+    result.critical_path = _critical_path(ordered, result.timings)
+    critical_duration = result.timings[result.critical_path[-1]][1] if result.critical_path else 0.0
+    timeline.set_critical_path(result.critical_path, critical_duration)
+    return result
@@ -1,12 +1,21 @@
 import asyncio
+import json
 from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import structlog
 
 from app.config import settings
 from app.services.payment_verification_service import auto_payment_verification_service
 from app.services.reporting_service import reporting_service
+from app.services.version_service import version_service
 from app.utils.startup_timeline import StartupTimeline
 
 
+logger = structlog.get_logger(__name__)
+
+
 def _format_webhook_url(base_url: str, path: str) -> str:
     return f'{base_url}{path if path.startswith("/") else "/" + path}'
 
@@ -38,6 +47,26 @@ def _collect_webhook_lines(base_url: str, *, telegram_webhook_enabled: bool) ->
     return webhook_lines
 
 
+def write_startup_report(timeline: StartupTimeline) -> None:
+    """Дописывает замеры запуска в ``STARTUP_REPORT_PATH`` (одна JSON-строка на запуск)."""
+    report_path = settings.STARTUP_REPORT_PATH
+    if not report_path:
+        return
+
+    report = {
+        'recorded_at': datetime.now(UTC).isoformat(),
+        'version': version_service.current_version,
+        **timeline.build_report(),
+    }
+    try:
+        path = Path(report_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('a', encoding='utf-8') as report_file:
+            report_file.write(json.dumps(report, ensure_ascii=False) + '\n')
+    except OSError as error:
+        logger.warning('Не удалось записать отчёт о запуске', path=report_path, error=error)
+
+
 def log_startup_summary(
     timeline: StartupTimeline,
     *,
@@ -73,3 +102,4 @@ def log_startup_summary(
     timeline.log_section('Активные фоновые сервисы', services_lines, icon='📄')
 
     timeline.log_summary()
+    write_startup_report(timeline)
@@ -1,5 +1,6 @@
 import asyncio
 
+from app.services.scheduler_leader_service import scheduler_leader_service
 from app.services.traffic_monitoring_service import traffic_monitoring_scheduler
 from app.utils.startup_timeline import StartupTimeline
 
@@ -10,8 +11,13 @@ async def start_traffic_monitoring_stage(timeline: StartupTimeline) -> asyncio.T
         '📊',
         success_message='Мониторинг трафика запущен',
     ) as stage:
+        if not scheduler_leader_service.jobs_active:
+            stage.skip('Выполняется на ведущей реплике планировщика')
+            return None
+
         if traffic_monitoring_scheduler.is_enabled():
             traffic_monitoring_task = asyncio.create_task(traffic_monitoring_scheduler.start_monitoring())
+            scheduler_leader_service.record_job_start('traffic_monitoring')
             status_info = traffic_monitoring_scheduler.get_status_info()
             stage.log(status_info)
             return traffic_monitoring_task
@@ -0,0 +1,76 @@
+"""Запуск дочернего процесса веб-сервера (``WEB_API_WORKERS > 1``).
+
+Воркер принимает соединения на сокете, открытом основным процессом, и
+поднимает только то, что нужно для обработки HTTP: бота с обработчиками,
+платёжный сервис и единое веб-приложение. Планировщики, мониторинги,
+синхронизации и прочие фоновые задачи остаются в основном процессе.
+Техработы и изменения из админки воркер получает через ``runtime_sync_service``;
+без Redis воркер не запускается.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import structlog
+import uvicorn
+
+from app.bootstrap.bot_startup import setup_bot_stage
+from app.bootstrap.configuration_startup import load_bot_configuration_stage
+from app.bootstrap.localization_startup import prepare_localizations
+from app.bootstrap.payment_runtime import setup_payment_runtime
+from app.bootstrap.runtime_logging import configure_runtime_logging
+from app.bootstrap.runtime_mode import resolve_runtime_mode
+from app.bootstrap.services_startup import connect_integration_services_stage, wire_core_services
+from app.database.crud.tariff import load_period_prices_from_db
+from app.database.database import AsyncSessionLocal, close_db
+from app.logging_config import setup_logging
+from app.services.runtime_sync_service import runtime_sync_service
+from app.utils.cache import cache
+from app.utils.http_clients import http_clients
+from app.utils.startup_timeline import StartupTimeline
+
+
+async def serve_web_worker(sock: socket.socket, index: int) -> None:
+    from app.webapi.server import build_uvicorn_config
+    from app.webserver.unified_app import create_unified_app
+
+    file_formatter, console_formatter, telegram_notifier = setup_logging()
+    await configure_runtime_logging(file_formatter, console_formatter)
+    logger = structlog.get_logger(__name__).bind(web_worker=index)
+    timeline = StartupTimeline(logger, f'Bedolaga web worker #{index}')
+
+    await prepare_localizations(timeline, logger)
+    await load_bot_configuration_stage(timeline, logger)
+    bot, dp = await setup_bot_stage(timeline, start_maintenance_monitoring=False, require_redis_storage=True)
+    try:
+        # Без подписки воркер не увидит техработы и изменения настроек из других процессов
+        if not await runtime_sync_service.start():
+            raise RuntimeError('Веб-воркер не может подписаться на синхронизацию состояния через Redis')
+        wire_core_services(bot, telegram_notifier)
+        await connect_integration_services_stage(timeline, bot)
+        payment_service = setup_payment_runtime(bot)
+        try:
+            async with AsyncSessionLocal() as db:
+                await load_period_prices_from_db(db)
+        except Exception as error:
+            logger.warning('Не удалось загрузить цены периодов в веб-воркере', error=error)
+
+        _, telegram_webhook_enabled, _ = resolve_runtime_mode()
+        app = create_unified_app(bot, dp, payment_service, enable_telegram_webhook=telegram_webhook_enabled)
+        server = uvicorn.Server(build_uvicorn_config(app))
+        logger.info('🌐 Веб-воркер принимает соединения', address=sock.getsockname())
+        await server.serve(sockets=[sock])
+    finally:
+        await runtime_sync_service.stop()
+        await bot.session.close()
+        await http_clients.close()
+        await cache.disconnect()
+        await close_db()
+        logger.info('🛑 Веб-воркер остановлен')
+
+
+def run_web_worker(sock: socket.socket, index: int) -> None:
+    """Точка входа дочернего процесса (multiprocessing spawn)."""
+    asyncio.run(serve_web_worker(sock, index))
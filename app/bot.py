@@ -5,62 +5,7 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.storage.redis import RedisStorage
 
 from app.config import settings
-from app.handlers import (
-    balance,
-    common,
-    contests as user_contests,
-    menu,
-    polls as user_polls,
-    promocode,
-    referral,
-    server_status,
-    simple_subscription,
-    start,
-    subscription,
-    support,
-    tickets,
-)
-from app.handlers.admin import (
-    backup as admin_backup,
-    blacklist as admin_blacklist,
-    blocked_users as admin_blocked_users,
-    bot_configuration as admin_bot_configuration,
-    bulk_ban as admin_bulk_ban,
-    campaigns as admin_campaigns,
-    contests as admin_contests,
-    daily_contests as admin_daily_contests,
-    faq as admin_faq,
-    main as admin_main,
-    maintenance as admin_maintenance,
-    messages as admin_messages,
-    monitoring as admin_monitoring,
-    payments as admin_payments,
-    polls as admin_polls,
-    pricing as admin_pricing,
-    privacy_policy as admin_privacy_policy,
-    promo_groups as admin_promo_groups,
-    promo_offers as admin_promo_offers,
-    promocodes as admin_promocodes,
-    public_offer as admin_public_offer,
-    referrals as admin_referrals,
-    remnawave as admin_remnawave,
-    reports as admin_reports,
-    required_channels as admin_required_channels,
-    rules as admin_rules,
-    servers as admin_servers,
-    statistics as admin_statistics,
-    subscriptions as admin_subscriptions,
-    system_logs as admin_system_logs,
-    tariffs as admin_tariffs,
-    tickets as admin_tickets,
-    trials as admin_trials,
-    updates as admin_updates,
-    user_messages as admin_user_messages,
-    users as admin_users,
-    welcome_text as admin_welcome_text,
-)
-from app.handlers.channel_member import register_handlers as register_channel_member_handlers
-from app.handlers.stars_payments import register_stars_handlers
+from app.handlers.registry import register_all_handlers
 from app.middlewares.auth import AuthMiddleware
 from app.middlewares.blacklist import BlacklistMiddleware
 from app.middlewares.button_stats import ButtonStatsMiddleware
@@ -69,6 +14,7 @@ from app.middlewares.context_binding import ContextVarsMiddleware
 from app.middlewares.global_error import GlobalErrorMiddleware
 from app.middlewares.logging import LoggingMiddleware
 from app.middlewares.maintenance import MaintenanceMiddleware
+from app.middlewares.query_stats import QueryStatsMiddleware
 from app.middlewares.subscription_checker import SubscriptionStatusMiddleware
 from app.middlewares.throttling import ThrottlingMiddleware
 from app.services.maintenance_service import maintenance_service
@@ -88,7 +34,16 @@ async def debug_callback_handler(callback: types.CallbackQuery):
     logger.info('Username', username=callback.from_user.username)
 
 
-async def setup_bot() -> tuple[Bot, Dispatcher]:
+def _receives_telegram_updates() -> bool:
+    from app.bootstrap.runtime_mode import resolve_runtime_mode
+
+    polling_enabled, telegram_webhook_enabled, _ = resolve_runtime_mode()
+    return polling_enabled or telegram_webhook_enabled
+
+
+async def setup_bot(
+    *, start_maintenance_monitoring: bool = True, require_redis_storage: bool = False
+) -> tuple[Bot, Dispatcher]:
     try:
         await cache.connect()
         logger.info('Кеш инициализирован')
@@ -109,12 +64,21 @@ async def setup_bot() -> tuple[Bot, Dispatcher]:
         storage = RedisStorage(redis_client)
         logger.info('Подключено к Redis для FSM storage')
     except Exception as e:
+        # Веб-воркер с MemoryStorage терял бы состояние FSM, как только следующий
+        # апдейт пользователя попадёт в другой процесс
+        if require_redis_storage:
+            raise RuntimeError('Redis недоступен: FSM storage нельзя разделить между процессами') from e
         logger.warning('Не удалось подключиться к Redis', error=e)
         logger.info('Используется MemoryStorage для FSM')
         storage = MemoryStorage()
 
     dp = Dispatcher(storage=storage)
 
+    if settings.DB_QUERY_STATS_ENABLED:
+        query_stats_middleware = QueryStatsMiddleware()
+        dp.message.middleware(query_stats_middleware)
+        dp.callback_query.middleware(query_stats_middleware)
+        dp.pre_checkout_query.middleware(query_stats_middleware)
     dp.message.middleware(ContextVarsMiddleware())
     dp.callback_query.middleware(ContextVarsMiddleware())
     dp.pre_checkout_query.middleware(ContextVarsMiddleware())
@@ -152,63 +116,19 @@ async def setup_bot() -> tuple[Bot, Dispatcher]:
     dp.pre_checkout_query.middleware(AuthMiddleware())
     dp.message.middleware(SubscriptionStatusMiddleware())
     dp.callback_query.middleware(SubscriptionStatusMiddleware())
-    start.register_handlers(dp)
-    menu.register_handlers(dp)
-    subscription.register_handlers(dp)
-    balance.register_balance_handlers(dp)
-    promocode.register_handlers(dp)
-    referral.register_handlers(dp)
-    support.register_handlers(dp)
-    server_status.register_handlers(dp)
-    tickets.register_handlers(dp)
-    admin_main.register_handlers(dp)
-    admin_users.register_handlers(dp)
-    admin_subscriptions.register_handlers(dp)
-    admin_servers.register_handlers(dp)
-    admin_promocodes.register_handlers(dp)
-    admin_messages.register_handlers(dp)
-    admin_monitoring.register_handlers(dp)
-    admin_referrals.register_handlers(dp)
-    admin_rules.register_handlers(dp)
-    admin_remnawave.register_handlers(dp)
-    admin_statistics.register_handlers(dp)
-    admin_polls.register_handlers(dp)
-    admin_promo_groups.register_handlers(dp)
-    admin_campaigns.register_handlers(dp)
-    admin_contests.register_handlers(dp)
-    admin_daily_contests.register_handlers(dp)
-    admin_promo_offers.register_handlers(dp)
-    admin_maintenance.register_handlers(dp)
-    admin_user_messages.register_handlers(dp)
-    admin_updates.register_handlers(dp)
-    admin_backup.register_handlers(dp)
-    admin_system_logs.register_handlers(dp)
-    admin_welcome_text.register_welcome_text_handlers(dp)
-    admin_tickets.register_handlers(dp)
-    admin_reports.register_handlers(dp)
-    admin_bot_configuration.register_handlers(dp)
-    admin_pricing.register_handlers(dp)
-    admin_privacy_policy.register_handlers(dp)
-    admin_public_offer.register_handlers(dp)
-    admin_faq.register_handlers(dp)
-    admin_payments.register_handlers(dp)
-    admin_trials.register_handlers(dp)
-    admin_tariffs.register_handlers(dp)
-    admin_bulk_ban.register_bulk_ban_handlers(dp)
-    admin_blacklist.register_blacklist_handlers(dp)
-    admin_blocked_users.register_handlers(dp)
-    admin_required_channels.register_handlers(dp)
-    register_channel_member_handlers(dp)
-    common.register_handlers(dp)
-    register_stars_handlers(dp)
-    user_contests.register_handlers(dp)
-    user_polls.register_handlers(dp)
-    simple_subscription.register_simple_subscription_handlers(dp)
-    logger.info('⭐ Зарегистрированы обработчики Telegram Stars платежей')
-    logger.info('⚡ Зарегистрированы обработчики простой покупки')
-    logger.info('⚡ Зарегистрированы обработчики простой подписки')
+    if _receives_telegram_updates():
+        admin_loader = register_all_handlers(dp, lazy_admin=settings.ADMIN_HANDLERS_LAZY_LOAD)
+        if not admin_loader.loaded:
+            logger.info('🛠️ Админские обработчики загрузятся при первом обращении администратора')
+        logger.info('⭐ Зарегистрированы обработчики Telegram Stars платежей')
+        logger.info('⚡ Зарегистрированы обработчики простой покупки')
+        logger.info('⚡ Зарегистрированы обработчики простой подписки')
+    else:
+        logger.info('Процесс не принимает апдейты Telegram: обработчики бота не загружаются')
 
-    if settings.is_maintenance_monitoring_enabled():
+    if not start_maintenance_monitoring:
+        logger.info('Мониторинг техработ ведёт основной процесс')
+    elif settings.is_maintenance_monitoring_enabled():
         try:
             await maintenance_service.start_monitoring()
             logger.info('Мониторинг техработ запущен')
@@ -1,15 +1,20 @@
 """FastAPI dependencies for cabinet module."""
 
+from collections.abc import Awaitable, Callable
+
 import structlog
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.config import settings
 from app.database.crud.user import get_user_by_id
 from app.database.database import AsyncSessionLocal
-from app.database.models import User
+from app.database.models import Subscription, User, UserPromoGroup
 from app.services.blacklist_service import blacklist_service
+from app.services.cabinet_principal_cache_service import CabinetPrincipal, cabinet_principal_cache_service
 from app.services.maintenance_service import maintenance_service
 
 from .auth.jwt_handler import get_token_payload
@@ -30,30 +35,8 @@ async def get_cabinet_db() -> AsyncSession:
             await session.close()
 
 
-async def get_current_cabinet_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: AsyncSession = Depends(get_cabinet_db),
-) -> User:
-    """
-    Get current authenticated cabinet user from JWT token.
-
-    Args:
-        request: FastAPI request object (for reading X-Telegram-Init-Data header)
-        credentials: HTTP Bearer credentials
-        db: Database session
-
-    Returns:
-        Authenticated User object
-
-    Raises:
-        HTTPException: If token is invalid, expired, or user not found
-    """
-    # Check maintenance mode first (except for admins - checked later)
-    if maintenance_service.is_maintenance_active():
-        # We need to check token first to see if user is admin
-        pass  # Will check after getting user
-
+def _decode_access_token(credentials: HTTPAuthorizationCredentials | None) -> tuple[str, int]:
+    """Проверяет access-токен и возвращает его вместе с id пользователя."""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,15 +63,39 @@ async def get_current_cabinet_user(
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
-    user = await get_user_by_id(db, user_id)
+    return token, user_id
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='User not found',
-        )
 
-    if user.status != 'active':
+# Связи пользователя, которые маршрут может запросить у require_cabinet_user
+_USER_RELATIONSHIP_LOADERS = {
+    'subscription': lambda: selectinload(User.subscription).selectinload(Subscription.tariff),
+    'promo_groups': lambda: selectinload(User.user_promo_groups).selectinload(UserPromoGroup.promo_group),
+    'referrer': lambda: selectinload(User.referrer),
+    'promo_group': lambda: selectinload(User.promo_group),
+}
+
+UserLoader = Callable[[AsyncSession, int], Awaitable[User | None]]
+
+
+def _build_user_loader(relationships: tuple[str, ...]) -> UserLoader:
+    unknown = set(relationships) - _USER_RELATIONSHIP_LOADERS.keys()
+    if unknown:
+        raise ValueError(f'Unknown user relationships: {sorted(unknown)}')
+    options = tuple(_USER_RELATIONSHIP_LOADERS[name]() for name in relationships)
+
+    async def load_user(db: AsyncSession, user_id: int) -> User | None:
+        result = await db.execute(select(User).options(*options).where(User.id == user_id))
+        return result.scalar_one_or_none()
+
+    return load_user
+
+
+_load_user_row = _build_user_loader(())
+
+
+async def _check_cabinet_access(request: Request, principal: CabinetPrincipal) -> None:
+    """Проверки, которые выполняются на каждый запрос: они зависят от заголовков и живых настроек."""
+    if principal.status != 'active':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail='User account is not active',
@@ -101,14 +108,14 @@ async def get_current_cabinet_user(
     # This prevents cross-account token reuse when Telegram WebView
     # shares localStorage across accounts on the same device.
     init_data_raw = request.headers.get('X-Telegram-Init-Data')
-    if init_data_raw and user.telegram_id is not None:
+    if init_data_raw and principal.telegram_id is not None:
         # Use generous max_age: Telegram Desktop caches initData
         tg_user = validate_telegram_init_data(init_data_raw, max_age_seconds=86400 * 30)
-        if tg_user and tg_user.get('id') != user.telegram_id:
+        if tg_user and tg_user.get('id') != principal.telegram_id:
             logger.warning(
                 'Telegram identity mismatch: JWT belongs to different user than current Telegram account',
-                jwt_user_id=user.id,
-                jwt_telegram_id=user.telegram_id,
+                jwt_user_id=principal.id,
+                jwt_telegram_id=principal.telegram_id,
                 init_data_telegram_id=tg_user.get('id'),
             )
             raise HTTPException(
@@ -118,8 +125,8 @@ async def get_current_cabinet_user(
             )
 
     # Check blacklist
-    if user.telegram_id is not None:
-        is_blacklisted, reason = await blacklist_service.is_user_blacklisted(user.telegram_id, user.username)
+    if principal.telegram_id is not None:
+        is_blacklisted, reason = await blacklist_service.is_user_blacklisted(principal.telegram_id, principal.username)
         if is_blacklisted:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -132,7 +139,9 @@ async def get_current_cabinet_user(
     # Check maintenance mode (allow admins to pass)
     if maintenance_service.is_maintenance_active():
         # Проверяем админа по telegram_id ИЛИ email
-        is_admin = settings.is_admin(telegram_id=user.telegram_id, email=user.email if user.email_verified else None)
+        is_admin = settings.is_admin(
+            telegram_id=principal.telegram_id, email=principal.email if principal.email_verified else None
+        )
         if not is_admin:
             status_info = maintenance_service.get_status_info()
             raise HTTPException(
@@ -147,15 +156,17 @@ async def get_current_cabinet_user(
     # Check required channel subscription - Telegram users only
     if settings.CHANNEL_IS_REQUIRED_SUB:
         # Skip for email-only users (no telegram_id)
-        if user.telegram_id is not None:
+        if principal.telegram_id is not None:
             # Skip admin check
             is_admin = settings.is_admin(
-                telegram_id=user.telegram_id, email=user.email if user.email_verified else None
+                telegram_id=principal.telegram_id, email=principal.email if principal.email_verified else None
             )
             if not is_admin:
                 from app.services.channel_subscription_service import channel_subscription_service
 
-                channels_with_status = await channel_subscription_service.get_channels_with_status(user.telegram_id)
+                channels_with_status = await channel_subscription_service.get_channels_with_status(
+                    principal.telegram_id
+                )
                 is_subscribed = (
                     all(ch['is_subscribed'] for ch in channels_with_status) if channels_with_status else True
                 )
@@ -170,9 +181,116 @@ async def get_current_cabinet_user(
                         },
                     )
 
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail='User not found',
+    )
+
+
+async def _authenticate(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None,
+    db: AsyncSession,
+    load_user: UserLoader | None,
+) -> tuple[CabinetPrincipal, User | None]:
+    """Проверяет токен и доступ; пользователь загружается только если его просит маршрут.
+
+    Принципал берётся из кеша по токену. При промахе пользователь читается из БД
+    тем же загрузчиком, что нужен маршруту, чтобы не делать второй запрос.
+    """
+    token, user_id = _decode_access_token(credentials)
+
+    user: User | None = None
+    principal = await cabinet_principal_cache_service.get(user_id, token)
+    if principal is None:
+        user = await (load_user or _load_user_row)(db, user_id)
+        if not user:
+            raise _user_not_found()
+        principal = CabinetPrincipal.from_user(user)
+        if principal.status == 'active':
+            await cabinet_principal_cache_service.store(token, principal)
+
+    await _check_cabinet_access(request, principal)
+
+    if user is None and load_user is not None:
+        user = await load_user(db, user_id)
+        if not user:
+            raise _user_not_found()
+    return principal, user
+
+
+async def get_current_cabinet_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: AsyncSession = Depends(get_cabinet_db),
+) -> User:
+    """
+    Get current authenticated cabinet user from JWT token.
+
+    Loads the user with subscription, promo groups and referrer. Routes that
+    need less should use ``require_cabinet_user(...)`` or ``get_cabinet_principal``.
+
+    Args:
+        request: FastAPI request object (for reading X-Telegram-Init-Data header)
+        credentials: HTTP Bearer credentials
+        db: Database session
+
+    Returns:
+        Authenticated User object
+
+    Raises:
+        HTTPException: If token is invalid, expired, or user not found
+    """
+    _principal, user = await _authenticate(request, credentials, db, get_user_by_id)
     return user
 
 
+async def get_cabinet_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: AsyncSession = Depends(get_cabinet_db),
+) -> CabinetPrincipal:
+    """
+    Get current authenticated cabinet user without loading the ORM object.
+
+    For routes that only need the user's id/identity: on a cache hit the
+    request does not touch the users table at all.
+    """
+    principal, _user = await _authenticate(request, credentials, db, None)
+    return principal
+
+
+def require_cabinet_user(*relationships: str):
+    """
+    FastAPI dependency factory: authenticated user with only the listed relationships loaded.
+
+    Usage::
+
+        @router.get('/language')
+        async def get_language(user: User = Depends(require_cabinet_user())): ...
+
+
+        @router.get('/devices')
+        async def devices(user: User = Depends(require_cabinet_user('subscription'))): ...
+
+    Accessing a relationship that was not requested raises in async code, so
+    list everything the route (and the services it calls) touches.
+    """
+    load_user = _build_user_loader(relationships)
+
+    async def dependency(
+        request: Request,
+        credentials: HTTPAuthorizationCredentials | None = Depends(security),
+        db: AsyncSession = Depends(get_cabinet_db),
+    ) -> User:
+        _principal, user = await _authenticate(request, credentials, db, load_user)
+        return user
+
+    return dependency
+
+
 async def get_optional_cabinet_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import User
+from app.services.runtime_sync_service import TOPIC_BUTTON_STYLES, runtime_sync_service
 from app.utils.button_styles_cache import (
     ALLOWED_STYLE_VALUES,
     BOT_LOCALES,
@@ -231,8 +232,9 @@ async def update_button_styles(
     # Persist
     await _set_setting_value(db, BUTTON_STYLES_KEY, json.dumps(current))
 
-    # Refresh in-process cache
+    # Refresh in-process cache and notify other processes
     await load_button_styles_cache()
+    await runtime_sync_service.publish(TOPIC_BUTTON_STYLES)
 
     logger.info(
         'Admin updated button styles for sections', telegram_id=admin.telegram_id, changed_sections=changed_sections
@@ -249,6 +251,7 @@ async def reset_button_styles(
     """Reset all button styles to defaults. Admin only."""
     await _set_setting_value(db, BUTTON_STYLES_KEY, json.dumps(DEFAULT_BUTTON_STYLES))
     await load_button_styles_cache()
+    await runtime_sync_service.publish(TOPIC_BUTTON_STYLES)
 
     logger.info('Admin reset button styles to defaults', telegram_id=admin.telegram_id)
 
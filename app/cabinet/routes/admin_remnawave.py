@@ -863,15 +863,20 @@ async def sync_from_panel(
 
 @router.post('/sync/to-panel', response_model=SyncResponse)
 async def sync_to_panel(
+    force: bool = Query(default=False, description='Push every subscription, not only the changed ones'),
     admin: User = Depends(require_permission('remnawave:sync')),
     db: AsyncSession = Depends(get_cabinet_db),
 ) -> SyncResponse:
-    """Sync users from bot to RemnaWave panel."""
+    """Sync users from bot to RemnaWave panel.
+
+    By default only subscriptions changed since the last push are sent; ``force`` also
+    repairs drift made directly in the panel.
+    """
     service = _get_service()
     _ensure_configured(service)
 
-    stats = await service.sync_users_to_panel(db)
-    logger.info('Admin synced to panel', telegram_id=admin.telegram_id)
+    stats = await service.sync_users_to_panel(db, force=force)
+    logger.info('Admin synced to panel', telegram_id=admin.telegram_id, force=force)
 
     return SyncResponse(
         success=True,
@@ -2,13 +2,13 @@
 
 from datetime import UTC, datetime, timedelta
 
-import aiohttp
 import structlog
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 from app.database.models import User
-from app.services.version_service import version_service
+from app.services.version_service import GITHUB_HTTP_PROFILE, version_service
+from app.utils.http_clients import http_clients
 
 from ..dependencies import require_permission
 
@@ -60,8 +60,7 @@ async def _fetch_cabinet_releases(force: bool = False) -> list[dict]:
     url = f'https://api.github.com/repos/{CABINET_REPO}/releases'
 
     try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session, session.get(url) as response:
+        async with http_clients.session('github', GITHUB_HTTP_PROFILE).get(url) as response:
             if response.status == 200:
                 data = await response.json()
                 releases = []
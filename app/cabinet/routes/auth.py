@@ -28,6 +28,7 @@ from app.database.crud.user import (
     verify_and_apply_email_change,
 )
 from app.database.models import CabinetRefreshToken, User
+from app.services.cabinet_principal_cache_service import cabinet_principal_cache_service
 from app.services.campaign_service import AdvertisingCampaignService
 from app.services.disposable_email_service import disposable_email_service
 from app.services.referral_service import process_referral_registration
@@ -113,6 +114,8 @@ async def _create_auth_response(user: User, db: AsyncSession) -> AuthResponse:
     )
     refresh_token = create_refresh_token(user.id)
     expires_in = settings.get_cabinet_access_token_expire_minutes() * 60
+    # Первая пачка запросов SPA после входа не пойдёт в БД за пользователем
+    await cabinet_principal_cache_service.remember(access_token, user)
 
     return AuthResponse(
         access_token=access_token,
@@ -597,7 +600,7 @@ async def register_email(
                 },
                 db=db,
             )
-            custom_subject, custom_body = override if override else (None, None)
+            custom_subject, custom_body = override or (None, None)
 
             await asyncio.to_thread(
                 email_service.send_verification_email,
@@ -1014,6 +1017,7 @@ async def refresh_token(
         role_level=user_role_level,
     )
     expires_in = settings.get_cabinet_access_token_expire_minutes() * 60
+    await cabinet_principal_cache_service.remember(access_token, user)
 
     return TokenResponse(
         access_token=access_token,
@@ -13,7 +13,7 @@ from app.services.privacy_policy_service import PrivacyPolicyService
 from app.services.public_offer_service import PublicOfferService
 from app.services.ultima_agreement_service import get_ultima_agreement
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user
+from ..dependencies import get_cabinet_db, require_cabinet_user
 
 
 logger = structlog.get_logger(__name__)
@@ -278,7 +278,7 @@ async def get_available_languages():
 
 @router.get('/user/language')
 async def get_user_language(
-    user: User = Depends(get_current_cabinet_user),
+    user: User = Depends(require_cabinet_user()),
 ):
     """Get current user's language."""
     return {'language': user.language or 'ru'}
@@ -287,7 +287,7 @@ async def get_user_language(
 @router.patch('/user/language')
 async def update_user_language(
     request: dict[str, str],
-    user: User = Depends(get_current_cabinet_user),
+    user: User = Depends(require_cabinet_user()),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update user's language preference."""
@@ -14,9 +14,11 @@ from app.database.crud.news import (
     get_published_news_count,
     increment_views,
 )
-from app.database.models import NewsArticle, User
+from app.database.models import NewsArticle
+from app.services.cabinet_principal_cache_service import CabinetPrincipal
+from app.services.news_view_counter_service import news_view_counter_service
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user
+from ..dependencies import get_cabinet_db, get_cabinet_principal
 from ..schemas.news import (
     NewsArticleListItem,
     NewsArticleResponse,
@@ -31,7 +33,8 @@ _SLUG_MAX_LENGTH: int = 500
 _SLUG_PATTERN: str = r'^[a-zA-Z0-9_-]+$'
 
 # --- View counter deduplication ---
-# In-memory TTL cache to prevent a single user from inflating view counts.
+# Views are normally deduplicated and batched in Redis (news_view_counter_service).
+# Without Redis this in-memory TTL cache prevents a single user from inflating view counts.
 # Key: (user_id, article_id), Value: timestamp of last counted view.
 # Views from the same user on the same article within _VIEW_DEDUP_SECONDS are ignored.
 _VIEW_DEDUP_SECONDS: int = 300  # 5 minutes
@@ -101,7 +104,7 @@ def _article_to_response(article: NewsArticle, *, include_content: bool = True)
 # NOTE: /categories MUST be declared before /{slug} to avoid route conflict
 @router.get('/categories', response_model=list[str])
 async def list_categories(
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ) -> list[str]:
     """Get list of distinct news categories."""
@@ -117,7 +120,7 @@ async def list_categories(
 
 @router.get('', response_model=NewsListResponse)
 async def list_published_news(
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
     category: str | None = Query(None, max_length=100),
     limit: int = Query(20, ge=1, le=100),
@@ -149,7 +152,7 @@ async def list_published_news(
 @router.get('/{slug}', response_model=NewsArticleResponse)
 async def get_article_by_slug(
     slug: str = Path(..., max_length=_SLUG_MAX_LENGTH, pattern=_SLUG_PATTERN),
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ) -> NewsArticleResponse:
     """Get a single published news article by slug. Increments view count."""
@@ -161,15 +164,18 @@ async def get_article_by_slug(
             detail='Article not found',
         )
 
-    # Increment views with per-user deduplication (5-min TTL).
-    # Prevents view count inflation from repeated requests by the same user.
-    if _should_count_view(user.id, article.id):
+    data = _article_to_response(article, include_content=True)
+
+    # Count the view once per user and day in Redis; the accumulated views are
+    # written to the database in batches, so the response adds the pending delta.
+    pending_views = await news_view_counter_service.record_view(article.id, user.id)
+    if pending_views is not None:
+        data['views_count'] = article.views_count + pending_views
+    elif _should_count_view(user.id, article.id):
+        # Redis unavailable: increment directly with per-user deduplication (5-min TTL)
         try:
-            new_count = await increment_views(db, article.id)
-            # Patch the ORM instance so the response reflects the new count
-            # without an extra db.refresh() round-trip
-            article.views_count = new_count
+            data['views_count'] = await increment_views(db, article.id)
         except Exception:
             logger.warning('Failed to increment views', article_id=article.id)
 
-    return NewsArticleResponse(**_article_to_response(article, include_content=True))
+    return NewsArticleResponse(**data)
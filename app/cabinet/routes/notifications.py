@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import User
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user
+from ..dependencies import get_cabinet_db, require_cabinet_user
 
 
 logger = structlog.get_logger(__name__)
@@ -83,7 +83,7 @@ def _update_notification_settings(user: User, updates: dict[str, Any]) -> dict[s
 
 @router.get('', response_model=NotificationSettingsResponse)
 async def get_notification_settings(
-    user: User = Depends(get_current_cabinet_user),
+    user: User = Depends(require_cabinet_user()),
 ):
     """Get user's notification settings."""
     settings = _get_notification_settings(user)
@@ -93,7 +93,7 @@ async def get_notification_settings(
 @router.patch('', response_model=NotificationSettingsResponse)
 async def update_notification_settings(
     request: NotificationSettingsUpdate,
-    user: User = Depends(get_current_cabinet_user),
+    user: User = Depends(require_cabinet_user()),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update user's notification settings."""
@@ -122,7 +122,7 @@ async def update_notification_settings(
 
 @router.post('/test')
 async def send_test_notification(
-    user: User = Depends(get_current_cabinet_user),
+    user: User = Depends(require_cabinet_user()),
 ):
     """Send a test notification to the user."""
     # This would typically trigger a notification via Telegram bot
@@ -137,7 +137,7 @@ async def send_test_notification(
 async def get_notification_history(
     limit: int = 20,
     offset: int = 0,
-    user: User = Depends(get_current_cabinet_user),
+    user: User = Depends(require_cabinet_user()),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user's notification history."""
@@ -14,10 +14,11 @@ from app.database.crud.poll import (
     get_poll_response_by_id,
     record_poll_answer,
 )
-from app.database.models import Poll, PollQuestion, PollResponse, User
+from app.database.models import Poll, PollQuestion, PollResponse
+from app.services.cabinet_principal_cache_service import CabinetPrincipal
 from app.services.poll_service import get_next_question, get_question_option, reward_user_for_poll
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user
+from ..dependencies import get_cabinet_db, get_cabinet_principal
 
 
 logger = structlog.get_logger(__name__)
@@ -117,7 +118,7 @@ class PollsCountResponse(BaseModel):
 
 @router.get('/count', response_model=PollsCountResponse)
 async def get_polls_count(
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get count of polls available for the user."""
@@ -132,7 +133,7 @@ async def get_polls_count(
 
 @router.get('', response_model=list[PollInfo])
 async def get_available_polls(
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get list of polls available for the user."""
@@ -180,7 +181,7 @@ async def get_available_polls(
 @router.get('/{response_id}', response_model=PollInfo)
 async def get_poll_details(
     response_id: int,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get details of a specific poll response."""
@@ -221,7 +222,7 @@ async def get_poll_details(
 @router.post('/{response_id}/start', response_model=PollStartResponse)
 async def start_poll(
     response_id: int,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Start or continue a poll."""
@@ -272,7 +273,7 @@ async def answer_question(
     response_id: int,
     question_id: int,
     request: AnswerRequest,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Submit answer for a poll question."""
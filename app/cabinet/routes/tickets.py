@@ -12,10 +12,11 @@ from sqlalchemy.orm import selectinload
 from app.cabinet.routes.websocket import notify_admins_new_ticket, notify_admins_ticket_reply
 from app.config import settings
 from app.database.crud.ticket_notification import TicketNotificationCRUD
-from app.database.models import Ticket, TicketMessage, User
+from app.database.models import Ticket, TicketMessage
 from app.handlers.tickets import notify_admins_about_new_ticket, notify_admins_about_ticket_reply
+from app.services.cabinet_principal_cache_service import CabinetPrincipal
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user
+from ..dependencies import get_cabinet_db, get_cabinet_principal
 from ..schemas.tickets import (
     TicketCreateRequest,
     TicketDetailResponse,
@@ -72,7 +73,7 @@ async def get_tickets(
     page: int = Query(1, ge=1, description='Page number'),
     per_page: int = Query(20, ge=1, le=100, description='Items per page'),
     status_filter: str | None = Query(None, alias='status', description='Filter by status'),
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user's support tickets."""
@@ -120,7 +121,7 @@ async def get_tickets(
 @router.post('', response_model=TicketDetailResponse)
 async def create_ticket(
     request: TicketCreateRequest,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Create a new support ticket."""
@@ -194,7 +195,7 @@ async def create_ticket(
 @router.get('/{ticket_id}', response_model=TicketDetailResponse)
 async def get_ticket(
     ticket_id: int,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get ticket with all messages."""
@@ -231,7 +232,7 @@ async def get_ticket(
 async def add_ticket_message(
     ticket_id: int,
     request: TicketMessageCreateRequest,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Add message to existing ticket."""
@@ -314,7 +315,7 @@ async def add_ticket_message(
 @router.post('/{ticket_id}/close', response_model=TicketDetailResponse)
 async def close_ticket(
     ticket_id: int,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Close user's ticket."""
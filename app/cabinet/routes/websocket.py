@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import asyncio
 import json
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
 
 import structlog
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
@@ -12,6 +15,7 @@ from app.cabinet.auth.jwt_handler import get_token_payload
 from app.config import settings
 from app.database.crud.user import get_user_by_id
 from app.database.database import AsyncSessionLocal
+from app.utils.cache import cache
 
 
 logger = structlog.get_logger(__name__)
@@ -19,18 +23,117 @@ logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
+class _CabinetSocketSender:
+    """Очередь исходящих сообщений одного WebSocket с собственной задачей отправки.
+
+    Медленный клиент копит сообщения только в своей очереди и не задерживает
+    остальных; при переполнении очереди или таймауте отправки сокет отключается.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        *,
+        queue_size: int,
+        send_timeout: float,
+        on_failure: Callable[[_CabinetSocketSender], Awaitable[None]],
+    ) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=max(1, queue_size))
+        self._send_timeout = send_timeout
+        self._on_failure = on_failure
+        self._task: asyncio.Task[None] | None = None
+        # Сильная ссылка: иначе задачу обработки отказа может собрать GC до завершения
+        self._failure_task: asyncio.Task[None] | None = None
+        self._failed = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=f'cabinet-ws-sender-{self.user_id}')
+
+    def enqueue(self, data: str) -> bool:
+        if self._failed:
+            return False
+        try:
+            self._queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning('Cabinet WS outbound queue overflow, dropping socket', user_id=self.user_id)
+            self._fail()
+            return False
+        return True
+
+    async def close(self) -> None:
+        task = self._task
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def _fail(self) -> None:
+        if self._failed:
+            return
+        self._failed = True
+        self._failure_task = asyncio.create_task(
+            self._on_failure(self), name=f'cabinet-ws-sender-failure-{self.user_id}'
+        )
+
+    async def _run(self) -> None:
+        while True:
+            data = await self._queue.get()
+            if data is None:
+                return
+            try:
+                await asyncio.wait_for(self.websocket.send_text(data), timeout=self._send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning('Failed to send to cabinet socket', user_id=self.user_id, e=e)
+                self._fail()
+                return
+
+
 class CabinetConnectionManager:
-    """Менеджер WebSocket подключений для кабинета."""
+    """Менеджер WebSocket подключений для кабинета.
+
+    Сообщение сериализуется один раз и раскладывается по очередям сокетов без
+    ожидания отправки. Через Redis pub/sub сообщения, отправленные в любом
+    процессе (бот, webhook, кабинет), доходят до сокетов всех остальных процессов.
+    """
 
-    def __init__(self):
+    PUBSUB_CHANNEL = 'cabinet:ws:events'
+
+    def __init__(self, *, queue_size: int | None = None, send_timeout: float | None = None):
         # user_id -> set of websocket connections
         self._user_connections: dict[int, set[WebSocket]] = {}
         # admin user_ids -> set of websocket connections
         self._admin_connections: dict[int, set[WebSocket]] = {}
+        self._senders: dict[WebSocket, _CabinetSocketSender] = {}
         self._lock = asyncio.Lock()
-
-    async def connect(self, websocket: WebSocket, user_id: int, is_admin: bool) -> None:
-        """Зарегистрировать подключение."""
+        self._queue_size = queue_size
+        self._send_timeout = send_timeout
+        self._instance_id = uuid.uuid4().hex
+        self._pubsub_task: asyncio.Task[None] | None = None
+
+    async def connect(
+        self, websocket: WebSocket, user_id: int, is_admin: bool, *, greeting: dict | None = None
+    ) -> None:
+        """Зарегистрировать подключение.
+
+        ``greeting`` ставится в очередь сокета первым — раньше любых уведомлений.
+        """
+        sender = _CabinetSocketSender(
+            websocket,
+            user_id,
+            queue_size=self._queue_size or settings.get_cabinet_ws_queue_size(),
+            send_timeout=self._send_timeout or settings.get_cabinet_ws_send_timeout(),
+            on_failure=self._handle_sender_failure,
+        )
+        if greeting is not None:
+            sender.enqueue(json.dumps(greeting, default=str, ensure_ascii=False))
         async with self._lock:
             if user_id not in self._user_connections:
                 self._user_connections[user_id] = set()
@@ -41,6 +144,9 @@ class CabinetConnectionManager:
                     self._admin_connections[user_id] = set()
                 self._admin_connections[user_id].add(websocket)
 
+            self._senders[websocket] = sender
+            sender.start()
+
         logger.debug(
             'Cabinet WS connected: user_id is_admin total_users',
             user_id=user_id,
@@ -51,71 +157,157 @@ class CabinetConnectionManager:
     async def disconnect(self, websocket: WebSocket, user_id: int) -> None:
         """Отменить регистрацию подключения."""
         async with self._lock:
-            if user_id in self._user_connections:
-                self._user_connections[user_id].discard(websocket)
-                if not self._user_connections[user_id]:
-                    del self._user_connections[user_id]
+            self._unregister(websocket, user_id)
+            sender = self._senders.pop(websocket, None)
 
-            if user_id in self._admin_connections:
-                self._admin_connections[user_id].discard(websocket)
-                if not self._admin_connections[user_id]:
-                    del self._admin_connections[user_id]
+        if sender is not None:
+            await sender.close()
 
         logger.debug('Cabinet WS disconnected: user_id', user_id=user_id)
 
-    async def send_to_user(self, user_id: int, message: dict) -> None:
-        """Отправить сообщение конкретному пользователю."""
-        # Snapshot connections under the lock to avoid mutation during iteration
+    def _unregister(self, websocket: WebSocket, user_id: int) -> None:
+        if user_id in self._user_connections:
+            self._user_connections[user_id].discard(websocket)
+            if not self._user_connections[user_id]:
+                del self._user_connections[user_id]
+
+        if user_id in self._admin_connections:
+            self._admin_connections[user_id].discard(websocket)
+            if not self._admin_connections[user_id]:
+                del self._admin_connections[user_id]
+
+    async def _handle_sender_failure(self, sender: _CabinetSocketSender) -> None:
         async with self._lock:
-            connections = list(self._user_connections.get(user_id, set()))
+            self._unregister(sender.websocket, sender.user_id)
+            self._senders.pop(sender.websocket, None)
+        # После снятия с учёта disconnect() уже не найдёт отправителя — задачу останавливаем здесь
+        await sender.close()
+        try:
+            await sender.websocket.close(code=1011)
+        except Exception:
+            pass
+
+    def _deliver(self, connections: Iterable[WebSocket], data: str) -> int:
+        delivered = 0
+        for ws in connections:
+            sender = self._senders.get(ws)
+            if sender is not None and sender.enqueue(data):
+                delivered += 1
+        return delivered
 
-        if not connections:
-            return
+    def _deliver_to_user(self, user_id: int, data: str) -> int:
+        return self._deliver(list(self._user_connections.get(user_id, ())), data)
 
-        disconnected = set()
-        data = json.dumps(message, default=str, ensure_ascii=False)
+    def _deliver_to_admins(self, data: str) -> int:
+        connections = [ws for sockets in self._admin_connections.values() for ws in sockets]
+        return self._deliver(connections, data)
 
-        for ws in connections:
-            try:
-                await ws.send_text(data)
-            except Exception as e:
-                logger.warning('Failed to send to user', user_id=user_id, e=e)
-                disconnected.add(ws)
+    def send_to_socket(self, websocket: WebSocket, message: dict) -> bool:
+        """Поставить сообщение в очередь одного сокета (ответы на его же запросы, без pub/sub)."""
+        return self._deliver((websocket,), json.dumps(message, default=str, ensure_ascii=False)) > 0
 
-        # Cleanup disconnected
-        if disconnected:
-            async with self._lock:
-                for ws in disconnected:
-                    self._user_connections.get(user_id, set()).discard(ws)
+    async def send_to_user(self, user_id: int, message: dict) -> None:
+        """Отправить сообщение конкретному пользователю."""
+        data = json.dumps(message, default=str, ensure_ascii=False)
+        self._deliver_to_user(user_id, data)
+        await self._publish({'target': 'user', 'user_id': user_id, 'data': data})
 
     async def send_to_admins(self, message: dict) -> None:
         """Отправить сообщение всем админам."""
-        # Snapshot connections under the lock to avoid mutation during iteration
-        async with self._lock:
-            if not self._admin_connections:
+        data = json.dumps(message, default=str, ensure_ascii=False)
+        self._deliver_to_admins(data)
+        await self._publish({'target': 'admins', 'data': data})
+
+    async def _publish(self, envelope: dict[str, Any]) -> None:
+        redis_client = cache.client()
+        if not settings.CABINET_WS_PUBSUB_ENABLED or redis_client is None:
+            return
+        envelope['origin'] = self._instance_id
+        try:
+            await redis_client.publish(self.PUBSUB_CHANNEL, json.dumps(envelope, ensure_ascii=False))
+        except Exception as e:
+            logger.warning('Cabinet WS: failed to publish event to Redis', e=e)
+
+    def _handle_pubsub_message(self, raw: bytes | str) -> None:
+        try:
+            envelope = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning('Cabinet WS: invalid pub/sub payload')
+            return
+
+        if not isinstance(envelope, dict):
+            logger.warning('Cabinet WS: invalid pub/sub envelope', envelope_type=type(envelope).__name__)
+            return
+
+        if envelope.get('origin') == self._instance_id:
+            return
+
+        data = envelope.get('data')
+        if not isinstance(data, str):
+            return
+
+        target = envelope.get('target')
+        if target == 'admins':
+            self._deliver_to_admins(data)
+        elif target == 'user':
+            try:
+                user_id = int(envelope['user_id'])
+            except (KeyError, TypeError, ValueError):
+                logger.warning('Cabinet WS: pub/sub envelope without valid user_id', user_id=envelope.get('user_id'))
                 return
-            # Create a snapshot: list of (user_id, list of websockets)
-            admin_snapshot = [(user_id, list(connections)) for user_id, connections in self._admin_connections.items()]
+            self._deliver_to_user(user_id, data)
 
-        data = json.dumps(message, default=str, ensure_ascii=False)
-        disconnected_by_user: dict[int, set[WebSocket]] = {}
+    async def start_pubsub(self) -> None:
+        """Подписаться на события других процессов через Redis."""
+        if not settings.CABINET_WS_PUBSUB_ENABLED:
+            return
+        if self._pubsub_task is not None and not self._pubsub_task.done():
+            return
+        self._pubsub_task = asyncio.create_task(self._pubsub_loop(), name='cabinet-ws-pubsub')
 
-        for user_id, connections in admin_snapshot:
-            for ws in connections:
-                try:
-                    await ws.send_text(data)
-                except Exception as e:
-                    logger.warning('Failed to send to admin', user_id=user_id, e=e)
-                    if user_id not in disconnected_by_user:
-                        disconnected_by_user[user_id] = set()
-                    disconnected_by_user[user_id].add(ws)
+    async def stop_pubsub(self) -> None:
+        task = self._pubsub_task
+        self._pubsub_task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _pubsub_loop(self) -> None:
+        retry_delay = 1.0
+        while True:
+            redis_client = cache.client()
+            if redis_client is None:
+                await asyncio.sleep(retry_delay)
+                continue
 
-        # Cleanup disconnected
-        if disconnected_by_user:
-            async with self._lock:
-                for user_id, ws_set in disconnected_by_user.items():
-                    for ws in ws_set:
-                        self._admin_connections.get(user_id, set()).discard(ws)
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.PUBSUB_CHANNEL)
+                logger.info('Cabinet WS: подписка на Redis pub/sub активна', channel=self.PUBSUB_CHANNEL)
+                retry_delay = 1.0
+                async for message in pubsub.listen():
+                    if not message or message.get('type') != 'message':
+                        continue
+                    try:
+                        self._handle_pubsub_message(message.get('data'))
+                    except Exception as e:
+                        # Ошибка одного сообщения не должна рвать подписку и терять следующие
+                        logger.warning('Cabinet WS: failed to handle pub/sub message', e=e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning('Cabinet WS: ошибка Redis pub/sub, переподключение', e=e, retry_delay=retry_delay)
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
 
 
 # Глобальный менеджер подключений
@@ -189,19 +381,19 @@ async def cabinet_websocket_endpoint(websocket: WebSocket):
         logger.error('Cabinet WS: Failed to accept from', client_host=client_host, e=e)
         return
 
-    # Регистрируем подключение
-    await cabinet_ws_manager.connect(websocket, user_id, is_admin)
+    # Регистрируем подключение; приветствие уходит через очередь сокета первым
+    await cabinet_ws_manager.connect(
+        websocket,
+        user_id,
+        is_admin,
+        greeting={
+            'type': 'connected',
+            'user_id': user_id,
+            'is_admin': is_admin,
+        },
+    )
 
     try:
-        # Приветственное сообщение
-        await websocket.send_json(
-            {
-                'type': 'connected',
-                'user_id': user_id,
-                'is_admin': is_admin,
-            }
-        )
-
         # Обрабатываем входящие сообщения
         while True:
             try:
@@ -210,7 +402,7 @@ async def cabinet_websocket_endpoint(websocket: WebSocket):
 
                 # Ping/pong для keepalive
                 if message.get('type') == 'ping':
-                    await websocket.send_json({'type': 'pong'})
+                    cabinet_ws_manager.send_to_socket(websocket, {'type': 'pong'})
 
             except json.JSONDecodeError:
                 logger.warning('Cabinet WS: Invalid JSON from user', user_id=user_id)
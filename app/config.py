@@ -5,13 +5,14 @@ import math
 import os
 import re
 from collections import defaultdict
+from dataclasses import dataclass
 from datetime import time
 from pathlib import Path
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
 import structlog
-from pydantic import Field, field_validator
+from pydantic import Field, PrivateAttr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -26,6 +27,25 @@ USER_TAG_PATTERN = re.compile(r'^[A-Z0-9_]{1,16}$')
 logger = structlog.get_logger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """Разобранные значения настроек для горячих путей (middleware, меню).
+
+    Строится один раз из строковых полей и заменяется целиком при изменении
+    любой настройки, поэтому читатели никогда не видят частично обновлённое
+    состояние.
+    """
+
+    admin_ids: tuple[int, ...]
+    admin_id_set: frozenset[int]
+    admin_emails: tuple[str, ...]
+    admin_email_set: frozenset[str]
+    display_name_banned_keywords: tuple[str, ...]
+    available_subscription_periods: tuple[int, ...]
+    traffic_packages: tuple[dict, ...]
+    support_contact_url: str | None
+
+
 class Settings(BaseSettings):
     BOT_TOKEN: str
     BOT_USERNAME: str | None = None
@@ -60,6 +80,7 @@ class Settings(BaseSettings):
     NALOGO_QUEUE_CHECK_INTERVAL: int = 300  # Интервал проверки очереди (секунды)
     NALOGO_QUEUE_RECEIPT_DELAY: int = 3  # Задержка между отправкой чеков (секунды)
     NALOGO_QUEUE_MAX_ATTEMPTS: int = 10  # Максимум попыток отправки чека
+    NALOGO_QUEUE_CONCURRENCY: int = 4  # Сколько чеков из очереди отправлять параллельно
 
     ADMIN_REPORTS_ENABLED: bool = False
     ADMIN_REPORTS_CHAT_ID: str | None = None
@@ -84,6 +105,7 @@ class Settings(BaseSettings):
     TIMEZONE: str = Field(default_factory=lambda: os.getenv('TZ', 'UTC'))
 
     DATABASE_MODE: str = 'auto'
+    DB_QUERY_STATS_ENABLED: bool = True  # Учёт SQL-запросов по маршрутам и обработчикам
 
     REDIS_URL: str = 'redis://localhost:6379/0'
     CART_TTL_SECONDS: int = 3600  # Время жизни корзины пользователя в Redis (1 час)
@@ -157,6 +179,7 @@ class Settings(BaseSettings):
     SERVER_STATUS_METRICS_VERIFY_SSL: bool = True
     SERVER_STATUS_REQUEST_TIMEOUT: int = 10
     SERVER_STATUS_ITEMS_PER_PAGE: int = 10
+    SERVER_STATUS_REFRESH_SECONDS: int = 30  # Как часто метрики обновляются в фоне
 
     BASE_SUBSCRIPTION_PRICE: int = 50000
     AVAILABLE_SUBSCRIPTION_PERIODS: str = '14,30,60,90,180,360'
@@ -230,6 +253,7 @@ class Settings(BaseSettings):
     REFERRAL_PROGRAM_ENABLED: bool = True
     REFERRAL_NOTIFICATIONS_ENABLED: bool = True
     REFERRAL_NOTIFICATION_RETRY_ATTEMPTS: int = 3
+    REFERRAL_STATS_CACHE_TTL_SECONDS: int = 900
 
     # Настройки вывода реферального баланса
     REFERRAL_WITHDRAWAL_ENABLED: bool = False  # Включить возможность вывода
@@ -253,6 +277,8 @@ class Settings(BaseSettings):
     CONTESTS_BUTTON_VISIBLE: bool = False
     # Для обратной совместимости со старыми конфигами
     REFERRAL_CONTESTS_ENABLED: bool = False
+    # Сверка инкрементального лидерборда конкурсов с событиями в БД (минуты)
+    REFERRAL_CONTEST_LEADERBOARD_RECONCILE_MINUTES: int = 30
 
     BLACKLIST_CHECK_ENABLED: bool = False
     BLACKLIST_GITHUB_URL: str | None = None
@@ -764,6 +790,7 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = 'INFO'
     LOG_FILE: str = 'logs/bot.log'
     LOG_COLORS: bool = True  # ANSI-цвета в консоли (false для plain-text вывода)
+    STARTUP_REPORT_PATH: str = ''  # JSONL-файл с замерами запуска (пусто — не писать)
 
     # === Log Rotation Settings ===
     LOG_ROTATION_ENABLED: bool = False  # По умолчанию старое поведение
@@ -872,7 +899,16 @@ class Settings(BaseSettings):
     WEBHOOK_WORKERS: int = 4
     WEBHOOK_ENQUEUE_TIMEOUT: float = 0.1
     WEBHOOK_WORKER_SHUTDOWN_TIMEOUT: float = 30.0
+    WEBHOOK_MAX_PENDING_PER_CHAT: int = 50
     BOT_RUN_MODE: str = 'polling'
+    PROCESS_ROLE: str = 'all'  # all | web | bot | scheduler
+    SCHEDULER_LEADER_ELECTION_ENABLED: bool = True
+    SCHEDULER_LEASE_TTL_SECONDS: int = 30
+    ADMIN_HANDLERS_LAZY_LOAD: bool = True  # Админские обработчики грузятся при первом обращении админа
+    TELEGRAM_SEND_RATE_LIMIT: float = 25.0  # Общий лимит исходящих сообщений бота в секунду
+    TELEGRAM_SEND_PER_CHAT_INTERVAL: float = 1.0  # Минимальный интервал между сообщениями в один чат
+    BROADCAST_AUTO_RESUME_ENABLED: bool = True  # Продолжать прерванные рестартом рассылки при старте
+    BROADCAST_AUTO_RESUME_MAX_AGE_HOURS: int = 24  # Более старые прерванные рассылки не продолжаются
 
     WEB_API_ENABLED: bool = False
     WEB_API_HOST: str = '0.0.0.0'
@@ -924,6 +960,11 @@ class Settings(BaseSettings):
     CABINET_EMAIL_AUTH_ENABLED: bool = True  # Enable email registration/login in cabinet
     CABINET_URL: str = 'https://example.com/cabinet'  # Base URL for cabinet (used in verification emails)
     CABINET_ULTIMA_ACCOUNT_LINKING_MODE: str = 'code'
+    CABINET_WS_SEND_TIMEOUT: float = 5.0  # Таймаут отправки одного сообщения в WebSocket
+    CABINET_WS_QUEUE_SIZE: int = 100  # Максимум неотправленных сообщений на один сокет
+    CABINET_WS_PUBSUB_ENABLED: bool = True  # Рассылка WS-событий между процессами через Redis
+    CABINET_PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # Кеш проверенного пользователя по access-токену (0 — выкл.)
+    CABINET_NEWS_VIEWS_FLUSH_SECONDS: int = 30  # Как часто просмотры новостей из Redis переносятся в БД
 
     # OAuth 2.0 provider settings for cabinet
     OAUTH_GOOGLE_CLIENT_ID: str = ''
@@ -1094,13 +1135,17 @@ class Settings(BaseSettings):
         Returns:
             True if user is admin
         """
-        if telegram_id and telegram_id in self.get_admin_ids():
+        snapshot = self.snapshot
+        if telegram_id and telegram_id in snapshot.admin_id_set:
             return True
-        if email and email.lower() in [e.lower() for e in self.get_admin_emails()]:
+        if email and email.lower() in snapshot.admin_email_set:
             return True
         return False
 
     def get_admin_ids(self) -> list[int]:
+        return list(self.snapshot.admin_ids)
+
+    def _parse_admin_ids(self) -> list[int]:
         try:
             admin_ids = self.ADMIN_IDS
 
@@ -1116,6 +1161,9 @@ class Settings(BaseSettings):
 
     def get_admin_emails(self) -> list[str]:
         """Get list of admin emails for email-only users."""
+        return list(self.snapshot.admin_emails)
+
+    def _parse_admin_emails(self) -> list[str]:
         try:
             admin_emails = self.ADMIN_EMAILS
 
@@ -1367,6 +1415,9 @@ class Settings(BaseSettings):
         return times[0] if times else None
 
     def get_display_name_banned_keywords(self) -> list[str]:
+        return list(self.snapshot.display_name_banned_keywords)
+
+    def _parse_display_name_banned_keywords(self) -> list[str]:
         raw_value = self.DISPLAY_NAME_BANNED_KEYWORDS
         if raw_value is None:
             return []
@@ -2398,6 +2449,13 @@ class Settings(BaseSettings):
         # kept for backward compatibility
         return self.is_contests_enabled()
 
+    def get_referral_contest_leaderboard_reconcile_minutes(self) -> int:
+        try:
+            minutes = int(self.REFERRAL_CONTEST_LEADERBOARD_RECONCILE_MINUTES)
+        except (TypeError, ValueError):
+            minutes = 30
+        return max(1, min(minutes, 1440))
+
     def get_happ_cryptolink_redirect_template(self) -> str | None:
         template = (self.HAPP_CRYPTOLINK_REDIRECT_TEMPLATE or '').strip()
         return template or None
@@ -2484,7 +2542,9 @@ class Settings(BaseSettings):
         Использует AVAILABLE_SUBSCRIPTION_PERIODS для фильтрации.
         Не фильтрует по цене, т.к. в режиме classic базовая цена может быть 0.
         """
+        return list(self.snapshot.available_subscription_periods)
 
+    def _parse_available_subscription_periods(self) -> list[int]:
         # Получаем разрешённые периоды из настройки
         try:
             periods_str = self.AVAILABLE_SUBSCRIPTION_PERIODS
@@ -2662,6 +2722,13 @@ class Settings(BaseSettings):
             return topic_id
         return self.BACKUP_SEND_TOPIC_ID
 
+    def get_referral_stats_cache_ttl_seconds(self) -> int:
+        try:
+            ttl = int(self.REFERRAL_STATS_CACHE_TTL_SECONDS)
+        except (TypeError, ValueError):
+            ttl = 900
+        return max(60, ttl)
+
     def get_referral_settings(self) -> dict:
         return {
             'program_enabled': self.is_referral_program_enabled(),
@@ -2688,6 +2755,9 @@ class Settings(BaseSettings):
         return self.REFERRAL_NOTIFICATIONS_ENABLED
 
     def get_traffic_packages(self) -> list[dict]:
+        return [dict(package) for package in self.snapshot.traffic_packages]
+
+    def _parse_traffic_packages(self) -> list[dict]:
         try:
             packages = []
             config_str = self.TRAFFIC_PACKAGES_CONFIG.strip()
@@ -2808,6 +2878,9 @@ class Settings(BaseSettings):
         return (self.SUPPORT_USERNAME or '').strip()
 
     def get_support_contact_url(self) -> str | None:
+        return self.snapshot.support_contact_url
+
+    def _build_support_contact_url(self) -> str | None:
         contact = self._clean_support_contact()
 
         if not contact:
@@ -2892,9 +2965,23 @@ class Settings(BaseSettings):
     def get_server_status_request_timeout(self) -> int:
         return max(1, self.SERVER_STATUS_REQUEST_TIMEOUT)
 
+    def get_server_status_refresh_seconds(self) -> int:
+        try:
+            seconds = int(self.SERVER_STATUS_REFRESH_SECONDS)
+        except (TypeError, ValueError):
+            seconds = 30
+        return min(3600, max(5, seconds))
+
     def is_web_api_enabled(self) -> bool:
         return bool(self.WEB_API_ENABLED)
 
+    def get_web_api_worker_count(self) -> int:
+        try:
+            workers = int(self.WEB_API_WORKERS)
+        except (TypeError, ValueError):
+            workers = 1
+        return min(64, max(1, workers))
+
     def get_web_api_allowed_origins(self) -> list[str]:
         raw = (self.WEB_API_ALLOWED_ORIGINS or '').split(',')
         origins = [origin.strip() for origin in raw if origin.strip()]
@@ -2940,6 +3027,30 @@ class Settings(BaseSettings):
             return 'polling'
         return mode
 
+    def get_nalogo_queue_concurrency(self) -> int:
+        try:
+            concurrency = int(self.NALOGO_QUEUE_CONCURRENCY)
+        except (TypeError, ValueError):
+            concurrency = 4
+        return max(1, min(concurrency, 32))
+
+    def get_process_role(self) -> str:
+        role = (self.PROCESS_ROLE or 'all').strip().lower()
+        if role not in {'all', 'web', 'bot', 'scheduler'}:
+            return 'all'
+        return role
+
+    def is_scheduler_candidate(self) -> bool:
+        """Может ли процесс выполнять периодические задачи (участвовать в выборах ведущего)."""
+        return self.get_process_role() in {'all', 'scheduler'}
+
+    def get_scheduler_lease_ttl(self) -> int:
+        try:
+            ttl = int(self.SCHEDULER_LEASE_TTL_SECONDS)
+        except (TypeError, ValueError):
+            ttl = 30
+        return max(5, ttl)
+
     def get_telegram_webhook_path(self) -> str:
         raw_path = (self.WEBHOOK_PATH or '/webhook').strip()
         if not raw_path:
@@ -2962,6 +3073,13 @@ class Settings(BaseSettings):
             workers = 1
         return max(1, workers)
 
+    def get_webhook_max_pending_per_chat(self) -> int:
+        try:
+            limit = int(self.WEBHOOK_MAX_PENDING_PER_CHAT)
+        except (TypeError, ValueError):
+            limit = 50
+        return max(0, limit)
+
     def get_webhook_enqueue_timeout(self) -> float:
         try:
             timeout = float(self.WEBHOOK_ENQUEUE_TIMEOUT)
@@ -2976,6 +3094,27 @@ class Settings(BaseSettings):
             timeout = 30.0
         return max(1.0, timeout)
 
+    def get_telegram_send_rate_limit(self) -> float:
+        try:
+            rate = float(self.TELEGRAM_SEND_RATE_LIMIT)
+        except (TypeError, ValueError):
+            rate = 25.0
+        return max(0.1, rate)
+
+    def get_broadcast_auto_resume_max_age_hours(self) -> int:
+        try:
+            hours = int(self.BROADCAST_AUTO_RESUME_MAX_AGE_HOURS)
+        except (TypeError, ValueError):
+            hours = 24
+        return min(24 * 30, max(1, hours))
+
+    def get_telegram_send_per_chat_interval(self) -> float:
+        try:
+            interval = float(self.TELEGRAM_SEND_PER_CHAT_INTERVAL)
+        except (TypeError, ValueError):
+            interval = 1.0
+        return max(0.0, interval)
+
     def get_telegram_webhook_url(self) -> str | None:
         base_url = (self.WEBHOOK_URL or '').strip()
         if not base_url:
@@ -3001,6 +3140,34 @@ class Settings(BaseSettings):
             return self.CABINET_JWT_SECRET
         return self.BOT_TOKEN
 
+    def get_cabinet_ws_send_timeout(self) -> float:
+        try:
+            timeout = float(self.CABINET_WS_SEND_TIMEOUT)
+        except (TypeError, ValueError):
+            timeout = 5.0
+        return max(0.1, timeout)
+
+    def get_cabinet_ws_queue_size(self) -> int:
+        try:
+            size = int(self.CABINET_WS_QUEUE_SIZE)
+        except (TypeError, ValueError):
+            size = 100
+        return max(1, size)
+
+    def get_cabinet_principal_cache_ttl_seconds(self) -> int:
+        try:
+            ttl = int(self.CABINET_PRINCIPAL_CACHE_TTL_SECONDS)
+        except (TypeError, ValueError):
+            ttl = 30
+        return min(300, max(0, ttl))
+
+    def get_cabinet_news_views_flush_seconds(self) -> int:
+        try:
+            seconds = int(self.CABINET_NEWS_VIEWS_FLUSH_SECONDS)
+        except (TypeError, ValueError):
+            seconds = 30
+        return min(3600, max(5, seconds))
+
     def get_cabinet_access_token_expire_minutes(self) -> int:
         return max(1, self.CABINET_ACCESS_TOKEN_EXPIRE_MINUTES)
 
@@ -3091,6 +3258,38 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
+    _snapshot: SettingsSnapshot | None = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        # Любое изменение поля (BotConfigurationService, monkeypatch в тестах) сбрасывает снимок
+        if not name.startswith('_'):
+            self.__pydantic_private__['_snapshot'] = None
+
+    @property
+    def snapshot(self) -> SettingsSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.rebuild_snapshot()
+        return snapshot
+
+    def rebuild_snapshot(self) -> SettingsSnapshot:
+        """Пересобирает снимок из текущих значений и атомарно подменяет его."""
+        admin_ids = tuple(dict.fromkeys(self._parse_admin_ids()))
+        admin_emails = tuple(dict.fromkeys(self._parse_admin_emails()))
+        snapshot = SettingsSnapshot(
+            admin_ids=admin_ids,
+            admin_id_set=frozenset(admin_ids),
+            admin_emails=admin_emails,
+            admin_email_set=frozenset(admin_emails),
+            display_name_banned_keywords=tuple(self._parse_display_name_banned_keywords()),
+            available_subscription_periods=tuple(self._parse_available_subscription_periods()),
+            traffic_packages=tuple(self._parse_traffic_packages()),
+            support_contact_url=self._build_support_contact_url(),
+        )
+        self.__pydantic_private__['_snapshot'] = snapshot
+        return snapshot
+
     @field_validator('TIMEZONE')
     @classmethod
     def validate_timezone(cls, value: str) -> str:
@@ -286,3 +286,18 @@ async def increment_views(db: AsyncSession, article_id: int) -> int:
     await db.commit()
     row = result.fetchone()
     return row[0] if row else 0
+
+
+async def apply_views_deltas(db: AsyncSession, deltas: dict[int, int]) -> None:
+    """Add accumulated view deltas to their articles in a single transaction.
+
+    Articles are updated in id order so concurrent flushes lock rows in the
+    same order; articles deleted in the meantime are silently skipped.
+    """
+    for article_id in sorted(deltas):
+        await db.execute(
+            update(NewsArticle)
+            .where(NewsArticle.id == article_id)
+            .values(views_count=NewsArticle.views_count + deltas[article_id])
+        )
+    await db.commit()
@@ -47,6 +47,10 @@ async def create_referral_earning(
     logger.info(
         '💰 Создан реферальный заработок: ₽ для пользователя', amount_kopeks=amount_kopeks / 100, user_id=user_id
     )
+
+    from app.services.referral_stats_cache_service import referral_stats_cache_service
+
+    await referral_stats_cache_service.record_earning(user_id, amount_kopeks)
     return earning
 
 
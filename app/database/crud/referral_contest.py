@@ -19,6 +19,14 @@ from app.database.models import (
 logger = structlog.get_logger(__name__)
 
 
+def get_contest_period(contest: ReferralContest) -> tuple[datetime, datetime]:
+    """Границы периода конкурса; полночный end_at означает конец этого дня."""
+    contest_end = contest.end_at
+    if contest_end.hour == 0 and contest_end.minute == 0 and contest_end.second == 0:
+        contest_end = contest_end.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return contest.start_at, contest_end
+
+
 async def create_referral_contest(
     db: AsyncSession,
     *,
@@ -97,11 +105,15 @@ async def update_referral_contest(
     contest: ReferralContest,
     **fields: object,
 ) -> ReferralContest:
+    from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+
     for key, value in fields.items():
         if hasattr(contest, key):
             setattr(contest, key, value)
     await db.commit()
     await db.refresh(contest)
+    # Период конкурса мог измениться — лидерборд соберётся заново при следующем чтении
+    await referral_contest_leaderboard_service.invalidate(contest.id)
     return contest
 
 
@@ -171,9 +183,11 @@ async def add_contest_event(
     if existing:
         # Обновляем amount_kopeks если повторная покупка (upsert)
         if amount_kopeks and existing.amount_kopeks != amount_kopeks:
+            amount_delta = abs(amount_kopeks) - abs(existing.amount_kopeks or 0)
             existing.amount_kopeks = amount_kopeks
             await db.commit()
             await db.refresh(existing)
+            await _record_leaderboard_event(existing, amount_delta=amount_delta)
         return None
 
     event = ReferralContestEvent(
@@ -187,9 +201,53 @@ async def add_contest_event(
     db.add(event)
     await db.commit()
     await db.refresh(event)
+    await _record_leaderboard_event(event, count_delta=1, amount_delta=abs(amount_kopeks))
     return event
 
 
+async def _record_leaderboard_event(
+    event: ReferralContestEvent,
+    *,
+    count_delta: int = 0,
+    amount_delta: int = 0,
+) -> None:
+    from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+
+    await referral_contest_leaderboard_service.record_event(
+        event.contest_id,
+        event.referrer_id,
+        occurred_at=event.occurred_at,
+        count_delta=count_delta,
+        amount_delta=amount_delta,
+    )
+
+
+async def get_contest_scores(
+    db: AsyncSession,
+    contest_id: int,
+    *,
+    start: datetime,
+    end: datetime,
+) -> Sequence[tuple[int, int, int]]:
+    """Очки участников по событиям в БД: (referrer_id, число рефералов, сумма)."""
+    result = await db.execute(
+        select(
+            ReferralContestEvent.referrer_id,
+            func.count(ReferralContestEvent.id),
+            func.coalesce(func.sum(func.abs(ReferralContestEvent.amount_kopeks)), 0),
+        )
+        .where(
+            and_(
+                ReferralContestEvent.contest_id == contest_id,
+                ReferralContestEvent.occurred_at >= start,
+                ReferralContestEvent.occurred_at <= end,
+            )
+        )
+        .group_by(ReferralContestEvent.referrer_id)
+    )
+    return [(int(referrer_id), int(count), int(amount)) for referrer_id, count, amount in result.all()]
+
+
 async def get_contest_leaderboard(
     db: AsyncSession,
     contest_id: int,
@@ -199,16 +257,28 @@ async def get_contest_leaderboard(
     """Получить лидерборд конкурса.
 
     Учитывает только рефералов, зарегистрированных В ПЕРИОД конкурса.
+    Очки читаются из инкрементального лидерборда в Redis; без Redis —
+    агрегатом по событиям.
     """
-    contest = await get_referral_contest(db, contest_id)
+    from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+
+    contest = await db.get(ReferralContest, contest_id)
     if not contest:
         return []
 
-    # Нормализуем границы дат
-    contest_start = contest.start_at
-    contest_end = contest.end_at
-    if contest_end.hour == 0 and contest_end.minute == 0 and contest_end.second == 0:
-        contest_end = contest_end.replace(hour=23, minute=59, second=59, microsecond=999999)
+    scores = await referral_contest_leaderboard_service.get_top(db, contest, limit=limit)
+    if scores is not None:
+        if not scores:
+            return []
+        users_result = await db.execute(select(User).where(User.id.in_([score.referrer_id for score in scores])))
+        users = {user.id: user for user in users_result.scalars().all()}
+        return [
+            (users[score.referrer_id], score.referral_count, score.total_amount_kopeks)
+            for score in scores
+            if score.referrer_id in users
+        ]
+
+    contest_start, contest_end = get_contest_period(contest)
 
     query = (
         select(
@@ -343,8 +413,12 @@ async def delete_referral_contest(
     db: AsyncSession,
     contest: ReferralContest,
 ) -> None:
+    from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+
+    contest_id = contest.id
     await db.delete(contest)
     await db.commit()
+    await referral_contest_leaderboard_service.invalidate(contest_id)
 
 
 async def get_contest_payment_stats(
@@ -518,9 +592,11 @@ async def upsert_contest_event(
     if existing:
         # Обновляем сумму если она изменилась
         if existing.amount_kopeks != amount_kopeks:
+            amount_delta = abs(amount_kopeks) - abs(existing.amount_kopeks or 0)
             existing.amount_kopeks = amount_kopeks
             await db.commit()
             await db.refresh(existing)
+            await _record_leaderboard_event(existing, amount_delta=amount_delta)
         return existing, False
 
     event = ReferralContestEvent(
@@ -534,6 +610,7 @@ async def upsert_contest_event(
     db.add(event)
     await db.commit()
     await db.refresh(event)
+    await _record_leaderboard_event(event, count_delta=1, amount_delta=abs(amount_kopeks))
     return event, True
 
 
@@ -726,6 +803,8 @@ async def sync_contest_events(
             "unpaid_count": int,  # Рефералов без платежей
         }
     """
+    from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+
     contest = await get_referral_contest(db, contest_id)
     if not contest:
         return {'error': 'Contest not found'}
@@ -848,6 +927,8 @@ async def sync_contest_events(
 
     # Сохраняем изменения
     await db.commit()
+    if stats['updated']:
+        await referral_contest_leaderboard_service.rebuild(db, contest)
 
     logger.info(
         'Синхронизация конкурса завершена: обновлено , пропущено , сумма коп.',
@@ -877,6 +958,8 @@ async def cleanup_invalid_contest_events(
             "total_before": int,  # Было событий до очистки
         }
     """
+    from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+
     contest = await get_referral_contest(db, contest_id)
     if not contest:
         return {'error': 'Contest not found'}
@@ -925,6 +1008,7 @@ async def cleanup_invalid_contest_events(
         )
         deleted = delete_result.rowcount
         await db.commit()
+        await referral_contest_leaderboard_service.rebuild(db, contest)
 
     # Считаем сколько осталось валидных событий
     remaining_result = await db.execute(
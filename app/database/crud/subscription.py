@@ -1155,15 +1155,16 @@ async def get_all_subscriptions(db: AsyncSession, page: int = 1, limit: int = 10
 
 async def get_subscriptions_batch(
     db: AsyncSession,
-    offset: int = 0,
+    *,
+    after_id: int = 0,
     limit: int = 500,
 ) -> list[Subscription]:
-    """Получает подписки пачками для синхронизации. Загружает связанных пользователей."""
+    """Получает подписки пачками для синхронизации (keyset по id). Загружает связанных пользователей."""
     result = await db.execute(
         select(Subscription)
         .options(selectinload(Subscription.user))
+        .where(Subscription.id > after_id)
         .order_by(Subscription.id)
-        .offset(offset)
         .limit(limit)
     )
     return list(result.scalars().all())
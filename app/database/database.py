@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
+from app.database.query_stats import install_query_stats
 
 
 logger = structlog.get_logger(__name__)
@@ -73,9 +74,8 @@ engine = create_async_engine(
     # Кеш скомпилированных запросов (правильное размещение)
     query_cache_size=500,
     connect_args=_pg_connect_args if not IS_SQLITE else {},
-    execution_options={
-        'isolation_level': 'READ COMMITTED',
-    },
+    # SQLite не поддерживает READ COMMITTED
+    execution_options={} if IS_SQLITE else {'isolation_level': 'READ COMMITTED'},
     **pool_kwargs,
 )
 
@@ -174,6 +174,9 @@ async def execute_with_retry(
 # QUERY PERFORMANCE MONITORING
 # ============================================================================
 
+if settings.DB_QUERY_STATS_ENABLED:
+    install_query_stats(Engine)
+
 if settings.DEBUG:
 
     @event.listens_for(Engine, 'before_cursor_execute')
@@ -1895,6 +1895,8 @@ class Subscription(Base):
     updated_at = Column(AwareDateTime(), default=func.now(), onupdate=func.now())
 
     last_webhook_update_at = Column(AwareDateTime(), nullable=True)
+    # Отпечаток данных, успешно отправленных в панель при sync_users_to_panel
+    panel_sync_hash = Column(String(64), nullable=True)
 
     remnawave_short_uuid = Column(String(255), nullable=True)
 
@@ -2765,6 +2767,11 @@ class BroadcastHistory(Base):
     email_subject = Column(String(255), nullable=True)
     email_html_content = Column(Text, nullable=True)
 
+    # Последний обработанный users.id Telegram-части — курсор для продолжения рассылки после перезапуска
+    recipient_cursor = Column(Integer, nullable=True)
+    # Состояние доставки по каналам (telegram/email): курсор, счётчики и параметры для автопродолжения
+    delivery_checkpoint = Column(JSON, nullable=True)
+
     admin = relationship('User', back_populates='broadcasts')
 
 
@@ -0,0 +1,181 @@
+"""Постоянный учёт SQL-запросов по HTTP-маршрутам и обработчикам бота.
+
+Хуки ``before/after_cursor_execute`` считают число и время запросов текущей
+области (``query_scope``): HTTP-запроса или апдейта Telegram. Область хранится
+в contextvar и переживает переход SQLAlchemy в greenlet. При закрытии области
+её итоги попадают в гистограммы с фиксированными корзинами, сгруппированные
+по имени маршрута или обработчика — так N+1 и регрессии видны под реальной
+нагрузкой. На запрос уходит несколько микросекунд: два ``perf_counter`` и
+обращение к contextvar.
+
+Вложенная область перехватывает учёт: запросы обработчика, вызванного из
+HTTP-вебхука, относятся к обработчику, а не к маршруту вебхука.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Верхние границы корзин; последняя корзина — всё, что больше
+QUERY_COUNT_BUCKETS: tuple[int, ...] = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+QUERY_TIME_BUCKETS_MS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Защита от неограниченного роста: новые имена сверх лимита копятся под OVERFLOW_SCOPE
+MAX_SCOPES = 500
+OVERFLOW_SCOPE = '<other>'
+
+_QUERY_START_KEY = 'query_stats_start'
+
+
+class QueryScope:
+    __slots__ = ('name', 'queries', 'seconds')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.queries = 0
+        self.seconds = 0.0
+
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts')
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def to_dict(self) -> dict[str, int]:
+        labels = [f'le_{bound:g}' for bound in self.bounds] + ['inf']
+        return dict(zip(labels, self.counts, strict=True))
+
+
+class _ScopeStats:
+    __slots__ = ('db_time_ms', 'max_queries', 'queries', 'queries_per_scope', 'scopes', 'seconds')
+
+    def __init__(self) -> None:
+        self.scopes = 0
+        self.queries = 0
+        self.seconds = 0.0
+        self.max_queries = 0
+        self.queries_per_scope = _Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time_ms = _Histogram(QUERY_TIME_BUCKETS_MS)
+
+    def record(self, scope: QueryScope) -> None:
+        self.scopes += 1
+        self.queries += scope.queries
+        self.seconds += scope.seconds
+        self.max_queries = max(self.max_queries, scope.queries)
+        self.queries_per_scope.observe(scope.queries)
+        self.db_time_ms.observe(scope.seconds * 1000)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'count': self.scopes,
+            'queries': self.queries,
+            'avg_queries': round(self.queries / self.scopes, 2) if self.scopes else 0.0,
+            'max_queries': self.max_queries,
+            'db_time_ms': round(self.seconds * 1000, 2),
+            'avg_db_time_ms': round(self.seconds * 1000 / self.scopes, 3) if self.scopes else 0.0,
+            'queries_histogram': self.queries_per_scope.to_dict(),
+            'db_time_histogram_ms': self.db_time_ms.to_dict(),
+        }
+
+
+class QueryStatsRegistry:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._scopes: dict[str, _ScopeStats] = {}
+        self._query_time_ms = _Histogram(QUERY_TIME_BUCKETS_MS)
+        self._unscoped_queries = 0
+        self._unscoped_seconds = 0.0
+        self._since = datetime.now(UTC)
+
+    def observe_query(self, scope: QueryScope | None, seconds: float) -> None:
+        self._query_time_ms.observe(seconds * 1000)
+        if scope is None:
+            self._unscoped_queries += 1
+            self._unscoped_seconds += seconds
+            return
+        scope.queries += 1
+        scope.seconds += seconds
+
+    def record_scope(self, scope: QueryScope) -> None:
+        stats = self._scopes.get(scope.name)
+        if stats is None:
+            name = scope.name if len(self._scopes) < MAX_SCOPES else OVERFLOW_SCOPE
+            stats = self._scopes.setdefault(name, _ScopeStats())
+        stats.record(scope)
+
+    def get_metrics(self) -> dict[str, Any]:
+        scopes = sorted(self._scopes.items(), key=lambda item: item[1].queries, reverse=True)
+        return {
+            'since': self._since.isoformat(),
+            'query_time_histogram_ms': self._query_time_ms.to_dict(),
+            # Фоновые задачи и прочие запросы вне HTTP-запроса и апдейта
+            'unscoped': {
+                'queries': self._unscoped_queries,
+                'db_time_ms': round(self._unscoped_seconds * 1000, 2),
+            },
+            'scopes': {name: stats.to_dict() for name, stats in scopes},
+        }
+
+
+query_stats = QueryStatsRegistry()
+
+_current_scope: ContextVar[QueryScope | None] = ContextVar('db_query_scope', default=None)
+
+
+@contextmanager
+def query_scope(name: str) -> Iterator[QueryScope]:
+    """Учитывает запросы блока под именем ``name``; имя можно уточнить до выхода из блока."""
+    scope = QueryScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        query_stats.record_scope(scope)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get(_QUERY_START_KEY)
+    if not started:
+        return
+    query_stats.observe_query(_current_scope.get(), time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context) -> None:
+    # Упавший запрос не вызывает after_cursor_execute — снимаем его отметку времени
+    connection = exception_context.connection
+    if connection is not None:
+        started = connection.info.get(_QUERY_START_KEY)
+        if started:
+            started.pop()
+
+
+def install_query_stats(target) -> None:
+    """Подключает учёт к движку или классу ``Engine`` (тогда — ко всем движкам)."""
+    for installed in (Engine, target):
+        if event.contains(installed, 'before_cursor_execute', _before_cursor_execute):
+            return
+    event.listen(target, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(target, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(target, 'handle_error', _handle_error)
@@ -1,4 +1 @@
-from . import balance
-
-
-__all__ = ['balance']
+# Обработчики бота регистрируются через app.handlers.registry
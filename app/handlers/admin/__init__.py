@@ -1,40 +1,3 @@
-# Инициализация админских обработчиков
-from . import (
-    backup,
-    blacklist,
-    blocked_users,
-    bot_configuration,
-    bulk_ban,
-    campaigns,
-    contests,
-    daily_contests,
-    faq,
-    main,
-    maintenance,
-    messages,
-    monitoring,
-    payments,
-    polls,
-    pricing,
-    privacy_policy,
-    promo_groups,
-    promo_offers,
-    promocodes,
-    public_offer,
-    referrals,
-    remnawave,
-    reports,
-    required_channels,
-    rules,
-    servers,
-    statistics,
-    subscriptions,
-    support_settings,
-    system_logs,
-    tickets,
-    trials,
-    updates,
-    user_messages,
-    users,
-    welcome_text,
-)
+# Админские обработчики.
+# Модули не импортируются здесь заранее: их подгружает app.handlers.registry
+# при регистрации, а прямой импорт подмодуля тянет только его зависимости.
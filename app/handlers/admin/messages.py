@@ -43,6 +43,7 @@ from app.services.pinned_message_service import (
     set_active_pinned_message,
     unpin_active_pinned_message,
 )
+from app.services.telegram_send_scheduler import SendPriority, telegram_send_scheduler
 from app.states import AdminStates
 from app.utils.decorators import admin_required, error_handler
 from app.utils.miniapp_buttons import BUTTON_KEY_TO_CABINET_PATH, build_miniapp_or_callback_button
@@ -1205,81 +1206,67 @@ async def confirm_broadcast(callback: types.CallbackQuery, db_user: User, state:
     broadcast_keyboard = create_broadcast_keyboard(selected_buttons, admin_language)
 
     # =========================================================================
-    # Rate limiting: Telegram допускает ~30 msg/sec для бота.
-    # Используем batch_size=25 + 1 сек задержка между батчами = ~25 msg/sec
-    # с запасом, чтобы не получать FloodWait.
-    # Semaphore=25 — все сообщения батча отправляются параллельно.
+    # Rate limiting: Telegram допускает ~30 msg/sec для бота. Темп и общие паузы
+    # FloodWait задаёт telegram_send_scheduler, батч определяет только
+    # количество одновременно ожидающих отправки сообщений.
     # =========================================================================
     _BATCH_SIZE = 25
-    _BATCH_DELAY = 1.0  # секунда между батчами
     _MAX_SEND_RETRIES = 3
     # Обновляем прогресс каждые N батчей (не каждое сообщение — иначе FloodWait на edit_text)
     _PROGRESS_UPDATE_INTERVAL = max(1, 500 // _BATCH_SIZE)  # ~каждые 500 сообщений
     # Минимальный интервал между обновлениями прогресса (секунды)
     _PROGRESS_MIN_INTERVAL = 5.0
 
-    # Глобальная пауза при FloodWait — тормозим ВСЕ отправки, а не один слот семафора
-    flood_wait_until: float = 0.0
+    async def _deliver_broadcast(telegram_id: int) -> None:
+        if has_media and media_file_id:
+            send_method = {
+                'photo': callback.bot.send_photo,
+                'video': callback.bot.send_video,
+                'document': callback.bot.send_document,
+            }.get(media_type)
+            if send_method:
+                media_kwarg = {
+                    'photo': 'photo',
+                    'video': 'video',
+                    'document': 'document',
+                }[media_type]
+                await send_method(
+                    chat_id=telegram_id,
+                    **{media_kwarg: media_file_id},
+                    caption=message_text,
+                    parse_mode='HTML',
+                    reply_markup=broadcast_keyboard,
+                )
+                return
+            # Неизвестный media_type — отправляем как текст
+
+        await callback.bot.send_message(
+            chat_id=telegram_id,
+            text=message_text,
+            parse_mode='HTML',
+            reply_markup=broadcast_keyboard,
+        )
 
     async def send_single_broadcast(telegram_id: int) -> str:
         """Отправляет одно сообщение. Возвращает 'sent', 'blocked' или 'failed'."""
-        nonlocal flood_wait_until
-
         for attempt in range(_MAX_SEND_RETRIES):
-            # Глобальная пауза при FloodWait
-            now = asyncio.get_running_loop().time()
-            if flood_wait_until > now:
-                await asyncio.sleep(flood_wait_until - now)
-
             try:
-                if has_media and media_file_id:
-                    send_method = {
-                        'photo': callback.bot.send_photo,
-                        'video': callback.bot.send_video,
-                        'document': callback.bot.send_document,
-                    }.get(media_type)
-                    if send_method:
-                        media_kwarg = {
-                            'photo': 'photo',
-                            'video': 'video',
-                            'document': 'document',
-                        }[media_type]
-                        await send_method(
-                            chat_id=telegram_id,
-                            **{media_kwarg: media_file_id},
-                            caption=message_text,
-                            parse_mode='HTML',
-                            reply_markup=broadcast_keyboard,
-                        )
-                    else:
-                        # Неизвестный media_type — отправляем как текст
-                        await callback.bot.send_message(
-                            chat_id=telegram_id,
-                            text=message_text,
-                            parse_mode='HTML',
-                            reply_markup=broadcast_keyboard,
-                        )
-                else:
-                    await callback.bot.send_message(
-                        chat_id=telegram_id,
-                        text=message_text,
-                        parse_mode='HTML',
-                        reply_markup=broadcast_keyboard,
-                    )
+                await telegram_send_scheduler.submit(
+                    telegram_id,
+                    lambda: _deliver_broadcast(telegram_id),
+                    priority=SendPriority.BROADCAST,
+                )
                 return 'sent'
 
             except TelegramRetryAfter as e:
-                # Глобальная пауза — тормозим все корутины
-                wait_seconds = e.retry_after + 1
-                flood_wait_until = asyncio.get_running_loop().time() + wait_seconds
+                # Планировщик уже выдержал паузы FloodWait и исчерпал свои повторы:
+                # повторная отправка снова остановила бы всех отправителей
                 logger.warning(
-                    'FloodWait: Telegram просит подождать сек (пользователь , попытка /)',
+                    'FloodWait: повторы планировщика исчерпаны',
                     retry_after=e.retry_after,
                     telegram_id=telegram_id,
-                    attempt=attempt + 1,
-                    MAX_SEND_RETRIES=_MAX_SEND_RETRIES,
                 )
-                await asyncio.sleep(wait_seconds)
+                return 'failed'
 
             except TelegramForbiddenError:
                 return 'blocked'
@@ -1401,9 +1388,6 @@ async def confirm_broadcast(callback: types.CallbackQuery, db_user: User, state:
         if batch_idx % _PROGRESS_UPDATE_INTERVAL == 0:
             await _update_progress_message(sent_count, failed_count, blocked_count)
 
-        # Задержка между батчами для соблюдения rate limits
-        await asyncio.sleep(_BATCH_DELAY)
-
     # Учитываем пропущенных email-only пользователей
     skipped_email_users = total_users_count - total_recipients
     if skipped_email_users > 0:
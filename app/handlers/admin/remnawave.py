@@ -2160,8 +2160,9 @@ async def show_sync_options(callback: types.CallbackQuery, db_user: User, db: As
         '• Рекомендуется делать полную синхронизацию ежедневно\n'
         '• Баланс пользователей НЕ удаляется\n\n'
         '⬆️ <b>Обратная синхронизация:</b>\n'
-        '• Отправляет активных пользователей из бота в панель\n'
-        '• Используйте при сбоях панели или для восстановления данных\n\n' + '\n'.join(status_lines)
+        '• Отправляет подписки, изменившиеся с прошлой отправки\n'
+        '• «Отправить все подписки» — при сбоях панели, правках в самой панели или для восстановления данных\n\n'
+        + '\n'.join(status_lines)
     )
 
     keyboard = [
@@ -2177,6 +2178,12 @@ async def show_sync_options(callback: types.CallbackQuery, db_user: User, db: As
                 callback_data='sync_to_panel',
             )
         ],
+        [
+            types.InlineKeyboardButton(
+                text='⬆️ Отправить все подписки в панель',
+                callback_data='sync_to_panel_force',
+            )
+        ],
         [
             types.InlineKeyboardButton(
                 text='⚙️ Настройки автосинхронизации',
@@ -2529,13 +2536,16 @@ async def sync_users_to_panel(
     db_user: User,
     db: AsyncSession,
 ):
+    # Обычный запуск пропускает подписки, не изменившиеся с прошлой отправки;
+    # полный — отправляет всё и исправляет расхождения, сделанные в самой панели
+    force = callback.data == 'sync_to_panel_force'
     await callback.message.edit_text(
         '⬆️ Выполняется синхронизация данных бота в панель Remnawave...\n\nЭто может занять несколько минут.',
         reply_markup=None,
     )
 
     remnawave_service = RemnaWaveService()
-    stats = await remnawave_service.sync_users_to_panel(db)
+    stats = await remnawave_service.sync_users_to_panel(db, force=force)
 
     if stats['errors'] == 0:
         status_emoji = '✅'
@@ -2549,11 +2559,13 @@ async def sync_users_to_panel(
         '📊 <b>Результаты:</b>\n'
         f'• 🆕 Создано: {stats["created"]}\n'
         f'• 🔄 Обновлено: {stats["updated"]}\n'
+        f'• ⏭ Без изменений: {stats.get("skipped", 0)}\n'
         f'• ❌ Ошибок: {stats["errors"]}'
     )
 
     keyboard = [
-        [types.InlineKeyboardButton(text='🔄 Повторить', callback_data='sync_to_panel')],
+        [types.InlineKeyboardButton(text='🔄 Повторить', callback_data=callback.data)],
+        [types.InlineKeyboardButton(text='⬆️ Отправить все подписки', callback_data='sync_to_panel_force')],
         [types.InlineKeyboardButton(text='🔄 Полная синхронизация', callback_data='sync_all_users')],
         [types.InlineKeyboardButton(text='⬅️ К синхронизации', callback_data='admin_rw_sync')],
     ]
@@ -2972,7 +2984,7 @@ def register_handlers(dp: Dispatcher):
     dp.callback_query.register(cancel_auto_sync_schedule, F.data == 'remnawave_auto_sync_cancel')
     dp.callback_query.register(run_auto_sync_now, F.data == 'remnawave_auto_sync_run')
     dp.callback_query.register(sync_all_users, F.data == 'sync_all_users')
-    dp.callback_query.register(sync_users_to_panel, F.data == 'sync_to_panel')
+    dp.callback_query.register(sync_users_to_panel, F.data.in_({'sync_to_panel', 'sync_to_panel_force'}))
     dp.callback_query.register(show_squad_migration_menu, F.data == 'admin_rw_migration')
     dp.callback_query.register(paginate_migration_source, F.data.startswith('admin_migration_source_page_'))
     dp.callback_query.register(handle_migration_source_selection, F.data.startswith('admin_migration_source_'))
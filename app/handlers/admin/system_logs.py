@@ -1,3 +1,4 @@
+import asyncio
 from datetime import UTC, datetime
 from html import escape
 from pathlib import Path
@@ -10,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.database.models import User
 from app.utils.decorators import admin_required, error_handler
+from app.utils.log_reader import read_log_tail
 
 
 logger = structlog.get_logger(__name__)
@@ -29,7 +31,7 @@ def _format_preview_block(text: str) -> str:
     return f'<blockquote expandable><pre><code>{escaped_text}</code></pre></blockquote>'
 
 
-def _build_logs_message(log_path: Path) -> str:
+def _build_logs_message(log_path: Path, min_level: str | None = None) -> str:
     if not log_path.exists():
         message = (
             '🧾 <b>Системные логи</b>\n\n'
@@ -39,30 +41,35 @@ def _build_logs_message(log_path: Path) -> str:
         return message
 
     try:
-        content = log_path.read_text(encoding='utf-8', errors='ignore')
+        tail = read_log_tail(log_path, max_chars=LOG_PREVIEW_LIMIT, min_level=min_level)
     except Exception as error:  # pragma: no cover - защита от проблем чтения
         logger.error('Ошибка чтения лог-файла', log_path=log_path, error=error)
         message = f'❌ <b>Ошибка чтения логов</b>\n\nНе удалось прочитать файл <code>{log_path}</code>.'
         return message
 
-    total_length = len(content)
-    stats = log_path.stat()
-    updated_at = datetime.fromtimestamp(stats.st_mtime, tz=UTC)
+    updated_at = datetime.fromtimestamp(tail.modified_at, tz=UTC)
 
-    if not content:
+    if tail.text.strip():
+        preview_text = tail.text
+    elif min_level:
+        preview_text = 'Подходящих записей нет.'
+    else:
         preview_text = 'Лог-файл пуст.'
-        truncated = False
+
+    if min_level:
+        scope_line = f'⚠️ Показаны последние записи уровня {min_level} и выше.'
+    elif tail.truncated:
+        scope_line = f'👇 Показаны последние {LOG_PREVIEW_LIMIT} символов.'
     else:
-        preview_text = content[-LOG_PREVIEW_LIMIT:]
-        truncated = total_length > LOG_PREVIEW_LIMIT
+        scope_line = '📄 Показано все содержимое файла.'
 
     details_lines = [
         '🧾 <b>Системные логи</b>',
         '',
         f'📁 <b>Файл:</b> <code>{log_path}</code>',
         f'🕒 <b>Обновлен:</b> {updated_at.strftime("%d.%m.%Y %H:%M:%S")}',
-        f'🧮 <b>Размер:</b> {total_length} символов',
-        (f'👇 Показаны последние {LOG_PREVIEW_LIMIT} символов.' if truncated else '📄 Показано все содержимое файла.'),
+        f'🧮 <b>Размер:</b> {tail.size_bytes} байт',
+        scope_line,
         '',
         _format_preview_block(preview_text),
     ]
@@ -74,6 +81,7 @@ def _get_logs_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text='🔄 Обновить', callback_data='admin_system_logs_refresh')],
+            [InlineKeyboardButton(text='⚠️ Только ошибки', callback_data='admin_system_logs_errors')],
             [InlineKeyboardButton(text='⬇️ Скачать лог', callback_data='admin_system_logs_download')],
             [InlineKeyboardButton(text='⬅️ Назад', callback_data='admin_submenu_system')],
         ]
@@ -88,7 +96,7 @@ async def show_system_logs(
     db: AsyncSession,
 ):
     log_path = _resolve_log_path()
-    message = _build_logs_message(log_path)
+    message = await asyncio.to_thread(_build_logs_message, log_path)
 
     reply_markup = _get_logs_keyboard()
     await callback.message.edit_text(message, reply_markup=reply_markup, parse_mode='HTML')
@@ -103,13 +111,28 @@ async def refresh_system_logs(
     db: AsyncSession,
 ):
     log_path = _resolve_log_path()
-    message = _build_logs_message(log_path)
+    message = await asyncio.to_thread(_build_logs_message, log_path)
 
     reply_markup = _get_logs_keyboard()
     await callback.message.edit_text(message, reply_markup=reply_markup, parse_mode='HTML')
     await callback.answer('🔄 Обновлено')
 
 
+@admin_required
+@error_handler
+async def show_system_log_errors(
+    callback: types.CallbackQuery,
+    db_user: User,
+    db: AsyncSession,
+):
+    log_path = _resolve_log_path()
+    message = await asyncio.to_thread(_build_logs_message, log_path, 'error')
+
+    reply_markup = _get_logs_keyboard()
+    await callback.message.edit_text(message, reply_markup=reply_markup, parse_mode='HTML')
+    await callback.answer()
+
+
 @admin_required
 @error_handler
 async def download_system_logs(
@@ -150,6 +173,10 @@ def register_handlers(dp: Dispatcher):
         refresh_system_logs,
         F.data == 'admin_system_logs_refresh',
     )
+    dp.callback_query.register(
+        show_system_log_errors,
+        F.data == 'admin_system_logs_errors',
+    )
     dp.callback_query.register(
         download_system_logs,
         F.data == 'admin_system_logs_download',
@@ -0,0 +1,182 @@
+"""Реестр обработчиков бота и их отложенная загрузка.
+
+Модули обработчиков импортируются только при регистрации, а не при импорте
+``app.bot``: процессам без входящих апдейтов Telegram (планировщик, web без
+webhook-а бота) они не нужны вовсе. Админские обработчики регистрируются в
+отдельном роутере на их прежнем месте в цепочке и подгружаются при первом
+апдейте от администратора или модератора поддержки.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+from aiogram import BaseMiddleware, Dispatcher, Router
+from aiogram.types import TelegramObject, User
+
+from app.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerRegistration:
+    module: str
+    register: str = 'register_handlers'
+
+
+# Порядок важен: обработчики aiogram проверяются в порядке регистрации
+USER_HANDLERS_HEAD: tuple[HandlerRegistration, ...] = (
+    HandlerRegistration('app.handlers.start'),
+    HandlerRegistration('app.handlers.menu'),
+    HandlerRegistration('app.handlers.subscription'),
+    HandlerRegistration('app.handlers.balance', 'register_balance_handlers'),
+    HandlerRegistration('app.handlers.promocode'),
+    HandlerRegistration('app.handlers.referral'),
+    HandlerRegistration('app.handlers.support'),
+    HandlerRegistration('app.handlers.server_status'),
+    HandlerRegistration('app.handlers.tickets'),
+)
+
+ADMIN_HANDLERS: tuple[HandlerRegistration, ...] = (
+    HandlerRegistration('app.handlers.admin.main'),
+    HandlerRegistration('app.handlers.admin.users'),
+    HandlerRegistration('app.handlers.admin.subscriptions'),
+    HandlerRegistration('app.handlers.admin.servers'),
+    HandlerRegistration('app.handlers.admin.promocodes'),
+    HandlerRegistration('app.handlers.admin.messages'),
+    HandlerRegistration('app.handlers.admin.monitoring'),
+    HandlerRegistration('app.handlers.admin.referrals'),
+    HandlerRegistration('app.handlers.admin.rules'),
+    HandlerRegistration('app.handlers.admin.remnawave'),
+    HandlerRegistration('app.handlers.admin.statistics'),
+    HandlerRegistration('app.handlers.admin.polls'),
+    HandlerRegistration('app.handlers.admin.promo_groups'),
+    HandlerRegistration('app.handlers.admin.campaigns'),
+    HandlerRegistration('app.handlers.admin.contests'),
+    HandlerRegistration('app.handlers.admin.daily_contests'),
+    HandlerRegistration('app.handlers.admin.promo_offers'),
+    HandlerRegistration('app.handlers.admin.maintenance'),
+    HandlerRegistration('app.handlers.admin.user_messages'),
+    HandlerRegistration('app.handlers.admin.updates'),
+    HandlerRegistration('app.handlers.admin.backup'),
+    HandlerRegistration('app.handlers.admin.system_logs'),
+    HandlerRegistration('app.handlers.admin.welcome_text', 'register_welcome_text_handlers'),
+    HandlerRegistration('app.handlers.admin.tickets'),
+    HandlerRegistration('app.handlers.admin.reports'),
+    HandlerRegistration('app.handlers.admin.bot_configuration'),
+    HandlerRegistration('app.handlers.admin.pricing'),
+    HandlerRegistration('app.handlers.admin.privacy_policy'),
+    HandlerRegistration('app.handlers.admin.public_offer'),
+    HandlerRegistration('app.handlers.admin.faq'),
+    HandlerRegistration('app.handlers.admin.payments'),
+    HandlerRegistration('app.handlers.admin.trials'),
+    HandlerRegistration('app.handlers.admin.tariffs'),
+    HandlerRegistration('app.handlers.admin.bulk_ban', 'register_bulk_ban_handlers'),
+    HandlerRegistration('app.handlers.admin.blacklist', 'register_blacklist_handlers'),
+    HandlerRegistration('app.handlers.admin.blocked_users'),
+    HandlerRegistration('app.handlers.admin.required_channels'),
+)
+
+USER_HANDLERS_TAIL: tuple[HandlerRegistration, ...] = (
+    HandlerRegistration('app.handlers.channel_member'),
+    HandlerRegistration('app.handlers.common'),
+    HandlerRegistration('app.handlers.stars_payments', 'register_stars_handlers'),
+    HandlerRegistration('app.handlers.contests'),
+    HandlerRegistration('app.handlers.polls'),
+    HandlerRegistration('app.handlers.simple_subscription', 'register_simple_subscription_handlers'),
+)
+
+
+def _import_registrations(registrations: Sequence[HandlerRegistration]) -> list[Callable[[Router], Any]]:
+    return [getattr(importlib.import_module(item.module), item.register) for item in registrations]
+
+
+def register_handler_group(router: Router, registrations: Sequence[HandlerRegistration]) -> None:
+    for register in _import_registrations(registrations):
+        register(router)
+
+
+def _is_privileged(user: User | None) -> bool:
+    if user is None:
+        return False
+    if settings.is_admin(user.id):
+        return True
+
+    from app.services.support_settings_service import SupportSettingsService
+
+    return SupportSettingsService.is_moderator(user.id)
+
+
+class AdminHandlersLoader:
+    """Загружает админские обработчики в зарезервированный роутер один раз."""
+
+    def __init__(self, router: Router) -> None:
+        self.router = router
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    def load_now(self) -> None:
+        if self.loaded:
+            return
+        started_at = time.perf_counter()
+        register_handler_group(self.router, ADMIN_HANDLERS)
+        self.loaded = True
+        logger.info('🛠️ Админские обработчики загружены', duration=round(time.perf_counter() - started_at, 2))
+
+    async def load(self) -> None:
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            started_at = time.perf_counter()
+            # Импорт тяжёлых модулей — в потоке, регистрация — в цикле событий
+            registers = await asyncio.to_thread(_import_registrations, ADMIN_HANDLERS)
+            for register in registers:
+                register(self.router)
+            self.loaded = True
+            logger.info(
+                '🛠️ Админские обработчики загружены по первому запросу',
+                duration=round(time.perf_counter() - started_at, 2),
+            )
+
+
+class AdminHandlersLoaderMiddleware(BaseMiddleware):
+    def __init__(self, loader: AdminHandlersLoader) -> None:
+        self.loader = loader
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not self.loader.loaded and _is_privileged(data.get('event_from_user')):
+            await self.loader.load()
+        return await handler(event, data)
+
+
+def register_all_handlers(dp: Dispatcher, *, lazy_admin: bool) -> AdminHandlersLoader:
+    register_handler_group(dp, USER_HANDLERS_HEAD)
+
+    admin_router = Router(name='admin_handlers')
+    dp.include_router(admin_router)
+    loader = AdminHandlersLoader(admin_router)
+    if lazy_admin:
+        dp.update.outer_middleware(AdminHandlersLoaderMiddleware(loader))
+    else:
+        loader.load_now()
+
+    # Пользовательские обработчики после админских: здесь общие catch-all хендлеры
+    tail_router = Router(name='user_handlers_tail')
+    dp.include_router(tail_router)
+    register_handler_group(tail_router, USER_HANDLERS_TAIL)
+    return loader
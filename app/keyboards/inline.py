@@ -102,10 +102,10 @@ async def get_main_menu_keyboard_async(
 
         # Получаем данные о рефералах из БД (если нужно)
         try:
-            from app.database.crud.referral import get_user_referral_stats
+            from app.services.referral_stats_cache_service import referral_stats_cache_service
 
             if user and hasattr(user, 'id'):
-                referral_data = await get_user_referral_stats(db, user.id)
+                referral_data = await referral_stats_cache_service.get_menu_stats(db, user.id)
                 if referral_data:
                     referral_count = referral_data.get('invited_count', 0)
                     referral_earnings_kopeks = referral_data.get('total_earned_kopeks', 0)
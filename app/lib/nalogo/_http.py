@@ -25,6 +25,9 @@ class AuthProvider(ABC):
         """Refresh access token using refresh token."""
 
 
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+
 class AsyncHTTPClient:
     """
     Async HTTP client with automatic token refresh on 401 responses.
@@ -33,6 +36,9 @@ class AsyncHTTPClient:
     - Adds Bearer authorization header
     - On 401 response, attempts token refresh once
     - Retries request with new token (max 2 attempts)
+
+    All requests share one long-lived httpx.AsyncClient, so connections
+    to the API are kept alive and reused between calls.
     """
 
     def __init__(
@@ -41,14 +47,29 @@ class AsyncHTTPClient:
         auth_provider: AuthProvider,
         default_headers: dict[str, str] | None = None,
         timeout: float = 10.0,
+        limits: httpx.Limits | None = None,
     ):
         self.base_url = base_url
         self.auth_provider = auth_provider
         self.default_headers = default_headers or {}
         self.timeout = timeout
+        self.limits = limits or DEFAULT_LIMITS
         self._refresh_lock = asyncio.Lock()
+        self._session: httpx.AsyncClient | None = None
         self.max_retries = 2  # Same as PHP AuthenticationPlugin::RETRY_LIMIT
 
+    def session(self) -> httpx.AsyncClient:
+        """Return the shared connection pool, creating it on first use."""
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._session is not None and not self._session.is_closed:
+            await self._session.aclose()
+        self._session = None
+
     async def _get_auth_headers(self) -> dict[str, str]:
         """Get authorization headers from current token."""
         token_data = await self.auth_provider.get_token()
@@ -124,22 +145,23 @@ class AsyncHTTPClient:
         if json_data is not None:
             request_kwargs['json'] = json_data
 
-        async with httpx.AsyncClient() as client:
-            # Initial request
-            response = await client.request(**request_kwargs)
+        client = self.session()
+
+        # Initial request
+        response = await client.request(**request_kwargs)
 
-            # Handle 401 with token refresh (max 1 retry)
-            if response.status_code == HTTPStatus.UNAUTHORIZED:
-                # Build request object for retry
-                request = client.build_request(**request_kwargs)
-                retry_response = await self._handle_401_response(client, request)
-                if retry_response is not None:
-                    response = retry_response
+        # Handle 401 with token refresh (max 1 retry)
+        if response.status_code == HTTPStatus.UNAUTHORIZED:
+            # Build request object for retry
+            request = client.build_request(**request_kwargs)
+            retry_response = await self._handle_401_response(client, request)
+            if retry_response is not None:
+                response = retry_response
 
-            # Check for domain exceptions
-            raise_for_status(response)
+        # Check for domain exceptions
+        raise_for_status(response)
 
-            return response
+        return response
 
     async def get(
         self,
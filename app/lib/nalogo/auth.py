@@ -5,6 +5,8 @@ Based on PHP library's Authenticator class.
 
 import json
 import uuid
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 from pathlib import Path
 from typing import Any
@@ -47,6 +49,8 @@ class AuthProviderImpl(AuthProvider):
         self.device_id = device_id or generate_device_id()
         self.device_info = DeviceInfo(sourceDeviceId=self.device_id)
         self._token_data: dict[str, Any] | None = None
+        # Shared connection pool provider (set by Client); per-call client otherwise
+        self.session_factory: Callable[[], httpx.AsyncClient] | None = None
 
         # Default headers similar to PHP Authenticator
         self.default_headers = {
@@ -91,6 +95,18 @@ class AuthProviderImpl(AuthProvider):
             # Ignore storage errors
             pass
 
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.session_factory is not None:
+            yield self.session_factory()
+            return
+        async with httpx.AsyncClient() as client:
+            yield client
+
+    def clear_token(self) -> None:
+        """Forget the in-memory token so the next call re-authenticates."""
+        self._token_data = None
+
     async def get_token(self) -> dict[str, Any] | None:
         """Get current access token data."""
         return self._token_data
@@ -130,7 +146,7 @@ class AuthProviderImpl(AuthProvider):
             'deviceInfo': self.device_info.model_dump(),
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._session() as client:
             response = await client.post(
                 f'{self.base_url_v1}/auth/lkfl',
                 json=request_data,
@@ -165,7 +181,7 @@ class AuthProviderImpl(AuthProvider):
             'requireTpToBeActive': True,
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._session() as client:
             response = await client.post(
                 f'{self.base_url_v2}/auth/challenge/sms/start',
                 json=request_data,
@@ -200,7 +216,7 @@ class AuthProviderImpl(AuthProvider):
             'deviceInfo': self.device_info.model_dump(),
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._session() as client:
             response = await client.post(
                 f'{self.base_url_v1}/auth/challenge/sms/verify',
                 json=request_data,
@@ -233,7 +249,7 @@ class AuthProviderImpl(AuthProvider):
         }
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._session() as client:
                 response = await client.post(
                     f'{self.base_url_v1}/auth/token',
                     json=request_data,
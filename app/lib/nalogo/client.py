@@ -68,6 +68,7 @@ class Client:
             },
             timeout=timeout,
         )
+        self.auth_provider.session_factory = self.http_client.session
 
         # User profile data (for receipt operations)
         self._user_profile: dict[str, Any] | None = None
@@ -151,6 +152,10 @@ class Client:
             # If token parsing fails, profile will remain None
             pass
 
+    async def aclose(self) -> None:
+        """Close the shared HTTP connection pool."""
+        await self.http_client.aclose()
+
     async def get_access_token(self) -> str | None:
         """
         Get current access token (may be refreshed).
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import CallbackQuery, Message, PreCheckoutQuery, TelegramObject
+
+from app.database.query_stats import query_scope
+
+
+_EVENT_TYPES: dict[type, str] = {
+    Message: 'message',
+    CallbackQuery: 'callback_query',
+    PreCheckoutQuery: 'pre_checkout_query',
+}
+
+
+def handler_scope_name(event: TelegramObject, handler: HandlerObject | None) -> str:
+    """«тип_события:модуль.обработчик» — имя ограничено числом обработчиков, а не данными апдейта."""
+    event_type = _EVENT_TYPES.get(type(event), type(event).__name__)
+    callback = getattr(handler, 'callback', None)
+    if callback is None:
+        return f'{event_type}:<unhandled>'
+    module = getattr(callback, '__module__', '') or ''
+    qualname = getattr(callback, '__qualname__', None) or type(callback).__name__
+    return f'{event_type}:{module.removeprefix("app.handlers.")}.{qualname}'
+
+
+class QueryStatsMiddleware(BaseMiddleware):
+    """Учёт SQL-запросов апдейта по обработчику, в который он попал."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with query_scope(handler_scope_name(event, data.get('handler'))):
+            return await handler(event, data)
@@ -22,6 +22,7 @@ from app.database.models import (
     Transaction,
     User,
 )
+from app.services.telegram_send_scheduler import SendPriority, telegram_send_scheduler
 from app.utils.timezone import format_local_datetime
 
 
@@ -1367,7 +1368,11 @@ class AdminNotificationService:
             if reply_markup is not None:
                 message_kwargs['reply_markup'] = reply_markup
 
-            await self.bot.send_message(**message_kwargs)
+            await telegram_send_scheduler.submit(
+                self.chat_id,
+                lambda: self.bot.send_message(**message_kwargs),
+                priority=SendPriority.TRANSACTIONAL,
+            )
             logger.info('Уведомление отправлено в чат', chat_id=self.chat_id)
             return True
 
@@ -1398,7 +1403,11 @@ class AdminNotificationService:
                     if thread_id:
                         retry_kwargs['message_thread_id'] = thread_id
 
-                    await self.bot.send_message(**retry_kwargs)
+                    await telegram_send_scheduler.submit(
+                        self.chat_id,
+                        lambda: self.bot.send_message(**retry_kwargs),
+                        priority=SendPriority.TRANSACTIONAL,
+                    )
                     logger.warning('Уведомление отправлено fallback-режимом (plain text)', chat_id=self.chat_id)
                     return True
                 except Exception as retry_error:
@@ -2055,7 +2064,11 @@ class AdminNotificationService:
                     media_kwargs['message_thread_id'] = thread_id
                 if keyboard:
                     media_kwargs['reply_markup'] = keyboard
-                await send_method(**media_kwargs)
+                await telegram_send_scheduler.submit(
+                    self.chat_id,
+                    lambda: send_method(**media_kwargs),
+                    priority=SendPriority.TRANSACTIONAL,
+                )
             else:
                 # Текст отдельно, медиа следом в тот же топик
                 await self._send_message(text, reply_markup=keyboard, ticket_event=True)
@@ -2065,7 +2078,11 @@ class AdminNotificationService:
                 }
                 if thread_id:
                     media_kwargs['message_thread_id'] = thread_id
-                await send_method(**media_kwargs)
+                await telegram_send_scheduler.submit(
+                    self.chat_id,
+                    lambda: send_method(**media_kwargs),
+                    priority=SendPriority.TRANSACTIONAL,
+                )
 
             return True
         except Exception as e:
@@ -2100,7 +2117,11 @@ class AdminNotificationService:
             if notification_topic_id:
                 message_kwargs['message_thread_id'] = notification_topic_id
 
-            await bot.send_message(**message_kwargs)
+            await telegram_send_scheduler.submit(
+                self.chat_id,
+                lambda: bot.send_message(**message_kwargs),
+                priority=SendPriority.NOTIFICATION,
+            )
             logger.info(
                 'Уведомление о подозрительной активности отправлено в чат топик',
                 chat_id=self.chat_id,
@@ -7,14 +7,16 @@ import asyncio
 import time
 from datetime import UTC, datetime, timedelta
 
-import aiohttp
 import structlog
 
 from app.config import settings
+from app.utils.http_clients import HttpClientProfile, http_clients
 
 
 logger = structlog.get_logger(__name__)
 
+BLACKLIST_HTTP_PROFILE = HttpClientProfile(timeout_seconds=30, limit_per_host=1)
+
 
 class BlacklistService:
     """
@@ -70,7 +72,8 @@ class BlacklistService:
                     raw_url = github_url
 
                 # Получаем содержимое файла
-                async with aiohttp.ClientSession() as session, session.get(raw_url) as response:
+                session = http_clients.session('blacklist', BLACKLIST_HTTP_PROFILE)
+                async with session.get(raw_url) as response:
                     if response.status != 200:
                         logger.error('Ошибка при получении черного списка: статус', status=response.status)
                         return False
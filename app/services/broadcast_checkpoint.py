@@ -0,0 +1,138 @@
+"""Контрольные точки рассылок и защита от повторной доставки.
+
+Состояние каждого канала рассылки (курсор по ``users.id``, счётчики и
+параметры, нужные для продолжения) хранится в
+``broadcast_history.delivery_checkpoint``. Между контрольными точками
+исход доставки по каждому получателю отмечается в Redis-битмапах
+(delivered/blocked/failed, бит = ``users.id``): после рестарта уже
+обработанные получатели пропускаются, даже если курсор в БД отстал.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any
+
+import structlog
+
+from app.utils.cache import cache
+
+
+logger = structlog.get_logger(__name__)
+
+
+_LEDGER_TTL_SECONDS = 7 * 24 * 3600
+_LEDGER_KINDS = ('delivered', 'blocked', 'failed')
+
+
+@dataclass(slots=True)
+class BroadcastCheckpoint:
+    """Состояние одного канала рассылки."""
+
+    target: str | None = None
+    cursor: int | None = None
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    selected_buttons: list[str] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed + self.blocked
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> BroadcastCheckpoint:
+        if not isinstance(data, dict):
+            return cls()
+        known = {item.name for item in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def read_checkpoint(raw: dict[str, Any] | None, channel: str) -> BroadcastCheckpoint | None:
+    """Достаёт состояние канала из ``delivery_checkpoint`` записи рассылки."""
+    if not isinstance(raw, dict) or not isinstance(raw.get(channel), dict):
+        return None
+    return BroadcastCheckpoint.from_dict(raw[channel])
+
+
+def write_checkpoint(
+    raw: dict[str, Any] | None,
+    channel: str,
+    checkpoint: BroadcastCheckpoint,
+) -> dict[str, Any]:
+    """Возвращает новый ``delivery_checkpoint`` с обновлённым состоянием канала.
+
+    Создаётся новый словарь, чтобы SQLAlchemy зафиксировал изменение JSON-колонки.
+    """
+    updated = dict(raw) if isinstance(raw, dict) else {}
+    updated[channel] = checkpoint.to_dict()
+    return updated
+
+
+class BroadcastDeliveryLedger:
+    """Журнал доставки рассылки в Redis-битмапах.
+
+    Без Redis журнал ничего не помнит: защитой от повторов остаётся только
+    курсор контрольной точки.
+    """
+
+    def __init__(self, broadcast_id: int, channel: str) -> None:
+        self._prefix = f'broadcast:{broadcast_id}:{channel}'
+
+    def _key(self, kind: str) -> str:
+        return f'{self._prefix}:{kind}'
+
+    async def lookup(self, user_ids: Sequence[int]) -> dict[int, str]:
+        """Возвращает уже обработанных получателей: ``users.id`` -> ``delivered``/``blocked``."""
+        client = cache.client()
+        if client is None or not user_ids:
+            return {}
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.getbit(self._key('delivered'), user_id)
+                pipe.getbit(self._key('blocked'), user_id)
+            bits = await pipe.execute()
+        except Exception as error:
+            logger.warning('Не удалось прочитать журнал доставки рассылки', prefix=self._prefix, error=error)
+            return {}
+
+        handled: dict[int, str] = {}
+        for index, user_id in enumerate(user_ids):
+            if int(bits[index * 2] or 0):
+                handled[user_id] = 'delivered'
+            elif int(bits[index * 2 + 1] or 0):
+                handled[user_id] = 'blocked'
+        return handled
+
+    async def record(
+        self,
+        *,
+        delivered: Iterable[int] = (),
+        blocked: Iterable[int] = (),
+        failed: Iterable[int] = (),
+    ) -> None:
+        client = cache.client()
+        if client is None:
+            return
+
+        groups = dict(zip(_LEDGER_KINDS, (list(delivered), list(blocked), list(failed)), strict=True))
+        if not any(groups.values()):
+            return
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for kind, user_ids in groups.items():
+                if not user_ids:
+                    continue
+                for user_id in user_ids:
+                    pipe.setbit(self._key(kind), user_id, 1)
+                pipe.expire(self._key(kind), _LEDGER_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as error:
+            logger.warning('Не удалось записать журнал доставки рассылки', prefix=self._prefix, error=error)
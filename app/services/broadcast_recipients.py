@@ -0,0 +1,229 @@
+"""Потоковая выборка получателей рассылок.
+
+Вместо загрузки всех пользователей в ORM и фильтрации в Python целевые группы
+описаны SQL-условиями над ``users``, а получатели читаются страницами по
+скалярным колонкам с keyset-пагинацией по ``users.id``. Каждая страница
+читается в отдельной короткой сессии, так что долгая рассылка не держит
+соединение с БД, а последний обработанный ``users.id`` служит курсором для
+продолжения после перезапуска.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import ColumnElement, and_, exists, func, or_, select, true
+
+from app.database.database import AsyncSessionLocal
+from app.database.models import Subscription, SubscriptionEvent, SubscriptionStatus, User, UserStatus
+
+
+RECIPIENT_PAGE_SIZE = 1000
+
+_LOW_BALANCE_THRESHOLD_KOPEKS = 10000  # 100 рублей
+
+
+@dataclass(slots=True, frozen=True)
+class TelegramRecipient:
+    user_id: int
+    telegram_id: int
+
+
+@dataclass(slots=True, frozen=True)
+class EmailRecipient:
+    user_id: int
+    email: str
+    user_name: str
+
+
+def _subscription_exists(*conditions: ColumnElement[bool]) -> ColumnElement[bool]:
+    return exists(select(Subscription.id).where(Subscription.user_id == User.id, *conditions))
+
+
+def _subscription_is_active(now: datetime) -> ColumnElement[bool]:
+    return and_(Subscription.status == SubscriptionStatus.ACTIVE.value, Subscription.end_date > now)
+
+
+def _zero_traffic() -> ColumnElement[bool]:
+    return or_(Subscription.traffic_used_gb.is_(None), Subscription.traffic_used_gb <= 0)
+
+
+def _expired_condition(now: datetime) -> ColumnElement[bool]:
+    expired_statuses = [SubscriptionStatus.EXPIRED.value, SubscriptionStatus.DISABLED.value]
+    return or_(
+        _subscription_exists(or_(Subscription.status.in_(expired_statuses), Subscription.end_date <= now)),
+        and_(~_subscription_exists(), User.has_had_paid_subscription == True),
+    )
+
+
+def _custom_condition(criteria: str, now: datetime) -> ColumnElement[bool] | None:
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    conditions = {
+        'today': User.created_at >= today,
+        'week': User.created_at >= now - timedelta(days=7),
+        'month': User.created_at >= now - timedelta(days=30),
+        'active_today': User.last_activity >= today,
+        'inactive_week': User.last_activity < now - timedelta(days=7),
+        'inactive_month': User.last_activity < now - timedelta(days=30),
+        'referrals': User.referred_by_id.isnot(None),
+        'direct': User.referred_by_id.is_(None),
+    }
+    return conditions.get(criteria)
+
+
+def build_telegram_target_condition(target: str, now: datetime | None = None) -> ColumnElement[bool] | None:
+    """SQL-условие над ``users`` для целевой группы Telegram-рассылки.
+
+    Повторяет семантику ``get_target_users``/``get_custom_users`` из
+    ``app.handlers.admin.messages``. Для неизвестной группы возвращает ``None``.
+    """
+    now = now or datetime.now(UTC)
+
+    if target.startswith('custom_'):
+        condition = _custom_condition(target[len('custom_') :], now)
+    elif target.startswith('tariff_'):
+        try:
+            tariff_id = int(target.split('_')[1])
+        except (IndexError, ValueError):
+            return None
+        condition = _subscription_exists(_subscription_is_active(now), Subscription.tariff_id == tariff_id)
+    else:
+        active = _subscription_is_active(now)
+        week_ago = now - timedelta(days=7)
+        conditions: dict[str, ColumnElement[bool]] = {
+            'all': true(),
+            'active': _subscription_exists(active, Subscription.is_trial == False),
+            'trial': _subscription_exists(Subscription.is_trial == True),
+            'no': ~_subscription_exists(active),
+            'expiring': _subscription_exists(active, Subscription.end_date <= now + timedelta(days=3)),
+            'expiring_subscribers': _subscription_exists(active, Subscription.end_date <= now + timedelta(days=7)),
+            'expired': _expired_condition(now),
+            'expired_subscribers': _expired_condition(now),
+            'active_zero': _subscription_exists(active, Subscription.is_trial == False, _zero_traffic()),
+            'trial_zero': _subscription_exists(active, Subscription.is_trial == True, _zero_traffic()),
+            'zero': _subscription_exists(active, _zero_traffic()),
+            'canceled_subscribers': _subscription_exists(Subscription.status == SubscriptionStatus.DISABLED.value),
+            'trial_ending': _subscription_exists(
+                active, Subscription.is_trial == True, Subscription.end_date <= now + timedelta(days=3)
+            ),
+            'trial_expired': _subscription_exists(Subscription.is_trial == True, Subscription.end_date <= now),
+            'autopay_failed': User.id.in_(
+                select(SubscriptionEvent.user_id).where(
+                    SubscriptionEvent.event_type == 'autopay_failed',
+                    SubscriptionEvent.occurred_at >= week_ago,
+                )
+            ),
+            'low_balance': and_(User.balance_kopeks > 0, User.balance_kopeks < _LOW_BALANCE_THRESHOLD_KOPEKS),
+            'inactive_30d': User.last_activity < now - timedelta(days=30),
+            'inactive_60d': User.last_activity < now - timedelta(days=60),
+            'inactive_90d': User.last_activity < now - timedelta(days=90),
+        }
+        condition = conditions.get(target)
+
+    if condition is None:
+        return None
+    return and_(User.status == UserStatus.ACTIVE.value, User.telegram_id.isnot(None), condition)
+
+
+def build_email_target_condition(target: str) -> ColumnElement[bool] | None:
+    """SQL-условие над ``users`` для целевой группы email-рассылки."""
+    base = and_(User.email.isnot(None), User.email_verified == True, User.status == UserStatus.ACTIVE.value)
+    conditions: dict[str, ColumnElement[bool]] = {
+        'all_email': true(),
+        'email_only': User.auth_type == 'email',
+        'telegram_with_email': and_(User.auth_type == 'telegram', User.telegram_id.isnot(None)),
+        'active_email': _subscription_exists(Subscription.status == SubscriptionStatus.ACTIVE.value),
+        'expired_email': _subscription_exists(
+            Subscription.status.in_([SubscriptionStatus.EXPIRED.value, SubscriptionStatus.DISABLED.value])
+        ),
+    }
+    condition = conditions.get(target)
+    if condition is None:
+        return None
+    return and_(base, condition)
+
+
+async def count_recipients(condition: ColumnElement[bool] | None) -> int:
+    if condition is None:
+        return 0
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(func.count(User.id)).where(condition))
+        return int(result.scalar() or 0)
+
+
+async def iter_telegram_recipients(
+    target: str,
+    *,
+    after_user_id: int = 0,
+    page_size: int = RECIPIENT_PAGE_SIZE,
+) -> AsyncIterator[list[TelegramRecipient]]:
+    """Отдаёт получателей Telegram-рассылки страницами, упорядоченными по ``users.id``."""
+    condition = build_telegram_target_condition(target)
+    if condition is None:
+        return
+
+    cursor = after_user_id
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(User.id, User.telegram_id).where(condition, User.id > cursor).order_by(User.id).limit(page_size)
+            )
+            rows = result.all()
+
+        if not rows:
+            return
+
+        yield [TelegramRecipient(user_id=row.id, telegram_id=row.telegram_id) for row in rows]
+        cursor = rows[-1].id
+        if len(rows) < page_size:
+            return
+
+
+def _email_user_name(email: str, username: str | None, first_name: str | None, last_name: str | None) -> str:
+    user_name = username
+    if not user_name:
+        user_name = first_name or ''
+        if last_name:
+            user_name = f'{user_name} {last_name}'.strip()
+    return user_name or email.split('@', maxsplit=1)[0]
+
+
+async def iter_email_recipients(
+    target: str,
+    *,
+    after_user_id: int = 0,
+    page_size: int = RECIPIENT_PAGE_SIZE,
+) -> AsyncIterator[list[EmailRecipient]]:
+    """Отдаёт получателей email-рассылки страницами, упорядоченными по ``users.id``."""
+    condition = build_email_target_condition(target)
+    if condition is None:
+        return
+
+    cursor = after_user_id
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(User.id, User.email, User.username, User.first_name, User.last_name)
+                .where(condition, User.id > cursor)
+                .order_by(User.id)
+                .limit(page_size)
+            )
+            rows = result.all()
+
+        if not rows:
+            return
+
+        yield [
+            EmailRecipient(
+                user_id=row.id,
+                email=row.email,
+                user_name=_email_user_name(row.email, row.username, row.first_name, row.last_name),
+            )
+            for row in rows
+            if row.email
+        ]
+        cursor = rows[-1].id
+        if len(rows) < page_size:
+            return
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 
 import structlog
@@ -12,13 +13,25 @@ from aiogram.types import InlineKeyboardMarkup
 from sqlalchemy import select
 from sqlalchemy.exc import InterfaceError, SQLAlchemyError
 
+from app.config import settings
 from app.database.database import AsyncSessionLocal
 from app.database.models import BroadcastHistory, Subscription, SubscriptionStatus, User, UserStatus
-from app.handlers.admin.messages import (
-    create_broadcast_keyboard,
-    get_custom_users,
-    get_target_users,
+from app.services.broadcast_checkpoint import (
+    BroadcastCheckpoint,
+    BroadcastDeliveryLedger,
+    read_checkpoint,
+    write_checkpoint,
 )
+from app.services.broadcast_recipients import (
+    EmailRecipient,
+    TelegramRecipient,
+    build_email_target_condition,
+    build_telegram_target_condition,
+    count_recipients,
+    iter_email_recipients,
+    iter_telegram_recipients,
+)
+from app.services.telegram_send_scheduler import SendPriority, telegram_send_scheduler
 
 
 if TYPE_CHECKING:
@@ -31,22 +44,37 @@ logger = structlog.get_logger(__name__)
 VALID_MEDIA_TYPES = {'photo', 'video', 'document'}
 
 # =========================================================================
-# Telegram rate limits: ~30 msg/sec для бота.
-# batch_size=25 + 1 sec delay = ~25 msg/sec с запасом.
+# Telegram rate limits (~30 msg/sec для бота) соблюдает общий
+# telegram_send_scheduler; батч задаёт только степень параллельности.
 # =========================================================================
 _TG_BATCH_SIZE = 25
-_TG_BATCH_DELAY = 1.0  # секунда между батчами
-_TG_MAX_RETRIES = 3  # retry при FloodWait / transient errors
+_TG_MAX_RETRIES = 3  # retry при transient errors (FloodWait повторяет планировщик)
 
 # Прогресс обновляется каждые ~500 сообщений ИЛИ раз в 5 секунд (что наступит раньше)
 _PROGRESS_UPDATE_MESSAGES = 500
 _PROGRESS_MIN_INTERVAL_SEC = 5.0
 
+# Ключи состояния каналов в broadcast_history.delivery_checkpoint
+_TELEGRAM_CHANNEL = 'telegram'
+_EMAIL_CHANNEL = 'email'
+# Статусы, с которыми рассылка могла остаться после аварийной остановки
+_RESUMABLE_STATUSES = ('queued', 'in_progress')
+
 # Email broadcast rate limiting: max 8 emails per second
 EMAIL_RATE_LIMIT = 8
 EMAIL_BATCH_SIZE = 50
 
 
+def _select_resumable(channel: str):
+    """Незавершённые рассылки канала, созданные не раньше допустимого для продолжения срока."""
+    created_after = datetime.now(UTC) - timedelta(hours=settings.get_broadcast_auto_resume_max_age_hours())
+    return select(BroadcastHistory).where(
+        BroadcastHistory.status.in_(_RESUMABLE_STATUSES),
+        BroadcastHistory.channel.in_((channel, 'both')),
+        BroadcastHistory.created_at >= created_after,
+    )
+
+
 @dataclass(slots=True)
 class BroadcastMediaConfig:
     type: str
@@ -73,14 +101,6 @@ class EmailBroadcastConfig:
     initiator_name: str | None = None
 
 
-@dataclass(slots=True)
-class _EmailRecipient:
-    """Скалярные данные получателя email (без ORM)."""
-
-    email: str
-    user_name: str
-
-
 @dataclass(slots=True)
 class _BroadcastTask:
     task: asyncio.Task
@@ -131,19 +151,56 @@ class BroadcastService:
             task_entry.cancel_event.set()
             return True
 
+    async def resume_interrupted(self) -> list[int]:
+        """Продолжает Telegram-рассылки, прерванные перезапуском процесса."""
+        if self._bot is None:
+            return []
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_select_resumable(_TELEGRAM_CHANNEL))
+            # Без контрольной точки канала рассылку запускал не этот сервис (отправка из бота
+            # или запись до обновления): её повтор разослал бы сообщение всем заново
+            pending = [
+                (record.id, self._config_from_record(record))
+                for record in result.scalars().all()
+                if read_checkpoint(record.delivery_checkpoint, _TELEGRAM_CHANNEL) is not None
+            ]
+
+        for broadcast_id, config in pending:
+            logger.info('Продолжаем прерванную рассылку', broadcast_id=broadcast_id, target=config.target)
+            await self.start_broadcast(broadcast_id, config)
+
+        return [broadcast_id for broadcast_id, _ in pending]
+
+    @staticmethod
+    def _config_from_record(record: BroadcastHistory) -> BroadcastConfig:
+        checkpoint = read_checkpoint(record.delivery_checkpoint, _TELEGRAM_CHANNEL) or BroadcastCheckpoint()
+        media = None
+        if record.has_media and record.media_type and record.media_file_id:
+            media = BroadcastMediaConfig(
+                type=record.media_type,
+                file_id=record.media_file_id,
+                caption=record.media_caption or record.message_text,
+            )
+        return BroadcastConfig(
+            target=checkpoint.target or record.target_type,
+            message_text=record.message_text or '',
+            selected_buttons=list(checkpoint.selected_buttons),
+            media=media,
+            initiator_name=record.admin_name,
+        )
+
     async def _run_broadcast(
         self,
         broadcast_id: int,
         config: BroadcastConfig,
         cancel_event: asyncio.Event,
     ) -> None:
-        sent_count = 0
-        failed_count = 0
-        blocked_count = 0
+        progress = BroadcastCheckpoint(target=config.target, selected_buttons=list(config.selected_buttons or []))
 
         try:
             if cancel_event.is_set():
-                await self._mark_cancelled(broadcast_id, sent_count, failed_count, blocked_count)
+                await self._mark_cancelled(broadcast_id, progress.sent, progress.failed, progress.blocked)
                 return
 
             async with AsyncSessionLocal() as session:
@@ -152,49 +209,57 @@ class BroadcastService:
                     logger.error('Запись рассылки не найдена в БД', broadcast_id=broadcast_id)
                     return
 
-                broadcast.status = 'in_progress'
-                broadcast.sent_count = 0
-                broadcast.failed_count = 0
-                broadcast.blocked_count = 0
+                stored = read_checkpoint(broadcast.delivery_checkpoint, _TELEGRAM_CHANNEL)
+                resumed = broadcast.status == 'in_progress' and stored is not None and stored.cursor is not None
+                if resumed:
+                    # Продолжаем прерванную рассылку с сохранённой контрольной точки
+                    progress.cursor = stored.cursor
+                    progress.sent = stored.sent
+                    progress.failed = stored.failed
+                    progress.blocked = stored.blocked
+                else:
+                    broadcast.status = 'in_progress'
+                    broadcast.sent_count = 0
+                    broadcast.failed_count = 0
+                    broadcast.blocked_count = 0
+                    broadcast.recipient_cursor = None
+                    broadcast.delivery_checkpoint = write_checkpoint(
+                        broadcast.delivery_checkpoint, _TELEGRAM_CHANNEL, progress
+                    )
                 await session.commit()
 
-            # _fetch_recipients теперь возвращает list[int] (telegram_id), а не ORM-объекты
-            recipient_ids: list[int] = await self._fetch_recipients(config.target)
+            if not resumed:
+                total_count = await count_recipients(build_telegram_target_condition(config.target))
 
-            async with AsyncSessionLocal() as session:
-                broadcast = await session.get(BroadcastHistory, broadcast_id)
-                if not broadcast:
-                    logger.error('Запись рассылки удалена до запуска', broadcast_id=broadcast_id)
-                    return
+                async with AsyncSessionLocal() as session:
+                    broadcast = await session.get(BroadcastHistory, broadcast_id)
+                    if not broadcast:
+                        logger.error('Запись рассылки удалена до запуска', broadcast_id=broadcast_id)
+                        return
 
-                broadcast.total_count = len(recipient_ids)
-                await session.commit()
+                    broadcast.total_count = total_count
+                    await session.commit()
 
             if cancel_event.is_set():
-                await self._mark_cancelled(broadcast_id, sent_count, failed_count, blocked_count)
-                return
-
-            if not recipient_ids:
-                logger.info('Рассылка : получатели не найдены', broadcast_id=broadcast_id)
-                await self._mark_finished(broadcast_id, sent_count, failed_count, blocked_count, cancelled=False)
+                await self._mark_cancelled(broadcast_id, progress.sent, progress.failed, progress.blocked)
                 return
 
             keyboard = self._build_keyboard(config.selected_buttons)
 
             logger.info(
-                'Рассылка : начинаем отправку получателям (batch delay=s)',
+                'Рассылка : начинаем отправку получателям',
                 broadcast_id=broadcast_id,
-                recipient_ids_count=len(recipient_ids),
+                resumed_after_user_id=progress.cursor,
                 TG_BATCH_SIZE=_TG_BATCH_SIZE,
-                TG_BATCH_DELAY=_TG_BATCH_DELAY,
             )
 
-            sent_count, failed_count, blocked_count, cancelled_during_run = await self._send_batched(
+            cancelled_during_run = await self._send_batched(
                 broadcast_id,
-                recipient_ids,
+                self._fetch_recipients(config.target, after_user_id=progress.cursor or 0),
                 config,
                 keyboard,
                 cancel_event,
+                progress,
             )
 
             if cancelled_during_run:
@@ -210,90 +275,86 @@ class BroadcastService:
                     broadcast_id=broadcast_id,
                 )
 
+            if not progress.processed:
+                logger.info('Рассылка : получатели не найдены', broadcast_id=broadcast_id)
+
             await self._mark_finished(
                 broadcast_id,
-                sent_count,
-                failed_count,
-                blocked_count,
+                progress.sent,
+                progress.failed,
+                progress.blocked,
                 cancelled=False,
             )
 
         except asyncio.CancelledError:
-            await self._mark_cancelled(broadcast_id, sent_count, failed_count, blocked_count)
+            if settings.BROADCAST_AUTO_RESUME_ENABLED:
+                # Задачу отменяет остановка процесса: сохраняем точку, рассылка продолжится при старте
+                logger.info('Рассылка прервана остановкой, контрольная точка сохранена', broadcast_id=broadcast_id)
+                await self._update_progress(
+                    broadcast_id, progress.sent, progress.failed, progress.blocked, checkpoint=progress
+                )
+            else:
+                await self._mark_cancelled(broadcast_id, progress.sent, progress.failed, progress.blocked)
             raise
         except Exception as exc:
             logger.exception('Критическая ошибка при выполнении рассылки', broadcast_id=broadcast_id, exc=exc)
-            await self._mark_failed(broadcast_id, sent_count, failed_count, blocked_count)
+            await self._mark_failed(broadcast_id, progress.sent, progress.failed, progress.blocked)
 
-    async def _fetch_recipients(self, target: str) -> list[int]:
-        """Загружает получателей и возвращает список telegram_id (скаляры, не ORM-объекты)."""
-        async with AsyncSessionLocal() as session:
-            if target.startswith('custom_'):
-                criteria = target[len('custom_') :]
-                users_orm = await get_custom_users(session, criteria)
-            else:
-                users_orm = await get_target_users(session, target)
+    def _fetch_recipients(self, target: str, *, after_user_id: int = 0) -> AsyncIterator[list[TelegramRecipient]]:
+        """Потоково отдаёт получателей страницами (скаляры user_id/telegram_id, не ORM-объекты).
 
-            # Извлекаем telegram_id сразу, пока сессия жива.
-            # После выхода из блока ORM-объекты станут detached.
-            return [u.telegram_id for u in users_orm if u.telegram_id is not None]
+        Страницы читаются keyset-пагинацией по users.id, поэтому отправка начинается
+        сразу после первой страницы, а память не зависит от размера базы.
+        """
+        return iter_telegram_recipients(target, after_user_id=after_user_id)
 
     async def _send_batched(
         self,
         broadcast_id: int,
-        recipient_ids: list[int],
+        recipient_pages: AsyncIterator[list[TelegramRecipient]],
         config: BroadcastConfig,
         keyboard: InlineKeyboardMarkup | None,
         cancel_event: asyncio.Event,
-    ) -> tuple[int, int, int, bool]:
+        progress: BroadcastCheckpoint,
+    ) -> bool:
         """
         Единый метод рассылки для любого количества получателей.
 
-        Батчинг по _TG_BATCH_SIZE сообщений с _TG_BATCH_DELAY задержкой.
-        Прогресс обновляется каждые _PROGRESS_UPDATE_MESSAGES сообщений.
-        Глобальная пауза при FloodWait.
+        Получатели читаются страницами, каждая страница отправляется батчами по
+        _TG_BATCH_SIZE; темп отправки и паузы FloodWait задаёт общий
+        telegram_send_scheduler (рассылка идёт с низшим приоритетом).
+        Прогресс и курсор сохраняются каждые _PROGRESS_UPDATE_MESSAGES сообщений.
 
-        Returns (sent_count, failed_count, blocked_count, was_cancelled).
+        Счётчики накапливаются в ``progress``. Returns was_cancelled.
         """
-        sent_count = 0
-        failed_count = 0
-        blocked_count = 0
-        blocked_telegram_ids: list[int] = []
-
-        # Глобальная пауза при FloodWait — все корутины ждут
-        flood_wait_until: float = 0.0
         last_progress_update: float = 0.0
-        last_progress_count: int = 0
+        last_progress_count: int = progress.processed
+        ledger = BroadcastDeliveryLedger(broadcast_id, _TELEGRAM_CHANNEL)
 
         async def send_single(telegram_id: int) -> str:
             """Returns 'sent', 'blocked', or 'failed'."""
-            nonlocal flood_wait_until
-
             for attempt in range(_TG_MAX_RETRIES):
-                # Глобальная пауза при FloodWait
-                now = asyncio.get_running_loop().time()
-                if flood_wait_until > now:
-                    await asyncio.sleep(flood_wait_until - now)
-
                 if cancel_event.is_set():
                     return 'failed'
 
                 try:
-                    await self._deliver_message(telegram_id, config, keyboard)
+                    await telegram_send_scheduler.submit(
+                        telegram_id,
+                        lambda: self._deliver_message(telegram_id, config, keyboard),
+                        priority=SendPriority.BROADCAST,
+                    )
                     return 'sent'
 
                 except TelegramRetryAfter as e:
-                    wait_seconds = e.retry_after + 1
-                    flood_wait_until = asyncio.get_running_loop().time() + wait_seconds
+                    # Планировщик уже выдержал паузы FloodWait и исчерпал свои повторы:
+                    # повторная отправка снова остановила бы всех отправителей
                     logger.warning(
-                        'FloodWait рассылки : Telegram просит сек (user попытка /)',
+                        'FloodWait рассылки: повторы планировщика исчерпаны',
                         broadcast_id=broadcast_id,
                         retry_after=e.retry_after,
                         telegram_id=telegram_id,
-                        attempt=attempt + 1,
-                        TG_MAX_RETRIES=_TG_MAX_RETRIES,
                     )
-                    await asyncio.sleep(wait_seconds)
+                    return 'failed'
 
                 except TelegramForbiddenError:
                     return 'blocked'
@@ -318,49 +379,71 @@ class BroadcastService:
 
             return 'failed'
 
-        for i in range(0, len(recipient_ids), _TG_BATCH_SIZE):
-            if cancel_event.is_set():
-                await self._mark_cancelled(broadcast_id, sent_count, failed_count, blocked_count)
-                return sent_count, failed_count, blocked_count, True
+        async for page in recipient_pages:
+            for i in range(0, len(page), _TG_BATCH_SIZE):
+                if cancel_event.is_set():
+                    await self._mark_cancelled(broadcast_id, progress.sent, progress.failed, progress.blocked)
+                    return True
 
-            batch = recipient_ids[i : i + _TG_BATCH_SIZE]
-            results = await asyncio.gather(
-                *[send_single(tid) for tid in batch],
-                return_exceptions=True,
-            )
+                batch = page[i : i + _TG_BATCH_SIZE]
+
+                # Получатели, обработанные до рестарта после последней контрольной точки, не получают дубль
+                handled = await ledger.lookup([recipient.user_id for recipient in batch])
+                pending = [recipient for recipient in batch if recipient.user_id not in handled]
+                for outcome in handled.values():
+                    if outcome == 'blocked':
+                        progress.blocked += 1
+                    else:
+                        progress.sent += 1
 
-            for idx, result in enumerate(results):
-                if isinstance(result, str):
+                results = await asyncio.gather(
+                    *[send_single(recipient.telegram_id) for recipient in pending],
+                    return_exceptions=True,
+                )
+
+                outcomes: dict[str, list[int]] = {'delivered': [], 'blocked': [], 'failed': []}
+                for recipient, result in zip(pending, results, strict=True):
                     if result == 'sent':
-                        sent_count += 1
+                        progress.sent += 1
+                        outcomes['delivered'].append(recipient.user_id)
                     elif result == 'blocked':
-                        blocked_count += 1
-                        blocked_telegram_ids.append(batch[idx])
+                        progress.blocked += 1
+                        outcomes['blocked'].append(recipient.user_id)
                     else:
-                        failed_count += 1
-                elif isinstance(result, Exception):
-                    failed_count += 1
-                    logger.error('Необработанное исключение в рассылке', broadcast_id=broadcast_id, result=result)
-
-            # Обновляем прогресс в БД периодически
-            processed = sent_count + failed_count + blocked_count
-            now = asyncio.get_running_loop().time()
-            if (
-                processed - last_progress_count >= _PROGRESS_UPDATE_MESSAGES
-                or now - last_progress_update >= _PROGRESS_MIN_INTERVAL_SEC
-            ):
-                await self._update_progress(broadcast_id, sent_count, failed_count, blocked_count)
-                last_progress_count = processed
-                last_progress_update = now
-
-            # Задержка между батчами для rate limiting
-            await asyncio.sleep(_TG_BATCH_DELAY)
-
-        return sent_count, failed_count, blocked_count, False
+                        progress.failed += 1
+                        outcomes['failed'].append(recipient.user_id)
+                        if isinstance(result, Exception):
+                            logger.error(
+                                'Необработанное исключение в рассылке', broadcast_id=broadcast_id, result=result
+                            )
+
+                await ledger.record(**outcomes)
+                progress.cursor = batch[-1].user_id
+
+                # Обновляем прогресс и курсор в БД периодически
+                now = asyncio.get_running_loop().time()
+                if (
+                    progress.processed - last_progress_count >= _PROGRESS_UPDATE_MESSAGES
+                    or now - last_progress_update >= _PROGRESS_MIN_INTERVAL_SEC
+                ):
+                    await self._update_progress(
+                        broadcast_id,
+                        progress.sent,
+                        progress.failed,
+                        progress.blocked,
+                        checkpoint=progress,
+                    )
+                    last_progress_count = progress.processed
+                    last_progress_update = now
+
+        return False
 
     def _build_keyboard(self, selected_buttons: list[str] | None) -> InlineKeyboardMarkup | None:
         if selected_buttons is None:
             selected_buttons = []
+
+        from app.handlers.admin.messages import create_broadcast_keyboard
+
         return create_broadcast_keyboard(selected_buttons)
 
     async def _deliver_message(
@@ -457,8 +540,10 @@ class BroadcastService:
         sent_count: int,
         failed_count: int,
         blocked_count: int = 0,
+        *,
+        checkpoint: BroadcastCheckpoint | None = None,
     ) -> None:
-        """Периодически обновляет прогресс рассылки, чтобы держать соединение активным."""
+        """Периодически обновляет прогресс и контрольную точку рассылки."""
 
         await self._safe_status_update(
             broadcast_id,
@@ -467,6 +552,7 @@ class BroadcastService:
             blocked_count,
             status='in_progress',
             update_completed_at=False,
+            checkpoint=checkpoint,
         )
 
     async def _safe_status_update(
@@ -478,13 +564,16 @@ class BroadcastService:
         *,
         status: str,
         update_completed_at: bool = True,
+        checkpoint: BroadcastCheckpoint | None = None,
     ) -> None:
         attempts = 0
 
         while attempts < 2:
             try:
                 async with AsyncSessionLocal() as session:
-                    broadcast = await session.get(BroadcastHistory, broadcast_id)
+                    broadcast = await session.get(
+                        BroadcastHistory, broadcast_id, with_for_update=checkpoint is not None
+                    )
                     if not broadcast:
                         return
 
@@ -492,6 +581,11 @@ class BroadcastService:
                     broadcast.failed_count = failed_count
                     broadcast.blocked_count = blocked_count
                     broadcast.status = status
+                    if checkpoint is not None:
+                        broadcast.recipient_cursor = checkpoint.cursor
+                        broadcast.delivery_checkpoint = write_checkpoint(
+                            broadcast.delivery_checkpoint, _TELEGRAM_CHANNEL, checkpoint
+                        )
 
                     if update_completed_at:
                         broadcast.completed_at = datetime.now(UTC)
@@ -643,6 +737,40 @@ class EmailBroadcastService:
             task_entry.cancel_event.set()
             return True
 
+    async def resume_interrupted(self) -> list[int]:
+        """Resume email broadcasts interrupted by a process restart."""
+        if self._email_service is None or not self._email_service.is_configured():
+            return []
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_select_resumable(_EMAIL_CHANNEL))
+            # Only rows this service has checkpointed: anything else would be re-sent from scratch
+            pending = [
+                (record.id, self._config_from_record(record))
+                for record in result.scalars().all()
+                if record.email_subject
+                and record.email_html_content
+                and read_checkpoint(record.delivery_checkpoint, _EMAIL_CHANNEL) is not None
+            ]
+
+        for broadcast_id, config in pending:
+            logger.info('Resuming interrupted email broadcast', broadcast_id=broadcast_id, target=config.target)
+            await self.start_broadcast(broadcast_id, config)
+
+        return [broadcast_id for broadcast_id, _ in pending]
+
+    @staticmethod
+    def _config_from_record(record: BroadcastHistory) -> EmailBroadcastConfig:
+        checkpoint = read_checkpoint(record.delivery_checkpoint, _EMAIL_CHANNEL)
+        # For 'both' channel the email part always targets 'all_email'
+        default_target = record.target_type if record.channel == _EMAIL_CHANNEL else 'all_email'
+        return EmailBroadcastConfig(
+            target=(checkpoint.target if checkpoint else None) or default_target,
+            email_subject=record.email_subject,
+            email_html_content=record.email_html_content,
+            initiator_name=record.admin_name,
+        )
+
     async def _run_broadcast(
         self,
         broadcast_id: int,
@@ -650,186 +778,115 @@ class EmailBroadcastService:
         cancel_event: asyncio.Event,
     ) -> None:
         """Execute email broadcast."""
-        sent_count = 0
-        failed_count = 0
+        progress = BroadcastCheckpoint(target=config.target)
 
         try:
             if cancel_event.is_set():
-                await self._mark_cancelled(broadcast_id, sent_count, failed_count)
+                await self._mark_cancelled(broadcast_id, progress.sent, progress.failed)
                 return
 
-            # Update status to in_progress
+            # Update status to in_progress (or resume from the stored cursor)
             async with AsyncSessionLocal() as session:
                 broadcast = await session.get(BroadcastHistory, broadcast_id)
                 if not broadcast:
                     logger.error('Broadcast record not found', broadcast_id=broadcast_id)
                     return
 
-                broadcast.status = 'in_progress'
-                broadcast.sent_count = 0
-                broadcast.failed_count = 0
+                stored = read_checkpoint(broadcast.delivery_checkpoint, _EMAIL_CHANNEL)
+                resumed = broadcast.status == 'in_progress' and stored is not None and stored.cursor is not None
+                if resumed:
+                    progress.cursor = stored.cursor
+                    progress.sent = stored.sent
+                    progress.failed = stored.failed
+                else:
+                    broadcast.status = 'in_progress'
+                    broadcast.sent_count = 0
+                    broadcast.failed_count = 0
+                    broadcast.delivery_checkpoint = write_checkpoint(
+                        broadcast.delivery_checkpoint, _EMAIL_CHANNEL, progress
+                    )
                 await session.commit()
 
-            # Fetch email recipients
-            recipients = await self._fetch_email_recipients(config.target)
+            if not resumed:
+                total_count = await count_recipients(build_email_target_condition(config.target))
 
-            # Update total count
-            async with AsyncSessionLocal() as session:
-                broadcast = await session.get(BroadcastHistory, broadcast_id)
-                if not broadcast:
-                    logger.error('Broadcast record deleted before start', broadcast_id=broadcast_id)
-                    return
+                async with AsyncSessionLocal() as session:
+                    broadcast = await session.get(BroadcastHistory, broadcast_id)
+                    if not broadcast:
+                        logger.error('Broadcast record deleted before start', broadcast_id=broadcast_id)
+                        return
 
-                broadcast.total_count = len(recipients)
-                await session.commit()
+                    broadcast.total_count = total_count
+                    await session.commit()
 
-            if cancel_event.is_set():
-                await self._mark_cancelled(broadcast_id, sent_count, failed_count)
-                return
+                if not total_count:
+                    logger.info('Email broadcast : no recipients found', broadcast_id=broadcast_id)
+                    await self._mark_finished(broadcast_id, progress.sent, progress.failed, cancelled=False)
+                    return
 
-            if not recipients:
-                logger.info('Email broadcast : no recipients found', broadcast_id=broadcast_id)
-                await self._mark_finished(broadcast_id, sent_count, failed_count, cancelled=False)
+            if cancel_event.is_set():
+                await self._mark_cancelled(broadcast_id, progress.sent, progress.failed)
                 return
 
             # Send emails with rate limiting
-            sent_count, failed_count, was_cancelled = await self._send_emails(
+            was_cancelled = await self._send_emails(
                 broadcast_id,
-                recipients,
+                self._fetch_email_recipients(config.target, after_user_id=progress.cursor or 0),
                 config,
                 cancel_event,
+                progress,
             )
 
             if was_cancelled:
                 logger.info('Email broadcast was cancelled during execution', broadcast_id=broadcast_id)
                 return
 
-            await self._mark_finished(broadcast_id, sent_count, failed_count, cancelled=False)
+            await self._mark_finished(broadcast_id, progress.sent, progress.failed, cancelled=False)
 
         except asyncio.CancelledError:
-            await self._mark_cancelled(broadcast_id, sent_count, failed_count)
+            if settings.BROADCAST_AUTO_RESUME_ENABLED:
+                logger.info('Email broadcast interrupted by shutdown, checkpoint saved', broadcast_id=broadcast_id)
+                await self._update_progress(broadcast_id, progress.sent, progress.failed, checkpoint=progress)
+            else:
+                await self._mark_cancelled(broadcast_id, progress.sent, progress.failed)
             raise
         except Exception as exc:
             logger.exception('Critical error in email broadcast', broadcast_id=broadcast_id, exc=exc)
-            await self._mark_failed(broadcast_id, sent_count, failed_count)
+            await self._mark_failed(broadcast_id, progress.sent, progress.failed)
 
-    async def _fetch_email_recipients(self, target: str) -> list[_EmailRecipient]:
+    def _fetch_email_recipients(self, target: str, *, after_user_id: int = 0) -> AsyncIterator[list[EmailRecipient]]:
         """
-        Загружает получателей email-рассылки.
+        Потоково отдаёт получателей email-рассылки страницами.
 
-        Возвращает список _EmailRecipient (скалярные данные), а не ORM-объектов,
-        чтобы избежать detached state при долгих рассылках.
+        Страницы содержат скалярные данные (EmailRecipient), а не ORM-объекты,
+        и читаются keyset-пагинацией по users.id в коротких сессиях.
         """
-        from sqlalchemy import select
-
-        from app.database.models import Subscription, SubscriptionStatus, User
-
-        async with AsyncSessionLocal() as session:
-            # Base query: verified email users with active status
-            base_conditions = [
-                User.email.isnot(None),
-                User.email_verified == True,
-                User.status == 'active',
-            ]
-
-            if target == 'all_email':
-                query = select(User).where(*base_conditions)
-
-            elif target == 'email_only':
-                query = select(User).where(
-                    *base_conditions,
-                    User.auth_type == 'email',
-                )
-
-            elif target == 'telegram_with_email':
-                query = select(User).where(
-                    *base_conditions,
-                    User.auth_type == 'telegram',
-                    User.telegram_id.isnot(None),
-                )
-
-            elif target == 'active_email':
-                query = (
-                    select(User)
-                    .join(Subscription, User.id == Subscription.user_id)
-                    .where(
-                        *base_conditions,
-                        Subscription.status == SubscriptionStatus.ACTIVE.value,
-                    )
-                )
-
-            elif target == 'expired_email':
-                query = (
-                    select(User)
-                    .join(Subscription, User.id == Subscription.user_id)
-                    .where(
-                        *base_conditions,
-                        Subscription.status.in_(
-                            [
-                                SubscriptionStatus.EXPIRED.value,
-                                SubscriptionStatus.DISABLED.value,
-                            ]
-                        ),
-                    )
-                )
-
-            else:
-                logger.warning('Unknown email target filter', target=target)
-                return []
-
-            # Загружаем батчами и извлекаем скаляры сразу
-            recipients: list[_EmailRecipient] = []
-            offset = 0
-            batch_size = 1000
-
-            while True:
-                result = await session.execute(query.offset(offset).limit(batch_size))
-                batch = result.scalars().all()
-
-                if not batch:
-                    break
-
-                for user in batch:
-                    email = user.email
-                    if not email:
-                        continue
-
-                    # Формируем имя пользователя
-                    user_name = user.username
-                    if not user_name:
-                        user_name = user.first_name or ''
-                        if last_name := user.last_name:
-                            user_name = f'{user_name} {last_name}'.strip()
-                    if not user_name:
-                        user_name = email.split('@')[0]
-
-                    recipients.append(_EmailRecipient(email=email, user_name=user_name))
-
-                offset += batch_size
-
-            return recipients
+        if build_email_target_condition(target) is None:
+            logger.warning('Unknown email target filter', target=target)
+        return iter_email_recipients(target, after_user_id=after_user_id)
 
     async def _send_emails(
         self,
         broadcast_id: int,
-        recipients: list[_EmailRecipient],
+        recipient_pages: AsyncIterator[list[EmailRecipient]],
         config: EmailBroadcastConfig,
         cancel_event: asyncio.Event,
-    ) -> tuple[int, int, bool]:
+        progress: BroadcastCheckpoint,
+    ) -> bool:
         """
         Отправляет email-рассылку с rate limiting.
 
         Использует run_in_executor для синхронного SMTP, ограничивая
-        параллельность семафором EMAIL_RATE_LIMIT.
+        параллельность семафором EMAIL_RATE_LIMIT. Счётчики и курсор
+        накапливаются в ``progress``. Returns was_cancelled.
         """
-        sent_count = 0
-        failed_count = 0
-        last_progress_count = 0
+        last_progress_count = progress.processed
         last_progress_time: float = 0.0
+        ledger = BroadcastDeliveryLedger(broadcast_id, _EMAIL_CHANNEL)
 
         semaphore = asyncio.Semaphore(EMAIL_RATE_LIMIT)
 
-        async def send_single_email(recipient: _EmailRecipient) -> bool | None:
+        async def send_single_email(recipient: EmailRecipient) -> bool | None:
             """Отправляет один email."""
             async with semaphore:
                 if cancel_event.is_set():
@@ -854,42 +911,59 @@ class EmailBroadcastService:
                     )
                     return False
 
-        for i in range(0, len(recipients), EMAIL_BATCH_SIZE):
-            if cancel_event.is_set():
-                await self._mark_cancelled(broadcast_id, sent_count, failed_count)
-                return sent_count, failed_count, True
-
-            batch = recipients[i : i + EMAIL_BATCH_SIZE]
-            tasks = [send_single_email(r) for r in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in results:
-                if result is True:
-                    sent_count += 1
-                elif result is None:
-                    pass  # Cancelled or skipped
-                else:
-                    failed_count += 1
+        async for page in recipient_pages:
+            for i in range(0, len(page), EMAIL_BATCH_SIZE):
+                if cancel_event.is_set():
+                    await self._mark_cancelled(broadcast_id, progress.sent, progress.failed)
+                    return True
+
+                batch = page[i : i + EMAIL_BATCH_SIZE]
+
+                # Skip recipients already handled before a restart
+                handled = await ledger.lookup([r.user_id for r in batch])
+                pending = [r for r in batch if r.user_id not in handled]
+                progress.sent += len(handled)
+
+                tasks = [send_single_email(r) for r in pending]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+
+                delivered: list[int] = []
+                failed: list[int] = []
+                for recipient, result in zip(pending, results, strict=True):
+                    if result is True:
+                        progress.sent += 1
+                        delivered.append(recipient.user_id)
+                    elif result is None:
+                        pass  # Cancelled or skipped
+                    else:
+                        progress.failed += 1
+                        failed.append(recipient.user_id)
 
-            # Обновляем прогресс периодически
-            processed = sent_count + failed_count
-            now = asyncio.get_running_loop().time()
-            if (
-                processed - last_progress_count >= _PROGRESS_UPDATE_MESSAGES
-                or now - last_progress_time >= _PROGRESS_MIN_INTERVAL_SEC
-                or i + EMAIL_BATCH_SIZE >= len(recipients)
-            ):
-                await self._update_progress(broadcast_id, sent_count, failed_count)
-                last_progress_count = processed
-                last_progress_time = now
+                await ledger.record(delivered=delivered, failed=failed)
+                progress.cursor = batch[-1].user_id
+
+                # Обновляем прогресс и курсор периодически
+                now = asyncio.get_running_loop().time()
+                if (
+                    progress.processed - last_progress_count >= _PROGRESS_UPDATE_MESSAGES
+                    or now - last_progress_time >= _PROGRESS_MIN_INTERVAL_SEC
+                ):
+                    await self._update_progress(
+                        broadcast_id,
+                        progress.sent,
+                        progress.failed,
+                        checkpoint=progress,
+                    )
+                    last_progress_count = progress.processed
+                    last_progress_time = now
 
-            # Rate limiting: ~8 emails/sec
-            await asyncio.sleep(EMAIL_BATCH_SIZE / EMAIL_RATE_LIMIT)
+                # Rate limiting: ~8 emails/sec
+                await asyncio.sleep(EMAIL_BATCH_SIZE / EMAIL_RATE_LIMIT)
 
-        return sent_count, failed_count, False
+        return False
 
     @staticmethod
-    def _render_template(template: str, recipient: _EmailRecipient) -> str:
+    def _render_template(template: str, recipient: EmailRecipient) -> str:
         """Подставляет переменные в шаблон email."""
         if not template:
             return template
@@ -933,14 +1007,17 @@ class EmailBroadcastService:
         broadcast_id: int,
         sent_count: int,
         failed_count: int,
+        *,
+        checkpoint: BroadcastCheckpoint | None = None,
     ) -> None:
-        """Update broadcast progress."""
+        """Update broadcast progress and checkpoint."""
         await self._safe_status_update(
             broadcast_id,
             sent_count,
             failed_count,
             status='in_progress',
             update_completed_at=False,
+            checkpoint=checkpoint,
         )
 
     async def _safe_status_update(
@@ -951,6 +1028,7 @@ class EmailBroadcastService:
         *,
         status: str,
         update_completed_at: bool = True,
+        checkpoint: BroadcastCheckpoint | None = None,
     ) -> None:
         """Safely update broadcast status with retry."""
         attempts = 0
@@ -958,13 +1036,19 @@ class EmailBroadcastService:
         while attempts < 2:
             try:
                 async with AsyncSessionLocal() as session:
-                    broadcast = await session.get(BroadcastHistory, broadcast_id)
+                    broadcast = await session.get(
+                        BroadcastHistory, broadcast_id, with_for_update=checkpoint is not None
+                    )
                     if not broadcast:
                         return
 
                     broadcast.sent_count = sent_count
                     broadcast.failed_count = failed_count
                     broadcast.status = status
+                    if checkpoint is not None:
+                        broadcast.delivery_checkpoint = write_checkpoint(
+                            broadcast.delivery_checkpoint, _EMAIL_CHANNEL, checkpoint
+                        )
 
                     if update_completed_at:
                         broadcast.completed_at = datetime.now(UTC)
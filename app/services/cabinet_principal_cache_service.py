@@ -0,0 +1,219 @@
+"""Кеш проверенных пользователей кабинета (принципалов) по access-токену.
+
+SPA кабинета на каждую страницу отправляет пачку параллельных запросов, и
+каждый из них загружал пользователя со всеми связями только ради проверки,
+что он существует и активен. Результат этой проверки — идентификаторы и
+статус пользователя — кешируется по отпечатку access-токена на
+``CABINET_PRINCIPAL_CACHE_TTL_SECONDS``: в Redis-хэше пользователя (общий для
+всех процессов веб-сервера), без Redis — в памяти процесса.
+
+Кеш сбрасывается после коммита, изменившего статус (бан, удаление) или
+идентификаторы пользователя, а также при удалении строки пользователя через
+ORM. Баланс, подписка и роли в принципал не входят и всегда читаются из БД.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.database.models import User
+from app.utils.cache import cache
+
+
+logger = structlog.get_logger(__name__)
+
+LOCAL_MAX_USERS = 2048
+
+# Поля пользователя, которые входят в принципал: их изменение сбрасывает кеш
+PRINCIPAL_FIELDS = ('status', 'telegram_id', 'username', 'email', 'email_verified')
+
+_PENDING_INVALIDATION_KEY = 'cabinet_principal_invalidate'
+
+
+@dataclass(frozen=True, slots=True)
+class CabinetPrincipal:
+    """Проверенный пользователь кабинета без ORM-состояния.
+
+    Имена полей совпадают с атрибутами ``User``, поэтому маршруты, которым нужен
+    только ``user.id``, работают с принципалом без изменений.
+    """
+
+    id: int
+    telegram_id: int | None
+    username: str | None
+    email: str | None
+    email_verified: bool
+    status: str
+
+    @classmethod
+    def from_user(cls, user: User) -> CabinetPrincipal:
+        return cls(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            username=user.username,
+            email=user.email,
+            email_verified=bool(user.email_verified),
+            status=user.status,
+        )
+
+
+def principal_cache_key(user_id: int) -> str:
+    return f'cabinet:principal:{user_id}'
+
+
+def token_fingerprint(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+class CabinetPrincipalCacheService:
+    def __init__(self) -> None:
+        # user_id -> {отпечаток токена: (момент истечения, принципал)}
+        self._local: OrderedDict[int, dict[str, tuple[float, CabinetPrincipal]]] = OrderedDict()
+        self._background_tasks: set[asyncio.Task[None]] = set()
+
+    async def get(self, user_id: int, token: str) -> CabinetPrincipal | None:
+        ttl = settings.get_cabinet_principal_cache_ttl_seconds()
+        if ttl <= 0:
+            return None
+        fingerprint = token_fingerprint(token)
+
+        redis = cache.client()
+        if redis is None:
+            return self._get_local(user_id, fingerprint)
+
+        try:
+            raw = await redis.hget(principal_cache_key(user_id), fingerprint)
+        except Exception as error:
+            logger.warning('Не удалось прочитать принципал кабинета из Redis', user_id=user_id, error=error)
+            return None
+        if raw is None:
+            return None
+        try:
+            data = json.loads(raw)
+            # Хэш живёт, пока в него пишут другие токены, поэтому возраст записи проверяем сами
+            if time.time() - data.pop('cached_at') > ttl:
+                return None
+            return CabinetPrincipal(**data)
+        except (TypeError, ValueError, KeyError) as error:
+            logger.warning('Повреждённая запись принципала кабинета', user_id=user_id, error=error)
+            return None
+
+    async def store(self, token: str, principal: CabinetPrincipal) -> None:
+        ttl = settings.get_cabinet_principal_cache_ttl_seconds()
+        if ttl <= 0:
+            return
+        fingerprint = token_fingerprint(token)
+
+        redis = cache.client()
+        if redis is None:
+            self._store_local(fingerprint, principal, ttl)
+            return
+
+        key = principal_cache_key(principal.id)
+        payload = json.dumps({**asdict(principal), 'cached_at': time.time()})
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, fingerprint, payload)
+                pipe.expire(key, ttl)
+                await pipe.execute()
+        except Exception as error:
+            logger.warning('Не удалось сохранить принципал кабинета в Redis', user_id=principal.id, error=error)
+
+    async def remember(self, token: str, user: User) -> None:
+        """Кладёт в кеш пользователя, которому только что выдан access-токен."""
+        if user.status == 'active':
+            await self.store(token, CabinetPrincipal.from_user(user))
+
+    async def invalidate(self, *user_ids: int) -> None:
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+
+        redis = cache.client()
+        if redis is None:
+            return
+        try:
+            await redis.delete(*(principal_cache_key(user_id) for user_id in user_ids))
+        except Exception as error:
+            logger.warning('Не удалось сбросить принципалы кабинета', user_ids=user_ids, error=error)
+
+    def schedule_invalidation(self, user_ids: set[int]) -> None:
+        """Сбрасывает кеш из синхронного контекста (события ORM)."""
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.invalidate(*user_ids), name='cabinet-principal-invalidate')
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _get_local(self, user_id: int, fingerprint: str) -> CabinetPrincipal | None:
+        entries = self._local.get(user_id)
+        if not entries:
+            return None
+        entry = entries.get(fingerprint)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            entries.pop(fingerprint, None)
+            return None
+        self._local.move_to_end(user_id)
+        return principal
+
+    def _store_local(self, fingerprint: str, principal: CabinetPrincipal, ttl: int) -> None:
+        now = time.monotonic()
+        entries = self._local.setdefault(principal.id, {})
+        # Заодно выбрасываем истёкшие токены пользователя
+        for stale in [key for key, (expires_at, _) in entries.items() if expires_at <= now]:
+            del entries[stale]
+        entries[fingerprint] = (now + ttl, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > LOCAL_MAX_USERS:
+            self._local.popitem(last=False)
+
+
+cabinet_principal_cache_service = CabinetPrincipalCacheService()
+
+
+def _mark_user_changed(target: User, _value, _oldvalue, _initiator) -> None:
+    session = object_session(target)
+    if session is None or target.id is None:
+        return
+    session.info.setdefault(_PENDING_INVALIDATION_KEY, set()).add(target.id)
+
+
+for _field in PRINCIPAL_FIELDS:
+    event.listen(getattr(User, _field), 'set', _mark_user_changed)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_deleted_users(session: Session, _flush_context) -> None:
+    deleted_ids = {instance.id for instance in session.deleted if isinstance(instance, User) and instance.id}
+    if deleted_ids:
+        session.info.setdefault(_PENDING_INVALIDATION_KEY, set()).update(deleted_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_INVALIDATION_KEY, None)
+    if user_ids:
+        cabinet_principal_cache_service.schedule_invalidation(user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATION_KEY, None)
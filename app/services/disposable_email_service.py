@@ -3,14 +3,16 @@
 import asyncio
 from datetime import UTC, datetime
 
-import aiohttp
 import structlog
 
 from app.config import settings
+from app.utils.http_clients import HttpClientProfile, http_clients
 
 
 logger = structlog.get_logger(__name__)
 
+DISPOSABLE_EMAIL_HTTP_PROFILE = HttpClientProfile(timeout_seconds=5, limit_per_host=1)
+
 
 class DisposableEmailService:
     """
@@ -23,7 +25,6 @@ class DisposableEmailService:
 
     DOMAINS_URL = 'https://raw.githubusercontent.com/disposable/disposable-email-domains/master/domains.txt'
     UPDATE_INTERVAL_HOURS = 24
-    REQUEST_TIMEOUT_SECONDS = 5
 
     def __init__(self) -> None:
         self._domains: frozenset[str] = frozenset()
@@ -55,8 +56,8 @@ class DisposableEmailService:
     async def _update_domains(self) -> None:
         """Fetch domains.txt from GitHub and swap the in-memory set."""
         try:
-            timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT_SECONDS)
-            async with aiohttp.ClientSession(timeout=timeout) as session, session.get(self.DOMAINS_URL) as resp:
+            session = http_clients.session('disposable_email', DISPOSABLE_EMAIL_HTTP_PROFILE)
+            async with session.get(self.DOMAINS_URL) as resp:
                 if resp.status != 200:
                     logger.error('Failed to fetch disposable domains: HTTP', resp_status=resp.status)
                     return
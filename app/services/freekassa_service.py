@@ -12,6 +12,7 @@ import aiohttp
 import structlog
 
 from app.config import settings
+from app.utils.http_clients import http_clients
 
 
 logger = structlog.get_logger(__name__)
@@ -94,20 +95,20 @@ async def get_public_ip() -> str:
             return _cached_public_ip
 
         # Пробуем получить IP от внешних сервисов
-        async with aiohttp.ClientSession() as session:
-            for service_url in IP_SERVICES:
-                try:
-                    async with session.get(service_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
-                        if response.status == 200:
-                            ip = (await response.text()).strip()
-                            # Простая валидация IPv4
-                            if ip and len(ip.split('.')) == 4:
-                                _cached_public_ip = ip
-                                logger.info('Определён публичный IP сервера', ip=ip)
-                                return ip
-                except Exception as e:
-                    logger.debug('Не удалось получить IP от', service_url=service_url, error=e)
-                    continue
+        session = http_clients.session('public_ip')
+        for service_url in IP_SERVICES:
+            try:
+                async with session.get(service_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    if response.status == 200:
+                        ip = (await response.text()).strip()
+                        # Простая валидация IPv4
+                        if ip and len(ip.split('.')) == 4:
+                            _cached_public_ip = ip
+                            logger.info('Определён публичный IP сервера', ip=ip)
+                            return ip
+            except Exception as e:
+                logger.debug('Не удалось получить IP от', service_url=service_url, error=e)
+                continue
 
         # Fallback на известный рабочий IP если ничего не получилось
         fallback_ip = '185.92.183.173'
@@ -10,6 +10,7 @@ import aiohttp
 import structlog
 
 from app.config import settings
+from app.utils.http_clients import http_clients
 
 
 logger = structlog.get_logger(__name__)
@@ -54,19 +55,19 @@ async def get_public_ip() -> str:
         if _cached_public_ip:
             return _cached_public_ip
 
-        async with aiohttp.ClientSession() as session:
-            for service_url in IP_SERVICES:
-                try:
-                    async with session.get(service_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
-                        if response.status == 200:
-                            ip = (await response.text()).strip()
-                            if ip and len(ip.split('.')) == 4:
-                                _cached_public_ip = ip
-                                logger.info('KassaAI: определён публичный IP сервера', ip=ip)
-                                return ip
-                except Exception as e:
-                    logger.debug('KassaAI: не удалось получить IP от', service_url=service_url, error=e)
-                    continue
+        session = http_clients.session('public_ip')
+        for service_url in IP_SERVICES:
+            try:
+                async with session.get(service_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    if response.status == 200:
+                        ip = (await response.text()).strip()
+                        if ip and len(ip.split('.')) == 4:
+                            _cached_public_ip = ip
+                            logger.info('KassaAI: определён публичный IP сервера', ip=ip)
+                            return ip
+            except Exception as e:
+                logger.debug('KassaAI: не удалось получить IP от', service_url=service_url, error=e)
+                continue
 
         fallback_ip = '127.0.0.1'
         logger.warning('KassaAI: не удалось определить публичный IP, используем fallback', fallback_ip=fallback_ip)
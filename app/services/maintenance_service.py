@@ -7,6 +7,7 @@ import structlog
 
 from app.config import settings
 from app.external.remnawave_api import RemnaWaveAPI, test_api_connection
+from app.services.runtime_sync_service import TOPIC_MAINTENANCE, runtime_sync_service
 from app.utils.cache import cache
 from app.utils.timezone import format_local_datetime
 
@@ -140,6 +141,7 @@ class MaintenanceService:
             self._status.auto_enabled = auto
 
             await self._save_status_to_cache()
+            await runtime_sync_service.publish(TOPIC_MAINTENANCE)
 
             enabled_time = format_local_datetime(self._status.enabled_at, '%d.%m.%Y %H:%M:%S %Z')
             notification_msg = f"""Режим технических работ ВКЛЮЧЕН
@@ -177,6 +179,7 @@ class MaintenanceService:
             self._status.consecutive_failures = 0
 
             await self._save_status_to_cache()
+            await runtime_sync_service.publish(TOPIC_MAINTENANCE)
 
             duration_str = ''
             if duration:
@@ -403,6 +406,10 @@ API снова отвечает на запросы.""",
         except Exception as e:
             logger.error('Ошибка сохранения состояния в кеш', error=e)
 
+    async def reload_status(self) -> None:
+        """Перечитывает состояние, изменённое другим процессом."""
+        await self._load_status_from_cache()
+
     async def _load_status_from_cache(self):
         try:
             status_data = await cache.get('maintenance_status')
@@ -414,6 +421,7 @@ API снова отвечает на запросы.""",
             self._status.auto_enabled = status_data.get('auto_enabled', False)
             self._status.consecutive_failures = status_data.get('consecutive_failures', 0)
 
+            self._status.enabled_at = None
             if status_data.get('enabled_at'):
                 dt = datetime.fromisoformat(status_data['enabled_at'])
                 if dt.tzinfo is None:
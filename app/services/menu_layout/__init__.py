@@ -4,6 +4,7 @@
 Структура модуля:
 - constants.py - константы и дефолтная конфигурация
 - context.py - MenuContext для построения меню
+- plan.py - скомпилированный план меню и кеш клавиатур
 - history_service.py - сервис истории изменений
 - stats_service.py - сервис статистики кликов
 - service.py - основной MenuLayoutService
@@ -0,0 +1,303 @@
+"""Скомпилированный план меню.
+
+Конфигурация конструктора компилируется один раз на версию: условия и
+видимость превращаются в предикаты, тексты кнопок — в готовые строки или
+разобранные шаблоны плейсхолдеров по языкам. Собранные клавиатуры кешируются
+в плане по тем частям контекста, которые действительно влияют на результат
+(видимые кнопки, их тексты и URL), поэтому повторный рендер меню сводится
+к проверке предикатов и поиску в словаре.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram.types import InlineKeyboardMarkup
+
+from app.config import settings
+
+from .context import MenuContext
+
+
+Predicate = Callable[[MenuContext], bool]
+
+# Литерал и имя плейсхолдера (None для хвоста без плейсхолдера)
+TemplateToken = tuple[str, str | None]
+
+PLACEHOLDER_PATTERN = re.compile(
+    r'\{(balance|username|subscription_days|traffic_used|traffic_left|referral_count|referral_earnings)\}'
+)
+
+KEYBOARD_CACHE_SIZE = 512
+
+
+def _always(_context: MenuContext) -> bool:
+    return True
+
+
+def _has_traffic_limit(context: MenuContext) -> bool:
+    if not context.subscription:
+        return False
+    traffic_limit = getattr(context.subscription, 'traffic_limit_gb', 0)
+    is_trial = getattr(context.subscription, 'is_trial', False)
+    return not is_trial and traffic_limit > 0
+
+
+def _support_enabled(_context: MenuContext) -> bool:
+    try:
+        from app.services.support_settings_service import SupportSettingsService
+
+        return bool(SupportSettingsService.is_support_menu_enabled())
+    except Exception:
+        return bool(settings.SUPPORT_MENU_ENABLED)
+
+
+def _is_trial_user(context: MenuContext) -> bool:
+    if not context.subscription:
+        return False
+    return bool(getattr(context.subscription, 'is_trial', False))
+
+
+# Флаговые условия: проверяются, только если в конфиге значение ровно True.
+# Условия на настройки вычисляются при каждом рендере — настройки меняются на лету.
+_FLAG_CONDITIONS: dict[str, Predicate] = {
+    'has_active_subscription': lambda context: context.has_active_subscription,
+    'subscription_is_active': lambda context: context.subscription_is_active,
+    'has_traffic_limit': _has_traffic_limit,
+    'traffic_topup_enabled': lambda _context: settings.is_traffic_topup_enabled() and not settings.is_tariffs_mode(),
+    'is_admin': lambda context: context.is_admin,
+    'is_moderator': lambda context: context.is_moderator and not context.is_admin,
+    'referral_enabled': lambda _context: settings.is_referral_program_enabled(),
+    'contests_visible': lambda _context: bool(settings.CONTESTS_BUTTON_VISIBLE),
+    'support_enabled': _support_enabled,
+    'language_selection_enabled': lambda _context: settings.is_language_selection_enabled(),
+    'happ_enabled': lambda _context: settings.is_happ_download_button_enabled(),
+    'simple_subscription_enabled': lambda _context: bool(settings.SIMPLE_SUBSCRIPTION_ENABLED),
+    'show_trial': lambda context: not (context.has_had_paid_subscription or context.has_active_subscription),
+    # В режиме тарифов кнопка покупки остаётся и у активных подписчиков
+    'show_buy': lambda context: (
+        settings.is_tariffs_mode() or not (context.has_active_subscription and context.subscription_is_active)
+    ),
+    'has_saved_cart': lambda context: context.has_saved_cart or context.show_resume_checkout,
+    'has_referrals': lambda context: context.referral_count > 0,
+    'is_trial_user': _is_trial_user,
+    'has_autopay': lambda context: context.has_autopay,
+}
+
+# Пороговые условия: проверяются, если значение задано (не None)
+_THRESHOLD_CONDITIONS: dict[str, Callable[[Any], Predicate]] = {
+    'min_balance_kopeks': lambda limit: lambda context: context.balance_kopeks >= limit,
+    'max_balance_kopeks': lambda limit: lambda context: context.balance_kopeks <= limit,
+    'min_registration_days': lambda limit: lambda context: context.registration_days >= limit,
+    'max_registration_days': lambda limit: lambda context: context.registration_days <= limit,
+    'min_referrals': lambda limit: lambda context: context.referral_count >= limit,
+    'has_subscription_days_left': lambda limit: lambda context: context.subscription_days >= limit,
+    'max_subscription_days_left': lambda limit: lambda context: context.subscription_days <= limit,
+}
+
+_VISIBILITY_PREDICATES: dict[str, Predicate] = {
+    'admins': lambda context: context.is_admin,
+    'moderators': lambda context: context.is_moderator and not context.is_admin,
+    'subscribers': lambda context: context.has_active_subscription and context.subscription_is_active,
+}
+
+
+def compile_conditions(conditions: dict[str, Any] | None) -> Predicate:
+    """Компилирует словарь условий в предикат (все условия через И)."""
+    if not conditions:
+        return _always
+
+    checks: list[Predicate] = []
+    for key, predicate in _FLAG_CONDITIONS.items():
+        if conditions.get(key) is True:
+            checks.append(predicate)
+    for key, factory in _THRESHOLD_CONDITIONS.items():
+        limit = conditions.get(key)
+        if limit is not None:
+            checks.append(factory(limit))
+
+    promo_groups = conditions.get('promo_group_ids')
+    if promo_groups and isinstance(promo_groups, list):
+        allowed_groups = tuple(promo_groups)
+        checks.append(lambda context: context.promo_group_id in allowed_groups)
+
+    exclude_groups = conditions.get('exclude_promo_group_ids')
+    if exclude_groups and isinstance(exclude_groups, list):
+        excluded_groups = tuple(exclude_groups)
+        checks.append(lambda context: context.promo_group_id not in excluded_groups)
+
+    if not checks:
+        return _always
+    if len(checks) == 1:
+        return checks[0]
+    checks_tuple = tuple(checks)
+    return lambda context: all(check(context) for check in checks_tuple)
+
+
+def compile_visibility(visibility: str) -> Predicate:
+    return _VISIBILITY_PREDICATES.get(visibility, _always)
+
+
+def _both(first: Predicate, second: Predicate) -> Predicate:
+    if first is _always:
+        return second
+    if second is _always:
+        return first
+    return lambda context: first(context) and second(context)
+
+
+def tokenize_template(text: str) -> tuple[TemplateToken, ...] | None:
+    """Разбивает текст на литералы и плейсхолдеры; None, если плейсхолдеров нет."""
+    tokens: list[TemplateToken] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        tokens.append((text[position : match.start()], match.group(1)))
+        position = match.end()
+    if not tokens:
+        return None
+    if position < len(text):
+        tokens.append((text[position:], None))
+    return tuple(tokens)
+
+
+def render_placeholder(name: str, context: MenuContext, texts: Any) -> str:
+    if name == 'balance':
+        return texts.format_price(context.balance_kopeks)
+    if name == 'username':
+        return context.username or 'User'
+    if name == 'subscription_days':
+        return str(context.subscription_days)
+    if name == 'traffic_used':
+        return f'{context.traffic_used_gb:.1f} GB'
+    if name == 'traffic_left':
+        return f'{context.traffic_left_gb:.1f} GB'
+    if name == 'referral_count':
+        return str(context.referral_count)
+    if name == 'referral_earnings':
+        return texts.format_price(context.referral_earnings_kopeks)
+    return ''
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledText:
+    """Текст кнопки для одного языка: готовая строка или шаблон."""
+
+    static: str
+    tokens: tuple[TemplateToken, ...] | None = None
+
+    def render(self, context: MenuContext, get_texts: Callable[[], Any]) -> str:
+        if self.tokens is None:
+            return self.static
+        parts: list[str] = []
+        for literal, placeholder in self.tokens:
+            parts.append(literal)
+            if placeholder is not None:
+                parts.append(render_placeholder(placeholder, context, get_texts()))
+        return ''.join(parts)
+
+
+def _compile_text(text: str, icon: str, dynamic: bool) -> CompiledText:
+    if not text:
+        return CompiledText(static='')
+    # Иконку добавляем, если текст не начинается с неё
+    if icon and not text.startswith(icon):
+        text = f'{icon} {text}'
+    return CompiledText(static=text, tokens=tokenize_template(text) if dynamic else None)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledButton:
+    button_id: str
+    config: dict[str, Any]
+    predicate: Predicate
+    texts: dict[str, CompiledText]
+    fallback_text: CompiledText
+    # builtin-кнопка с open_mode=direct: URL определяется по контексту
+    opens_directly: bool
+
+    def text_for(self, language: str) -> CompiledText:
+        return self.texts.get(language, self.fallback_text)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRow:
+    predicate: Predicate
+    buttons: tuple[CompiledButton, ...]
+    max_per_row: int
+
+
+@dataclass(slots=True)
+class MenuLayoutPlan:
+    config: dict[str, Any]
+    rows: tuple[CompiledRow, ...]
+    keyboards: OrderedDict[tuple, InlineKeyboardMarkup] = field(default_factory=OrderedDict)
+
+    def get_keyboard(self, key: tuple) -> InlineKeyboardMarkup | None:
+        keyboard = self.keyboards.get(key)
+        if keyboard is not None:
+            self.keyboards.move_to_end(key)
+        return keyboard
+
+    def store_keyboard(self, key: tuple, keyboard: InlineKeyboardMarkup) -> None:
+        self.keyboards[key] = keyboard
+        if len(self.keyboards) > KEYBOARD_CACHE_SIZE:
+            self.keyboards.popitem(last=False)
+
+
+def compile_button(button_id: str, button_config: dict[str, Any]) -> CompiledButton:
+    text_config = button_config.get('text', {}) or {}
+    icon = button_config.get('icon', '')
+    dynamic = bool(button_config.get('dynamic_text'))
+    texts = {language: _compile_text(text, icon, dynamic) for language, text in text_config.items()}
+
+    # Порядок подбора языка как в MenuLayoutService._get_localized_text: запрошенный → en → первый
+    if 'en' in texts:
+        fallback_text = texts['en']
+    elif texts:
+        fallback_text = next(iter(texts.values()))
+    else:
+        fallback_text = CompiledText(static='')
+
+    button_type = button_config.get('type', 'builtin')
+    return CompiledButton(
+        button_id=button_id,
+        config=button_config,
+        predicate=_both(
+            compile_visibility(button_config.get('visibility', 'all')),
+            compile_conditions(button_config.get('conditions')),
+        ),
+        texts=texts,
+        fallback_text=fallback_text,
+        opens_directly=(
+            button_type not in {'url', 'mini_app', 'callback'}
+            and button_config.get('open_mode', 'callback') == 'direct'
+        ),
+    )
+
+
+def compile_menu_plan(config: dict[str, Any]) -> MenuLayoutPlan:
+    """Компилирует конфигурацию меню. Конфиг копируется: план не зависит от правок исходного словаря."""
+    config = copy.deepcopy(config)
+    buttons_config = config.get('buttons', {})
+
+    rows: list[CompiledRow] = []
+    for row_config in config.get('rows', []):
+        buttons: list[CompiledButton] = []
+        for button_id in row_config.get('buttons', []):
+            button_config = buttons_config.get(button_id)
+            if button_config is None or not button_config.get('enabled', True):
+                continue
+            buttons.append(compile_button(button_id, button_config))
+        rows.append(
+            CompiledRow(
+                predicate=compile_conditions(row_config.get('conditions')),
+                buttons=tuple(buttons),
+                max_per_row=row_config.get('max_per_row', 2),
+            )
+        )
+    return MenuLayoutPlan(config=config, rows=tuple(rows))
@@ -18,7 +18,8 @@ from app.config import settings
 from app.database.crud.system_setting import upsert_system_setting
 from app.database.models import SystemSetting
 from app.localization.texts import get_texts
-from app.utils.button_styles_cache import CALLBACK_TO_SECTION, get_cached_button_styles
+from app.services.runtime_sync_service import TOPIC_MENU, runtime_sync_service
+from app.utils.button_styles_cache import CALLBACK_TO_SECTION, get_button_styles_version, get_cached_button_styles
 from app.utils.miniapp_buttons import CALLBACK_TO_CABINET_STYLE, _resolve_style
 
 from .constants import (
@@ -30,6 +31,16 @@ from .constants import (
 )
 from .context import MenuContext
 from .history_service import MenuLayoutHistoryService
+from .plan import (
+    CompiledButton,
+    CompiledText,
+    MenuLayoutPlan,
+    compile_button,
+    compile_conditions,
+    compile_menu_plan,
+    compile_visibility,
+    tokenize_template,
+)
 from .stats_service import MenuLayoutStatsService
 
 
@@ -41,6 +52,8 @@ class MenuLayoutService:
 
     _cache: dict[str, Any] | None = None
     _cache_updated_at: datetime | None = None
+    _plan: MenuLayoutPlan | None = None
+    _plan_source: dict[str, Any] | None = None
     _lock: asyncio.Lock = asyncio.Lock()
 
     # --- Управление кешем ---
@@ -50,6 +63,8 @@ class MenuLayoutService:
         """Инвалидировать кеш конфигурации."""
         cls._cache = None
         cls._cache_updated_at = None
+        cls._plan = None
+        cls._plan_source = None
 
     # --- Получение констант и информации ---
 
@@ -260,6 +275,7 @@ class MenuLayoutService:
         )
         await db.commit()
         cls.invalidate_cache()
+        await runtime_sync_service.publish(TOPIC_MENU)
 
     @classmethod
     async def reset_to_default(cls, db: AsyncSession) -> dict[str, Any]:
@@ -708,176 +724,7 @@ class MenuLayoutService:
         context: MenuContext,
     ) -> bool:
         """Проверить условия показа."""
-        if not conditions:
-            return True
-
-        # has_active_subscription
-        if conditions.get('has_active_subscription') is True:
-            if not context.has_active_subscription:
-                return False
-
-        # subscription_is_active
-        if conditions.get('subscription_is_active') is True:
-            if not context.subscription_is_active:
-                return False
-
-        # has_traffic_limit - подписка с лимитом трафика
-        if conditions.get('has_traffic_limit') is True:
-            if not context.subscription:
-                return False
-            traffic_limit = getattr(context.subscription, 'traffic_limit_gb', 0)
-            is_trial = getattr(context.subscription, 'is_trial', False)
-            if is_trial or traffic_limit <= 0:
-                return False
-
-        # traffic_topup_enabled - функция докупки трафика включена
-        if conditions.get('traffic_topup_enabled') is True:
-            if not settings.is_traffic_topup_enabled():
-                return False
-            # В режиме тарифов докупка трафика недоступна
-            if settings.is_tariffs_mode():
-                return False
-
-        # is_admin
-        if conditions.get('is_admin') is True:
-            if not context.is_admin:
-                return False
-
-        # is_moderator
-        if conditions.get('is_moderator') is True:
-            if context.is_admin:  # Админ не показывает кнопку модератора
-                return False
-            if not context.is_moderator:
-                return False
-
-        # referral_enabled
-        if conditions.get('referral_enabled') is True:
-            if not settings.is_referral_program_enabled():
-                return False
-
-        # contests_visible
-        if conditions.get('contests_visible') is True:
-            if not settings.CONTESTS_BUTTON_VISIBLE:
-                return False
-
-        # support_enabled
-        if conditions.get('support_enabled') is True:
-            try:
-                from app.services.support_settings_service import SupportSettingsService
-
-                if not SupportSettingsService.is_support_menu_enabled():
-                    return False
-            except Exception:
-                if not settings.SUPPORT_MENU_ENABLED:
-                    return False
-
-        # language_selection_enabled
-        if conditions.get('language_selection_enabled') is True:
-            if not settings.is_language_selection_enabled():
-                return False
-
-        # happ_enabled
-        if conditions.get('happ_enabled') is True:
-            if not settings.is_happ_download_button_enabled():
-                return False
-
-        # simple_subscription_enabled
-        if conditions.get('simple_subscription_enabled') is True:
-            if not settings.SIMPLE_SUBSCRIPTION_ENABLED:
-                return False
-
-        # show_trial
-        if conditions.get('show_trial') is True:
-            if context.has_had_paid_subscription or context.has_active_subscription:
-                return False
-
-        # show_buy
-        if conditions.get('show_buy') is True:
-            # In tariffs mode we keep "buy subscription" available even for active users
-            # so they can proactively extend/change plans from the main menu.
-            if not settings.is_tariffs_mode() and context.has_active_subscription and context.subscription_is_active:
-                return False
-
-        # has_saved_cart
-        if conditions.get('has_saved_cart') is True:
-            if not context.has_saved_cart and not context.show_resume_checkout:
-                return False
-
-        # --- Расширенные условия ---
-
-        # min_balance_kopeks
-        min_balance = conditions.get('min_balance_kopeks')
-        if min_balance is not None:
-            if context.balance_kopeks < min_balance:
-                return False
-
-        # max_balance_kopeks
-        max_balance = conditions.get('max_balance_kopeks')
-        if max_balance is not None:
-            if context.balance_kopeks > max_balance:
-                return False
-
-        # min_registration_days
-        min_reg_days = conditions.get('min_registration_days')
-        if min_reg_days is not None:
-            if context.registration_days < min_reg_days:
-                return False
-
-        # max_registration_days
-        max_reg_days = conditions.get('max_registration_days')
-        if max_reg_days is not None:
-            if context.registration_days > max_reg_days:
-                return False
-
-        # min_referrals
-        min_refs = conditions.get('min_referrals')
-        if min_refs is not None:
-            if context.referral_count < min_refs:
-                return False
-
-        # has_referrals
-        if conditions.get('has_referrals') is True:
-            if context.referral_count <= 0:
-                return False
-
-        # promo_group_ids - пользователь должен быть в одной из указанных групп
-        promo_groups = conditions.get('promo_group_ids')
-        if promo_groups and isinstance(promo_groups, list):
-            if context.promo_group_id not in promo_groups:
-                return False
-
-        # exclude_promo_group_ids - исключить пользователей из этих групп
-        exclude_groups = conditions.get('exclude_promo_group_ids')
-        if exclude_groups and isinstance(exclude_groups, list):
-            if context.promo_group_id in exclude_groups:
-                return False
-
-        # has_subscription_days_left - минимум дней до окончания
-        min_sub_days = conditions.get('has_subscription_days_left')
-        if min_sub_days is not None:
-            if context.subscription_days < min_sub_days:
-                return False
-
-        # max_subscription_days_left
-        max_sub_days = conditions.get('max_subscription_days_left')
-        if max_sub_days is not None:
-            if context.subscription_days > max_sub_days:
-                return False
-
-        # is_trial_user
-        if conditions.get('is_trial_user') is True:
-            if not context.subscription:
-                return False
-            is_trial = getattr(context.subscription, 'is_trial', False)
-            if not is_trial:
-                return False
-
-        # has_autopay
-        if conditions.get('has_autopay') is True:
-            if not context.has_autopay:
-                return False
-
-        return True
+        return compile_conditions(conditions)(context)
 
     @classmethod
     def _check_visibility(
@@ -886,15 +733,7 @@ class MenuLayoutService:
         context: MenuContext,
     ) -> bool:
         """Проверить видимость кнопки."""
-        if visibility == 'all':
-            return True
-        if visibility == 'admins':
-            return context.is_admin
-        if visibility == 'moderators':
-            return context.is_moderator and not context.is_admin
-        if visibility == 'subscribers':
-            return context.has_active_subscription and context.subscription_is_active
-        return True
+        return compile_visibility(visibility)(context)
 
     # --- Форматирование текста ---
 
@@ -950,68 +789,69 @@ class MenuLayoutService:
         texts: Any,
     ) -> str:
         """Форматировать динамический текст с плейсхолдерами."""
-        # Баланс
-        if '{balance}' in text:
-            formatted_balance = texts.format_price(context.balance_kopeks)
-            text = text.replace('{balance}', formatted_balance)
+        tokens = tokenize_template(text)
+        if tokens is None:
+            return text
+        return CompiledText(static=text, tokens=tokens).render(context, lambda: texts)
 
-        # Имя пользователя
-        if '{username}' in text:
-            text = text.replace('{username}', context.username or 'User')
+    # --- Построение кнопок ---
 
-        # Дней до окончания подписки
-        if '{subscription_days}' in text:
-            text = text.replace('{subscription_days}', str(context.subscription_days))
+    @staticmethod
+    def _is_connect_button(button_id: str, action: str) -> bool:
+        return (
+            button_id == 'connect'
+            or 'connect' in str(button_id).lower()
+            or action == 'subscription_connect'
+            or 'connect' in str(action).lower()
+        )
 
-        # Использованный трафик
-        if '{traffic_used}' in text:
-            traffic = f'{context.traffic_used_gb:.1f} GB'
-            text = text.replace('{traffic_used}', traffic)
+    @staticmethod
+    def _is_http_url(url: str | None) -> bool:
+        return bool(url) and (url.startswith('http://') or url.startswith('https://'))
 
-        # Оставшийся трафик
-        if '{traffic_left}' in text:
-            traffic = f'{context.traffic_left_gb:.1f} GB'
-            text = text.replace('{traffic_left}', traffic)
+    @classmethod
+    def _resolve_direct_url(
+        cls,
+        button_config: dict[str, Any],
+        context: MenuContext,
+        is_connect_button: bool,
+    ) -> str | None:
+        """URL для builtin-кнопки с open_mode=direct или None, если открыть напрямую нельзя."""
+        action = button_config.get('action', '')
+        # Используем webapp_url, если указан, иначе action (если это URL)
+        url = button_config.get('webapp_url') or action
 
-        # Количество рефералов
-        if '{referral_count}' in text:
-            text = text.replace('{referral_count}', str(context.referral_count))
+        # Для кнопки connect: если URL не указан или это callback_data,
+        # пытаемся получить URL из подписки пользователя
+        if is_connect_button and not cls._is_http_url(url):
+            if context.subscription:
+                from app.utils.subscription_utils import get_display_subscription_link
 
-        # Заработок с рефералов
-        if '{referral_earnings}' in text:
-            formatted_earnings = texts.format_price(context.referral_earnings_kopeks)
-            text = text.replace('{referral_earnings}', formatted_earnings)
+                subscription_url = get_display_subscription_link(context.subscription)
+                if subscription_url:
+                    url = subscription_url
+            # Если все еще нет URL, пробуем использовать настройку MINIAPP_CUSTOM_URL
+            if not cls._is_http_url(url) and settings.MINIAPP_CUSTOM_URL:
+                url = settings.MINIAPP_CUSTOM_URL
 
-        return text
+        return url if cls._is_http_url(url) else None
 
-    # --- Построение кнопок ---
+    @staticmethod
+    def _style_environment() -> tuple:
+        """Всё, от чего зависят стили кнопок, — часть ключа кеша клавиатур."""
+        return (settings.is_cabinet_mode(), settings.CABINET_BUTTON_STYLE, get_button_styles_version())
 
     @classmethod
-    def _build_button(
+    def _create_button(
         cls,
         button_config: dict[str, Any],
-        context: MenuContext,
-        texts: Any,
-        button_id: str = '',
-    ) -> InlineKeyboardButton | None:
-        """Построить кнопку из конфигурации.
-
-        Args:
-            button_config: Конфигурация кнопки
-            context: Контекст пользователя
-            texts: Локализованные тексты
-            button_id: ID кнопки (ключ в словаре buttons)
-        """
+        text: str,
+        direct_url: str | None,
+    ) -> InlineKeyboardButton:
+        """Создать кнопку с готовым текстом и (для open_mode=direct) разрешённым URL."""
         button_type = button_config.get('type', 'builtin')
-        # Используем переданный button_id или fallback на builtin_id
-        effective_button_id = button_id or button_config.get('builtin_id', '')
-        text_config = button_config.get('text', {})
         action = button_config.get('action', '')
         open_mode = button_config.get('open_mode', 'callback')
-        webapp_url = button_config.get('webapp_url')
-        icon = button_config.get('icon', '')
-        global_style = _resolve_style((settings.CABINET_BUTTON_STYLE or '').strip())
-        cached_styles = get_cached_button_styles()
 
         def _menu_layout_style_kwargs(callback_fallback: str) -> dict[str, Any]:
             if not settings.is_cabinet_mode():
@@ -1020,12 +860,13 @@ class MenuLayoutService:
             if not section:
                 return {}
 
-            section_cfg = cached_styles.get(section, {})
+            section_cfg = get_cached_button_styles().get(section, {})
             if not section_cfg.get('enabled', True):
                 return {}
             if section_cfg.get('style'):
                 resolved_style = _resolve_style(section_cfg['style'])
             else:
+                global_style = _resolve_style((settings.CABINET_BUTTON_STYLE or '').strip())
                 resolved_style = global_style or _resolve_style(CALLBACK_TO_CABINET_STYLE.get(callback_fallback))
             resolved_emoji = section_cfg.get('icon_custom_emoji_id') or None
             return {
@@ -1033,37 +874,6 @@ class MenuLayoutService:
                 'icon_custom_emoji_id': resolved_emoji or None,
             }
 
-        # Логирование для отладки кнопки connect
-        is_connect_button = (
-            effective_button_id == 'connect'
-            or 'connect' in str(effective_button_id).lower()
-            or action == 'subscription_connect'
-            or 'connect' in str(action).lower()
-        )
-
-        if is_connect_button:
-            logger.info(
-                '🔗 Построение кнопки connect: button_id=, type=, open_mode=, action=, webapp_url',
-                effective_button_id=effective_button_id,
-                button_type=button_type,
-                open_mode=open_mode,
-                action=action,
-                webapp_url=webapp_url,
-            )
-
-        # Получаем текст
-        text = cls._get_localized_text(text_config, context.language)
-        if not text:
-            return None
-
-        # Добавляем иконку если есть и текст не начинается с неё
-        if icon and not text.startswith(icon):
-            text = f'{icon} {text}'
-
-        # Форматируем динамический текст
-        if button_config.get('dynamic_text'):
-            text = cls._format_dynamic_text(text, context, texts)
-
         # Строим кнопку в зависимости от типа
         if button_type == 'url':
             return InlineKeyboardButton(text=text, url=action)
@@ -1079,109 +889,137 @@ class MenuLayoutService:
         # builtin - проверяем open_mode
         if open_mode == 'direct':
             # Прямое открытие Mini App через WebAppInfo
-            # Используем webapp_url, если указан, иначе action (если это URL)
-            url = webapp_url or action
-
-            # Для кнопки connect: если URL не указан или это callback_data,
-            # пытаемся получить URL из подписки пользователя
-            if is_connect_button and (not url or not (url.startswith('http://') or url.startswith('https://'))):
-                if context.subscription:
-                    from app.utils.subscription_utils import get_display_subscription_link
-
-                    subscription_url = get_display_subscription_link(context.subscription)
-                    if subscription_url:
-                        url = subscription_url
-                        logger.info('🔗 Кнопка connect: получен URL из подписки: ...', url=url[:50])
-                # Если все еще нет URL, пробуем использовать настройку MINIAPP_CUSTOM_URL
-                if not url or not (url.startswith('http://') or url.startswith('https://')):
-                    if settings.MINIAPP_CUSTOM_URL:
-                        url = settings.MINIAPP_CUSTOM_URL
-                        logger.info('🔗 Кнопка connect: использован MINIAPP_CUSTOM_URL: ...', url=url[:50])
-
-            # Проверяем, что это действительно URL
-            if url and (url.startswith('http://') or url.startswith('https://')):
-                logger.info('🔗 Кнопка connect: open_mode=direct, используем URL: ...', url=url[:50])
+            if direct_url:
                 return InlineKeyboardButton(
                     text=text,
-                    web_app=types.WebAppInfo(url=url),
+                    web_app=types.WebAppInfo(url=direct_url),
                     **_menu_layout_style_kwargs(action),
                 )
             logger.warning(
-                '🔗 Кнопка connect: open_mode=direct, но URL не найден. webapp_url=, action=, subscription_url',
-                webapp_url=webapp_url,
+                '🔗 Кнопка open_mode=direct, но URL не найден. webapp_url=, action',
+                webapp_url=button_config.get('webapp_url'),
                 action=action,
-                value='есть' if context.subscription else 'нет',
             )
-            # Fallback на callback_data
-            return InlineKeyboardButton(
-                text=text,
-                callback_data=action,
-                **_menu_layout_style_kwargs(action),
-            )
-        # Стандартный callback_data
-        logger.debug('Кнопка connect: open_mode=, используем callback_data', open_mode=open_mode, action=action)
+        # Стандартный callback_data (и fallback для direct без URL)
         return InlineKeyboardButton(
             text=text,
             callback_data=action,
             **_menu_layout_style_kwargs(action),
         )
 
+    @classmethod
+    def _build_button(
+        cls,
+        button_config: dict[str, Any],
+        context: MenuContext,
+        texts: Any,
+        button_id: str = '',
+    ) -> InlineKeyboardButton | None:
+        """Построить кнопку из конфигурации.
+
+        Args:
+            button_config: Конфигурация кнопки
+            context: Контекст пользователя
+            texts: Локализованные тексты
+            button_id: ID кнопки (ключ в словаре buttons)
+        """
+        # Используем переданный button_id или fallback на builtin_id
+        effective_button_id = button_id or button_config.get('builtin_id', '')
+        compiled = compile_button(effective_button_id, button_config)
+
+        # Получаем текст (с иконкой и плейсхолдерами)
+        text = compiled.text_for(context.language).render(context, lambda: texts)
+        if not text:
+            return None
+
+        direct_url = None
+        if compiled.opens_directly:
+            direct_url = cls._resolve_direct_url(
+                button_config,
+                context,
+                cls._is_connect_button(effective_button_id, button_config.get('action', '')),
+            )
+        return cls._create_button(button_config, text, direct_url)
+
     # --- Построение клавиатуры ---
 
+    @classmethod
+    async def get_plan(cls, db: AsyncSession) -> MenuLayoutPlan:
+        """Скомпилированный план текущей версии конфигурации."""
+        config = await cls.get_config(db)
+        plan = cls._plan
+        if plan is None or cls._plan_source is not config:
+            plan = compile_menu_plan(config)
+            cls._plan = plan
+            cls._plan_source = config
+        return plan
+
     @classmethod
     async def build_keyboard(
         cls,
         db: AsyncSession,
         context: MenuContext,
     ) -> InlineKeyboardMarkup:
-        """Построить клавиатуру меню на основе конфигурации."""
-        config = await cls.get_config(db)
-        texts = get_texts(context.language)
+        """Построить клавиатуру меню на основе скомпилированного плана.
 
-        keyboard_rows: list[list[InlineKeyboardButton]] = []
-        rows_config = config.get('rows', [])
-        buttons_config = config.get('buttons', {})
+        Ключ кеша — видимые кнопки с отрендеренными текстами и URL, поэтому
+        пользователи с одинаковым результатом получают один и тот же объект.
+        """
+        plan = await cls.get_plan(db)
+        texts_holder: list[Any] = []
 
-        for row_config in rows_config:
+        def _texts() -> Any:
+            if not texts_holder:
+                texts_holder.append(get_texts(context.language))
+            return texts_holder[0]
+
+        visible_rows: list[tuple[int, list[tuple[CompiledButton, str, str | None]]]] = []
+        for row in plan.rows:
             # Проверяем условия строки
-            row_conditions = row_config.get('conditions')
-            if not cls._evaluate_conditions(row_conditions, context):
+            if not row.predicate(context):
                 continue
 
-            row_buttons: list[InlineKeyboardButton] = []
-            max_per_row = row_config.get('max_per_row', 2)
-
-            for button_id in row_config.get('buttons', []):
-                if button_id not in buttons_config:
-                    continue
-
-                button_cfg = buttons_config[button_id]
-
-                # Проверяем включена ли кнопка
-                if not button_cfg.get('enabled', True):
-                    continue
-
-                # Проверяем видимость
-                visibility = button_cfg.get('visibility', 'all')
-                if not cls._check_visibility(visibility, context):
+            row_buttons: list[tuple[CompiledButton, str, str | None]] = []
+            for button in row.buttons:
+                # Видимость и условия кнопки
+                if not button.predicate(context):
                     continue
-
-                # Проверяем условия кнопки
-                button_conditions = button_cfg.get('conditions')
-                if not cls._evaluate_conditions(button_conditions, context):
+                text = button.text_for(context.language).render(context, _texts)
+                if not text:
                     continue
+                direct_url = None
+                if button.opens_directly:
+                    direct_url = cls._resolve_direct_url(
+                        button.config,
+                        context,
+                        cls._is_connect_button(button.button_id, button.config.get('action', '')),
+                    )
+                row_buttons.append((button, text, direct_url))
 
-                # Строим кнопку (передаём button_id для кастомных кнопок)
-                button = cls._build_button(button_cfg, context, texts, button_id=button_id)
-                if button:
-                    row_buttons.append(button)
+            if row_buttons:
+                visible_rows.append((row.max_per_row, row_buttons))
+
+        key = (
+            cls._style_environment(),
+            tuple(
+                (max_per_row, tuple((button.button_id, text, direct_url) for button, text, direct_url in row_buttons))
+                for max_per_row, row_buttons in visible_rows
+            ),
+        )
+        keyboard = plan.get_keyboard(key)
+        if keyboard is not None:
+            return keyboard
 
+        keyboard_rows: list[list[InlineKeyboardButton]] = []
+        for max_per_row, row_buttons in visible_rows:
+            built = [cls._create_button(button.config, text, direct_url) for button, text, direct_url in row_buttons]
             # Добавляем кнопки с учетом max_per_row
-            if row_buttons:
-                for i in range(0, len(row_buttons), max_per_row):
-                    keyboard_rows.append(row_buttons[i : i + max_per_row])
+            for i in range(0, len(built), max_per_row):
+                keyboard_rows.append(built[i : i + max_per_row])
 
-        return InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
+        keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
+        plan.store_keyboard(key, keyboard)
+        return keyboard
 
     @classmethod
     async def preview_keyboard(
@@ -5,6 +5,7 @@
 """
 
 import asyncio
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
 import structlog
@@ -19,6 +20,15 @@ from app.utils.cache import cache
 logger = structlog.get_logger(__name__)
 
 
+@dataclass
+class _DrainStats:
+    processed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    processed_amount: float = 0.0
+    service_unavailable: bool = False
+
+
 class NalogoQueueService:
     """Сервис фоновой обработки очереди чеков NaloGO."""
 
@@ -30,6 +40,7 @@ class NalogoQueueService:
         self._last_notification_time: datetime | None = None
         self._notification_cooldown = timedelta(hours=1)  # Не чаще раза в час
         self._had_pending_receipts = False  # Флаг для отслеживания успешной разгрузки
+        self._drain_lock = asyncio.Lock()
 
     def set_nalogo_service(self, service: NaloGoService) -> None:
         """Установить сервис NaloGO."""
@@ -53,6 +64,11 @@ class NalogoQueueService:
         """Задержка между отправкой чеков в секундах."""
         return getattr(settings, 'NALOGO_QUEUE_RECEIPT_DELAY', 3)
 
+    @property
+    def _concurrency(self) -> int:
+        """Сколько чеков отправляется параллельно."""
+        return settings.get_nalogo_queue_concurrency()
+
     @property
     def _max_attempts(self) -> int:
         """Максимальное количество попыток отправки чека."""
@@ -68,12 +84,16 @@ class NalogoQueueService:
             logger.warning('Сервис очереди чеков уже запущен')
             return
 
+        # Чеки, взятые в работу до падения/перезапуска, возвращаем в очередь
+        await self._nalogo_service.recover_processing_receipts()
+
         self._running = True
         self._task = asyncio.create_task(self._process_queue_loop())
         logger.info(
             'Сервис очереди чеков NaloGO запущен (интервал: с, задержка между чеками: с)',
             _check_interval=self._check_interval,
             _receipt_delay=self._receipt_delay,
+            concurrency=self._concurrency,
         )
 
     async def stop(self) -> None:
@@ -88,6 +108,12 @@ class NalogoQueueService:
         self._task = None
         logger.info('Сервис очереди чеков NaloGO остановлен')
 
+    async def shutdown(self) -> None:
+        """Остановить обработку и закрыть пул соединений NaloGO (при завершении процесса)."""
+        await self.stop()
+        if self._nalogo_service:
+            await self._nalogo_service.close()
+
     async def _send_admin_notification(self, message: str, skip_cooldown: bool = False) -> None:
         """Отправить уведомление админам о чеках."""
         if not self._bot:
@@ -138,120 +164,33 @@ class NalogoQueueService:
         if queue_length == 0:
             return
 
-        logger.info('Начинаем обработку очереди чеков: шт.', queue_length=queue_length)
+        logger.info(
+            'Начинаем обработку очереди чеков: шт.',
+            queue_length=queue_length,
+            concurrency=self._concurrency,
+        )
         self._had_pending_receipts = True
 
-        processed = 0
-        failed = 0
-        skipped = 0
-        total_processed_amount = 0.0
-        service_unavailable = False
-
-        while True:
-            receipt_data = await self._nalogo_service.pop_receipt_from_queue()
-            if not receipt_data:
-                break
-
-            attempts = receipt_data.get('attempts', 0)
-            payment_id = receipt_data.get('payment_id', 'unknown')
-            amount = receipt_data.get('amount', 0)
-
-            # Логируем количество попыток (чек никогда не удаляется из очереди)
-            if attempts >= 10:
-                logger.warning('Чек уже попыток, продолжаем пытаться...', payment_id=payment_id, attempts=attempts)
-
-            # Пытаемся отправить чек
-            try:
-                # Восстанавливаем описание из сохранённых данных
-                telegram_user_id = receipt_data.get('telegram_user_id')
-                amount_kopeks = receipt_data.get('amount_kopeks')
-
-                # Извлекаем время оплаты из очереди (чтобы чек был с правильным временем)
-                operation_time = None
-                created_at_str = receipt_data.get('created_at')
-                if created_at_str:
-                    try:
-                        operation_time = isoparse(created_at_str)
-                        if operation_time.tzinfo is None:
-                            operation_time = operation_time.replace(tzinfo=UTC)
-                    except (ValueError, TypeError) as parse_error:
-                        logger.warning(
-                            'Не удалось распарсить created_at', created_at_str=created_at_str, parse_error=parse_error
-                        )
-
-                # Формируем описание заново из настроек (если есть данные)
-                if amount_kopeks is not None:
-                    receipt_name = settings.get_balance_payment_description(amount_kopeks, telegram_user_id)
-                else:
-                    # Fallback на сохранённое имя
-                    receipt_name = receipt_data.get(
-                        'name', settings.get_balance_payment_description(int(amount * 100), telegram_user_id)
-                    )
-
-                receipt_uuid = await self._nalogo_service.create_receipt(
-                    name=receipt_name,
-                    amount=amount,
-                    quantity=receipt_data.get('quantity', 1),
-                    client_info=receipt_data.get('client_info'),
-                    payment_id=payment_id,
-                    queue_on_failure=False,  # Не добавлять в очередь повторно автоматически
-                    telegram_user_id=telegram_user_id,
-                    amount_kopeks=amount_kopeks,
-                    operation_time=operation_time,  # Время оплаты, а не отправки
-                )
-
-                if receipt_uuid:
-                    processed += 1
-                    total_processed_amount += amount
-
-                    # Удаляем метку "в очереди" (чек создан успешно)
-                    if payment_id:
-                        queued_key = f'nalogo:queued:{payment_id}'
-                        await cache.delete(queued_key)
-
-                    logger.info(
-                        'Чек из очереди успешно создан: (payment_id=, попытка )',
-                        receipt_uuid=receipt_uuid,
-                        payment_id=payment_id,
-                        attempts=attempts + 1,
-                    )
-                else:
-                    # Вернуть в очередь с увеличенным счетчиком попыток
-                    await self._nalogo_service.requeue_receipt(receipt_data)
-                    failed += 1
-                    service_unavailable = True
-                    logger.warning(
-                        'Не удалось создать чек из очереди (payment_id=), возвращен в очередь (попытка /)',
-                        payment_id=payment_id,
-                        attempts=attempts + 1,
-                        _max_attempts=self._max_attempts,
-                    )
-                    # Если сервис недоступен, прекращаем попытки до следующего цикла
-                    break
-
-            except Exception as error:
-                await self._nalogo_service.requeue_receipt(receipt_data)
-                failed += 1
-                logger.error('Ошибка при создании чека из очереди (payment_id=)', payment_id=payment_id, error=error)
-                # Прекращаем попытки при ошибке
-                break
-
-            # Задержка между чеками чтобы не долбить API
-            await asyncio.sleep(self._receipt_delay)
+        stats = _DrainStats()
+        stop_event = asyncio.Event()
+        async with self._drain_lock:
+            await asyncio.gather(
+                *(self._drain_worker(stats, stop_event) for _ in range(min(self._concurrency, queue_length)))
+            )
 
-        if processed > 0 or failed > 0 or skipped > 0:
+        if stats.processed > 0 or stats.failed > 0 or stats.skipped > 0:
             logger.info(
                 'Обработка очереди завершена: успешно=, неудачно=, пропущено',
-                processed=processed,
-                failed=failed,
-                skipped=skipped,
+                processed=stats.processed,
+                failed=stats.failed,
+                skipped=stats.skipped,
             )
 
         # Проверяем остаток в очереди
         remaining = await self._nalogo_service.get_queue_length()
 
         # Отправляем уведомление если есть проблемы
-        if service_unavailable or failed > 0:
+        if stats.service_unavailable or stats.failed > 0:
             if remaining > 0:
                 queued = await self._nalogo_service.get_queued_receipts()
                 total_queued_amount = sum(r.get('amount', 0) for r in queued)
@@ -266,16 +205,121 @@ class NalogoQueueService:
                 await self._send_admin_notification(message)
 
         # Уведомление об успешной разгрузке очереди
-        elif remaining == 0 and self._had_pending_receipts and processed > 0:
+        elif remaining == 0 and self._had_pending_receipts and stats.processed > 0:
             self._had_pending_receipts = False
             message = (
                 f'<b>✅ Очередь чеков NaloGO разгружена</b>\n\n'
                 f'Все отложенные чеки успешно отправлены!\n\n'
-                f'📋 <b>Отправлено:</b> {processed} чек(ов)\n'
-                f'💰 <b>На сумму:</b> {total_processed_amount:,.2f} ₽'
+                f'📋 <b>Отправлено:</b> {stats.processed} чек(ов)\n'
+                f'💰 <b>На сумму:</b> {stats.processed_amount:,.2f} ₽'
             )
             await self._send_admin_notification(message, skip_cooldown=True)
 
+    async def _drain_worker(self, stats: _DrainStats, stop_event: asyncio.Event) -> None:
+        """Забирает чеки из очереди по одному, пока очередь не опустеет или сервис не откажет.
+
+        Чек переносится в список обработки и удаляется оттуда только после
+        отправки или возврата в очередь, поэтому прерванная отправка не теряется.
+        """
+        while not stop_event.is_set():
+            claimed = await self._nalogo_service.claim_receipt()
+            if claimed is None:
+                return
+            raw, receipt_data = claimed
+
+            attempts = receipt_data.get('attempts', 0)
+            payment_id = receipt_data.get('payment_id', 'unknown')
+            amount = receipt_data.get('amount', 0)
+
+            # Логируем количество попыток (чек никогда не удаляется из очереди)
+            if attempts >= 10:
+                logger.warning('Чек уже попыток, продолжаем пытаться...', payment_id=payment_id, attempts=attempts)
+
+            try:
+                receipt_uuid = await self._submit_receipt(receipt_data)
+            except Exception as error:
+                await self._nalogo_service.requeue_claimed_receipt(raw, receipt_data)
+                stats.failed += 1
+                stop_event.set()
+                logger.error('Ошибка при создании чека из очереди (payment_id=)', payment_id=payment_id, error=error)
+                return
+
+            if not receipt_uuid:
+                # Вернуть в очередь с увеличенным счетчиком попыток
+                await self._nalogo_service.requeue_claimed_receipt(raw, receipt_data)
+                stats.failed += 1
+                stats.service_unavailable = True
+                logger.warning(
+                    'Не удалось создать чек из очереди (payment_id=), возвращен в очередь (попытка /)',
+                    payment_id=payment_id,
+                    attempts=attempts + 1,
+                    _max_attempts=self._max_attempts,
+                )
+                # Если сервис недоступен, прекращаем попытки до следующего цикла
+                stop_event.set()
+                return
+
+            await self._nalogo_service.ack_receipt(raw)
+            stats.processed += 1
+            stats.processed_amount += amount
+
+            # Удаляем метку "в очереди" (чек создан успешно)
+            if payment_id:
+                await cache.delete(f'nalogo:queued:{payment_id}')
+
+            logger.info(
+                'Чек из очереди успешно создан: (payment_id=, попытка )',
+                receipt_uuid=receipt_uuid,
+                payment_id=payment_id,
+                attempts=attempts + 1,
+            )
+
+            # Задержка между чеками чтобы не долбить API
+            await asyncio.sleep(self._receipt_delay)
+
+    async def _submit_receipt(self, receipt_data: dict) -> str | None:
+        """Отправить чек из очереди в NaloGO."""
+        payment_id = receipt_data.get('payment_id', 'unknown')
+        amount = receipt_data.get('amount', 0)
+
+        # Восстанавливаем описание из сохранённых данных
+        telegram_user_id = receipt_data.get('telegram_user_id')
+        amount_kopeks = receipt_data.get('amount_kopeks')
+
+        # Извлекаем время оплаты из очереди (чтобы чек был с правильным временем)
+        operation_time = None
+        created_at_str = receipt_data.get('created_at')
+        if created_at_str:
+            try:
+                operation_time = isoparse(created_at_str)
+                if operation_time.tzinfo is None:
+                    operation_time = operation_time.replace(tzinfo=UTC)
+            except (ValueError, TypeError) as parse_error:
+                logger.warning(
+                    'Не удалось распарсить created_at', created_at_str=created_at_str, parse_error=parse_error
+                )
+
+        # Формируем описание заново из настроек (если есть данные)
+        if amount_kopeks is not None:
+            receipt_name = settings.get_balance_payment_description(amount_kopeks, telegram_user_id)
+        else:
+            # Fallback на сохранённое имя
+            receipt_name = receipt_data.get(
+                'name', settings.get_balance_payment_description(int(amount * 100), telegram_user_id)
+            )
+
+        return await self._nalogo_service.create_receipt(
+            name=receipt_name,
+            amount=amount,
+            quantity=receipt_data.get('quantity', 1),
+            client_info=receipt_data.get('client_info'),
+            payment_id=payment_id,
+            queue_on_failure=False,  # Не добавлять в очередь повторно автоматически
+            telegram_user_id=telegram_user_id,
+            amount_kopeks=amount_kopeks,
+            operation_time=operation_time,  # Время оплаты, а не отправки
+        )
+
     async def force_process(self) -> dict:
         """Принудительно обработать очередь (для ручного запуска)."""
         if not self._nalogo_service:
@@ -298,6 +342,7 @@ class NalogoQueueService:
     async def get_status(self) -> dict:
         """Получить статус сервиса и очереди."""
         queue_length = 0
+        processing_count = 0
         total_amount = 0.0
         queued_receipts = []
         pending_verification_count = 0
@@ -306,6 +351,7 @@ class NalogoQueueService:
 
         if self._nalogo_service:
             queue_length = await self._nalogo_service.get_queue_length()
+            processing_count = await self._nalogo_service.get_processing_length()
             if queue_length > 0:
                 queued_receipts = await self._nalogo_service.get_queued_receipts()
                 total_amount = sum(r.get('amount', 0) for r in queued_receipts)
@@ -321,6 +367,8 @@ class NalogoQueueService:
             'check_interval_seconds': self._check_interval,
             'receipt_delay_seconds': self._receipt_delay,
             'queue_length': queue_length,
+            'processing_count': processing_count,
+            'concurrency': self._concurrency,
             'total_amount': total_amount,
             'max_attempts': self._max_attempts,
             'queued_receipts': queued_receipts[:10],
@@ -1,3 +1,5 @@
+import asyncio
+import json
 from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from typing import Any
@@ -9,12 +11,15 @@ from app.config import settings
 # Используем локальную исправленную версию библиотеки
 from app.lib.nalogo import Client
 from app.lib.nalogo.dto.income import IncomeClient, IncomeType
+from app.lib.nalogo.exceptions import UnauthorizedException
 from app.utils.cache import cache
 
 
 logger = structlog.get_logger(__name__)
 
 NALOGO_QUEUE_KEY = 'nalogo:receipt_queue'
+# Чеки, взятые воркером в работу: удаляются только после успешной отправки или возврата в очередь
+NALOGO_PROCESSING_KEY = 'nalogo:receipt_queue:processing'
 NALOGO_PENDING_VERIFICATION_KEY = 'nalogo:pending_verification'
 
 
@@ -34,6 +39,7 @@ class NaloGoService:
         storage_path = storage_path or getattr(settings, 'NALOGO_STORAGE_PATH', './nalogo_tokens.json')
 
         self.configured = False
+        self._auth_lock = asyncio.Lock()
 
         if not inn or not password:
             logger.warning('NaloGO INN или PASSWORD не настроены в settings. Функционал чеков будет ОТКЛЮЧЕН.')
@@ -286,6 +292,24 @@ class NaloGoService:
                 logger.error('Ошибка аутентификации в NaloGO', error=error, exc_info=True)
             return False
 
+    async def _has_token(self) -> bool:
+        token_data = await self.client.auth_provider.get_token()
+        return bool(token_data and token_data.get('token'))
+
+    async def _ensure_authenticated(self) -> bool:
+        """Переиспользует сохранённый токен; логинится один раз на все параллельные запросы."""
+        if await self._has_token():
+            return True
+        async with self._auth_lock:
+            if await self._has_token():
+                return True
+            return await self.authenticate()
+
+    async def close(self) -> None:
+        """Закрыть пул HTTP-соединений с nalog.ru."""
+        if self.configured:
+            await self.client.aclose()
+
     async def create_receipt(
         self,
         name: str,
@@ -333,15 +357,13 @@ class NaloGoService:
         # ЭТАП 1: Аутентификация
         # Если не прошла — чек точно не создавался, безопасно добавить в очередь
         try:
-            if not hasattr(self.client, '_access_token') or not self.client._access_token:
-                auth_success = await self.authenticate()
-                if not auth_success:
-                    # Аутентификация не прошла — чек не создавался, безопасно в очередь
-                    if queue_on_failure:
-                        await self._queue_receipt(
-                            name, amount, quantity, client_info, payment_id, telegram_user_id, amount_kopeks
-                        )
-                    return None
+            if not await self._ensure_authenticated():
+                # Аутентификация не прошла — чек не создавался, безопасно в очередь
+                if queue_on_failure:
+                    await self._queue_receipt(
+                        name, amount, quantity, client_info, payment_id, telegram_user_id, amount_kopeks
+                    )
+                return None
         except Exception as auth_error:
             # Ошибка аутентификации — чек не создавался, безопасно в очередь
             if self._is_service_unavailable(auth_error):
@@ -396,6 +418,16 @@ class NaloGoService:
             logger.error('Ошибка создания чека', result=result)
             return None
 
+        except UnauthorizedException as error:
+            # Токен отклонён и не обновился — чек не создан; следующий вызов залогинится заново
+            self.client.auth_provider.clear_token()
+            logger.warning('NaloGO отклонил токен, чек не создан', payment_id=payment_id, error=str(error)[:200])
+            if queue_on_failure:
+                await self._queue_receipt(
+                    name, amount, quantity, client_info, payment_id, telegram_user_id, amount_kopeks
+                )
+            return None
+
         except Exception as error:
             # ВАЖНО: Аутентификация была успешной, запрос на создание чека УШЁЛ
             # При таймауте чек МОГ быть создан на сервере — НЕ добавляем в очередь!
@@ -429,14 +461,73 @@ class NaloGoService:
         """Получить список чеков в очереди (без удаления)."""
         return await cache.lrange(NALOGO_QUEUE_KEY)
 
-    async def pop_receipt_from_queue(self) -> dict[str, Any] | None:
-        """Извлечь следующий чек из очереди."""
-        return await cache.rpop(NALOGO_QUEUE_KEY)
+    async def get_processing_length(self) -> int:
+        """Количество чеков, взятых в работу и ещё не подтверждённых."""
+        return await cache.llen(NALOGO_PROCESSING_KEY)
+
+    async def claim_receipt(self) -> tuple[str, dict[str, Any]] | None:
+        """Атомарно переносит следующий чек из очереди в список обработки.
 
-    async def requeue_receipt(self, receipt_data: dict[str, Any]) -> bool:
-        """Вернуть чек обратно в очередь (при неудачной отправке)."""
+        Возвращает исходную запись (для подтверждения) и разобранные данные чека.
+        """
+        client = cache.client()
+        if client is None:
+            return None
+        try:
+            raw = await client.lmove(NALOGO_QUEUE_KEY, NALOGO_PROCESSING_KEY, 'RIGHT', 'LEFT')
+        except Exception as error:
+            logger.error('Ошибка извлечения чека из очереди', error=error)
+            return None
+        if raw is None:
+            return None
+        try:
+            return raw, json.loads(raw)
+        except (TypeError, ValueError) as error:
+            # Битую запись оставлять в обработке бессмысленно — она не разберётся и потом
+            logger.error('Некорректная запись в очереди чеков удалена', raw=str(raw)[:200], error=error)
+            await self.ack_receipt(raw)
+            return None
+
+    async def ack_receipt(self, raw: str) -> None:
+        """Удаляет обработанный чек из списка обработки."""
+        client = cache.client()
+        if client is None:
+            return
+        try:
+            await client.lrem(NALOGO_PROCESSING_KEY, 1, raw)
+        except Exception as error:
+            logger.error('Ошибка подтверждения чека в очереди', error=error)
+
+    async def requeue_claimed_receipt(self, raw: str, receipt_data: dict[str, Any]) -> bool:
+        """Возвращает чек из обработки в очередь с увеличенным счётчиком попыток."""
+        client = cache.client()
+        if client is None:
+            return False
         receipt_data['attempts'] = receipt_data.get('attempts', 0) + 1
-        return await cache.lpush(NALOGO_QUEUE_KEY, receipt_data)
+        try:
+            pipe = client.pipeline(transaction=True)
+            pipe.lpush(NALOGO_QUEUE_KEY, json.dumps(receipt_data, default=str))
+            pipe.lrem(NALOGO_PROCESSING_KEY, 1, raw)
+            await pipe.execute()
+            return True
+        except Exception as error:
+            logger.error('Ошибка возврата чека в очередь', error=error)
+            return False
+
+    async def recover_processing_receipts(self) -> int:
+        """Возвращает в очередь чеки, оставшиеся в обработке после падения воркера."""
+        client = cache.client()
+        if client is None:
+            return 0
+        recovered = 0
+        try:
+            while await client.lmove(NALOGO_PROCESSING_KEY, NALOGO_QUEUE_KEY, 'LEFT', 'RIGHT') is not None:
+                recovered += 1
+        except Exception as error:
+            logger.error('Ошибка восстановления чеков из обработки', error=error)
+        if recovered:
+            logger.warning('Чеки из прерванной обработки возвращены в очередь', recovered=recovered)
+        return recovered
 
     async def find_duplicate_receipt(
         self,
@@ -536,10 +627,8 @@ class NaloGoService:
 
         try:
             # Аутентифицируемся если нужно
-            if not hasattr(self.client, '_access_token') or not self.client._access_token:
-                auth_success = await self.authenticate()
-                if not auth_success:
-                    return []
+            if not await self._ensure_authenticated():
+                return []
 
             income_api = self.client.income()
             result = await income_api.get_list(
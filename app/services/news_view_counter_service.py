@@ -0,0 +1,139 @@
+"""Счётчик просмотров новостей кабинета с пакетной записью в БД.
+
+Просмотр учитывается в Redis: множество ``news:views:seen:{id}:{YYYYMMDD}``
+отсекает повторные просмотры пользователя за сутки, а хэш
+``news:views:pending`` копит прирост по статьям. Периодический сброс забирает
+накопленное и применяет одним UPDATE на статью — вместо отдельной записи и
+блокировки строки на каждого читателя.
+
+Без Redis вызывающий код пишет просмотр в БД сразу (``record_view`` → ``None``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import structlog
+
+from app.config import settings
+from app.database.crud.news import apply_views_deltas
+from app.database.database import AsyncSessionLocal
+from app.utils.cache import cache, decode_redis_value
+
+
+logger = structlog.get_logger(__name__)
+
+PENDING_VIEWS_KEY = 'news:views:pending'
+SEEN_TTL_SECONDS = 2 * 24 * 60 * 60
+
+# Возвращает накопленный и ещё не записанный в БД прирост статьи
+_RECORD_VIEW_SCRIPT = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+end
+return tonumber(redis.call('HGET', KEYS[2], ARGV[2]) or '0')
+"""
+
+# Забирает накопленные приросты атомарно: просмотры, пришедшие после, попадут в следующий сброс
+_TAKE_PENDING_SCRIPT = """
+local pending = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return pending
+"""
+
+
+def seen_views_key(article_id: int, day: datetime | None = None) -> str:
+    day = day or datetime.now(UTC)
+    return f'news:views:seen:{article_id}:{day.strftime("%Y%m%d")}'
+
+
+class NewsViewCounterService:
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    async def record_view(self, article_id: int, user_id: int) -> int | None:
+        """Учитывает просмотр; возвращает прирост статьи, ещё не записанный в БД.
+
+        ``None`` — Redis недоступен, просмотр нужно записать в БД напрямую.
+        """
+        if cache.client() is None:
+            return None
+        try:
+            pending = await cache.run_script(
+                _RECORD_VIEW_SCRIPT,
+                (seen_views_key(article_id), PENDING_VIEWS_KEY),
+                (user_id, article_id, SEEN_TTL_SECONDS),
+            )
+        except Exception as error:
+            logger.warning('Не удалось учесть просмотр новости в Redis', article_id=article_id, error=error)
+            return None
+        return int(pending or 0)
+
+    async def _restore(self, redis, deltas: dict[int, int]) -> None:
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                for article_id, delta in deltas.items():
+                    pipe.hincrby(PENDING_VIEWS_KEY, str(article_id), delta)
+                await pipe.execute()
+        except Exception as error:
+            logger.error('Просмотры новостей потеряны: не удалось вернуть их в Redis', deltas=deltas, error=error)
+
+    async def flush(self) -> int:
+        """Переносит накопленные просмотры в БД; возвращает число обновлённых статей."""
+        redis = cache.client()
+        if redis is None:
+            return 0
+
+        raw = await cache.run_script(_TAKE_PENDING_SCRIPT, (PENDING_VIEWS_KEY,))
+        if not raw:
+            return 0
+        deltas = {int(decode_redis_value(raw[index])): int(raw[index + 1]) for index in range(0, len(raw), 2)}
+        deltas = {article_id: delta for article_id, delta in deltas.items() if delta > 0}
+        if not deltas:
+            return 0
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await apply_views_deltas(db, deltas)
+        except Exception:
+            await self._restore(redis, deltas)
+            raise
+
+        logger.debug('Просмотры новостей записаны в БД', articles=len(deltas), views=sum(deltas.values()))
+        return len(deltas)
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        await self.stop()
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info('👁 Сброс просмотров новостей запущен')
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(settings.get_cabinet_news_views_flush_seconds())
+                try:
+                    await self.flush()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.error('Ошибка записи просмотров новостей', exc=exc)
+        except asyncio.CancelledError:
+            logger.info('Сброс просмотров новостей остановлен')
+            raise
+
+
+news_view_counter_service = NewsViewCounterService()
@@ -0,0 +1,240 @@
+"""Инкрементальный лидерборд реферальных конкурсов в Redis.
+
+Вместо GROUP BY по всем событиям конкурса при каждом показе лидерборда очки
+участников хранятся в Redis: хэш ``referral_contest:{id}:scores`` с числом
+рефералов и суммой по каждому рефереру и sorted set
+``referral_contest:{id}:leaderboard`` для top-N за O(log n + N).
+
+Очки увеличиваются в момент записи события конкурса. Хэш собирается из БД при
+первом обращении и периодически пересобирается сверкой
+(``REFERRAL_CONTEST_LEADERBOARD_RECONCILE_MINUTES``) — это исправляет
+расхождения после операций вне инкрементов (каскадное удаление пользователей,
+гонка записи события с пересборкой).
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.crud.referral_contest import get_contest_period, get_contest_scores, get_contests_for_summaries
+from app.database.models import ReferralContest
+from app.utils.cache import cache, decode_redis_value
+
+
+logger = structlog.get_logger(__name__)
+
+# Очки в sorted set: число рефералов, при равенстве — сумма платежей.
+# Точность double сохраняется до ~9000 рефералов у одного участника.
+SCORE_SCALE = 10**12
+
+_READY_FIELD = '__ready'
+_START_FIELD = '__start'
+_END_FIELD = '__end'
+
+# Применяем событие только к уже собранному лидерборду и только если оно
+# попадает в период конкурса, сохранённый при пересборке.
+_APPLY_EVENT_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], '__ready') == 0 then
+    return nil
+end
+local occurred_at = tonumber(ARGV[4])
+local period = redis.call('HMGET', KEYS[1], '__start', '__end')
+if occurred_at < tonumber(period[1]) or occurred_at > tonumber(period[2]) then
+    return nil
+end
+local count = redis.call('HINCRBY', KEYS[1], ARGV[1] .. ':count', ARGV[2])
+local amount = redis.call('HINCRBY', KEYS[1], ARGV[1] .. ':amount', ARGV[3])
+if count <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1] .. ':count', ARGV[1] .. ':amount')
+    redis.call('ZREM', KEYS[2], ARGV[1])
+else
+    redis.call('ZADD', KEYS[2], count * tonumber(ARGV[5]) + math.min(amount, tonumber(ARGV[5]) - 1), ARGV[1])
+end
+return count
+"""
+
+
+class ContestScore(NamedTuple):
+    referrer_id: int
+    referral_count: int
+    total_amount_kopeks: int
+
+
+def contest_scores_key(contest_id: int) -> str:
+    return f'referral_contest:{contest_id}:scores'
+
+
+def contest_leaderboard_key(contest_id: int) -> str:
+    return f'referral_contest:{contest_id}:leaderboard'
+
+
+def _sort_key(score: ContestScore) -> tuple[int, int, int]:
+    return -score.referral_count, -score.total_amount_kopeks, score.referrer_id
+
+
+def _zset_score(referral_count: int, total_amount_kopeks: int) -> int:
+    return referral_count * SCORE_SCALE + min(total_amount_kopeks, SCORE_SCALE - 1)
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+class ReferralContestLeaderboardService:
+    @staticmethod
+    def _ttl_seconds() -> int:
+        # Лидерборд, который сверка перестала обновлять (конкурс завершён), истекает сам
+        return settings.get_referral_contest_leaderboard_reconcile_minutes() * 60 * 2
+
+    async def rebuild(self, db: AsyncSession, contest: ReferralContest) -> list[ContestScore] | None:
+        """Пересобирает лидерборд конкурса из событий в БД."""
+        redis = cache.client()
+        if redis is None:
+            return None
+
+        start, end = get_contest_period(contest)
+        scores = sorted(
+            (ContestScore(*row) for row in await get_contest_scores(db, contest.id, start=start, end=end)),
+            key=_sort_key,
+        )
+
+        mapping: dict[str, int | float] = {
+            _READY_FIELD: 1,
+            _START_FIELD: _timestamp(start),
+            _END_FIELD: _timestamp(end),
+        }
+        for score in scores:
+            mapping[f'{score.referrer_id}:count'] = score.referral_count
+            mapping[f'{score.referrer_id}:amount'] = score.total_amount_kopeks
+
+        scores_key = contest_scores_key(contest.id)
+        leaderboard_key = contest_leaderboard_key(contest.id)
+        ttl = self._ttl_seconds()
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(scores_key, leaderboard_key)
+                pipe.hset(scores_key, mapping=mapping)
+                if scores:
+                    pipe.zadd(
+                        leaderboard_key,
+                        {
+                            str(score.referrer_id): _zset_score(score.referral_count, score.total_amount_kopeks)
+                            for score in scores
+                        },
+                    )
+                    pipe.expire(leaderboard_key, ttl)
+                pipe.expire(scores_key, ttl)
+                await pipe.execute()
+        except Exception as error:
+            logger.warning('Не удалось сохранить лидерборд конкурса в Redis', contest_id=contest.id, error=error)
+        return scores
+
+    async def _read_scores(self, redis, contest_id: int, referrer_ids: list[bytes | str]) -> list[ContestScore]:
+        if not referrer_ids:
+            return []
+        referrer_ids = [decode_redis_value(referrer_id) for referrer_id in referrer_ids]
+        fields = [f'{referrer_id}:{suffix}' for referrer_id in referrer_ids for suffix in ('count', 'amount')]
+        values = await redis.hmget(contest_scores_key(contest_id), fields)
+        scores = []
+        for index, referrer_id in enumerate(referrer_ids):
+            count, amount = values[index * 2], values[index * 2 + 1]
+            if count is None:
+                continue
+            scores.append(ContestScore(int(referrer_id), int(count), int(amount or 0)))
+        return scores
+
+    async def get_top(
+        self,
+        db: AsyncSession,
+        contest: ReferralContest,
+        *,
+        limit: int | None = None,
+    ) -> list[ContestScore] | None:
+        """Top-N участников; ``None``, если Redis недоступен и нужно считать по БД."""
+        redis = cache.client()
+        if redis is None:
+            return None
+
+        leaderboard_key = contest_leaderboard_key(contest.id)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hexists(contest_scores_key(contest.id), _READY_FIELD)
+                pipe.zrevrange(leaderboard_key, 0, (limit or 0) - 1, withscores=True)
+                ready, ranked = await pipe.execute()
+            if ready:
+                referrer_ids = [member for member, _score in ranked]
+                if limit and len(ranked) == limit:
+                    # При равных очках Redis упорядочивает участников по строке, а БД — по id:
+                    # добираем всех с очками последнего места и отрезаем top-N после сортировки
+                    cutoff = ranked[-1][1]
+                    tied = await redis.zrevrangebyscore(leaderboard_key, cutoff, cutoff)
+                    referrer_ids = [member for member, score in ranked if score > cutoff] + list(tied)
+                scores = sorted(await self._read_scores(redis, contest.id, referrer_ids), key=_sort_key)
+                return scores[:limit] if limit else scores
+        except Exception as error:
+            logger.warning('Не удалось прочитать лидерборд конкурса из Redis', contest_id=contest.id, error=error)
+            return None
+
+        scores = await self.rebuild(db, contest)
+        if scores is not None and limit:
+            scores = scores[:limit]
+        return scores
+
+    async def record_event(
+        self,
+        contest_id: int,
+        referrer_id: int,
+        *,
+        occurred_at: datetime,
+        count_delta: int = 0,
+        amount_delta: int = 0,
+    ) -> None:
+        """Применяет записанное событие конкурса к уже собранному лидерборду."""
+        if cache.client() is None or (not count_delta and not amount_delta):
+            return
+        keys = (contest_scores_key(contest_id), contest_leaderboard_key(contest_id))
+        args = (referrer_id, count_delta, amount_delta, _timestamp(occurred_at), SCORE_SCALE)
+        try:
+            await cache.run_script(_APPLY_EVENT_SCRIPT, keys, args)
+        except Exception as error:
+            # Redis не откатывает скрипт, упавший на середине, а при обрыве соединения неизвестно,
+            # выполнился ли он. Счётчики в хэше и очки в sorted set могли разойтись, а top-N
+            # отбирается по zset и не сверяется с хэшем — удаляем оба ключа, чтобы get_top
+            # пересобрал лидерборд из БД.
+            logger.warning('Не удалось обновить лидерборд конкурса', contest_id=contest_id, error=error)
+            await self.invalidate(contest_id)
+
+    async def invalidate(self, *contest_ids: int) -> None:
+        redis = cache.client()
+        if redis is None or not contest_ids:
+            return
+        keys = [
+            key
+            for contest_id in contest_ids
+            for key in (contest_scores_key(contest_id), contest_leaderboard_key(contest_id))
+        ]
+        try:
+            await redis.delete(*keys)
+        except Exception as error:
+            logger.warning('Не удалось сбросить лидерборд конкурса', contest_ids=contest_ids, error=error)
+
+    async def reconcile(self, db: AsyncSession) -> int:
+        """Пересобирает лидерборды активных конкурсов из событий; возвращает число конкурсов."""
+        if cache.client() is None:
+            return 0
+        contests = await get_contests_for_summaries(db)
+        for contest in contests:
+            await self.rebuild(db, contest)
+        if contests:
+            logger.info('Лидерборды конкурсов сверены с БД', contests=len(contests))
+        return len(contests)
+
+
+referral_contest_leaderboard_service = ReferralContestLeaderboardService()
@@ -23,6 +23,8 @@ from app.database.crud.referral_contest import (
 from app.database.crud.user import get_user_by_id
 from app.database.database import AsyncSessionLocal
 from app.database.models import ReferralContest, User
+from app.services.referral_contest_leaderboard_service import referral_contest_leaderboard_service
+from app.services.telegram_send_scheduler import telegram_send_scheduler
 
 
 logger = structlog.get_logger(__name__)
@@ -33,6 +35,7 @@ class ReferralContestService:
         self.bot: Bot | None = None
         self._task: asyncio.Task | None = None
         self._poll_interval_seconds = 60
+        self._last_reconcile_at: float | None = None
 
     def set_bot(self, bot: Bot) -> None:
         self.bot = bot
@@ -73,6 +76,13 @@ class ReferralContestService:
                 except Exception as exc:
                     logger.error('Ошибка сервиса конкурсов', exc=exc)
 
+                try:
+                    await self._maybe_reconcile_leaderboards()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.error('Ошибка сверки лидербордов конкурсов', exc=exc)
+
                 await asyncio.sleep(self._poll_interval_seconds)
         except asyncio.CancelledError:
             logger.info('Сервис конкурсов остановлен')
@@ -95,6 +105,16 @@ class ReferralContestService:
                 except Exception as exc:
                     logger.error('Ошибка обработки конкурса', contest_id=contest.id, title=contest.title, exc=exc)
 
+    async def _maybe_reconcile_leaderboards(self) -> None:
+        loop_time = asyncio.get_running_loop().time()
+        interval = settings.get_referral_contest_leaderboard_reconcile_minutes() * 60
+        if self._last_reconcile_at is not None and loop_time - self._last_reconcile_at < interval:
+            return
+        self._last_reconcile_at = loop_time
+
+        async with AsyncSessionLocal() as db:
+            await referral_contest_leaderboard_service.reconcile(db)
+
     async def _maybe_send_daily_summary(
         self,
         db: AsyncSession,
@@ -254,7 +274,10 @@ class ReferralContestService:
                 continue
 
             try:
-                await self.bot.send_message(user.telegram_id, text, disable_web_page_preview=True)
+                await telegram_send_scheduler.submit(
+                    user.telegram_id,
+                    lambda: self.bot.send_message(user.telegram_id, text, disable_web_page_preview=True),
+                )
             except (TelegramForbiddenError, TelegramNotFound):
                 logger.info(
                     'Не удалось отправить сообщение участнику (вероятно, блокировка)', telegram_id=user.telegram_id
@@ -301,11 +324,14 @@ class ReferralContestService:
             lines.append(f'Приз: {contest.prize_text}')
 
         try:
-            await self.bot.send_message(
-                chat_id=chat_id,
-                text='\n'.join(lines),
-                disable_web_page_preview=True,
-                message_thread_id=settings.ADMIN_NOTIFICATIONS_TOPIC_ID,
+            await telegram_send_scheduler.submit(
+                chat_id,
+                lambda: self.bot.send_message(
+                    chat_id=chat_id,
+                    text='\n'.join(lines),
+                    disable_web_page_preview=True,
+                    message_thread_id=settings.ADMIN_NOTIFICATIONS_TOPIC_ID,
+                ),
             )
         except Exception as exc:
             logger.error('Не удалось отправить админскую сводку конкурса', exc=exc)
@@ -349,10 +375,13 @@ class ReferralContestService:
             lines.append(f'Приз: {contest.prize_text}')
 
         try:
-            await self.bot.send_message(
-                chat_id=channel_id,
-                text='\n'.join(lines),
-                disable_web_page_preview=True,
+            await telegram_send_scheduler.submit(
+                channel_id,
+                lambda: self.bot.send_message(
+                    chat_id=channel_id,
+                    text='\n'.join(lines),
+                    disable_web_page_preview=True,
+                ),
             )
         except (TelegramForbiddenError, TelegramNotFound):
             logger.info('Не удалось отправить сводку конкурса в канал', channel_id=channel_id)
@@ -7,7 +7,10 @@
 - Выявление потерянных рефералов
 """
 
-import re
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
@@ -21,10 +24,37 @@ from app.config import settings
 from app.database.crud.referral import create_referral_earning, get_user_campaign_id
 from app.database.crud.user import add_user_balance
 from app.database.models import ReferralEarning, User
+from app.services.referral_log_parser import (
+    ParsedClick,
+    ParsedRange,
+    complete_lines_end,
+    file_identity,
+    parse_log_range,
+    split_at_line_boundaries,
+)
+from app.utils.cache import cache
 
 
 logger = structlog.get_logger(__name__)
 
+# Новый участок лога больше порога разбирается кусками в пуле процессов
+PARALLEL_PARSE_MIN_BYTES = 32 * 1024 * 1024
+PARSE_CHUNK_BYTES = 8 * 1024 * 1024
+PARSE_MAX_WORKERS = 4
+PARSE_STATE_CACHE_TTL = timedelta(days=7)
+# Состояние хранит только то, что нужно самому длинному периоду диагностики (30 дней)
+PARSE_STATE_RETENTION = timedelta(days=31)
+PARSE_STATE_MAX_CLICKS = 50_000
+
+_LOG_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _parse_log_timestamp(value: str) -> datetime | None:
+    try:
+        return datetime.strptime(value, _LOG_TIMESTAMP_FORMAT).replace(tzinfo=UTC)
+    except ValueError:
+        return None
+
 
 @dataclass
 class ReferralClick:
@@ -34,7 +64,6 @@ class ReferralClick:
     telegram_id: int
     raw_code: str  # Код как в логе (может быть ref_refXXX)
     clean_code: str  # Очищенный код (refXXX)
-    log_line: str
 
 
 @dataclass
@@ -286,6 +315,58 @@ class MissingBonusReport:
         )
 
 
+@dataclass
+class LogParseState:
+    """Разобранная часть лог-файла: смещение и накопленные по ней результаты.
+
+    Хранятся только агрегаты (клики без исходных строк и число строк по часам)
+    за ``PARSE_STATE_RETENTION`` до последней записи лога, см. ``prune``.
+    """
+
+    log_path: str
+    device: int
+    inode: int
+    offset: int = 0
+    parsed: ParsedRange = field(default_factory=ParsedRange)
+
+    def to_dict(self) -> dict:
+        """Сериализация в dict для хранения в Redis."""
+        return {
+            'log_path': self.log_path,
+            'device': self.device,
+            'inode': self.inode,
+            'offset': self.offset,
+            'total_lines': self.parsed.total_lines,
+            'hourly_lines': self.parsed.hourly_lines,
+            'clicks': [list(click) for click in self.parsed.clicks],
+        }
+
+    def prune(self) -> None:
+        """Отбрасывает данные старше окна хранения, отсчитанного от последнего часа в логе."""
+        if not self.parsed.hourly_lines:
+            return
+        newest = _parse_log_timestamp(f'{max(self.parsed.hourly_lines)}:00:00')
+        if newest is None:
+            return
+        since = (newest - PARSE_STATE_RETENTION).strftime(_LOG_TIMESTAMP_FORMAT)
+        self.parsed.prune(since, PARSE_STATE_MAX_CLICKS)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LogParseState':
+        """Десериализация из dict."""
+        return cls(
+            log_path=data['log_path'],
+            device=int(data['device']),
+            inode=int(data['inode']),
+            offset=int(data['offset']),
+            parsed=ParsedRange(
+                total_lines=int(data.get('total_lines', 0)),
+                hourly_lines={hour: int(count) for hour, count in data.get('hourly_lines', {}).items()},
+                clicks=[ParsedClick(*click) for click in data.get('clicks', [])],
+            ),
+        )
+
+
 class ReferralDiagnosticsService:
     """Сервис диагностики реферальной системы."""
 
@@ -302,6 +383,9 @@ class ReferralDiagnosticsService:
             self.log_path = Path(log_path)
         else:
             self.log_path = self._find_log_file()
+        self._parse_state: LogParseState | None = None
+        self._parse_lock = asyncio.Lock()
+        self._parse_pool: ProcessPoolExecutor | None = None
 
     def _find_log_file(self) -> Path:
         """Ищет существующий лог-файл, предпочитая свежие."""
@@ -421,101 +505,150 @@ class ReferralDiagnosticsService:
             # Восстанавливаем оригинальный путь
             self.log_path = original_log_path
 
-    async def _parse_clicks(
-        self, start_date: datetime, end_date: datetime, skip_date_filter: bool = False
-    ) -> tuple[list[ReferralClick], int, int]:
-        """Парсит логи и находит все переходы по реф-ссылкам."""
+    @staticmethod
+    def _parse_state_cache_key(log_path: Path) -> str:
+        return f'referral_diagnostics:log_state:{log_path.resolve()}'
 
-        clicks = []
-        total_lines = 0
-        lines_in_period = 0
+    async def _parse_range(self, log_path: Path, start: int, end: int) -> ParsedRange:
+        """Разбирает диапазон лога; большие диапазоны — кусками в пуле процессов."""
+        if end - start < PARALLEL_PARSE_MIN_BYTES:
+            return await asyncio.to_thread(parse_log_range, str(log_path), start, end)
 
-        if not self.log_path.exists():
-            logger.warning('❌ Лог-файл не найден', log_path=self.log_path)
-            return clicks, 0, 0
+        ranges = await asyncio.to_thread(split_at_line_boundaries, str(log_path), start, end, PARSE_CHUNK_BYTES)
+        pool = self._get_parse_pool()
+        logger.info(
+            '🧵 Разбираю лог в пуле процессов',
+            chunks=len(ranges),
+            workers=min(len(ranges), os.cpu_count() or 1, PARSE_MAX_WORKERS),
+        )
+
+        loop = asyncio.get_running_loop()
+        parts = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, parse_log_range, str(log_path), chunk_start, chunk_end)
+                for chunk_start, chunk_end in ranges
+            )
+        )
+
+        result = ParsedRange()
+        for part in parts:
+            result.merge(part)
+        return result
 
-        file_size = self.log_path.stat().st_size
-        logger.info('📂 Читаю лог-файл: ( MB)', log_path=self.log_path, file_size=round(file_size / 1024 / 1024, 2))
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Пул создаётся при первом большом разборе и живёт до ``close``.
 
-        # Паттерн timestamp
-        timestamp_pattern = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - .+ - .+ - (.+)$')
+        Процессы spawn-пула импортируют главный модуль приложения, поэтому
+        запускать их заново на каждый разбор дорого.
+        """
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, PARSE_MAX_WORKERS),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._parse_pool
 
-        # Паттерны для поиска реф-кликов
-        # /start refXXX или /start ref_refXXX
-        start_pattern = re.compile(r'📩 Сообщение от ID:(\d+).*?/start\s+(ref[\w_]+)')
-        # Сохранение payload
-        payload_pattern = re.compile(r"💾 Сохранен start payload '(ref[\w_]+)' для пользователя\s*(\d+)")
+    def close(self) -> None:
+        """Останавливает пул процессов разбора логов."""
+        pool, self._parse_pool = self._parse_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        # Для быстрой фильтрации по дате (только если не пропускаем фильтр)
-        use_date_prefix = not skip_date_filter and (end_date - start_date).days <= 31
-        date_prefix = start_date.strftime('%Y-%m-%d') if use_date_prefix else None
+    async def _load_parse_state(self, log_path: Path) -> LogParseState | None:
+        if self._parse_state is not None and self._parse_state.log_path == str(log_path):
+            return self._parse_state
 
+        data = await cache.get(self._parse_state_cache_key(log_path))
+        if not data:
+            return None
         try:
-            with open(self.log_path, encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    total_lines += 1
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # Убираем Docker-префикс
-                    if ' | ' in line[:50]:
-                        line = line.split(' | ', 1)[-1]
-
-                    # Быстрая проверка по дате (только для коротких периодов)
-                    if date_prefix and date_prefix not in line[:10]:
-                        continue
-
-                    # Парсим timestamp
-                    match = timestamp_pattern.match(line)
-                    if not match:
-                        continue
-
-                    timestamp_str, message = match.groups()
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=UTC)
-                    except ValueError:
-                        continue
-
-                    if not (start_date <= timestamp < end_date):
-                        continue
-
-                    lines_in_period += 1
-
-                    # Ищем реф-клики
-                    for pattern in [start_pattern, payload_pattern]:
-                        event_match = pattern.search(message)
-                        if event_match:
-                            if pattern == start_pattern:
-                                telegram_id = int(event_match.group(1))
-                                raw_code = event_match.group(2)
-                            else:
-                                raw_code = event_match.group(1)
-                                telegram_id = int(event_match.group(2))
-
-                            clean_code = self.clean_referral_code(raw_code)
-
-                            clicks.append(
-                                ReferralClick(
-                                    timestamp=timestamp,
-                                    telegram_id=telegram_id,
-                                    raw_code=raw_code,
-                                    clean_code=clean_code,
-                                    log_line=line,
-                                )
-                            )
-                            break
+            return LogParseState.from_dict(data)
+        except (KeyError, TypeError, ValueError) as error:
+            logger.warning('Сохранённое состояние разбора лога повреждено', log_path=log_path, error=error)
+            return None
+
+    async def _refresh_parse_state(self) -> LogParseState:
+        """Дочитывает лог с сохранённого смещения и возвращает накопленные результаты."""
+        log_path = self.log_path
+        async with self._parse_lock:
+            device, inode, size = file_identity(str(log_path))
+            state = await self._load_parse_state(log_path)
+
+            # Файл заменён при ротации или усечён — разбираем заново
+            if state is None or (state.device, state.inode) != (device, inode) or size < state.offset:
+                state = LogParseState(log_path=str(log_path), device=device, inode=inode)
+
+            end = await asyncio.to_thread(complete_lines_end, str(log_path), size)
+            if end > state.offset:
+                logger.info(
+                    '📂 Дочитываю лог-файл',
+                    log_path=log_path,
+                    offset=state.offset,
+                    new_mb=round((end - state.offset) / 1024 / 1024, 2),
+                )
+                state.parsed.merge(await self._parse_range(log_path, state.offset, end))
+                state.offset = end
+                state.prune()
+                await cache.set(self._parse_state_cache_key(log_path), state.to_dict(), expire=PARSE_STATE_CACHE_TTL)
+
+            self._parse_state = state
+            return state
+
+    async def _parse_clicks(
+        self, start_date: datetime, end_date: datetime, skip_date_filter: bool = False
+    ) -> tuple[list[ReferralClick], int, int]:
+        """Находит переходы по реф-ссылкам за период.
 
+        Основной лог разбирается инкрементально: с прошлого запуска читается
+        только дописанный хвост. Загруженный файл (``skip_date_filter``)
+        разбирается целиком без сохранения состояния.
+        """
+
+        if not self.log_path.exists():
+            logger.warning('❌ Лог-файл не найден', log_path=self.log_path)
+            return [], 0, 0
+
+        try:
+            if skip_date_filter:
+                parsed = await self._parse_range(self.log_path, 0, self.log_path.stat().st_size)
+            else:
+                parsed = (await self._refresh_parse_state()).parsed
         except Exception as e:
             logger.error('Ошибка парсинга логов', error=e, exc_info=True)
+            return [], 0, 0
+
+        clicks = []
+        for parsed_click in parsed.clicks:
+            timestamp = _parse_log_timestamp(parsed_click.timestamp)
+            if timestamp is None:
+                continue
+            if not skip_date_filter and not (start_date <= timestamp < end_date):
+                continue
+            clicks.append(
+                ReferralClick(
+                    timestamp=timestamp,
+                    telegram_id=parsed_click.telegram_id,
+                    raw_code=parsed_click.raw_code,
+                    clean_code=self.clean_referral_code(parsed_click.raw_code),
+                )
+            )
+
+        # Строки считаются с точностью до часа: учитываются часы, пересекающиеся с периодом
+        lines_in_period = 0
+        for hour, count in parsed.hourly_lines.items():
+            hour_start = _parse_log_timestamp(f'{hour}:00:00')
+            if hour_start is None:
+                continue
+            if skip_date_filter or (hour_start < end_date and hour_start + timedelta(hours=1) > start_date):
+                lines_in_period += count
 
         logger.info(
             '📊 Парсинг: строк=, за период=, реф-кликов',
-            total_lines=total_lines,
+            total_lines=parsed.total_lines,
             lines_in_period=lines_in_period,
             clicks_count=len(clicks),
         )
-        return clicks, total_lines, lines_in_period
+        return clicks, parsed.total_lines, lines_in_period
 
     async def _find_lost_referrals(self, db: AsyncSession, clicks: list[ReferralClick]) -> list[LostReferral]:
         """Находит потерянных рефералов — пришли по ссылке, но реферер не засчитался."""
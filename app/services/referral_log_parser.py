@@ -0,0 +1,140 @@
+"""Разбор лог-файла бота для диагностики рефералов.
+
+Модуль намеренно не импортирует остальное приложение: большие участки лога
+разбираются в пуле процессов (spawn), и функции разбора передаются в них по
+имени модуля. Сам дочерний процесс при spawn всё равно заново импортирует
+главный модуль (``main.py`` как ``__mp_main__``), поэтому пул создаётся один
+раз и переиспользуется.
+
+Разбирается диапазон байт ``[start, end)``, границы которого совпадают с
+началами строк, поэтому файл можно делить на независимые куски и
+обрабатывать их параллельно, а при повторной диагностике — разбирать только
+дописанный хвост.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+
+
+# Формат строки лога: «2026-01-31 12:00:00,123 - logger - LEVEL - сообщение»
+TIMESTAMP_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - .+ - .+ - (.+)$')
+# /start refXXX или /start ref_refXXX
+START_PATTERN = re.compile(r'📩 Сообщение от ID:(\d+).*?/start\s+(ref[\w_]+)')
+# Сохранение payload
+PAYLOAD_PATTERN = re.compile(r"💾 Сохранен start payload '(ref[\w_]+)' для пользователя\s*(\d+)")
+
+_BOUNDARY_SEARCH_BYTES = 64 * 1024
+
+
+class ParsedClick(NamedTuple):
+    timestamp: str  # '%Y-%m-%d %H:%M:%S', время лога
+    telegram_id: int
+    raw_code: str
+
+
+@dataclass(slots=True)
+class ParsedRange:
+    """Результат разбора диапазона: строки по часам и найденные реф-клики."""
+
+    total_lines: int = 0
+    # 'YYYY-MM-DD HH' → число строк с меткой времени за этот час
+    hourly_lines: dict[str, int] = field(default_factory=dict)
+    clicks: list[ParsedClick] = field(default_factory=list)
+
+    def merge(self, other: ParsedRange) -> None:
+        """Дописывает результат следующего по порядку диапазона."""
+        self.total_lines += other.total_lines
+        for hour, count in other.hourly_lines.items():
+            self.hourly_lines[hour] = self.hourly_lines.get(hour, 0) + count
+        self.clicks.extend(other.clicks)
+
+    def prune(self, since: str, max_clicks: int) -> None:
+        """Отбрасывает часы и клики раньше ``since`` и оставляет не больше ``max_clicks`` последних кликов."""
+        since_hour = since[:13]
+        self.hourly_lines = {hour: count for hour, count in self.hourly_lines.items() if hour >= since_hour}
+        clicks = [click for click in self.clicks if click.timestamp >= since]
+        self.clicks = clicks[-max_clicks:] if max_clicks > 0 else []
+
+
+def complete_lines_end(path: str, size: int) -> int:
+    """Смещение сразу после последней завершённой строки — недописанную строку не трогаем."""
+    with open(path, 'rb') as handle:
+        position = size
+        while position > 0:
+            read_size = min(_BOUNDARY_SEARCH_BYTES, position)
+            position -= read_size
+            handle.seek(position)
+            newline = handle.read(read_size).rfind(b'\n')
+            if newline >= 0:
+                return position + newline + 1
+    return 0
+
+
+def split_at_line_boundaries(path: str, start: int, end: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Делит ``[start, end)`` на куски примерно по ``chunk_bytes``, сдвигая границы к началам строк."""
+    ranges = []
+    with open(path, 'rb') as handle:
+        chunk_start = start
+        while chunk_start < end:
+            boundary = chunk_start + chunk_bytes
+            if boundary >= end:
+                ranges.append((chunk_start, end))
+                break
+            handle.seek(boundary)
+            handle.readline()
+            boundary = min(handle.tell(), end)
+            ranges.append((chunk_start, boundary))
+            chunk_start = boundary
+    return ranges
+
+
+def parse_line(line: str, result: ParsedRange) -> None:
+    line = line.strip()
+    if not line:
+        return
+
+    # Убираем Docker-префикс
+    if ' | ' in line[:50]:
+        line = line.split(' | ', 1)[-1]
+
+    match = TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return
+
+    timestamp, message = match.groups()
+    hour = timestamp[:13]
+    result.hourly_lines[hour] = result.hourly_lines.get(hour, 0) + 1
+
+    event_match = START_PATTERN.search(message)
+    if event_match:
+        result.clicks.append(ParsedClick(timestamp, int(event_match.group(1)), event_match.group(2)))
+        return
+
+    event_match = PAYLOAD_PATTERN.search(message)
+    if event_match:
+        result.clicks.append(ParsedClick(timestamp, int(event_match.group(2)), event_match.group(1)))
+
+
+def parse_log_range(path: str, start: int, end: int) -> ParsedRange:
+    """Разбирает строки лога в диапазоне байт ``[start, end)``."""
+    result = ParsedRange()
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start
+        for raw_line in handle:
+            if remaining <= 0:
+                break
+            remaining -= len(raw_line)
+            result.total_lines += 1
+            parse_line(raw_line.decode('utf-8', errors='ignore'), result)
+    return result
+
+
+def file_identity(path: str) -> tuple[int, int, int]:
+    """(устройство, inode, размер) — по смене первых двух определяется ротация."""
+    stats = Path(path).stat()
+    return stats.st_dev, stats.st_ino, stats.st_size
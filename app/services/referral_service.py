@@ -11,6 +11,7 @@ from app.database.models import ReferralEarning, TransactionType, User
 from app.services.notification_delivery_service import (
     notification_delivery_service,
 )
+from app.services.referral_stats_cache_service import referral_stats_cache_service
 from app.utils.user_utils import get_effective_referral_commission_percent
 
 
@@ -129,6 +130,7 @@ async def process_referral_registration(db: AsyncSession, new_user_id: int, refe
             reason='referral_registration_pending',
             campaign_id=campaign_id,
         )
+        await referral_stats_cache_service.record_registration(referrer_id)
 
         try:
             from app.services.referral_contest_service import referral_contest_service
@@ -0,0 +1,106 @@
+"""Счётчики реферальной статистики для рендера главного меню.
+
+Меню показывает число приглашённых и общий заработок по рефералам. Вместо
+агрегатных запросов при каждом открытии меню значения хранятся в Redis-хэше
+пользователя и увеличиваются в момент регистрации реферала и начисления
+реферального дохода. Хэш заполняется из БД при первом обращении и живёт
+``REFERRAL_STATS_CACHE_TTL_SECONDS`` — это ограничивает расхождение после
+редких операций вне счётчиков (удаление пользователей, ручные правки).
+"""
+
+from __future__ import annotations
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.crud.referral import get_referral_earnings_sum
+from app.database.models import User
+from app.utils.cache import cache, decode_redis_value
+
+
+logger = structlog.get_logger(__name__)
+
+INVITED_COUNT_FIELD = 'invited_count'
+TOTAL_EARNED_FIELD = 'total_earned_kopeks'
+
+# Увеличиваем счётчик только в уже заполненном хэше: иначе частичный хэш
+# (один инкремент без базовых значений) выдавался бы за полную статистику.
+_INCREMENT_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+
+
+def referral_stats_key(user_id: int) -> str:
+    return f'referral:stats:{user_id}'
+
+
+class ReferralStatsCacheService:
+    @staticmethod
+    async def _load_from_db(db: AsyncSession, user_id: int) -> dict[str, int]:
+        invited_count_result = await db.execute(select(func.count(User.id)).where(User.referred_by_id == user_id))
+        return {
+            INVITED_COUNT_FIELD: invited_count_result.scalar() or 0,
+            TOTAL_EARNED_FIELD: await get_referral_earnings_sum(db, user_id),
+        }
+
+    async def get_menu_stats(self, db: AsyncSession, user_id: int) -> dict[str, int]:
+        """Возвращает invited_count и total_earned_kopeks без агрегатов при попадании в кеш."""
+        redis = cache.client()
+        if redis is not None:
+            try:
+                cached = await redis.hgetall(referral_stats_key(user_id))
+                if cached:
+                    values = {decode_redis_value(field): int(value) for field, value in cached.items()}
+                    return {
+                        INVITED_COUNT_FIELD: values.get(INVITED_COUNT_FIELD, 0),
+                        TOTAL_EARNED_FIELD: values.get(TOTAL_EARNED_FIELD, 0),
+                    }
+            except Exception as error:
+                logger.warning('Не удалось прочитать реферальную статистику из Redis', user_id=user_id, error=error)
+                redis = None
+
+        stats = await self._load_from_db(db, user_id)
+
+        if redis is not None:
+            try:
+                key = referral_stats_key(user_id)
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, mapping=stats)
+                    pipe.expire(key, settings.get_referral_stats_cache_ttl_seconds())
+                    await pipe.execute()
+            except Exception as error:
+                logger.warning('Не удалось сохранить реферальную статистику в Redis', user_id=user_id, error=error)
+        return stats
+
+    async def _increment(self, user_id: int, field: str, amount: int) -> None:
+        if cache.client() is None or not amount:
+            return
+        try:
+            await cache.run_script(_INCREMENT_IF_EXISTS_SCRIPT, (referral_stats_key(user_id),), (field, amount))
+        except Exception as error:
+            # Счётчик мог разойтись с БД — сбрасываем, при следующем чтении он соберётся заново
+            logger.warning('Не удалось обновить реферальную статистику', user_id=user_id, field=field, error=error)
+            await self.invalidate(user_id)
+
+    async def record_registration(self, referrer_id: int) -> None:
+        await self._increment(referrer_id, INVITED_COUNT_FIELD, 1)
+
+    async def record_earning(self, referrer_id: int, amount_kopeks: int) -> None:
+        await self._increment(referrer_id, TOTAL_EARNED_FIELD, amount_kopeks)
+
+    async def invalidate(self, *user_ids: int) -> None:
+        redis = cache.client()
+        if redis is None or not user_ids:
+            return
+        try:
+            await redis.delete(*(referral_stats_key(user_id) for user_id in user_ids))
+        except Exception as error:
+            logger.warning('Не удалось сбросить реферальную статистику', user_ids=user_ids, error=error)
+
+
+referral_stats_cache_service = ReferralStatsCacheService()
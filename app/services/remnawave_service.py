@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import json
 import re
 from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import asdict, is_dataclass
@@ -63,6 +65,16 @@ def _get_lifetime_traffic_bytes(panel_user: dict[str, Any]) -> int:
     return panel_user.get('lifetimeUsedTrafficBytes', 0)
 
 
+def panel_sync_fingerprint(payload: dict[str, Any]) -> str:
+    """Отпечаток полей, отправляемых в панель: при совпадении повторная отправка не нужна."""
+    normalized = {
+        key: sorted(value) if key == 'active_internal_squads' and isinstance(value, list) else value
+        for key, value in payload.items()
+    }
+    encoded = json.dumps(normalized, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
 _UUID_MAP_MISSING = object()
 _ATTR_NOT_CAPTURED = object()
 
@@ -147,6 +159,8 @@ class RemnaWaveConfigurationError(Exception):
 
 
 class RemnaWaveService:
+    PANEL_SYNC_BATCH_SIZE = 500
+
     def __init__(self):
         auth_params = settings.get_remnawave_auth_params()
         base_url = (auth_params.get('base_url') or '').strip()
@@ -1903,14 +1917,21 @@ class RemnaWaveService:
             # Ошибку прокидываем выше для корректной обработки в основном цикле
             raise
 
-    async def sync_users_to_panel(self, db: AsyncSession) -> dict[str, int]:
+    async def sync_users_to_panel(self, db: AsyncSession, *, force: bool = False) -> dict[str, int]:
+        """Отправляет в панель подписки, данные которых изменились с последней успешной отправки.
+
+        Изменение определяется по отпечатку отправляемых полей (``Subscription.panel_sync_hash``),
+        поэтому учитываются любые правки: через CRUD, массовые UPDATE, смену настроек
+        и истечение срока. ``force=True`` отправляет все подписки.
+        """
         from app.database.crud.subscription import get_subscriptions_batch
 
         try:
-            stats = {'created': 0, 'updated': 0, 'errors': 0}
+            stats = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
 
-            batch_size = 500
-            offset = 0
+            batch_size = self.PANEL_SYNC_BATCH_SIZE
+            last_id = 0
+            processed = 0
             concurrent_limit = 5
 
             async with self.get_api_client() as api:
@@ -1918,18 +1939,20 @@ class RemnaWaveService:
 
                 while True:
                     # Получаем подписки напрямую (не через users)
-                    subscriptions = await get_subscriptions_batch(db, offset=offset, limit=batch_size)
+                    subscriptions = await get_subscriptions_batch(db, after_id=last_id, limit=batch_size)
 
                     if not subscriptions:
                         break
 
+                    last_id = subscriptions[-1].id
+                    processed += len(subscriptions)
+
                     # Фильтруем подписки у которых есть пользователь
                     valid_subscriptions = [s for s in subscriptions if s.user]
 
                     if not valid_subscriptions:
                         if len(subscriptions) < batch_size:
                             break
-                        offset += batch_size
                         continue
 
                     # Подготавливаем задачи для параллельного выполнения
@@ -1977,6 +2000,12 @@ class RemnaWaveService:
                                 if hwid_limit is not None:
                                     create_kwargs['hwid_device_limit'] = hwid_limit
 
+                                # Для просроченных подписок expire_at сдвигается к текущему времени,
+                                # поэтому в отпечаток идёт исходная дата окончания
+                                fingerprint = panel_sync_fingerprint({**create_kwargs, 'expire_at': sub.end_date})
+                                if not force and user.remnawave_uuid and sub.panel_sync_hash == fingerprint:
+                                    return ('skipped', sub, None)
+
                                 # Определяем UUID для обновления
                                 panel_uuid = user.remnawave_uuid
 
@@ -2022,14 +2051,17 @@ class RemnaWaveService:
                                         # Сохраняем UUID если его не было
                                         if not user.remnawave_uuid:
                                             user.remnawave_uuid = panel_uuid
+                                        sub.panel_sync_hash = fingerprint
                                         return ('updated', sub, None)
                                     except RemnaWaveAPIError as api_error:
                                         if api_error.status_code == 404:
                                             new_user = await api.create_user(**create_kwargs)
+                                            sub.panel_sync_hash = fingerprint
                                             return ('created', sub, new_user)
                                         raise
                                 else:
                                     new_user = await api.create_user(**create_kwargs)
+                                    sub.panel_sync_hash = fingerprint
                                     return ('created', sub, new_user)
 
                             except Exception as e:
@@ -2058,6 +2090,8 @@ class RemnaWaveService:
                             stats['created'] += 1
                         elif action == 'updated':
                             stats['updated'] += 1
+                        elif action == 'skipped':
+                            stats['skipped'] += 1
                         else:
                             stats['errors'] += 1
 
@@ -2069,29 +2103,29 @@ class RemnaWaveService:
                         stats['errors'] += len(valid_subscriptions)
 
                     logger.info(
-                        '📦 Обработано подписок: создано обновлено ошибок',
-                        offset=offset + len(subscriptions),
+                        '📦 Обработано подписок: создано обновлено без изменений ошибок',
+                        processed=processed,
                         stats=stats['created'],
                         stats_2=stats['updated'],
+                        skipped=stats['skipped'],
                         stats_3=stats['errors'],
                     )
 
                     if len(subscriptions) < batch_size:
                         break
 
-                    offset += batch_size
-
             logger.info(
-                '✅ Синхронизация в панель завершена: создано обновлено ошибок',
+                '✅ Синхронизация в панель завершена: создано обновлено без изменений ошибок',
                 stats=stats['created'],
                 stats_2=stats['updated'],
+                skipped=stats['skipped'],
                 stats_3=stats['errors'],
             )
             return stats
 
         except Exception as e:
             logger.error('Ошибка синхронизации пользователей в панель', error=e)
-            return {'created': 0, 'updated': 0, 'errors': 1}
+            return {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 1}
 
     async def get_user_traffic_stats(self, telegram_id: int) -> dict[str, Any] | None:
         try:
@@ -0,0 +1,181 @@
+"""Синхронизация локального состояния между процессами через Redis pub/sub.
+
+Техработы, переопределения настроек из админки, конструктор меню и стили
+кнопок хранятся в памяти каждого процесса. Процесс, который изменил такое
+состояние, публикует событие в канал ``runtime:sync``; остальные процессы
+(веб-воркеры при ``WEB_API_WORKERS > 1``, процессы с разными ``PROCESS_ROLE``)
+применяют его у себя. После каждой (пере)подписки процесс перечитывает всё
+состояние целиком, чтобы не зависеть от событий, пропущенных без подписки.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+
+from app.utils.cache import cache
+
+
+logger = structlog.get_logger(__name__)
+
+TOPIC_MAINTENANCE = 'maintenance'
+TOPIC_BOT_CONFIG = 'bot_config'
+TOPIC_MENU = 'menu'
+TOPIC_BUTTON_STYLES = 'button_styles'
+
+RuntimeSyncHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+async def _reload_maintenance(_payload: dict[str, Any]) -> None:
+    from app.services.maintenance_service import maintenance_service
+
+    await maintenance_service.reload_status()
+
+
+async def _apply_bot_config(payload: dict[str, Any]) -> None:
+    from app.services.system_settings_service import BotConfigurationService
+
+    key = payload.get('key')
+    if isinstance(key, str):
+        BotConfigurationService.apply_remote_change(key, payload.get('value'), reset=bool(payload.get('reset')))
+    else:
+        await BotConfigurationService.sync_overrides_from_db()
+
+
+async def _invalidate_menu(_payload: dict[str, Any]) -> None:
+    from app.services.main_menu_button_service import MainMenuButtonService
+    from app.services.menu_layout import MenuLayoutService
+
+    MenuLayoutService.invalidate_cache()
+    MainMenuButtonService.invalidate_cache()
+
+
+async def _reload_button_styles(_payload: dict[str, Any]) -> None:
+    from app.utils.button_styles_cache import load_button_styles_cache
+
+    await load_button_styles_cache()
+
+
+class RuntimeSyncService:
+    CHANNEL = 'runtime:sync'
+
+    def __init__(self) -> None:
+        self._instance_id = uuid.uuid4().hex
+        self._task: asyncio.Task[None] | None = None
+        self._subscribed = asyncio.Event()
+        self._handlers: dict[str, RuntimeSyncHandler] = {
+            TOPIC_MAINTENANCE: _reload_maintenance,
+            TOPIC_BOT_CONFIG: _apply_bot_config,
+            TOPIC_MENU: _invalidate_menu,
+            TOPIC_BUTTON_STYLES: _reload_button_styles,
+        }
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, *, subscribe_timeout: float = 5.0) -> bool:
+        """Подписывается на события других процессов. False — Redis недоступен."""
+        if self.is_running():
+            return True
+        if cache.client() is None:
+            logger.warning('Синхронизация состояния между процессами недоступна: Redis не подключён')
+            return False
+
+        self._subscribed.clear()
+        self._task = asyncio.create_task(self._run_loop(), name='runtime-sync')
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=subscribe_timeout)
+        except TimeoutError:
+            logger.warning('Подписка на синхронизацию состояния ещё не активна', timeout=subscribe_timeout)
+        return True
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def publish(self, topic: str, **payload: Any) -> None:
+        """Сообщает остальным процессам, что локальное состояние ``topic`` изменилось."""
+        redis_client = cache.client()
+        if redis_client is None:
+            return
+        message = {**payload, 'topic': topic, 'origin': self._instance_id}
+        try:
+            await redis_client.publish(self.CHANNEL, json.dumps(message, ensure_ascii=False, default=str))
+        except Exception as error:
+            logger.warning('Не удалось опубликовать изменение состояния', topic=topic, error=error)
+
+    async def handle_message(self, raw: bytes | str) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning('Некорректное сообщение синхронизации состояния')
+            return
+        if not isinstance(message, dict) or message.get('origin') == self._instance_id:
+            return
+
+        topic = message.get('topic')
+        handler = self._handlers.get(topic)
+        if handler is None:
+            logger.debug('Неизвестная тема синхронизации состояния', topic=topic)
+            return
+        try:
+            await handler(message)
+        except Exception as error:
+            logger.error('Ошибка применения изменения из другого процесса', topic=topic, error=error)
+
+    async def refresh_all(self) -> None:
+        """Перечитывает всё синхронизируемое состояние из Redis и БД."""
+        for topic, handler in self._handlers.items():
+            try:
+                await handler({})
+            except Exception as error:
+                logger.error('Ошибка обновления состояния после подписки', topic=topic, error=error)
+
+    async def _run_loop(self) -> None:
+        retry_delay = 1.0
+        while True:
+            redis_client = cache.client()
+            if redis_client is None:
+                await asyncio.sleep(retry_delay)
+                continue
+
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                logger.info('Подписка на синхронизацию состояния активна', channel=self.CHANNEL)
+                retry_delay = 1.0
+                await self.refresh_all()
+                self._subscribed.set()
+                async for message in pubsub.listen():
+                    if message and message.get('type') == 'message':
+                        await self.handle_message(message.get('data'))
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning(
+                    'Ошибка подписки на синхронизацию состояния, переподключение',
+                    error=error,
+                    retry_delay=retry_delay,
+                )
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+runtime_sync_service = RuntimeSyncService()
@@ -0,0 +1,200 @@
+"""Выбор ведущей реплики для периодических задач.
+
+Периодические задачи (мониторинг, суточные списания, бекапы, отчеты,
+автосинхронизация и т.д.) должны выполняться ровно на одной реплике.
+Реплики с ролью ``all``/``scheduler`` соревнуются за аренду в Redis
+(``SET NX PX``); владелец продлевает её, пока жив. Если ведущий упал,
+аренда истекает и её забирает другая реплика.
+
+``is_leader`` — текущее владение арендой, ``jobs_active`` — запущены ли
+задачи в этом процессе. Расхождение между ними устраняет runtime watchdog.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+
+from app.config import settings
+from app.utils.cache import cache
+
+
+logger = structlog.get_logger(__name__)
+
+
+LEASE_KEY = 'scheduler:leader'
+
+# Продлить аренду, только если она всё ещё наша
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(slots=True)
+class SchedulerJobStats:
+    starts: int = 0
+    stops: int = 0
+    failures: int = 0
+    running: bool = False
+    last_started_at: str | None = None
+    last_stopped_at: str | None = None
+    last_error: str | None = None
+
+
+class SchedulerLeaderService:
+    def __init__(self) -> None:
+        self.instance_id = uuid.uuid4().hex
+        # Без выборов (один процесс) процесс считается ведущим
+        self.is_leader = True
+        self.jobs_active = True
+        self._leader_since: datetime | None = None
+        self._acquisitions = 0
+        self._losses = 0
+        self._lease_deadline = 0.0
+        self._task: asyncio.Task | None = None
+        self._jobs: dict[str, SchedulerJobStats] = {}
+
+    @property
+    def election_enabled(self) -> bool:
+        return settings.SCHEDULER_LEADER_ELECTION_ENABLED and settings.is_scheduler_candidate()
+
+    async def start(self) -> bool:
+        """Делает первую попытку захватить аренду и запускает цикл продления.
+
+        Возвращает ``jobs_active`` — должен ли процесс запускать периодические задачи.
+        """
+        if not settings.is_scheduler_candidate():
+            self._set_leader(False)
+        elif not settings.SCHEDULER_LEADER_ELECTION_ENABLED:
+            self._set_leader(True)
+        elif cache.client() is None:
+            logger.warning('Redis недоступен: выбор ведущего планировщика отключен, задачи выполняются локально')
+            self._set_leader(True)
+        else:
+            self._set_leader(await self._try_acquire())
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._lease_loop(), name='scheduler-leader-lease')
+
+        self.jobs_active = self.is_leader
+        logger.info(
+            'Роль процесса в планировщике',
+            role=settings.get_process_role(),
+            is_leader=self.is_leader,
+            instance_id=self.instance_id,
+        )
+        return self.jobs_active
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+        if cache.client() is not None and self.election_enabled and self.is_leader:
+            try:
+                # Освобождаем аренду сразу, чтобы другая реплика не ждала TTL
+                await cache.run_script(_RELEASE_SCRIPT, (LEASE_KEY,), (self.instance_id,))
+            except Exception as error:
+                logger.warning('Не удалось освободить аренду планировщика', error=error)
+
+    def record_job_start(self, name: str) -> None:
+        stats = self._jobs.setdefault(name, SchedulerJobStats())
+        stats.starts += 1
+        stats.running = True
+        stats.last_started_at = datetime.now(UTC).isoformat()
+
+    def record_job_stop(self, name: str) -> None:
+        stats = self._jobs.setdefault(name, SchedulerJobStats())
+        stats.stops += 1
+        stats.running = False
+        stats.last_stopped_at = datetime.now(UTC).isoformat()
+
+    def record_job_failure(self, name: str, error: BaseException | str) -> None:
+        stats = self._jobs.setdefault(name, SchedulerJobStats())
+        stats.failures += 1
+        stats.last_error = str(error)
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            'role': settings.get_process_role(),
+            'instance_id': self.instance_id,
+            'election_enabled': self.election_enabled,
+            'is_leader': self.is_leader,
+            'jobs_active': self.jobs_active,
+            'leader_since': self._leader_since.isoformat() if self._leader_since else None,
+            'acquisitions': self._acquisitions,
+            'losses': self._losses,
+            'lease_ttl_seconds': settings.get_scheduler_lease_ttl(),
+            'jobs': {name: asdict(stats) for name, stats in sorted(self._jobs.items())},
+        }
+
+    def _set_leader(self, is_leader: bool) -> None:
+        was_elected = self._leader_since is not None
+        if is_leader and not was_elected:
+            self._acquisitions += 1
+            self._leader_since = datetime.now(UTC)
+        elif not is_leader and was_elected:
+            self._losses += 1
+            self._leader_since = None
+        self.is_leader = is_leader
+
+    async def _try_acquire(self) -> bool:
+        client = cache.client()
+        if client is None:
+            return False
+        ttl_ms = settings.get_scheduler_lease_ttl() * 1000
+        acquired = await client.set(LEASE_KEY, self.instance_id, nx=True, px=ttl_ms)
+        if acquired:
+            self._lease_deadline = time.monotonic() + settings.get_scheduler_lease_ttl()
+        return bool(acquired)
+
+    async def _renew(self) -> bool:
+        if cache.client() is None:
+            return False
+        ttl_ms = settings.get_scheduler_lease_ttl() * 1000
+        renewed = await cache.run_script(_RENEW_SCRIPT, (LEASE_KEY,), (self.instance_id, ttl_ms))
+        if renewed:
+            self._lease_deadline = time.monotonic() + settings.get_scheduler_lease_ttl()
+        return bool(renewed)
+
+    async def _lease_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.get_scheduler_lease_ttl() / 3)
+            try:
+                if self.is_leader:
+                    if not await self._renew():
+                        logger.warning('Аренда ведущего планировщика потеряна', instance_id=self.instance_id)
+                        self._set_leader(False)
+                elif await self._try_acquire():
+                    logger.info('Процесс стал ведущим планировщиком', instance_id=self.instance_id)
+                    self._set_leader(True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning('Ошибка продления аренды планировщика', error=error)
+                # Не продлённая аренда истекает и может достаться другой реплике: уступаем заранее
+                if self.is_leader and time.monotonic() >= self._lease_deadline:
+                    logger.warning('Аренда планировщика истекла без продления', instance_id=self.instance_id)
+                    self._set_leader(False)
+
+
+scheduler_leader_service = SchedulerLeaderService()
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import re
+import time
 from dataclasses import dataclass
+from datetime import UTC, datetime
 
 import aiohttp
 import structlog
 
 from app.config import settings
+from app.utils.http_clients import HttpClientProfile, http_clients
 
 
 logger = structlog.get_logger(__name__)
 
+# Метрики опрашиваются с одного хоста; таймаут запроса задаётся настройкой
+SERVER_STATUS_HTTP_PROFILE = HttpClientProfile(limit_per_host=2)
+
+_LATENCY_METRIC_PREFIX = 'xray_proxy_latency_ms{'
+_STATUS_METRIC_PREFIX = 'xray_proxy_status{'
+# Если обновление не удалось, прошлый снимок показывается, пока он моложе стольких интервалов
+STALE_SNAPSHOT_MAX_INTERVALS = 5
+
 
 @dataclass
 class ServerStatusEntry:
@@ -24,20 +36,90 @@ class ServerStatusEntry:
     is_online: bool
 
 
+@dataclass(frozen=True, slots=True)
+class ServerStatusSnapshot:
+    servers: tuple[ServerStatusEntry, ...]
+    fetched_at: datetime
+    # time.monotonic() момента получения — для проверки свежести
+    fetched_monotonic: float
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.fetched_monotonic
+
+
 class ServerStatusError(Exception):
     """Raised when server status information cannot be fetched or parsed."""
 
 
 class ServerStatusService:
-    _LATENCY_PATTERN = re.compile(r'xray_proxy_latency_ms\{(?P<labels>[^}]*)\}\s+(?P<value>[-+]?\d+(?:\.\d+)?)')
-    _STATUS_PATTERN = re.compile(r'xray_proxy_status\{(?P<labels>[^}]*)\}\s+(?P<value>[-+]?\d+(?:\.\d+)?)')
+    """Статус серверов из метрик XrayChecker.
+
+    Метрики обновляются в фоне раз в ``SERVER_STATUS_REFRESH_SECONDS`` и
+    разбираются в снимок; показ статуса читает готовый снимок. Устаревший
+    снимок показывается сразу, а обновление запускается в фоне. Ждать загрузку
+    приходится, только если снимка нет или он старше
+    ``STALE_SNAPSHOT_MAX_INTERVALS`` интервалов; одновременные запросы ждут
+    одну и ту же загрузку.
+    """
+
     _LABEL_PATTERN = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)=\"(?P<value>(?:\\.|[^\"])*)\"')
     _FLAG_PATTERN = re.compile(r'^([\U0001F1E6-\U0001F1FF]{2})\s*(.*)$')
 
     def __init__(self) -> None:
-        pass
+        self._snapshot: ServerStatusSnapshot | None = None
+        self._refresh_task: asyncio.Task[ServerStatusSnapshot] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def snapshot(self) -> ServerStatusSnapshot | None:
+        return self._snapshot
 
     async def get_servers(self) -> list[ServerStatusEntry]:
+        self._ensure_configured()
+
+        interval = settings.get_server_status_refresh_seconds()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age_seconds() < interval:
+            return list(snapshot.servers)
+
+        if snapshot is not None and snapshot.age_seconds() < interval * STALE_SNAPSHOT_MAX_INTERVALS:
+            # Не держим показ на таймауте недоступного эндпоинта метрик
+            self._start_refresh()
+            return list(snapshot.servers)
+
+        snapshot = await self.refresh()
+        return list(snapshot.servers)
+
+    async def refresh(self) -> ServerStatusSnapshot:
+        """Загружает и разбирает метрики; параллельные вызовы ждут одну загрузку."""
+        # shield: отмена одного ожидающего не прерывает общую загрузку
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task[ServerStatusSnapshot]:
+        task = self._refresh_task
+        if task is None or task.done():
+            task = self._refresh_task = asyncio.create_task(self._fetch_snapshot())
+            task.add_done_callback(self._log_refresh_failure)
+        return task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task[ServerStatusSnapshot]) -> None:
+        if task.cancelled():
+            return
+        error = task.exception()
+        if isinstance(error, ServerStatusError):
+            logger.warning('Не удалось обновить статус серверов', error=error)
+        elif error is not None:
+            logger.error('Ошибка обновления статуса серверов', error=error)
+
+    def is_configured(self) -> bool:
+        try:
+            self._ensure_configured()
+        except ServerStatusError:
+            return False
+        return True
+
+    def _ensure_configured(self) -> str:
         mode = settings.get_server_status_mode()
         if mode != 'xray':
             raise ServerStatusError('Server status integration is not enabled')
@@ -45,7 +127,20 @@ class ServerStatusService:
         url = settings.get_server_status_metrics_url()
         if not url:
             raise ServerStatusError('Metrics URL is not configured')
+        return url
+
+    async def _fetch_snapshot(self) -> ServerStatusSnapshot:
+        metrics_body = await self._fetch_metrics(self._ensure_configured())
+        servers = self._parse_metrics(metrics_body)
+        snapshot = ServerStatusSnapshot(
+            servers=tuple(servers),
+            fetched_at=datetime.now(UTC),
+            fetched_monotonic=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        return snapshot
 
+    async def _fetch_metrics(self, url: str) -> str:
         timeout = aiohttp.ClientTimeout(total=settings.get_server_status_request_timeout())
         auth = None
         auth_credentials = settings.get_server_status_metrics_auth()
@@ -54,44 +149,89 @@ class ServerStatusService:
             auth = aiohttp.BasicAuth(username, password)
 
         try:
-            async with (
-                aiohttp.ClientSession(timeout=timeout) as session,
-                session.get(
-                    url,
-                    auth=auth,
-                    ssl=settings.SERVER_STATUS_METRICS_VERIFY_SSL,
-                ) as response,
-            ):
+            session = http_clients.session('server_status', SERVER_STATUS_HTTP_PROFILE)
+            async with session.get(
+                url,
+                auth=auth,
+                timeout=timeout,
+                ssl=settings.SERVER_STATUS_METRICS_VERIFY_SSL,
+            ) as response:
                 if response.status != 200:
                     text = await response.text()
                     raise ServerStatusError(f'Unexpected response status: {response.status} - {text[:200]}')
-                metrics_body = await response.text()
+                return await response.text()
         except TimeoutError as error:
             raise ServerStatusError('Request to metrics endpoint timed out') from error
         except aiohttp.ClientError as error:
             raise ServerStatusError('Failed to fetch metrics') from error
 
-        return self._parse_metrics(metrics_body)
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        await self.stop()
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info('📡 Фоновое обновление статуса серверов запущено')
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run_loop(self) -> None:
+        was_configured = True
+        try:
+            while True:
+                # Интеграцию могут выключить и снова включить в админке: пока она
+                # выключена, цикл пропускает обновления, не засоряя лог
+                configured = self.is_configured()
+                if configured != was_configured:
+                    logger.info(
+                        'Фоновое обновление статуса серверов возобновлено'
+                        if configured
+                        else 'Интеграция статуса серверов выключена, фоновое обновление приостановлено'
+                    )
+                    was_configured = configured
+                if configured:
+                    try:
+                        await self.refresh()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        # Ошибку уже записал _log_refresh_failure
+                        pass
+                await asyncio.sleep(settings.get_server_status_refresh_seconds())
+        except asyncio.CancelledError:
+            logger.info('Фоновое обновление статуса серверов остановлено')
+            raise
 
     def _parse_metrics(self, body: str) -> list[ServerStatusEntry]:
+        """Один проход по строкам: берутся только строки нужных метрик, остальное пропускается."""
         servers: dict[tuple[str, str, str, str], ServerStatusEntry] = {}
 
-        for match in self._LATENCY_PATTERN.finditer(body):
-            labels = self._parse_labels(match.group('labels'))
-            key = self._build_key(labels)
-            entry = servers.get(key)
-            if not entry:
-                entry = self._create_entry(labels)
-                servers[key] = entry
+        for line in body.splitlines():
+            if line.startswith(_LATENCY_METRIC_PREFIX):
+                labels_start = len(_LATENCY_METRIC_PREFIX)
+                is_latency = True
+            elif line.startswith(_STATUS_METRIC_PREFIX):
+                labels_start = len(_STATUS_METRIC_PREFIX)
+                is_latency = False
+            else:
+                continue
 
-            try:
-                value = float(match.group('value'))
-                entry.latency_ms = int(round(value))
-            except (TypeError, ValueError):
-                entry.latency_ms = None
+            labels_end = line.rfind('}')
+            if labels_end < labels_start:
+                continue
+            # После меток: значение и, возможно, метка времени
+            value_parts = line[labels_end + 1 :].split()
+            if not value_parts:
+                continue
 
-        for match in self._STATUS_PATTERN.finditer(body):
-            labels = self._parse_labels(match.group('labels'))
+            labels = self._parse_labels(line[labels_start:labels_end])
             key = self._build_key(labels)
             entry = servers.get(key)
             if not entry:
@@ -99,10 +239,16 @@ class ServerStatusService:
                 servers[key] = entry
 
             try:
-                value = float(match.group('value'))
-                entry.is_online = value >= 1
-            except (TypeError, ValueError):
-                entry.is_online = False
+                value = float(value_parts[0])
+                if is_latency:
+                    entry.latency_ms = int(round(value))
+                else:
+                    entry.is_online = value >= 1
+            except (TypeError, ValueError, OverflowError):
+                if is_latency:
+                    entry.latency_ms = None
+                else:
+                    entry.is_online = False
 
         return sorted(
             servers.values(),
@@ -148,3 +294,6 @@ class ServerStatusService:
             value = match.group('value').replace('\\"', '"')
             labels[key] = value
         return labels
+
+
+server_status_service = ServerStatusService()
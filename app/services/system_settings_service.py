@@ -20,6 +20,7 @@ from app.database.crud.system_setting import (
 )
 from app.database.database import AsyncSessionLocal
 from app.database.models import SystemSetting
+from app.services.runtime_sync_service import TOPIC_BOT_CONFIG, runtime_sync_service
 from app.services.web_api_token_service import ensure_default_web_api_token
 
 
@@ -1647,6 +1648,8 @@ class BotConfigurationService:
             cls._overrides_raw[key] = raw_value
             cls._apply_to_settings(key, parsed_value)
 
+        # Снимок собирается один раз после применения всех переопределений
+        settings.rebuild_snapshot()
         await cls._sync_default_web_api_token()
 
     @classmethod
@@ -1654,6 +1657,59 @@ class BotConfigurationService:
         cls._overrides_raw.clear()
         await cls.initialize()
 
+    @classmethod
+    def apply_remote_change(cls, key: str, raw_value: str | None, *, reset: bool = False) -> None:
+        """Применяет изменение настройки, сделанное в другом процессе."""
+        if key not in cls._definitions or cls._is_env_override(key):
+            return
+        if reset:
+            cls._overrides_raw.pop(key, None)
+            cls._apply_to_settings(key, cls.get_original_value(key))
+        else:
+            try:
+                parsed_value = cls.deserialize_value(key, raw_value)
+            except Exception as error:
+                logger.error('Не удалось применить настройку из другого процесса', key=key, error=error)
+                return
+            cls._overrides_raw[key] = raw_value
+            cls._apply_to_settings(key, parsed_value)
+        settings.rebuild_snapshot()
+
+    @classmethod
+    async def sync_overrides_from_db(cls) -> None:
+        """Применяет только те переопределения из БД, которые отличаются от текущих.
+
+        В отличие от ``reload`` не трогает совпадающие настройки и не запускает
+        повторно их побочные эффекты (например, синхронизацию RemnaWave).
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(SystemSetting))
+            rows = result.scalars().all()
+
+        stored = {
+            row.key: row.value for row in rows if row.key in cls._definitions and not cls._is_env_override(row.key)
+        }
+        changed = False
+        for key, raw_value in stored.items():
+            if key in cls._overrides_raw and cls._overrides_raw[key] == raw_value:
+                continue
+            try:
+                parsed_value = cls.deserialize_value(key, raw_value)
+            except Exception as error:
+                logger.error('Не удалось применить настройку', key=key, error=error)
+                continue
+            cls._overrides_raw[key] = raw_value
+            cls._apply_to_settings(key, parsed_value)
+            changed = True
+
+        for key in [key for key in cls._overrides_raw if key not in stored]:
+            cls._overrides_raw.pop(key, None)
+            cls._apply_to_settings(key, cls.get_original_value(key))
+            changed = True
+
+        if changed:
+            settings.rebuild_snapshot()
+
     @classmethod
     def deserialize_value(cls, key: str, raw_value: str | None) -> Any:
         if raw_value is None:
@@ -1757,6 +1813,8 @@ class BotConfigurationService:
         else:
             cls._overrides_raw[key] = raw_value
             cls._apply_to_settings(key, value)
+            settings.rebuild_snapshot()
+            await runtime_sync_service.publish(TOPIC_BOT_CONFIG, key=key, value=raw_value)
 
         if key in {'WEB_API_DEFAULT_TOKEN', 'WEB_API_DEFAULT_TOKEN_NAME'}:
             await cls._sync_default_web_api_token()
@@ -1779,6 +1837,8 @@ class BotConfigurationService:
         else:
             original = cls.get_original_value(key)
             cls._apply_to_settings(key, original)
+            settings.rebuild_snapshot()
+            await runtime_sync_service.publish(TOPIC_BOT_CONFIG, key=key, reset=True)
 
         if key in {'WEB_API_DEFAULT_TOKEN', 'WEB_API_DEFAULT_TOKEN_NAME'}:
             await cls._sync_default_web_api_token()
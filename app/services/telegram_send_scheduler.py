@@ -0,0 +1,236 @@
+"""Общий планировщик отправки сообщений Telegram.
+
+Все фоновые отправители (рассылки, мониторинг, уведомления админам, конкурсы)
+делят один лимит бота (~30 сообщений/с) и лимит на чат (~1 сообщение/с).
+Планировщик выдаёт «разрешения» на отправку по token bucket с учётом приоритета,
+выдерживает интервал между сообщениями в один чат и при FloodWait ставит на
+паузу всех отправителей сразу.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, TypeVar
+
+import structlog
+from aiogram.exceptions import TelegramRetryAfter
+
+from app.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar('T')
+
+ChatId = int | str
+
+_THROUGHPUT_WINDOW_SEC = 60.0
+_CHAT_SLOTS_PRUNE_THRESHOLD = 1024
+
+
+class SendPriority(IntEnum):
+    """Приоритет отправки: меньшее значение обслуживается раньше."""
+
+    TRANSACTIONAL = 0  # события в реальном времени: платежи, тикеты, админ-алерты
+    NOTIFICATION = 1  # плановые уведомления: мониторинг, конкурсы, трафик
+    BROADCAST = 2  # массовые рассылки
+
+
+@dataclass(slots=True)
+class _ChatSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_sent: float = 0.0
+    users: int = 0
+
+
+class TelegramSendScheduler:
+    """Token bucket на весь бот + интервал на чат + общая пауза при FloodWait."""
+
+    def __init__(
+        self,
+        *,
+        rate_per_second: float | None = None,
+        per_chat_interval: float | None = None,
+        max_flood_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate_override = rate_per_second
+        self._chat_interval_override = per_chat_interval
+        self._max_flood_retries = max(1, max_flood_retries)
+        self._clock = clock
+
+        self._tokens: float | None = None
+        self._last_refill = clock()
+        self._pause_until = 0.0
+        self._waiting: dict[SendPriority, int] = dict.fromkeys(SendPriority, 0)
+        self._chat_slots: dict[ChatId, _ChatSlot] = {}
+
+        self._sent: dict[SendPriority, int] = dict.fromkeys(SendPriority, 0)
+        self._failed: dict[SendPriority, int] = dict.fromkeys(SendPriority, 0)
+        self._flood_waits = 0
+        self._recent_sends: deque[float] = deque()
+
+    @property
+    def rate_per_second(self) -> float:
+        if self._rate_override is not None:
+            return max(0.1, self._rate_override)
+        return settings.get_telegram_send_rate_limit()
+
+    @property
+    def per_chat_interval(self) -> float:
+        if self._chat_interval_override is not None:
+            return max(0.0, self._chat_interval_override)
+        return settings.get_telegram_send_per_chat_interval()
+
+    async def submit(
+        self,
+        chat_id: ChatId | None,
+        send: Callable[[], Awaitable[T]],
+        *,
+        priority: SendPriority = SendPriority.NOTIFICATION,
+    ) -> T:
+        """Выполняет ``send`` с соблюдением лимитов и возвращает его результат.
+
+        FloodWait обрабатывается здесь: все отправители ставятся на паузу, а вызов
+        повторяется. Остальные исключения пробрасываются вызывающему коду.
+        """
+        slot = await self._acquire_chat(chat_id)
+        try:
+            for attempt in range(self._max_flood_retries):
+                await self._acquire_token(priority)
+                try:
+                    result = await send()
+                except TelegramRetryAfter as error:
+                    self._register_flood_wait(error.retry_after, chat_id=chat_id, priority=priority)
+                    if attempt == self._max_flood_retries - 1:
+                        self._failed[priority] += 1
+                        raise
+                    continue
+                except Exception:
+                    self._failed[priority] += 1
+                    raise
+                self._register_sent(priority)
+                return result
+            raise AssertionError('unreachable')  # pragma: no cover
+        finally:
+            self._release_chat(chat_id, slot)
+
+    def get_metrics(self) -> dict[str, Any]:
+        now = self._clock()
+        self._trim_recent(now)
+        return {
+            'rate_limit_per_second': self.rate_per_second,
+            'per_chat_interval': self.per_chat_interval,
+            'throughput_per_second': round(len(self._recent_sends) / _THROUGHPUT_WINDOW_SEC, 2),
+            'queue_depth': {priority.name.lower(): count for priority, count in self._waiting.items()},
+            'sent': {priority.name.lower(): count for priority, count in self._sent.items()},
+            'failed': {priority.name.lower(): count for priority, count in self._failed.items()},
+            'flood_waits': self._flood_waits,
+            'paused_for_seconds': round(max(0.0, self._pause_until - now), 2),
+            'active_chats': len(self._chat_slots),
+        }
+
+    async def _acquire_chat(self, chat_id: ChatId | None) -> _ChatSlot | None:
+        interval = self.per_chat_interval
+        if chat_id is None or interval <= 0:
+            return None
+
+        slot = self._chat_slots.get(chat_id)
+        if slot is None:
+            slot = _ChatSlot()
+            self._chat_slots[chat_id] = slot
+        slot.users += 1
+
+        try:
+            await slot.lock.acquire()
+        except BaseException:
+            slot.users -= 1
+            raise
+
+        delay = slot.last_sent + interval - self._clock()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                self._release_chat(chat_id, slot, mark_sent=False)
+                raise
+        return slot
+
+    def _release_chat(self, chat_id: ChatId | None, slot: _ChatSlot | None, *, mark_sent: bool = True) -> None:
+        if slot is None:
+            return
+        now = self._clock()
+        if mark_sent:
+            slot.last_sent = now
+        slot.users -= 1
+        slot.lock.release()
+
+        if len(self._chat_slots) > _CHAT_SLOTS_PRUNE_THRESHOLD:
+            interval = self.per_chat_interval
+            stale = [
+                key for key, value in self._chat_slots.items() if value.users <= 0 and value.last_sent + interval <= now
+            ]
+            for key in stale:
+                del self._chat_slots[key]
+
+    def _has_higher_priority_waiters(self, priority: SendPriority) -> bool:
+        return any(self._waiting[other] for other in SendPriority if other < priority)
+
+    def _refill(self, now: float) -> None:
+        rate = self.rate_per_second
+        capacity = max(1.0, rate)
+        if self._tokens is None:
+            self._tokens = capacity
+        else:
+            self._tokens = min(capacity, self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    async def _acquire_token(self, priority: SendPriority) -> None:
+        self._waiting[priority] += 1
+        try:
+            while True:
+                now = self._clock()
+                if self._pause_until > now:
+                    await asyncio.sleep(self._pause_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1.0 and not self._has_higher_priority_waiters(priority):
+                    self._tokens -= 1.0
+                    return
+
+                shortage = max(0.0, 1.0 - self._tokens)
+                await asyncio.sleep(max(shortage / self.rate_per_second, 0.005))
+        finally:
+            self._waiting[priority] -= 1
+
+    def _register_flood_wait(self, retry_after: int, *, chat_id: ChatId | None, priority: SendPriority) -> None:
+        self._flood_waits += 1
+        self._pause_until = max(self._pause_until, self._clock() + retry_after + 1)
+        # После паузы начинаем с пустого bucket, чтобы не выстрелить всплеском
+        self._tokens = 0.0
+        logger.warning(
+            'FloodWait: все отправки Telegram приостановлены',
+            retry_after=retry_after,
+            chat_id=chat_id,
+            priority=priority.name,
+        )
+
+    def _register_sent(self, priority: SendPriority) -> None:
+        now = self._clock()
+        self._sent[priority] += 1
+        self._recent_sends.append(now)
+        self._trim_recent(now)
+
+    def _trim_recent(self, now: float) -> None:
+        border = now - _THROUGHPUT_WINDOW_SEC
+        while self._recent_sends and self._recent_sends[0] < border:
+            self._recent_sends.popleft()
+
+
+telegram_send_scheduler = TelegramSendScheduler()
@@ -678,7 +678,7 @@ class TrafficMonitoringServiceV2:
             )
             violations = violations[:max_notifications]
 
-        for i, violation in enumerate(violations):
+        for violation in violations:
             try:
                 if not await self.should_send_notification(violation.user_uuid):
                     logger.info(
@@ -738,10 +738,6 @@ class TrafficMonitoringServiceV2:
 
                 logger.info('📨 Уведомление отправлено для', user_uuid=violation.user_uuid)
 
-                # Задержка между отправками (защита от flood)
-                if i < len(violations) - 1:
-                    await asyncio.sleep(0.5)
-
             except Exception as e:
                 logger.error('❌ Ошибка отправки уведомления для', user_uuid=violation.user_uuid, error=e)
 
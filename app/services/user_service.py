@@ -53,10 +53,12 @@ from app.database.models import (
     YooKassaPayment,
 )
 from app.localization.texts import get_texts
+from app.services.cabinet_principal_cache_service import cabinet_principal_cache_service
 from app.services.notification_delivery_service import (
     NotificationType,
     notification_delivery_service,
 )
+from app.services.referral_stats_cache_service import referral_stats_cache_service
 
 
 logger = structlog.get_logger(__name__)
@@ -653,6 +655,7 @@ class UserService:
                 await db.execute(update(User).where(User.id.in_(to_remove)).values(referred_by_id=None))
 
             await db.commit()
+            await referral_stats_cache_service.invalidate(user_id)
 
             logger.info(
                 'Админ обновил рефералов пользователя : добавлено , удалено , всего',
@@ -763,6 +766,7 @@ class UserService:
                 return False
 
             user_id_display = user.telegram_id or user.email or f'#{user.id}'
+            referrer_id = user.referred_by_id
             logger.info(
                 '🗑️ Начинаем полное удаление пользователя (ID: )', user_id=user_id, user_id_display=user_id_display
             )
@@ -1257,6 +1261,9 @@ class UserService:
                 await db.execute(delete(User).where(User.id == user_id))
                 await db.commit()
                 logger.info('✅ Пользователь окончательно удален из базы', user_id=user_id)
+                await cabinet_principal_cache_service.invalidate(user_id)
+                if referrer_id:
+                    await referral_stats_cache_service.invalidate(referrer_id)
             except Exception as e:
                 logger.error('❌ Ошибка финального удаления пользователя', error=e)
                 await db.rollback()
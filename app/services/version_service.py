@@ -2,15 +2,17 @@ import asyncio
 import re
 from datetime import UTC, datetime, timedelta
 
-import aiohttp
 import structlog
 from packaging import version
 
 from app.config import settings
+from app.utils.http_clients import HttpClientProfile, http_clients
 
 
 logger = structlog.get_logger(__name__)
 
+GITHUB_HTTP_PROFILE = HttpClientProfile(limit_per_host=2, headers={'Accept': 'application/vnd.github+json'})
+
 
 class VersionInfo:
     def __init__(self, tag_name: str, published_at: str, name: str, body: str, prerelease: bool = False):
@@ -73,7 +75,7 @@ class VersionService:
     async def get_latest_stable_version(self) -> str:
         try:
             url = f'https://api.github.com/repos/{self.repo}/releases/latest'
-            async with aiohttp.ClientSession() as session, session.get(url) as response:
+            async with http_clients.session('github', GITHUB_HTTP_PROFILE).get(url) as response:
                 if response.status == 200:
                     data = await response.json()
                     return data['tag_name']
@@ -138,8 +140,7 @@ class VersionService:
         url = f'https://api.github.com/repos/{self.repo}/releases'
 
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session, session.get(url) as response:
+            async with http_clients.session('github', GITHUB_HTTP_PROFILE).get(url) as response:
                 if response.status == 200:
                     data = await response.json()
                     releases = []
@@ -63,6 +63,8 @@ ALLOWED_STYLE_VALUES = VALID_STYLES | {'default'}
 # ---- Module-level cache ---------------------------------------------------
 
 _cached_styles: dict[str, dict] | None = None
+# Растёт при каждой перезагрузке: по нему потребители сбрасывают свои кеши
+_styles_version = 0
 
 
 def _deep_copy_styles(source: dict[str, dict]) -> dict[str, dict]:
@@ -80,12 +82,17 @@ def get_cached_button_styles() -> dict[str, dict]:
     return _deep_copy_styles(DEFAULT_BUTTON_STYLES)
 
 
+def get_button_styles_version() -> int:
+    """Return the cache version, bumped on every reload."""
+    return _styles_version
+
+
 async def load_button_styles_cache() -> dict[str, dict]:
     """Load button styles from DB and refresh the module cache.
 
     Called at bot startup and after admin updates via the cabinet API.
     """
-    global _cached_styles
+    global _cached_styles, _styles_version
 
     merged = _deep_copy_styles(DEFAULT_BUTTON_STYLES)
 
@@ -117,5 +124,6 @@ async def load_button_styles_cache() -> dict[str, dict]:
         logger.exception('Failed to load button styles from DB, using defaults')
 
     _cached_styles = merged
+    _styles_version += 1
     logger.info('Button styles cache loaded', list=list(merged.keys()))
     return merged
@@ -1,4 +1,5 @@
 import json
+from collections.abc import Sequence
 from datetime import timedelta
 from typing import Any
 
@@ -20,10 +21,17 @@ from app.config import settings
 logger = structlog.get_logger(__name__)
 
 
+def decode_redis_value(value: bytes | str) -> str:
+    """Строка из ответа Redis: клиент работает без ``decode_responses`` и отдаёт байты."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
 class CacheService:
     def __init__(self):
         self.redis_client: redis.Redis | None = None
         self._connected = False
+        # Текст Lua-скрипта -> SHA, под которым он загружен в Redis
+        self._script_shas: dict[str, str] = {}
 
     async def connect(self):
         try:
@@ -35,6 +43,31 @@ class CacheService:
             logger.warning('⚠️ Не удалось подключиться к Redis', error=e)
             self._connected = False
 
+    def client(self) -> redis.Redis | None:
+        """Клиент Redis для команд вне обёрток кеша; ``None``, если Redis не подключён."""
+        if not self._connected or self.redis_client is None:
+            return None
+        return self.redis_client
+
+    async def run_script(self, script: str, keys: Sequence[str], args: Sequence[Any] = ()) -> Any:
+        """Выполняет Lua-скрипт через EVALSHA.
+
+        Скрипт загружается один раз; если Redis потерял кеш скриптов (перезапуск,
+        SCRIPT FLUSH), он загружается заново. Без подключения к Redis поднимает
+        ``ConnectionError``.
+        """
+        client = self.client()
+        if client is None:
+            raise ConnectionError('Redis не подключён')
+        sha = self._script_shas.get(script)
+        if sha is None:
+            sha = self._script_shas[script] = await client.script_load(script)
+        try:
+            return await client.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            sha = self._script_shas[script] = await client.script_load(script)
+            return await client.evalsha(sha, len(keys), *keys, *args)
+
     async def disconnect(self):
         if self.redis_client:
             await self.redis_client.close()
@@ -341,7 +374,6 @@ if c == 1 then
 end
 return c
 """
-    _rate_limit_sha: str | None = None
 
     @staticmethod
     async def _atomic_rate_check(key: str, limit: int, window: int, *, fail_closed: bool = False) -> bool:
@@ -358,29 +390,7 @@ return c
             return fail_closed
 
         try:
-            # Cache the script SHA for performance (avoids sending script body every time)
-            if RateLimitCache._rate_limit_sha is None:
-                RateLimitCache._rate_limit_sha = await cache.redis_client.script_load(
-                    RateLimitCache._RATE_LIMIT_SCRIPT,
-                )
-            try:
-                current = await cache.redis_client.evalsha(
-                    RateLimitCache._rate_limit_sha,
-                    1,
-                    key,
-                    window,
-                )
-            except NoScriptError:
-                # SHA evicted from Redis script cache — reload and retry
-                RateLimitCache._rate_limit_sha = await cache.redis_client.script_load(
-                    RateLimitCache._RATE_LIMIT_SCRIPT,
-                )
-                current = await cache.redis_client.evalsha(
-                    RateLimitCache._rate_limit_sha,
-                    1,
-                    key,
-                    window,
-                )
+            current = await cache.run_script(RateLimitCache._RATE_LIMIT_SCRIPT, (key,), (window,))
             return int(current) > limit
         except Exception:
             logger.warning('Rate limiter error', key=key, exc_info=True)
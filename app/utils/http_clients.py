@@ -0,0 +1,94 @@
+"""Общие HTTP-клиенты вспомогательных интеграций.
+
+Вместо новой ``aiohttp.ClientSession`` на каждый запрос (а значит, новых
+DNS-запроса и TLS-рукопожатия) интеграции берут из реестра долгоживущую
+сессию со своим пулом соединений: keep-alive, кеш DNS, ограничение
+соединений на хост и таймауты по умолчанию. Сессии закрываются при остановке
+приложения (``http_clients.close``).
+
+Клиенты платёжных систем реестр не используют: у каждого свой жизненный цикл
+сессии, а лимит соединений на хост ограничил бы параллельные платежи.
+
+Сессию из реестра нельзя использовать как ``async with session`` — это закроет
+её для всех; запросы выполняются как ``async with session.get(...)``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import aiohttp
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class HttpClientProfile:
+    timeout_seconds: float = 10.0
+    limit_per_host: int = 4
+    keepalive_seconds: float = 30.0
+    dns_cache_seconds: int = 300
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+DEFAULT_PROFILE = HttpClientProfile()
+
+
+class HttpClientRegistry:
+    def __init__(self) -> None:
+        self._sessions: dict[str, tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+
+    def session(self, name: str, profile: HttpClientProfile = DEFAULT_PROFILE) -> aiohttp.ClientSession:
+        """Сессия интеграции ``name``; создаётся при первом обращении с параметрами ``profile``."""
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(name)
+        if entry is not None:
+            session, session_loop = entry
+            # Сессия привязана к циклу событий, в котором создана
+            if not session.closed and session_loop is loop:
+                return session
+            self._close_foreign(name, session, session_loop)
+
+        connector = aiohttp.TCPConnector(
+            limit_per_host=profile.limit_per_host,
+            keepalive_timeout=profile.keepalive_seconds,
+            ttl_dns_cache=profile.dns_cache_seconds,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=profile.timeout_seconds),
+            headers=dict(profile.headers),
+        )
+        self._sessions[name] = (session, loop)
+        return session
+
+    @staticmethod
+    def _close_foreign(name: str, session: aiohttp.ClientSession, session_loop: asyncio.AbstractEventLoop) -> None:
+        """Закрывает сессию, созданную в другом цикле событий: закрыть её можно только в её цикле."""
+        if session.closed:
+            return
+        if not session_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            return
+        logger.warning('HTTP-клиент интеграции не закрыт: его цикл событий уже завершён', client=name)
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        loop = asyncio.get_running_loop()
+        for name, (session, session_loop) in sessions.items():
+            if session_loop is not loop:
+                self._close_foreign(name, session, session_loop)
+                continue
+            if session.closed:
+                continue
+            try:
+                await session.close()
+            except Exception as error:
+                logger.warning('Не удалось закрыть HTTP-клиент интеграции', client=name, error=error)
+
+
+http_clients = HttpClientRegistry()
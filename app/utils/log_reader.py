@@ -0,0 +1,311 @@
+"""Чтение лог-файла бота с конца без загрузки файла целиком.
+
+Файл читается блоками от конца к началу, поэтому последние записи
+отдаются за время, не зависящее от размера лога. Записи можно
+фильтровать по минимальному уровню и по интервалу времени; для интервала
+используется разреженный индекс «время → смещение», который позволяет
+сразу перейти к нужному участку файла.
+
+Функции модуля блокирующие — из асинхронного кода их нужно вызывать через
+``asyncio.to_thread``/``run_in_threadpool``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import re
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from app.utils.timezone import get_local_timezone
+
+
+LOG_READ_BLOCK_SIZE = 64 * 1024
+LOG_INDEX_STRIDE_BYTES = 1024 * 1024
+LOG_COUNT_BLOCK_SIZE = 1024 * 1024
+
+LOG_LEVELS = ('debug', 'info', 'warning', 'error', 'critical')
+_LEVEL_RANKS = {name: rank for rank, name in enumerate(LOG_LEVELS)} | {'warn': 2, 'exception': 3, 'fatal': 4}
+
+# Строка записи, как её пишет файловый ConsoleRenderer: «2026-01-31 12:00:00 [info] ...».
+# Строки без такого префикса (трейсбеки, многострочные сообщения) относятся к предыдущей записи.
+_RECORD_HEADER = re.compile(rb'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \[([a-z]+)')
+_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Продолжающие байты многобайтовых символов UTF-8 (10xxxxxx)
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+class LogRecord(NamedTuple):
+    timestamp: datetime
+    level: str
+    text: str
+
+
+@dataclass(slots=True)
+class LogTail:
+    text: str
+    size_bytes: int
+    modified_at: float
+    truncated: bool
+
+
+def _parse_header(line: bytes) -> tuple[datetime, str] | None:
+    match = _RECORD_HEADER.match(line)
+    if match is None:
+        return None
+    try:
+        timestamp = datetime.strptime(match.group(1).decode('ascii'), _TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+    return timestamp, match.group(2).decode('ascii')
+
+
+def to_log_time(value: datetime) -> datetime:
+    """Переводит момент времени в наивное локальное время, в котором пишутся метки лога."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(get_local_timezone()).replace(tzinfo=None)
+
+
+def iter_lines_reversed(
+    handle: BinaryIO,
+    end: int,
+    start: int = 0,
+    block_size: int | None = None,
+) -> Iterator[bytes]:
+    """Строки диапазона ``[start, end)`` в обратном порядке, без символов перевода строки."""
+    block_size = block_size or LOG_READ_BLOCK_SIZE
+    position = end
+    remainder = b''
+    while position > start:
+        read_size = min(block_size, position - start)
+        position -= read_size
+        handle.seek(position)
+        lines = (handle.read(read_size) + remainder).split(b'\n')
+        remainder = lines[0]
+        yield from reversed(lines[1:])
+    if end > start:
+        yield remainder
+
+
+def iter_records_reversed(handle: BinaryIO, end: int, start: int = 0) -> Iterator[LogRecord]:
+    """Записи лога в обратном порядке; продолжения строк склеиваются со своей записью."""
+    continuation: list[bytes] = []
+    for line in iter_lines_reversed(handle, end, start):
+        header = _parse_header(line)
+        if header is None:
+            # Пустые строки в хвосте файла не относятся ни к одной записи
+            if continuation or line.strip():
+                continuation.append(line)
+            continue
+        text = b'\n'.join([line, *reversed(continuation)]).decode('utf-8', errors='ignore')
+        continuation = []
+        yield LogRecord(header[0], header[1], text)
+
+
+class LogOffsetIndex:
+    """Разреженный индекс «время → смещение» по одному лог-файлу.
+
+    Каждые ``stride`` байт запоминается метка времени первой записи после этой
+    точки. Индекс дописывается по мере роста файла и сбрасывается, если файл
+    был заменён (ротация) или усечён.
+    """
+
+    def __init__(self, stride: int = LOG_INDEX_STRIDE_BYTES) -> None:
+        self._stride = stride
+        self._lock = threading.Lock()
+        self._identity: tuple[int, int] | None = None
+        self._next_probe = 0
+        self._timestamps: list[datetime] = []
+        self._offsets: list[int] = []
+
+    def _probe(self, handle: BinaryIO, position: int, size: int) -> tuple[datetime, int] | None:
+        handle.seek(position)
+        chunk = handle.read(min(LOG_READ_BLOCK_SIZE, size - position))
+        offset = 0
+        if position > 0:
+            # Точка попала в середину строки — начинаем со следующей
+            newline = chunk.find(b'\n')
+            if newline < 0:
+                return None
+            offset = newline + 1
+        while offset < len(chunk):
+            newline = chunk.find(b'\n', offset)
+            line_end = len(chunk) if newline < 0 else newline
+            header = _parse_header(chunk[offset:line_end])
+            if header is not None:
+                return header[0], position + offset
+            if newline < 0:
+                return None
+            offset = newline + 1
+        return None
+
+    def _refresh(self, handle: BinaryIO, stats: os.stat_result) -> None:
+        identity = (stats.st_dev, stats.st_ino)
+        indexed_end = self._offsets[-1] if self._offsets else 0
+        if identity != self._identity or stats.st_size < indexed_end:
+            self._identity = identity
+            self._next_probe = 0
+            self._timestamps = []
+            self._offsets = []
+
+        while self._next_probe < stats.st_size:
+            sample = self._probe(handle, self._next_probe, stats.st_size)
+            if sample is not None and (not self._offsets or sample[1] > self._offsets[-1]):
+                # Порядок меток обеспечиваем сами: записи разных процессов могут чуть перемешиваться
+                timestamp = max(sample[0], self._timestamps[-1]) if self._timestamps else sample[0]
+                self._timestamps.append(timestamp)
+                self._offsets.append(sample[1])
+            self._next_probe += self._stride
+
+    def window(
+        self,
+        handle: BinaryIO,
+        stats: os.stat_result,
+        since: datetime | None,
+        until: datetime | None,
+    ) -> tuple[int, int]:
+        """Диапазон байт, в котором лежат записи интервала ``[since, until]``.
+
+        Границы берутся с запасом в один шаг индекса, поэтому записи всё равно
+        нужно фильтровать по времени.
+        """
+        with self._lock:
+            self._refresh(handle, stats)
+            start, end = 0, stats.st_size
+            if since is not None:
+                position = bisect.bisect_left(self._timestamps, since) - 2
+                if position >= 0:
+                    start = self._offsets[position]
+            if until is not None:
+                position = bisect.bisect_right(self._timestamps, until) + 1
+                if position < len(self._offsets):
+                    end = self._offsets[position]
+            return start, end
+
+
+class LogCharCounter:
+    """Число символов UTF-8 в лог-файле, досчитываемое по мере роста файла.
+
+    Символ — это любой байт, кроме продолжающего байта многобайтовой
+    последовательности, поэтому файл можно считать блоками с любыми границами
+    и продолжать с места последнего подсчёта. Счёт сбрасывается при ротации
+    или усечении файла.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._identity: tuple[int, int] | None = None
+        self._counted_end = 0
+        self._chars = 0
+
+    def count(self, handle: BinaryIO, stats: os.stat_result) -> int:
+        with self._lock:
+            identity = (stats.st_dev, stats.st_ino)
+            if identity != self._identity or stats.st_size < self._counted_end:
+                self._identity = identity
+                self._counted_end = 0
+                self._chars = 0
+
+            handle.seek(self._counted_end)
+            while self._counted_end < stats.st_size:
+                chunk = handle.read(min(LOG_COUNT_BLOCK_SIZE, stats.st_size - self._counted_end))
+                if not chunk:
+                    break
+                self._chars += len(chunk.translate(None, _UTF8_CONTINUATION_BYTES))
+                self._counted_end += len(chunk)
+            return self._chars
+
+
+_indexes: dict[str, LogOffsetIndex] = {}
+_char_counters: dict[str, LogCharCounter] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_log_index(path: Path) -> LogOffsetIndex:
+    key = str(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LogOffsetIndex()
+        return index
+
+
+def count_log_chars(path: Path) -> int:
+    """Число символов в лог-файле; повторные вызовы дочитывают только дописанное."""
+    key = str(path)
+    with _indexes_lock:
+        counter = _char_counters.get(key)
+        if counter is None:
+            counter = _char_counters[key] = LogCharCounter()
+    with path.open('rb') as handle:
+        return counter.count(handle, os.fstat(handle.fileno()))
+
+
+def _record_matches(
+    record: LogRecord,
+    min_rank: int | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> bool:
+    if min_rank is not None and _LEVEL_RANKS.get(record.level, 0) < min_rank:
+        return False
+    if since is not None and record.timestamp < since:
+        return False
+    return until is None or record.timestamp <= until
+
+
+def read_log_tail(
+    path: Path,
+    *,
+    max_chars: int,
+    min_level: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> LogTail:
+    """Последние ``max_chars`` символов лога, при необходимости только подходящие записи.
+
+    ``min_level`` — минимальный уровень (``warning`` вернёт также ``error`` и
+    ``critical``); ``since``/``until`` ограничивают время записей.
+    """
+    if min_level is not None and min_level not in _LEVEL_RANKS:
+        raise ValueError(f'Неизвестный уровень логов: {min_level}')
+    min_rank = _LEVEL_RANKS[min_level] if min_level is not None else None
+    since = to_log_time(since) if since is not None else None
+    until = to_log_time(until) if until is not None else None
+
+    with path.open('rb') as handle:
+        stats = os.fstat(handle.fileno())
+        start, end = 0, stats.st_size
+        if since is not None or until is not None:
+            start, end = get_log_index(path).window(handle, stats, since, until)
+
+        if min_rank is None and since is None and until is None:
+            pieces = (line.decode('utf-8', errors='ignore') for line in iter_lines_reversed(handle, end, start))
+        else:
+            pieces = (
+                record.text
+                for record in iter_records_reversed(handle, end, start)
+                if _record_matches(record, min_rank, since, until)
+            )
+
+        collected: list[str] = []
+        collected_chars = 0
+        for piece in pieces:
+            collected.append(piece)
+            collected_chars += len(piece) + 1
+            if collected_chars > max_chars:
+                break
+        # Остались ли ещё подходящие строки перед прочитанным фрагментом
+        truncated = next(pieces, None) is not None
+
+    text = '\n'.join(reversed(collected))
+    if len(text) > max_chars:
+        text = text[-max_chars:] if max_chars > 0 else ''
+        truncated = True
+    return LogTail(text=text, size_bytes=stats.st_size, modified_at=stats.st_mtime, truncated=truncated)
@@ -3,10 +3,15 @@ import time
 import unicodedata
 from collections.abc import Iterable, Sequence
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import Any
 
 
+# Узел графа запуска, внутри которого выполняется текущий этап
+current_startup_node: ContextVar[str | None] = ContextVar('current_startup_node', default=None)
+
+
 def _char_width(ch: str) -> int:
     """Return terminal display width of a single character."""
     cp = ord(ch)
@@ -60,6 +65,8 @@ class StepRecord:
     status_label: str
     message: str
     duration: float
+    started_at: float = 0.0
+    node: str | None = None
 
 
 class StageHandle:
@@ -112,8 +119,21 @@ class StartupTimeline:
         self.logger = logger
         self.app_name = app_name
         self.steps: list[StepRecord] = []
+        self.critical_path: list[str] = []
+        self.critical_path_duration = 0.0
+        self._origin = time.perf_counter()
 
-    def _record_step(self, title: str, icon: str, status_label: str, message: str, duration: float) -> None:
+    def _record_step(
+        self,
+        title: str,
+        icon: str,
+        status_label: str,
+        message: str,
+        duration: float,
+        started_at: float | None = None,
+    ) -> None:
+        if started_at is None:
+            started_at = time.perf_counter() - duration
         self.steps.append(
             StepRecord(
                 title=title,
@@ -121,9 +141,43 @@ class StartupTimeline:
                 status_label=status_label,
                 message=message,
                 duration=duration,
+                started_at=started_at - self._origin,
+                node=current_startup_node.get(),
             )
         )
 
+    def set_critical_path(self, nodes: Sequence[str], duration: float) -> None:
+        """Запоминает самую длинную цепочку зависимых узлов графа запуска."""
+        self.critical_path = list(nodes)
+        self.critical_path_duration = duration
+
+    def _critical_path_titles(self) -> list[str]:
+        titles_by_node: dict[str, str] = {}
+        for step in self.steps:
+            if step.node and step.node not in titles_by_node:
+                titles_by_node[step.node] = step.title
+        return [titles_by_node.get(node, node) for node in self.critical_path]
+
+    def build_report(self) -> dict[str, Any]:
+        """Машиночитаемый отчёт о запуске для сравнения между релизами."""
+        return {
+            'app': self.app_name,
+            'python': platform.python_version(),
+            'total_seconds': round(time.perf_counter() - self._origin, 4),
+            'critical_path': list(self.critical_path),
+            'critical_path_seconds': round(self.critical_path_duration, 4),
+            'steps': [
+                {
+                    'title': step.title,
+                    'node': step.node,
+                    'status': step.status_label,
+                    'started_at': round(step.started_at, 4),
+                    'duration': round(step.duration, 4),
+                }
+                for step in self.steps
+            ],
+        }
+
     def log_banner(self, metadata: Sequence[tuple[str, Any]] | None = None) -> None:
         title_text = f'🚀 {self.app_name}'
         subtitle_parts = [f'Python {platform.python_version()}']
@@ -203,6 +257,7 @@ class StartupTimeline:
                 status_label=handle.status_label,
                 message=handle.message,
                 duration=duration,
+                started_at=start_time,
             )
 
     def log_summary(self) -> None:
@@ -216,6 +271,10 @@ class StartupTimeline:
                 base += f' :: {step.message}'
             lines.append(base)
 
+        if self.critical_path:
+            path = ' → '.join(self._critical_path_titles())
+            lines.append(f'🧭 Критический путь [{self.critical_path_duration:.2f}s] :: {path}')
+
         width = max(_display_width(line) for line in lines)
         border_top = '┏' + '━' * (width + 2) + '┓'
         border_mid = '┣' + '━' * (width + 2) + '┫'
@@ -1,4 +1,10 @@
-"""Utilities for validating Telegram WebApp initialization data."""
+"""Utilities for validating Telegram WebApp initialization data.
+
+A mini app session sends the same init data with every request, so successfully
+validated payloads are cached in-process by their raw string. Cached entries are
+still checked against ``auth_date`` on every call and are dropped after
+``INIT_DATA_CACHE_TTL_SECONDS``.
+"""
 
 from __future__ import annotations
 
@@ -6,10 +12,19 @@ import hashlib
 import hmac
 import json
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any
 from urllib.parse import parse_qsl
 
 
+INIT_DATA_CACHE_MAX_ENTRIES = 4096
+INIT_DATA_CACHE_TTL_SECONDS = 600
+
+# (bot token, init data) -> (cached until, validated payload)
+_validated_init_data: OrderedDict[tuple[str, str], tuple[float, dict[str, Any]]] = OrderedDict()
+
+
 class TelegramWebAppAuthError(Exception):
     """Raised when Telegram WebApp init data fails validation."""
 
@@ -40,6 +55,48 @@ def parse_webapp_init_data(
     if not bot_token:
         raise TelegramWebAppAuthError('Bot token is not configured')
 
+    cache_key = (bot_token, init_data)
+    now = time.monotonic()
+    cached = _validated_init_data.get(cache_key)
+    if cached is not None and cached[0] > now:
+        _validated_init_data.move_to_end(cache_key)
+        data = cached[1]
+    else:
+        data = _validate_signature_and_parse(init_data, bot_token)
+        _validated_init_data[cache_key] = (now + INIT_DATA_CACHE_TTL_SECONDS, data)
+        _validated_init_data.move_to_end(cache_key)
+        while len(_validated_init_data) > INIT_DATA_CACHE_MAX_ENTRIES:
+            _validated_init_data.popitem(last=False)
+
+    auth_date = data.get('auth_date')
+    if max_age_seconds and auth_date:
+        current_ts = int(time.time())
+        if current_ts - auth_date > max_age_seconds:
+            raise TelegramWebAppAuthError('Init data is too old')
+
+    # Callers may modify the result; the cached payload must stay intact
+    result = dict(data)
+    if isinstance(result.get('user'), dict):
+        result['user'] = dict(result['user'])
+    return result
+
+
+def clear_init_data_cache() -> None:
+    _validated_init_data.clear()
+
+
+@lru_cache(maxsize=8)
+def _webapp_secret_key(bot_token: str) -> bytes:
+    return hmac.new(
+        key=b'WebAppData',
+        msg=bot_token.encode('utf-8'),
+        digestmod=hashlib.sha256,
+    ).digest()
+
+
+def _validate_signature_and_parse(init_data: str, bot_token: str) -> dict[str, Any]:
+    """Check the signature and decode the payload; ``auth_date`` age is checked by the caller."""
+
     parsed_pairs = parse_qsl(init_data, strict_parsing=True, keep_blank_values=True)
     data: dict[str, Any] = {key: value for key, value in parsed_pairs}
 
@@ -49,14 +106,8 @@ def parse_webapp_init_data(
 
     data_check_string = '\n'.join(f'{key}={value}' for key, value in sorted(data.items()))
 
-    secret_key = hmac.new(
-        key=b'WebAppData',
-        msg=bot_token.encode('utf-8'),
-        digestmod=hashlib.sha256,
-    ).digest()
-
     computed_hash = hmac.new(
-        key=secret_key,
+        key=_webapp_secret_key(bot_token),
         msg=data_check_string.encode('utf-8'),
         digestmod=hashlib.sha256,
     ).hexdigest()
@@ -67,17 +118,10 @@ def parse_webapp_init_data(
     auth_date_raw = data.get('auth_date')
     if auth_date_raw is not None:
         try:
-            auth_date = int(auth_date_raw)
+            data['auth_date'] = int(auth_date_raw)
         except (TypeError, ValueError):
             raise TelegramWebAppAuthError('Invalid auth_date value') from None
 
-        if max_age_seconds and auth_date:
-            current_ts = int(time.time())
-            if current_ts - auth_date > max_age_seconds:
-                raise TelegramWebAppAuthError('Init data is too old')
-
-        data['auth_date'] = auth_date
-
     user_payload = data.get('user')
     if user_payload is not None:
         try:
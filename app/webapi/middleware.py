@@ -7,8 +7,11 @@ from sqlalchemy.exc import InterfaceError, OperationalError
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 from structlog.contextvars import bound_contextvars
 
+from app.database.query_stats import query_scope
+
 
 logger = structlog.get_logger('web_api')
 
@@ -38,3 +41,27 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 logger.debug(
                     '-> (ms)', method=request.method, path=request.url.path, status=status, duration_ms=duration_ms
                 )
+
+
+class QueryStatsMiddleware:
+    """Учёт SQL-запросов по шаблону маршрута (``GET /users/{user_id}``).
+
+    ASGI-обёртка, а не ``BaseHTTPMiddleware``: область закрывается после
+    отправки тела, поэтому запросы потоковых ответов тоже учитываются.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with query_scope('http') as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get('route')
+                path = getattr(route, 'path', None) or '<unmatched>'
+                stats.name = f'{scope["method"]} {path}'
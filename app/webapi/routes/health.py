@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Security
+from fastapi import APIRouter, Query, Security
 
 from app.config import settings
 from app.database import db_manager, get_pool_metrics
+from app.database.query_stats import query_stats
+from app.services.scheduler_leader_service import scheduler_leader_service
+from app.services.telegram_send_scheduler import telegram_send_scheduler
 from app.services.version_service import version_service
 
 from ..dependencies import require_api_token
@@ -40,3 +43,30 @@ async def pool_metrics(_: object = Security(require_api_token)) -> dict:
     """Метрики пула подключений к базе данных."""
 
     return await get_pool_metrics()
+
+
+@router.get('/metrics/telegram-send', tags=['health'])
+async def telegram_send_metrics(_: object = Security(require_api_token)) -> dict:
+    """Пропускная способность и очередь общего планировщика отправки Telegram."""
+
+    return telegram_send_scheduler.get_metrics()
+
+
+@router.get('/metrics/scheduler', tags=['health'])
+async def scheduler_metrics(_: object = Security(require_api_token)) -> dict:
+    """Роль процесса, владение арендой ведущего планировщика и счётчики периодических задач."""
+
+    return scheduler_leader_service.get_metrics()
+
+
+@router.get('/metrics/db-queries', tags=['health'])
+async def db_query_metrics(
+    _: object = Security(require_api_token),
+    reset: bool = Query(False, description='Обнулить счётчики после ответа'),
+) -> dict:
+    """Число и время SQL-запросов по маршрутам веб-API и обработчикам бота (в пределах процесса)."""
+
+    metrics = {'enabled': settings.DB_QUERY_STATS_ENABLED, **query_stats.get_metrics()}
+    if reset:
+        query_stats.reset()
+    return metrics
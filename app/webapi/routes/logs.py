@@ -15,6 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.database.crud.ticket import TicketCRUD
 from app.services.monitoring_service import monitoring_service
+from app.utils.log_reader import LogTail, count_log_chars, read_log_tail
 
 from ..dependencies import get_db_session, require_api_token
 from ..schemas.logs import (
@@ -54,6 +55,21 @@ async def _read_system_log(path: Path) -> tuple[str, int, float | None]:
     return await run_in_threadpool(_read)
 
 
+async def _read_system_log_tail(
+    path: Path,
+    *,
+    max_chars: int,
+    level: str | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> tuple[LogTail, int]:
+    def _read() -> tuple[LogTail, int]:
+        tail = read_log_tail(path, max_chars=max_chars, min_level=level, since=since, until=until)
+        return tail, count_log_chars(path)
+
+    return await run_in_threadpool(_read)
+
+
 def _format_timestamp(timestamp: float | None) -> datetime | None:
     if timestamp is None:
         return None
@@ -69,6 +85,13 @@ async def get_system_log_preview(
         le=SYSTEM_LOG_PREVIEW_LIMIT_MAX,
         description='Количество символов предпросмотра от конца файла',
     ),
+    level: str | None = Query(
+        default=None,
+        pattern='^(debug|info|warning|error|critical)$',
+        description='Минимальный уровень записей',
+    ),
+    since: datetime | None = Query(default=None, description='Записи не раньше этого времени'),
+    until: datetime | None = Query(default=None, description='Записи не позже этого времени'),
 ) -> SystemLogPreviewResponse:
     """Получить предпросмотр системного лог-файла бота."""
 
@@ -88,7 +111,9 @@ async def get_system_log_preview(
         )
 
     try:
-        content, size_bytes, mtime = await _read_system_log(log_path)
+        tail, size_chars = await _read_system_log_tail(
+            log_path, max_chars=preview_limit, level=level, since=since, until=until
+        )
     except FileNotFoundError:
         logger.warning('Лог-файл исчез во время чтения', log_path=log_path)
         return SystemLogPreviewResponse(
@@ -106,18 +131,15 @@ async def get_system_log_preview(
         logger.error('Ошибка чтения лог-файла', log_path=log_path, error=error)
         raise HTTPException(status_code=500, detail='Не удалось прочитать лог-файл') from error
 
-    preview_text = content[-preview_limit:] if preview_limit > 0 else ''
-    truncated = len(content) > len(preview_text)
-
     return SystemLogPreviewResponse(
         path=str(log_path),
         exists=True,
-        updated_at=_format_timestamp(mtime),
-        size_bytes=size_bytes,
-        size_chars=len(content),
-        preview=preview_text,
-        preview_chars=len(preview_text),
-        preview_truncated=truncated,
+        updated_at=_format_timestamp(tail.modified_at),
+        size_bytes=tail.size_bytes,
+        size_chars=size_chars,
+        preview=tail.text,
+        preview_chars=len(tail.text),
+        preview_truncated=tail.truncated,
         download_url='/logs/system/download',
     )
 
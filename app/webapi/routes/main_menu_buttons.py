@@ -15,6 +15,7 @@ from app.database.crud.main_menu_button import (
 )
 from app.database.models import MainMenuButton
 from app.services.main_menu_button_service import MainMenuButtonService
+from app.services.runtime_sync_service import TOPIC_MENU, runtime_sync_service
 
 from ..dependencies import get_db_session, require_api_token
 from ..schemas.main_menu_buttons import (
@@ -77,6 +78,7 @@ async def create_main_menu_button_endpoint(
     )
 
     MainMenuButtonService.invalidate_cache()
+    await runtime_sync_service.publish(TOPIC_MENU)
     return _serialize(button)
 
 
@@ -95,6 +97,7 @@ async def update_main_menu_button_endpoint(
     button = await update_main_menu_button(db, button, **update_payload)
 
     MainMenuButtonService.invalidate_cache()
+    await runtime_sync_service.publish(TOPIC_MENU)
     return _serialize(button)
 
 
@@ -110,4 +113,5 @@ async def delete_main_menu_button_endpoint(
 
     await delete_main_menu_button(db, button)
     MainMenuButtonService.invalidate_cache()
+    await runtime_sync_service.publish(TOPIC_MENU)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -447,13 +447,14 @@ async def sync_from_panel(
 
 @router.post('/sync/to-panel', response_model=RemnaWaveGenericSyncResponse)
 async def sync_to_panel(
+    force: bool = Query(default=False, description='Отправить все подписки, а не только изменившиеся'),
     _: Any = Security(require_api_token),
     db: AsyncSession = Depends(get_db_session),
 ) -> RemnaWaveGenericSyncResponse:
     service = _get_service()
     _ensure_service_configured(service)
 
-    stats = await service.sync_users_to_panel(db)
+    stats = await service.sync_users_to_panel(db, force=force)
     detail = 'Синхронизация в панель выполнена'
     return RemnaWaveGenericSyncResponse(success=True, detail=detail, data=stats)
 
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, Depends, Query, Security
+from fastapi.responses import StreamingResponse
 from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,6 +12,7 @@ from app.database.models import Transaction
 
 from ..dependencies import get_db_session, require_api_token
 from ..schemas.transactions import TransactionListResponse, TransactionResponse
+from ..streaming import ExportFormat, export_response, iter_export_rows
 
 
 router = APIRouter()
@@ -32,20 +34,16 @@ def _serialize(transaction: Transaction) -> TransactionResponse:
     )
 
 
-@router.get('', response_model=TransactionListResponse)
-async def list_transactions(
-    _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
-    limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-    user_id: int | None = Query(default=None),
-    type_filter: str | None = Query(default=None, alias='type'),
-    payment_method: str | None = Query(default=None),
-    is_completed: bool | None = Query(default=None),
-    date_from: datetime | None = Query(default=None),
-    date_to: datetime | None = Query(default=None),
-) -> TransactionListResponse:
-    base_query = select(Transaction)
+def _build_transactions_query(
+    *,
+    user_id: int | None,
+    type_filter: str | None,
+    payment_method: str | None,
+    is_completed: bool | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+):
+    query = select(Transaction)
     conditions = []
 
     if user_id:
@@ -62,7 +60,32 @@ async def list_transactions(
         conditions.append(Transaction.created_at <= date_to)
 
     if conditions:
-        base_query = base_query.where(and_(*conditions))
+        query = query.where(and_(*conditions))
+
+    return query
+
+
+@router.get('', response_model=TransactionListResponse)
+async def list_transactions(
+    _: Any = Security(require_api_token),
+    db: AsyncSession = Depends(get_db_session),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    user_id: int | None = Query(default=None),
+    type_filter: str | None = Query(default=None, alias='type'),
+    payment_method: str | None = Query(default=None),
+    is_completed: bool | None = Query(default=None),
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+) -> TransactionListResponse:
+    base_query = _build_transactions_query(
+        user_id=user_id,
+        type_filter=type_filter,
+        payment_method=payment_method,
+        is_completed=is_completed,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
     total_query = base_query.with_only_columns(func.count()).order_by(None)
     total = await db.scalar(total_query) or 0
@@ -76,3 +99,28 @@ async def list_transactions(
         limit=limit,
         offset=offset,
     )
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_transactions(
+    _: Any = Security(require_api_token),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias='format'),
+    after_id: int = Query(0, ge=0, description='Продолжить выгрузку после этого id'),
+    user_id: int | None = Query(default=None),
+    type_filter: str | None = Query(default=None, alias='type'),
+    payment_method: str | None = Query(default=None),
+    is_completed: bool | None = Query(default=None),
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+) -> StreamingResponse:
+    """Выгрузка транзакций одним проходом в порядке id (NDJSON или CSV)."""
+    query = _build_transactions_query(
+        user_id=user_id,
+        type_filter=type_filter,
+        payment_method=payment_method,
+        is_completed=is_completed,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    batches = iter_export_rows(query, Transaction.id, _serialize, after_id=after_id)
+    return export_response(batches, export_format=export_format, model=TransactionResponse, name='transactions')
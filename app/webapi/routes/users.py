@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Security, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -38,6 +39,7 @@ from ..schemas.users import (
     UserSubscriptionCreateRequest,
     UserUpdateRequest,
 )
+from ..streaming import ExportFormat, export_response, iter_export_rows
 
 
 router = APIRouter()
@@ -121,6 +123,28 @@ def _apply_search_filter(query, search: str):
     return query.where(or_(*conditions))
 
 
+def _build_users_query(
+    status_filter: UserStatus | None,
+    promo_group_id: int | None,
+    search: str | None,
+):
+    query = select(User).options(
+        selectinload(User.subscription),
+        selectinload(User.promo_group),
+    )
+
+    if status_filter:
+        query = query.where(User.status == status_filter.value)
+
+    if promo_group_id:
+        query = query.where(User.promo_group_id == promo_group_id)
+
+    if search:
+        query = _apply_search_filter(query, search)
+
+    return query
+
+
 @router.get('', response_model=UserListResponse)
 async def list_users(
     _: Any = Security(require_api_token),
@@ -131,19 +155,7 @@ async def list_users(
     promo_group_id: int | None = Query(default=None),
     search: str | None = Query(default=None),
 ) -> UserListResponse:
-    base_query = select(User).options(
-        selectinload(User.subscription),
-        selectinload(User.promo_group),
-    )
-
-    if status_filter:
-        base_query = base_query.where(User.status == status_filter.value)
-
-    if promo_group_id:
-        base_query = base_query.where(User.promo_group_id == promo_group_id)
-
-    if search:
-        base_query = _apply_search_filter(base_query, search)
+    base_query = _build_users_query(status_filter, promo_group_id, search)
 
     total_query = base_query.with_only_columns(func.count()).order_by(None)
     total = await db.scalar(total_query) or 0
@@ -159,6 +171,25 @@ async def list_users(
     )
 
 
+@router.get('/export', response_class=StreamingResponse)
+async def export_users(
+    _: Any = Security(require_api_token),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias='format'),
+    after_id: int = Query(0, ge=0, description='Продолжить выгрузку после этого id'),
+    status_filter: UserStatus | None = Query(default=None, alias='status'),
+    promo_group_id: int | None = Query(default=None),
+    search: str | None = Query(default=None),
+) -> StreamingResponse:
+    """Выгрузка всех пользователей одним проходом в порядке id (NDJSON или CSV)."""
+    batches = iter_export_rows(
+        _build_users_query(status_filter, promo_group_id, search),
+        User.id,
+        _serialize_user,
+        after_id=after_id,
+    )
+    return export_response(batches, export_format=export_format, model=UserResponse, name='users')
+
+
 @router.get('/{user_id}', response_model=UserResponse)
 async def get_user(
     user_id: int,
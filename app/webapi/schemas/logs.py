@@ -82,7 +82,7 @@ class SystemLogPreviewResponse(BaseModel):
         description='Фрагмент содержимого лог-файла, возвращаемый для предпросмотра',
     )
     preview_chars: int = Field(..., ge=0, description='Размер предпросмотра в символах')
-    preview_truncated: bool = Field(..., description='Флаг усечения предпросмотра относительно полного файла')
+    preview_truncated: bool = Field(..., description='Флаг наличия подходящих записей перед предпросмотром')
     download_url: str | None = Field(
         default=None,
         description='Относительный путь до endpoint для скачивания лог-файла',
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import socket
+from typing import Any
 
 import structlog
 import uvicorn
 
 from app.config import settings
+from app.services.runtime_sync_service import runtime_sync_service
+from app.utils.cache import cache
+from app.webserver.worker_pool import WebWorkerPool, bind_shared_socket
 
 from .app import create_web_api_app
 
@@ -13,68 +18,90 @@ from .app import create_web_api_app
 logger = structlog.get_logger(__name__)
 
 
+# Кастомный конфиг логирования - скрываем спам от WebSocket
+UVICORN_LOG_CONFIG: dict[str, Any] = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'default': {
+            '()': 'uvicorn.logging.DefaultFormatter',
+            'fmt': '%(levelprefix)s %(message)s',
+            'use_colors': None,
+        },
+    },
+    'handlers': {
+        'default': {
+            'formatter': 'default',
+            'class': 'logging.StreamHandler',
+            'stream': 'ext://sys.stderr',
+        },
+    },
+    'loggers': {
+        'uvicorn': {'handlers': ['default'], 'level': 'WARNING', 'propagate': False},
+        'uvicorn.error': {'level': 'WARNING', 'propagate': False},
+        'uvicorn.access': {'level': 'ERROR', 'propagate': False},
+        'uvicorn.protocols': {'level': 'WARNING', 'propagate': False},
+        'uvicorn.protocols.websockets': {'level': 'WARNING', 'propagate': False},
+        'uvicorn.protocols.websockets.websockets_impl': {'level': 'WARNING', 'propagate': False},
+        'websockets': {'level': 'WARNING', 'propagate': False},
+        'websockets.server': {'level': 'WARNING', 'propagate': False},
+    },
+}
+
+
+def build_uvicorn_config(app: object) -> uvicorn.Config:
+    return uvicorn.Config(
+        app=app,
+        host=settings.WEB_API_HOST,
+        port=int(settings.WEB_API_PORT or 8080),
+        log_level='warning',
+        lifespan='on',
+        access_log=False,
+        log_config=UVICORN_LOG_CONFIG,
+    )
+
+
 class WebAPIServer:
     """Асинхронный uvicorn-сервер для административного API."""
 
     def __init__(self, app: object | None = None) -> None:
         self._app = app or create_web_api_app()
 
-        workers = max(1, int(settings.WEB_API_WORKERS or 1))
-        if workers > 1:
-            logger.warning('WEB_API_WORKERS > 1 не поддерживается в embed-режиме, используем 1')
-            workers = 1
-
-        # Кастомный конфиг логирования - скрываем спам от WebSocket
-        log_config = {
-            'version': 1,
-            'disable_existing_loggers': False,
-            'formatters': {
-                'default': {
-                    '()': 'uvicorn.logging.DefaultFormatter',
-                    'fmt': '%(levelprefix)s %(message)s',
-                    'use_colors': None,
-                },
-            },
-            'handlers': {
-                'default': {
-                    'formatter': 'default',
-                    'class': 'logging.StreamHandler',
-                    'stream': 'ext://sys.stderr',
-                },
-            },
-            'loggers': {
-                'uvicorn': {'handlers': ['default'], 'level': 'WARNING', 'propagate': False},
-                'uvicorn.error': {'level': 'WARNING', 'propagate': False},
-                'uvicorn.access': {'level': 'ERROR', 'propagate': False},
-                'uvicorn.protocols': {'level': 'WARNING', 'propagate': False},
-                'uvicorn.protocols.websockets': {'level': 'WARNING', 'propagate': False},
-                'uvicorn.protocols.websockets.websockets_impl': {'level': 'WARNING', 'propagate': False},
-                'websockets': {'level': 'WARNING', 'propagate': False},
-                'websockets.server': {'level': 'WARNING', 'propagate': False},
-            },
-        }
-
-        self._config = uvicorn.Config(
-            app=self._app,
-            host=settings.WEB_API_HOST,
-            port=int(settings.WEB_API_PORT or 8080),
-            log_level='warning',
-            workers=workers,
-            lifespan='on',
-            access_log=False,
-            log_config=log_config,
-        )
+        self._workers = settings.get_web_api_worker_count()
+        self._config = build_uvicorn_config(self._app)
         self._server = uvicorn.Server(self._config)
+        self._socket: socket.socket | None = None
+        self._worker_pool: WebWorkerPool | None = None
         self._task: asyncio.Task[None] | None = None
 
+    def _bind_shared_socket(self) -> socket.socket | None:
+        """Открывает общий сокет для нескольких процессов или None для обычного запуска."""
+        if self._workers <= 1:
+            return None
+        # Без Redis процессы не смогут договориться о webhook-ах и вебсокетах
+        if cache.client() is None:
+            logger.warning('WEB_API_WORKERS > 1 требует Redis, веб-сервер запускается в одном процессе')
+            return None
+        # Без подписки основной процесс не увидит изменений, сделанных в воркерах
+        if not runtime_sync_service.is_running():
+            logger.warning(
+                'WEB_API_WORKERS > 1 требует синхронизации состояния через Redis, '
+                'веб-сервер запускается в одном процессе'
+            )
+            return None
+        return bind_shared_socket(self._config.host, self._config.port)
+
     async def start(self) -> None:
         if self._task and not self._task.done():
             logger.info('🌐 Административное веб-API уже запущено')
             return
 
+        self._socket = self._bind_shared_socket()
+        sockets = [self._socket] if self._socket is not None else None
+
         async def _serve() -> None:
             try:
-                await self._server.serve()
+                await self._server.serve(sockets=sockets)
             except Exception as error:  # pragma: no cover - логируем ошибки сервера
                 logger.exception('❌ Ошибка работы веб-API', error=error)
                 raise
@@ -98,13 +125,27 @@ class WebAPIServer:
                 await asyncio.sleep(0.1)
 
         if self._task.done() and self._task.exception():
+            self._close_socket()
             raise self._task.exception()
 
+        if self._socket is not None:
+            self._worker_pool = WebWorkerPool(self._socket, self._workers - 1)
+            self._worker_pool.start()
+            logger.info('🌐 Веб-сервер работает в нескольких процессах', workers=self._workers)
+
+    def _close_socket(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
     async def stop(self) -> None:
         if not self._task:
             return
 
         logger.info('🛑 Остановка административного API')
+        if self._worker_pool is not None:
+            await self._worker_pool.stop()
+            self._worker_pool = None
         self._server.should_exit = True
         try:
             await asyncio.wait_for(self._task, timeout=10)
@@ -117,3 +158,4 @@ class WebAPIServer:
             except asyncio.CancelledError:
                 pass
         self._task = None
+        self._close_socket()
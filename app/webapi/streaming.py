@@ -0,0 +1,144 @@
+"""Потоковая выгрузка таблиц в NDJSON/CSV для внешней отчётности.
+
+Строки читаются серверным курсором (``AsyncSession.stream`` с ``yield_per``)
+в порядке первичного ключа, поэтому память не зависит от размера таблицы, а
+прерванную выгрузку можно продолжить с последнего полученного ``id``
+(параметр ``after_id``).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import types
+from collections.abc import AsyncIterator, Callable, Iterable
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Any, Union, get_args, get_origin
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.database.database import AsyncSessionLocal
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(StrEnum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+_MEDIA_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv; charset=utf-8',
+}
+
+
+async def iter_export_rows(
+    statement: Select,
+    id_column: InstrumentedAttribute,
+    serialize: Callable[[Any], BaseModel],
+    *,
+    after_id: int = 0,
+    batch_size: int | None = None,
+) -> AsyncIterator[list[BaseModel]]:
+    """Отдаёт сериализованные строки пачками по ``batch_size`` в порядке ``id_column``.
+
+    Сессия открывается внутри генератора: ответ стримится после выхода из
+    обработчика, и сессия из зависимостей к этому моменту может быть закрыта.
+    """
+    statement = (
+        statement.where(id_column > after_id)
+        .order_by(id_column)
+        .execution_options(yield_per=batch_size or EXPORT_BATCH_SIZE)
+    )
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(statement)
+        async for partition in result.scalars().partitions():
+            batch = [serialize(row) for row in partition]
+            # Отпускаем загруженные объекты, чтобы identity map не рос вместе с выгрузкой
+            session.expunge_all()
+            yield batch
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (Union, types.UnionType):
+        for argument in get_args(annotation):
+            nested = _nested_model(argument)
+            if nested is not None:
+                return nested
+    return None
+
+
+def csv_columns(model: type[BaseModel], prefix: str = '') -> list[str]:
+    """Плоский список колонок модели; вложенные модели разворачиваются через точку."""
+    columns: list[str] = []
+    for name, field in model.model_fields.items():
+        nested = _nested_model(field.annotation)
+        if nested is not None:
+            columns.extend(csv_columns(nested, f'{prefix}{name}.'))
+        else:
+            columns.append(f'{prefix}{name}')
+    return columns
+
+
+def _flatten(data: dict[str, Any], prefix: str = '') -> dict[str, Any]:
+    flat: dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, list):
+            flat[f'{prefix}{key}'] = ';'.join(str(item) for item in value)
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def _encode_ndjson(batch: Iterable[BaseModel]) -> str:
+    return ''.join(json.dumps(item.model_dump(mode='json'), ensure_ascii=False) + '\n' for item in batch)
+
+
+async def _ndjson_body(batches: AsyncIterator[list[BaseModel]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield _encode_ndjson(batch)
+
+
+async def _csv_body(batches: AsyncIterator[list[BaseModel]], columns: list[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_flatten(item.model_dump(mode='json')) for item in batch)
+        yield buffer.getvalue()
+
+
+def export_response(
+    batches: AsyncIterator[list[BaseModel]],
+    *,
+    export_format: ExportFormat,
+    model: type[BaseModel],
+    name: str,
+) -> StreamingResponse:
+    if export_format is ExportFormat.CSV:
+        body = _csv_body(batches, csv_columns(model))
+    else:
+        body = _ndjson_body(batches)
+
+    timestamp = datetime.now(UTC).strftime('%Y%m%d_%H%M%S')
+    filename = f'{name}_{timestamp}.{export_format.value}'
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
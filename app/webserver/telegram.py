@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import dataclass
 from typing import Any
 
 import structlog
 from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
 from aiogram.types import Update
 from fastapi import APIRouter, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 
 from app.config import settings
 
+from .update_coordination import WebhookUpdateCoordinator
+
 
 logger = structlog.get_logger(__name__)
 
@@ -27,8 +31,56 @@ class TelegramWebhookOverloadedError(TelegramWebhookProcessorError):
     """Очередь переполнена и не успевает обрабатывать новые обновления."""
 
 
+class TelegramWebhookChatLimitExceededError(TelegramWebhookOverloadedError):
+    """У одного чата/пользователя накопилось слишком много необработанных обновлений."""
+
+
+@dataclass(slots=True)
+class _WebhookLane:
+    """Полоса обработки: собственная очередь и воркер для набора чатов."""
+
+    index: int
+    queue: asyncio.Queue[tuple[Update, int | None] | object]
+    processed: int = 0
+    failed: int = 0
+    peak_depth: int = 0
+
+
+def resolve_update_shard_key(update: Update) -> int | None:
+    """Возвращает ключ шардирования update: id пользователя, иначе id чата."""
+
+    try:
+        context = UserContextMiddleware.resolve_event_context(update)
+    except Exception:  # pragma: no cover - неизвестный тип update
+        return None
+
+    if context.user is not None:
+        return context.user.id
+    if context.chat is not None:
+        return context.chat.id
+    return None
+
+
+def is_payment_update(update: Update) -> bool:
+    """Платёжные update нельзя отбрасывать: деньги уже списаны или списываются."""
+
+    if update.pre_checkout_query is not None:
+        return True
+    message = update.message
+    return message is not None and (message.successful_payment is not None or message.refunded_payment is not None)
+
+
 class TelegramWebhookProcessor:
-    """Асинхронная очередь обработки Telegram webhook-ов."""
+    """Асинхронная очередь обработки Telegram webhook-ов.
+
+    Обновления распределяются по полосам (lane) по ключу пользователя/чата:
+    все обновления одного пользователя обрабатываются строго по очереди одним
+    воркером, а разные пользователи — параллельно в разных полосах.
+
+    С ``coordinator`` (несколько процессов веб-сервера) повторные доставки
+    update отбрасываются, а обработка обновлений пользователя дополнительно
+    сериализуется между процессами через Redis.
+    """
 
     def __init__(
         self,
@@ -39,6 +91,8 @@ class TelegramWebhookProcessor:
         worker_count: int,
         enqueue_timeout: float,
         shutdown_timeout: float,
+        max_pending_per_chat: int = 0,
+        coordinator: WebhookUpdateCoordinator | None = None,
     ) -> None:
         self._bot = bot
         self._dispatcher = dispatcher
@@ -46,7 +100,15 @@ class TelegramWebhookProcessor:
         self._worker_count = max(0, worker_count)
         self._enqueue_timeout = max(0.0, enqueue_timeout)
         self._shutdown_timeout = max(1.0, shutdown_timeout)
-        self._queue: asyncio.Queue[Update | object] = asyncio.Queue(maxsize=self._queue_maxsize)
+        self._max_pending_per_chat = max(0, max_pending_per_chat)
+        self._coordinator = coordinator
+        self._lane_count = max(1, self._worker_count)
+        self._lane_maxsize = max(1, -(-self._queue_maxsize // self._lane_count))
+        self._lanes: list[_WebhookLane] = self._create_lanes()
+        self._pending_per_chat: dict[int, int] = {}
+        self._rejected_overload = 0
+        self._rejected_chat_limit = 0
+        self._skipped_duplicates = 0
         self._workers: list[asyncio.Task[None]] = []
         self._running = False
         self._stop_sentinel: object = object()
@@ -56,18 +118,57 @@ class TelegramWebhookProcessor:
     def is_running(self) -> bool:
         return self._running
 
+    @property
+    def lane_count(self) -> int:
+        return self._lane_count
+
+    def _create_lanes(self) -> list[_WebhookLane]:
+        return [
+            _WebhookLane(index=index, queue=asyncio.Queue(maxsize=self._lane_maxsize))
+            for index in range(self._lane_count)
+        ]
+
+    def _select_lane(self, update: Update, shard_key: int | None) -> _WebhookLane:
+        if shard_key is None:
+            # Обновления без пользователя/чата (опросы и т.п.) не требуют порядка
+            return self._lanes[update.update_id % self._lane_count]
+        return self._lanes[shard_key % self._lane_count]
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            'running': self._running,
+            'lanes': [
+                {
+                    'index': lane.index,
+                    'depth': lane.queue.qsize(),
+                    'peak_depth': lane.peak_depth,
+                    'processed': lane.processed,
+                    'failed': lane.failed,
+                }
+                for lane in self._lanes
+            ],
+            'lane_maxsize': self._lane_maxsize,
+            'pending_chats': len(self._pending_per_chat),
+            'max_pending_per_chat': self._max_pending_per_chat,
+            'rejected_overload': self._rejected_overload,
+            'rejected_chat_limit': self._rejected_chat_limit,
+            'cross_process': self._coordinator is not None,
+            'skipped_duplicates': self._skipped_duplicates,
+        }
+
     async def start(self) -> None:
         async with self._lifecycle_lock:
             if self._running:
                 return
 
             self._running = True
-            self._queue = asyncio.Queue(maxsize=self._queue_maxsize)
+            self._lanes = self._create_lanes()
+            self._pending_per_chat.clear()
             self._workers.clear()
 
             for index in range(self._worker_count):
                 task = asyncio.create_task(
-                    self._worker_loop(index),
+                    self._worker_loop(self._lanes[index]),
                     name=f'telegram-webhook-worker-{index}',
                 )
                 self._workers.append(task)
@@ -77,10 +178,15 @@ class TelegramWebhookProcessor:
                     '🚀 Telegram webhook processor запущен: воркеров, очередь',
                     worker_count=self._worker_count,
                     queue_maxsize=self._queue_maxsize,
+                    lane_maxsize=self._lane_maxsize,
+                    max_pending_per_chat=self._max_pending_per_chat,
                 )
             else:
                 logger.warning('Telegram webhook processor запущен без воркеров — обновления не будут обрабатываться')
 
+    async def _join_lanes(self) -> None:
+        await asyncio.gather(*(lane.queue.join() for lane in self._lanes))
+
     async def stop(self) -> None:
         async with self._lifecycle_lock:
             if not self._running:
@@ -90,7 +196,7 @@ class TelegramWebhookProcessor:
 
             if self._worker_count > 0:
                 try:
-                    await asyncio.wait_for(self._queue.join(), timeout=self._shutdown_timeout)
+                    await asyncio.wait_for(self._join_lanes(), timeout=self._shutdown_timeout)
                 except TimeoutError:
                     logger.warning(
                         '⏱️ Не удалось дождаться завершения очереди Telegram webhook за секунд',
@@ -98,76 +204,119 @@ class TelegramWebhookProcessor:
                     )
             else:
                 drained = 0
-                while not self._queue.empty():
-                    try:
-                        self._queue.get_nowait()
-                    except asyncio.QueueEmpty:  # pragma: no cover - гонка состояния
-                        break
-                    else:
-                        drained += 1
-                        self._queue.task_done()
+                for lane in self._lanes:
+                    while not lane.queue.empty():
+                        try:
+                            lane.queue.get_nowait()
+                        except asyncio.QueueEmpty:  # pragma: no cover - гонка состояния
+                            break
+                        else:
+                            drained += 1
+                            lane.queue.task_done()
+                self._pending_per_chat.clear()
                 if drained:
                     logger.warning(
                         'Очередь Telegram webhook остановлена без воркеров, потеряно обновлений', drained=drained
                     )
 
-            for _ in range(len(self._workers)):
+            for lane in self._lanes[: len(self._workers)]:
                 try:
-                    self._queue.put_nowait(self._stop_sentinel)
+                    lane.queue.put_nowait(self._stop_sentinel)
                 except asyncio.QueueFull:
                     # Очередь переполнена, подождём пока освободится место
-                    await self._queue.put(self._stop_sentinel)
+                    await lane.queue.put(self._stop_sentinel)
 
             if self._workers:
                 await asyncio.gather(*self._workers, return_exceptions=True)
             self._workers.clear()
             logger.info('🛑 Telegram webhook processor остановлен')
 
+    def _acquire_chat_slot(self, shard_key: int | None, *, exempt: bool = False) -> None:
+        if shard_key is None:
+            return
+        pending = self._pending_per_chat.get(shard_key, 0)
+        if self._max_pending_per_chat and pending >= self._max_pending_per_chat and not exempt:
+            self._rejected_chat_limit += 1
+            raise TelegramWebhookChatLimitExceededError(shard_key)
+        self._pending_per_chat[shard_key] = pending + 1
+
+    def _release_chat_slot(self, shard_key: int | None) -> None:
+        if shard_key is None:
+            return
+        pending = self._pending_per_chat.get(shard_key, 0) - 1
+        if pending > 0:
+            self._pending_per_chat[shard_key] = pending
+        else:
+            self._pending_per_chat.pop(shard_key, None)
+
     async def enqueue(self, update: Update) -> None:
         if not self._running:
             raise TelegramWebhookProcessorNotRunningError
 
+        if self._coordinator is not None and not await self._coordinator.claim_update(update.update_id):
+            self._skipped_duplicates += 1
+            logger.debug('Telegram update уже принят другим процессом', update_id=update.update_id)
+            return
+
+        shard_key = resolve_update_shard_key(update)
+        lane = self._select_lane(update, shard_key)
+        # Платёжные update учитываются в лимите чата, но не отбрасываются им
+        self._acquire_chat_slot(shard_key, exempt=is_payment_update(update))
+        item = (update, shard_key)
+
         try:
             if self._enqueue_timeout <= 0:
-                self._queue.put_nowait(update)
+                lane.queue.put_nowait(item)
             else:
-                await asyncio.wait_for(self._queue.put(update), timeout=self._enqueue_timeout)
-        except asyncio.QueueFull as error:  # pragma: no cover - защитный сценарий
-            raise TelegramWebhookOverloadedError from error
-        except TimeoutError as error:
+                await asyncio.wait_for(lane.queue.put(item), timeout=self._enqueue_timeout)
+        except (asyncio.QueueFull, TimeoutError) as error:
+            self._release_chat_slot(shard_key)
+            self._rejected_overload += 1
+            if self._coordinator is not None:
+                await self._coordinator.release_update(update.update_id)
             raise TelegramWebhookOverloadedError from error
 
+        lane.peak_depth = max(lane.peak_depth, lane.queue.qsize())
+
     async def wait_until_drained(self, timeout: float | None = None) -> None:
         if not self._running or self._worker_count == 0:
             return
         if timeout is None:
-            await self._queue.join()
+            await self._join_lanes()
             return
-        await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        await asyncio.wait_for(self._join_lanes(), timeout=timeout)
 
-    async def _worker_loop(self, worker_id: int) -> None:
+    async def _worker_loop(self, lane: _WebhookLane) -> None:
+        worker_id = lane.index
         try:
             while True:
                 try:
-                    item = await self._queue.get()
+                    item = await lane.queue.get()
                 except asyncio.CancelledError:  # pragma: no cover - остановка приложения
                     logger.debug('Worker cancelled', worker_id=worker_id)
                     raise
 
                 if item is self._stop_sentinel:
-                    self._queue.task_done()
+                    lane.queue.task_done()
                     break
 
-                update = item
+                update, shard_key = item  # type: ignore[misc]
                 try:
-                    await self._dispatcher.feed_update(self._bot, update)  # type: ignore[arg-type]
+                    if self._coordinator is None:
+                        await self._dispatcher.feed_update(self._bot, update)
+                    else:
+                        async with self._coordinator.hold_shard(shard_key):
+                            await self._dispatcher.feed_update(self._bot, update)
+                    lane.processed += 1
                 except asyncio.CancelledError:  # pragma: no cover - остановка приложения
                     logger.debug('Worker cancelled during processing', worker_id=worker_id)
                     raise
                 except Exception as error:  # pragma: no cover - логируем сбой обработчика
+                    lane.failed += 1
                     logger.exception('Ошибка обработки Telegram update в worker', worker_id=worker_id, error=error)
                 finally:
-                    self._queue.task_done()
+                    self._release_chat_slot(shard_key)
+                    lane.queue.task_done()
         finally:
             logger.debug('Worker завершён', worker_id=worker_id)
 
@@ -182,6 +331,15 @@ async def _dispatch_update(
     if processor is not None:
         try:
             await processor.enqueue(update)
+        except TelegramWebhookChatLimitExceededError as error:
+            # Повторная доставка от Telegram только задержит остальных пользователей,
+            # поэтому флуд от одного чата отбрасываем, отвечая 200. Платёжные update
+            # под лимит не попадают (см. is_payment_update).
+            logger.warning(
+                'Превышен лимит необработанных обновлений для чата, update отброшен',
+                shard_key=error.args[0] if error.args else None,
+                update_id=update.update_id,
+            )
         except TelegramWebhookOverloadedError as error:
             logger.warning('Очередь Telegram webhook переполнена', error=error)
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='webhook_queue_full') from error
@@ -242,6 +400,8 @@ def create_telegram_router(
                 'webhook_configured': bool(settings.get_telegram_webhook_url()),
                 'queue_maxsize': settings.get_webhook_queue_maxsize(),
                 'workers': settings.get_webhook_worker_count(),
+                'max_pending_per_chat': settings.get_webhook_max_pending_per_chat(),
+                **({'processor': processor.get_metrics()} if processor is not None else {}),
             }
         )
 
@@ -10,13 +10,16 @@ from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse,
 from fastapi.staticfiles import StaticFiles
 
 from app.cabinet.routes import router as cabinet_router
+from app.cabinet.routes.websocket import cabinet_ws_manager
 from app.config import settings
 from app.services.disposable_email_service import disposable_email_service
 from app.services.payment_service import PaymentService
 from app.webapi.app import create_web_api_app
 from app.webapi.docs import add_redoc_endpoint
+from app.webapi.middleware import QueryStatsMiddleware
 
 from . import payments, telegram
+from .update_coordination import WebhookUpdateCoordinator
 
 
 logger = structlog.get_logger(__name__)
@@ -76,6 +79,9 @@ def _create_base_app() -> FastAPI:
             )
             app.include_router(cabinet_router)
 
+    if settings.DB_QUERY_STATS_ENABLED:
+        app.add_middleware(QueryStatsMiddleware)
+
     _attach_docs_alias(app, app.docs_url)
     return app
 
@@ -152,6 +158,9 @@ def create_unified_app(
             worker_count=settings.get_webhook_worker_count(),
             enqueue_timeout=settings.get_webhook_enqueue_timeout(),
             shutdown_timeout=settings.get_webhook_shutdown_timeout(),
+            max_pending_per_chat=settings.get_webhook_max_pending_per_chat(),
+            # Несколько процессов принимают webhook-и на одном сокете
+            coordinator=WebhookUpdateCoordinator() if settings.get_web_api_worker_count() > 1 else None,
         )
         app.state.telegram_webhook_processor = telegram_processor
         app.include_router(telegram.create_telegram_router(bot, dispatcher, processor=telegram_processor))
@@ -165,14 +174,20 @@ def create_unified_app(
         async with original_lifespan_context(fastapi_app):
             telegram_started = False
             disposable_started = False
+            cabinet_ws_started = False
             try:
                 if telegram_processor is not None:
                     await telegram_processor.start()
                     telegram_started = True
                 await disposable_email_service.start()
                 disposable_started = True
+                if settings.is_cabinet_enabled():
+                    await cabinet_ws_manager.start_pubsub()
+                    cabinet_ws_started = True
                 yield
             finally:
+                if cabinet_ws_started:
+                    await cabinet_ws_manager.stop_pubsub()
                 if disposable_started:
                     await disposable_email_service.stop()
                 if telegram_started:
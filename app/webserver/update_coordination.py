@@ -0,0 +1,166 @@
+"""Координация обработки Telegram webhook между процессами веб-сервера.
+
+При нескольких воркерах (``WEB_API_WORKERS > 1``) Telegram может доставить
+повтор одного update в другой процесс, а обновления одного пользователя —
+в разные процессы одновременно. Координатор хранит в Redis отметки о
+принятых update_id и короткоживущие блокировки по ключу шардирования, чтобы
+каждый update обрабатывался один раз, а обработчики одного пользователя не
+выполнялись параллельно. Пока обработка идёт, блокировка продлевается каждую
+треть TTL; если процесс завис или умер, она истекает сама.
+Без Redis координатор ничего не блокирует.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import structlog
+
+from app.utils.cache import cache
+
+
+logger = structlog.get_logger(__name__)
+
+UPDATE_CLAIM_TTL_SECONDS = 24 * 60 * 60
+SHARD_LOCK_TTL_MS = 60_000
+SHARD_LOCK_WAIT_SECONDS = 30.0
+SHARD_LOCK_POLL_SECONDS = 0.02
+
+# Снимаем блокировку, только если она всё ещё наша: после истечения TTL её
+# мог захватить другой процесс.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Продлеваем TTL, только пока блокировка принадлежит нам
+_RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def update_claim_key(update_id: int) -> str:
+    return f'telegram:webhook:update:{update_id}'
+
+
+def shard_lock_key(shard_key: int) -> str:
+    return f'telegram:webhook:shard:{shard_key}'
+
+
+class WebhookUpdateCoordinator:
+    def __init__(
+        self,
+        *,
+        claim_ttl_seconds: int = UPDATE_CLAIM_TTL_SECONDS,
+        lock_ttl_ms: int = SHARD_LOCK_TTL_MS,
+        lock_wait_seconds: float = SHARD_LOCK_WAIT_SECONDS,
+        poll_interval: float = SHARD_LOCK_POLL_SECONDS,
+    ) -> None:
+        self._claim_ttl_seconds = max(1, claim_ttl_seconds)
+        self._lock_ttl_ms = max(1, lock_ttl_ms)
+        self._lock_wait_seconds = max(0.0, lock_wait_seconds)
+        self._poll_interval = max(0.001, poll_interval)
+
+    async def claim_update(self, update_id: int) -> bool:
+        """Отмечает update как принятый. False — его уже принял другой процесс."""
+        redis = cache.client()
+        if redis is None:
+            return True
+        try:
+            claimed = await redis.set(update_claim_key(update_id), b'1', nx=True, ex=self._claim_ttl_seconds)
+        except Exception as error:
+            # Лучше обработать повтор, чем потерять update
+            logger.warning('Не удалось отметить Telegram update в Redis', update_id=update_id, error=error)
+            return True
+        return bool(claimed)
+
+    async def release_update(self, update_id: int) -> None:
+        """Снимает отметку, если update не удалось поставить в очередь: Telegram пришлёт его повторно."""
+        redis = cache.client()
+        if redis is None:
+            return
+        try:
+            await redis.delete(update_claim_key(update_id))
+        except Exception as error:
+            logger.warning('Не удалось снять отметку Telegram update', update_id=update_id, error=error)
+
+    async def _acquire(self, redis, key: str, token: str) -> bool:
+        deadline = time.monotonic() + self._lock_wait_seconds
+        while True:
+            if await redis.set(key, token, nx=True, px=self._lock_ttl_ms):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self._poll_interval)
+
+    async def _release(self, key: str, token: str) -> None:
+        await cache.run_script(_RELEASE_LOCK_SCRIPT, (key,), (token,))
+
+    async def _keep_alive(self, key: str, token: str, shard_key: int) -> None:
+        interval = self._lock_ttl_ms / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await cache.run_script(_RENEW_LOCK_SCRIPT, (key,), (token, self._lock_ttl_ms))
+            except Exception as error:
+                logger.warning('Не удалось продлить блокировку пользователя', shard_key=shard_key, error=error)
+                continue
+            if not renewed:
+                logger.warning('Блокировка пользователя истекла до окончания обработки', shard_key=shard_key)
+                return
+
+    @asynccontextmanager
+    async def hold_shard(self, shard_key: int | None) -> AsyncIterator[None]:
+        """Не даёт обрабатывать обновления одного пользователя в нескольких процессах одновременно.
+
+        Если блокировку не удалось получить за ``lock_wait_seconds`` (например,
+        её держит зависший процесс), обработка продолжается без неё.
+        """
+        redis = cache.client() if shard_key is not None else None
+        if redis is None:
+            yield
+            return
+
+        key = shard_lock_key(shard_key)
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self._acquire(redis, key, token)
+        except Exception as error:
+            logger.warning('Не удалось получить блокировку пользователя в Redis', shard_key=shard_key, error=error)
+            acquired = False
+        else:
+            if not acquired:
+                logger.warning(
+                    'Блокировка пользователя занята дольше лимита, обрабатываем update без неё',
+                    shard_key=shard_key,
+                    lock_wait_seconds=self._lock_wait_seconds,
+                )
+
+        keep_alive = (
+            asyncio.create_task(self._keep_alive(key, token, shard_key), name=f'shard-lock-{shard_key}')
+            if acquired
+            else None
+        )
+        try:
+            yield
+        finally:
+            if keep_alive is not None:
+                keep_alive.cancel()
+                try:
+                    await keep_alive
+                except asyncio.CancelledError:
+                    pass
+            if acquired:
+                try:
+                    await self._release(key, token)
+                except Exception as error:
+                    logger.warning('Не удалось снять блокировку пользователя', shard_key=shard_key, error=error)
@@ -0,0 +1,133 @@
+"""Пул дочерних процессов единого веб-сервера.
+
+Основной процесс открывает слушающий сокет и передаёт его воркерам
+(multiprocessing spawn): ядро распределяет входящие соединения между всеми
+процессами, включая основной. Супервизор перезапускает упавших воркеров.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import socket
+from collections.abc import Callable
+from multiprocessing.process import BaseProcess
+
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+SUPERVISE_INTERVAL_SECONDS = 1.0
+RESTART_BACKOFF_MAX_SECONDS = 30.0
+
+
+def bind_shared_socket(host: str, port: int) -> socket.socket:
+    """Открывает TCP-сокет для передачи в дочерние процессы."""
+    family = socket.AF_INET6 if host and ':' in host else socket.AF_INET
+    sock = socket.socket(family=family)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+    except OSError:
+        sock.close()
+        raise
+    sock.set_inheritable(True)
+    return sock
+
+
+def _default_target(sock: socket.socket, index: int) -> None:
+    from app.bootstrap.web_worker_startup import run_web_worker
+
+    run_web_worker(sock, index)
+
+
+class WebWorkerPool:
+    def __init__(
+        self,
+        sock: socket.socket,
+        count: int,
+        *,
+        target: Callable[[socket.socket, int], None] = _default_target,
+        stop_timeout: float = 10.0,
+    ) -> None:
+        self._sock = sock
+        self._count = max(0, count)
+        self._target = target
+        self._stop_timeout = stop_timeout
+        self._context = multiprocessing.get_context('spawn')
+        self._processes: dict[int, BaseProcess] = {}
+        self._restarts: dict[int, int] = {}
+        self._supervisor: asyncio.Task[None] | None = None
+        self._stopping = False
+
+    @property
+    def processes(self) -> dict[int, BaseProcess]:
+        return dict(self._processes)
+
+    def _spawn(self, index: int) -> BaseProcess:
+        process = self._context.Process(
+            target=self._target,
+            args=(self._sock, index),
+            name=f'web-worker-{index}',
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info('🌐 Запущен веб-воркер', index=index, pid=process.pid)
+        return process
+
+    def start(self) -> None:
+        self._stopping = False
+        # Индекс 0 у основного процесса
+        for index in range(1, self._count + 1):
+            self._spawn(index)
+        self._supervisor = asyncio.create_task(self._supervise(), name='web-worker-supervisor')
+
+    async def _supervise(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(SUPERVISE_INTERVAL_SECONDS)
+            for index, process in list(self._processes.items()):
+                if self._stopping or process.is_alive():
+                    continue
+                restarts = self._restarts.get(index, 0) + 1
+                self._restarts[index] = restarts
+                backoff = min(RESTART_BACKOFF_MAX_SECONDS, float(2 ** min(restarts - 1, 5)))
+                logger.warning(
+                    'Веб-воркер завершился, перезапуск',
+                    index=index,
+                    exitcode=process.exitcode,
+                    restarts=restarts,
+                    backoff=backoff,
+                )
+                process.close()
+                del self._processes[index]
+                await asyncio.sleep(backoff)
+                if not self._stopping:
+                    self._spawn(index)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+
+        processes = list(self._processes.values())
+        self._processes.clear()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        loop = asyncio.get_running_loop()
+        for process in processes:
+            await loop.run_in_executor(None, process.join, self._stop_timeout)
+            if process.is_alive():
+                logger.warning('Веб-воркер не остановился вовремя, принудительное завершение', pid=process.pid)
+                process.kill()
+                await loop.run_in_executor(None, process.join, 1.0)
+        if processes:
+            logger.info('🛑 Веб-воркеры остановлены', count=len(processes))
@@ -0,0 +1,37 @@
+"""add recipient cursor to broadcast_history
+
+Revision ID: 0051
+Revises: 0050
+Create Date: 2026-10-19
+
+Stores the last processed users.id of a broadcast so that recipient
+streaming can continue from that point after a restart.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0051'
+down_revision: str | None = '0050'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return False
+    return column_name in {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_column('broadcast_history', 'recipient_cursor'):
+        op.add_column('broadcast_history', sa.Column('recipient_cursor', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column('broadcast_history', 'recipient_cursor'):
+        op.drop_column('broadcast_history', 'recipient_cursor')
@@ -0,0 +1,38 @@
+"""add delivery checkpoint to broadcast_history
+
+Revision ID: 0052
+Revises: 0051
+Create Date: 2026-10-19
+
+Stores per-channel delivery state of a broadcast (cursor, counters and
+the parameters required to resume it) so that interrupted broadcasts are
+resumed automatically at startup.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0052'
+down_revision: str | None = '0051'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return False
+    return column_name in {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_column('broadcast_history', 'delivery_checkpoint'):
+        op.add_column('broadcast_history', sa.Column('delivery_checkpoint', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column('broadcast_history', 'delivery_checkpoint'):
+        op.drop_column('broadcast_history', 'delivery_checkpoint')
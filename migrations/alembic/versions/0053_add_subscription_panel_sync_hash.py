@@ -0,0 +1,37 @@
+"""add panel_sync_hash to subscriptions
+
+Revision ID: 0053
+Revises: 0052
+Create Date: 2026-10-19
+
+Stores a fingerprint of the data last pushed to the RemnaWave panel so that
+sync_users_to_panel only sends subscriptions whose panel fields changed.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0053'
+down_revision: str | None = '0052'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return False
+    return column_name in {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_column('subscriptions', 'panel_sync_hash'):
+        op.add_column('subscriptions', sa.Column('panel_sync_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column('subscriptions', 'panel_sync_hash'):
+        op.drop_column('subscriptions', 'panel_sync_hash')
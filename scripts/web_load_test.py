@@ -0,0 +1,247 @@
+"""Нагрузочный стенд единого веб-сервера: RPS в зависимости от числа воркеров.
+
+По умолчанию поднимает синтетическое приложение (разбор Telegram update,
+проверка HMAC-подписи, JSON-ответ — типичная CPU-нагрузка webhook-а) под
+uvicorn с разным числом воркеров и измеряет пропускную способность.
+С ``--url`` нагружает уже запущенный инстанс.
+
+    python scripts/web_load_test.py --workers 1,2,4 --duration 10
+    python scripts/web_load_test.py --url http://127.0.0.1:8080/health
+
+Результат печатается в JSON.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+
+SYNTHETIC_PATH = '/webhook'
+SYNTHETIC_SECRET = b'load-test-secret'
+
+SAMPLE_UPDATE: dict[str, Any] = {
+    'update_id': 1,
+    'callback_query': {
+        'id': '4382bfdwdsb323b2d9',
+        'from': {'id': 1111111, 'is_bot': False, 'first_name': 'Load', 'username': 'load_test', 'language_code': 'ru'},
+        'chat_instance': '-4125863209831279',
+        'data': 'menu_balance',
+        'message': {
+            'message_id': 42,
+            'date': 1700000000,
+            'chat': {'id': 1111111, 'type': 'private', 'first_name': 'Load'},
+            'text': 'Главное меню',
+            'reply_markup': {
+                'inline_keyboard': [
+                    [
+                        {'text': f'Кнопка {row}-{column}', 'callback_data': f'button_{row}_{column}'}
+                        for column in range(2)
+                    ]
+                    for row in range(6)
+                ]
+            },
+        },
+    },
+}
+
+
+def create_synthetic_app():
+    """ASGI-приложение, повторяющее CPU-профиль обработки webhook-а без внешних зависимостей."""
+    from aiogram.types import Update
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+
+    @app.post(SYNTHETIC_PATH)
+    async def webhook(request: Request) -> JSONResponse:
+        body = await request.body()
+        signature = hmac.new(SYNTHETIC_SECRET, body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, request.headers.get('x-signature', '')):
+            raise HTTPException(status_code=401)
+        update = Update.model_validate(json.loads(body))
+        return JSONResponse({'status': 'ok', 'update_id': update.update_id})
+
+    return app
+
+
+def _signed_body() -> tuple[bytes, dict[str, str]]:
+    body = json.dumps(SAMPLE_UPDATE, ensure_ascii=False).encode()
+    signature = hmac.new(SYNTHETIC_SECRET, body, hashlib.sha256).hexdigest()
+    return body, {'content-type': 'application/json', 'x-signature': signature}
+
+
+async def _client_loop(url: str, method: str, concurrency: int, duration: float) -> dict[str, Any]:
+    import aiohttp
+
+    body, headers = _signed_body() if method == 'POST' else (None, {})
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            try:
+                async with session.request(method, url, data=body, headers=headers) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        errors += 1
+                        continue
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started_at)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    return {'latencies': latencies, 'errors': errors}
+
+
+def _client_process(url: str, method: str, concurrency: int, duration: float) -> dict[str, Any]:
+    return asyncio.run(_client_loop(url, method, concurrency, duration))
+
+
+def run_load(url: str, *, method: str, concurrency: int, duration: float, client_processes: int) -> dict[str, Any]:
+    """Нагружает URL из нескольких процессов, чтобы клиент не стал узким местом."""
+    per_process = max(1, concurrency // client_processes)
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(client_processes) as pool:
+        chunks = pool.starmap(_client_process, [(url, method, per_process, duration)] * client_processes)
+
+    latencies = sorted(latency for chunk in chunks for latency in chunk['latencies'])
+    errors = sum(chunk['errors'] for chunk in chunks)
+    result: dict[str, Any] = {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / duration, 1),
+    }
+    if latencies:
+        result['p50_ms'] = round(statistics.median(latencies) * 1000, 2)
+        result['p99_ms'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2)
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер не поднялся на порту {port} за {timeout} с')
+
+
+def run_synthetic(workers: int, args: argparse.Namespace) -> dict[str, Any]:
+    port = _free_port()
+    command = [
+        sys.executable,
+        '-m',
+        'uvicorn',
+        f'{Path(__file__).stem}:create_synthetic_app',
+        '--factory',
+        '--app-dir',
+        str(Path(__file__).resolve().parent),
+        '--host',
+        '127.0.0.1',
+        '--port',
+        str(port),
+        '--workers',
+        str(workers),
+        '--log-level',
+        'warning',
+        '--no-access-log',
+    ]
+    server = subprocess.Popen(command)
+    try:
+        _wait_for_port(port, timeout=30)
+        # Прогрев: воркеры импортируют приложение и заполняют кеши pydantic
+        run_load(
+            f'http://127.0.0.1:{port}{SYNTHETIC_PATH}',
+            method='POST',
+            concurrency=workers * 4,
+            duration=1.0,
+            client_processes=1,
+        )
+        result = run_load(
+            f'http://127.0.0.1:{port}{SYNTHETIC_PATH}',
+            method='POST',
+            concurrency=args.concurrency,
+            duration=args.duration,
+            client_processes=args.client_processes,
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {'workers': workers, **result}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4', help='Число воркеров через запятую (синтетический режим)')
+    parser.add_argument('--url', help='Нагружать уже запущенный сервер по этому URL')
+    parser.add_argument('--method', default='GET', choices=('GET', 'POST'), help='HTTP-метод для --url')
+    parser.add_argument('--duration', type=float, default=10.0, help='Длительность замера, секунд')
+    parser.add_argument('--concurrency', type=int, default=64, help='Одновременных соединений')
+    parser.add_argument(
+        '--client-processes',
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help='Процессов нагрузочного клиента',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    args.client_processes = max(1, args.client_processes)
+
+    if args.url:
+        result = run_load(
+            args.url,
+            method=args.method,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            client_processes=args.client_processes,
+        )
+        print(json.dumps({'url': args.url, **result}, ensure_ascii=False, indent=2))
+        return
+
+    worker_counts = sorted({max(1, int(value)) for value in args.workers.split(',') if value.strip()})
+    results = [run_synthetic(workers, args) for workers in worker_counts]
+    baseline = results[0]['rps'] or 1.0
+    for result in results:
+        result['speedup'] = round(result['rps'] / baseline, 2)
+
+    report = {
+        'cpu_count': os.cpu_count(),
+        'duration_seconds': args.duration,
+        'concurrency': args.concurrency,
+        'client_processes': args.client_processes,
+        'results': results,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram import Router
+
+from app.config import settings
+from app.handlers import registry
+
+
+# Бюджет импорта app.bot: число модулей приложения, загружаемых до регистрации обработчиков.
+# Считаем модули, а не время — число детерминировано и не зависит от загрузки машины.
+APP_IMPORT_MODULE_BUDGET = 70
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+_LAZY_MODULES = ('app.handlers', 'app.handlers.registry')
+
+
+def _profile_bot_import() -> dict[str, int]:
+    """Запускает ``python -X importtime -c 'import app.bot'`` и возвращает self-time модулей (мкс)."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app.bot'],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+    self_times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _cumulative, module = line.removeprefix('import time:').split('|')
+        self_times[module.strip()] = int(self_us)
+    return self_times
+
+
+def test_bot_import_stays_within_budget() -> None:
+    """``import app.bot`` не тянет модули обработчиков и укладывается в бюджет модулей приложения."""
+    self_times = _profile_bot_import()
+    app_modules = sorted(module for module in self_times if module == 'app' or module.startswith('app.'))
+
+    handler_modules = [
+        module for module in app_modules if module.startswith('app.handlers.') and module not in _LAZY_MODULES
+    ]
+    assert handler_modules == []
+
+    app_seconds = sum(self_times[module] for module in app_modules) / 1_000_000
+    assert len(app_modules) <= APP_IMPORT_MODULE_BUDGET, (
+        f'import app.bot загрузил {len(app_modules)} модулей приложения ({app_seconds:.2f}s self-time): {app_modules}'
+    )
+
+
+@pytest.fixture
+def fake_admin_handlers(monkeypatch: pytest.MonkeyPatch) -> list[Router]:
+    registered: list[Router] = []
+    monkeypatch.setattr(registry, '_import_registrations', lambda _items: [registered.append])
+    monkeypatch.setattr(settings, 'ADMIN_IDS', '42', raising=False)
+    return registered
+
+
+@pytest.mark.asyncio
+async def test_admin_handlers_load_on_first_admin_update(fake_admin_handlers: list[Router]) -> None:
+    loader = registry.AdminHandlersLoader(Router())
+    middleware = registry.AdminHandlersLoaderMiddleware(loader)
+    handler = AsyncMock(return_value='ok')
+
+    await middleware(handler, SimpleNamespace(), {'event_from_user': SimpleNamespace(id=7)})
+    assert loader.loaded is False
+
+    result = await middleware(handler, SimpleNamespace(), {'event_from_user': SimpleNamespace(id=42)})
+    await middleware(handler, SimpleNamespace(), {'event_from_user': SimpleNamespace(id=42)})
+
+    assert result == 'ok'
+    assert loader.loaded is True
+    assert fake_admin_handlers == [loader.router]
+    assert handler.await_count == 3
@@ -44,12 +44,16 @@ async def test_start_core_runtime_stage_propagates_runtime_mode_flags(monkeypatc
     monkeypatch.setattr(startup, 'setup_bot_stage', AsyncMock(return_value=(bot, dp)))
     monkeypatch.setattr(startup, 'wire_core_services', MagicMock())
     monkeypatch.setattr(startup, 'connect_integration_services_stage', AsyncMock())
+    monkeypatch.setattr(startup, 'initialize_scheduler_leader_stage', AsyncMock())
     monkeypatch.setattr(startup, 'initialize_backup_stage', AsyncMock())
     monkeypatch.setattr(startup, 'initialize_reporting_stage', AsyncMock())
     monkeypatch.setattr(startup, 'initialize_referral_contests_stage', AsyncMock())
     monkeypatch.setattr(startup, 'initialize_contest_rotation_stage', AsyncMock())
     monkeypatch.setattr(startup, 'initialize_log_rotation_stage', AsyncMock())
     monkeypatch.setattr(startup, 'initialize_remnawave_sync_stage', AsyncMock())
+    monkeypatch.setattr(startup, 'initialize_news_views_stage', AsyncMock())
+    monkeypatch.setattr(startup, 'initialize_server_status_stage', AsyncMock())
+    monkeypatch.setattr(startup, 'start_runtime_sync_stage', AsyncMock())
     monkeypatch.setattr(startup, 'setup_payment_runtime', lambda _bot: payment_service)
 
     async def _initialize_payment_verification_stage(*_args, **_kwargs):
@@ -62,6 +66,9 @@ async def test_start_core_runtime_stage_propagates_runtime_mode_flags(monkeypatc
     async def _initialize_external_admin_stage(*_args, **_kwargs):
         call_order.append('external_admin')
 
+    async def _resume_interrupted_broadcasts_stage(*_args, **_kwargs):
+        call_order.append('broadcast_recovery')
+
     monkeypatch.setattr(
         startup,
         'initialize_payment_verification_stage',
@@ -73,6 +80,11 @@ async def test_start_core_runtime_stage_propagates_runtime_mode_flags(monkeypatc
         'initialize_external_admin_stage',
         AsyncMock(side_effect=_initialize_external_admin_stage),
     )
+    monkeypatch.setattr(
+        startup,
+        'resume_interrupted_broadcasts_stage',
+        AsyncMock(side_effect=_resume_interrupted_broadcasts_stage),
+    )
     monkeypatch.setattr(
         startup,
         'resolve_runtime_mode',
@@ -109,11 +121,11 @@ async def test_start_core_runtime_stage_propagates_runtime_mode_flags(monkeypatc
         dp,
         telegram_webhook_enabled=True,
     )
-    assert call_order == ['payment_verification', 'nalogo_queue', 'external_admin']
+    assert call_order == ['payment_verification', 'nalogo_queue', 'external_admin', 'broadcast_recovery']
 
 
 @pytest.mark.asyncio
-async def test_run_pre_runtime_bootstrap_preserves_sequence_and_bot_handoff(
+async def test_run_pre_runtime_bootstrap_respects_dependencies_and_bot_handoff(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     startup = importlib.import_module('app.bootstrap.core_runtime_startup')
@@ -156,6 +168,9 @@ async def test_run_pre_runtime_bootstrap_preserves_sequence_and_bot_handoff(
     async def _connect_integration_services_stage(*_args, **_kwargs):
         call_order.append('connect_integrations')
 
+    async def _initialize_scheduler_leader_stage(*_args, **_kwargs):
+        call_order.append('scheduler_leader')
+
     async def _initialize_backup_stage(*_args, **_kwargs):
         call_order.append('backup')
 
@@ -174,6 +189,15 @@ async def test_run_pre_runtime_bootstrap_preserves_sequence_and_bot_handoff(
     async def _initialize_remnawave_sync_stage(*_args, **_kwargs):
         call_order.append('remnawave_sync')
 
+    async def _initialize_news_views_stage(*_args, **_kwargs):
+        call_order.append('news_views')
+
+    async def _initialize_server_status_stage(*_args, **_kwargs):
+        call_order.append('server_status')
+
+    async def _start_runtime_sync_stage(*_args, **_kwargs):
+        call_order.append('runtime_sync')
+
     monkeypatch.setattr(startup, 'run_database_migration_stage', AsyncMock(side_effect=_run_database_migration_stage))
     monkeypatch.setattr(startup, 'initialize_database_stage', AsyncMock(side_effect=_initialize_database_stage))
     monkeypatch.setattr(startup, 'sync_tariffs_stage', AsyncMock(side_effect=_sync_tariffs_stage))
@@ -191,6 +215,11 @@ async def test_run_pre_runtime_bootstrap_preserves_sequence_and_bot_handoff(
         'connect_integration_services_stage',
         AsyncMock(side_effect=_connect_integration_services_stage),
     )
+    monkeypatch.setattr(
+        startup,
+        'initialize_scheduler_leader_stage',
+        AsyncMock(side_effect=_initialize_scheduler_leader_stage),
+    )
     monkeypatch.setattr(startup, 'initialize_backup_stage', AsyncMock(side_effect=_initialize_backup_stage))
     monkeypatch.setattr(startup, 'initialize_reporting_stage', AsyncMock(side_effect=_initialize_reporting_stage))
     monkeypatch.setattr(
@@ -209,29 +238,65 @@ async def test_run_pre_runtime_bootstrap_preserves_sequence_and_bot_handoff(
         'initialize_remnawave_sync_stage',
         AsyncMock(side_effect=_initialize_remnawave_sync_stage),
     )
+    monkeypatch.setattr(startup, 'initialize_news_views_stage', AsyncMock(side_effect=_initialize_news_views_stage))
+    monkeypatch.setattr(
+        startup,
+        'initialize_server_status_stage',
+        AsyncMock(side_effect=_initialize_server_status_stage),
+    )
+    monkeypatch.setattr(startup, 'start_runtime_sync_stage', AsyncMock(side_effect=_start_runtime_sync_stage))
     monkeypatch.setattr(startup, 'settings', types.SimpleNamespace(is_log_rotation_enabled=lambda: True))
 
     result = await startup._run_pre_runtime_bootstrap(timeline, logger, telegram_notifier)
 
     assert result.bot is bot
     assert result.dp is dp
-    assert call_order == [
-        'db_migration',
-        'db_init',
-        'sync_tariffs',
-        'sync_servers',
-        'payment_methods',
-        'load_bot_config',
-        'setup_bot',
-        'wire_core_services',
-        'connect_integrations',
-        'backup',
-        'reporting',
-        'referral_contests',
-        'contest_rotation',
-        'log_rotation',
-        'remnawave_sync',
-    ]
+    assert sorted(call_order) == sorted(
+        [
+            'db_migration',
+            'db_init',
+            'sync_tariffs',
+            'sync_servers',
+            'payment_methods',
+            'load_bot_config',
+            'setup_bot',
+            'wire_core_services',
+            'connect_integrations',
+            'scheduler_leader',
+            'backup',
+            'reporting',
+            'referral_contests',
+            'contest_rotation',
+            'log_rotation',
+            'remnawave_sync',
+            'news_views',
+            'server_status',
+            'runtime_sync',
+        ]
+    )
+    dependencies = {
+        'db_init': ['db_migration'],
+        'load_bot_config': ['db_init'],
+        'sync_tariffs': ['load_bot_config'],
+        'sync_servers': ['load_bot_config'],
+        'payment_methods': ['load_bot_config'],
+        'setup_bot': ['load_bot_config'],
+        'wire_core_services': ['setup_bot'],
+        'connect_integrations': ['wire_core_services'],
+        'scheduler_leader': ['setup_bot'],
+        'backup': ['wire_core_services', 'scheduler_leader'],
+        'reporting': ['wire_core_services', 'scheduler_leader'],
+        'referral_contests': ['connect_integrations', 'scheduler_leader'],
+        'contest_rotation': ['wire_core_services', 'scheduler_leader'],
+        'log_rotation': ['wire_core_services'],
+        'remnawave_sync': ['scheduler_leader'],
+        'news_views': ['scheduler_leader'],
+        'server_status': ['load_bot_config'],
+        'runtime_sync': ['setup_bot'],
+    }
+    for stage, required in dependencies.items():
+        for dependency in required:
+            assert call_order.index(dependency) < call_order.index(stage), (dependency, stage)
 
 
 @pytest.mark.asyncio
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from app.bootstrap.runtime_watchdog import _restart_task_on_exception
+import app.bootstrap.runtime_watchdog as watchdog
+from app.bootstrap.runtime_watchdog import RuntimeTasks, _reconcile_scheduler_leadership, _restart_task_on_exception
 
 
 @pytest.mark.asyncio
@@ -96,3 +97,61 @@ async def test_restart_task_on_exception_does_not_restart_when_condition_denies(
     logger.error.assert_called_once()
     logger.info.assert_not_called()
     create_task.assert_not_called()
+
+
+def _runtime_tasks(**overrides) -> RuntimeTasks:
+    values = dict.fromkeys(
+        (
+            'monitoring_task',
+            'maintenance_task',
+            'version_check_task',
+            'traffic_monitoring_task',
+            'daily_subscription_task',
+            'polling_task',
+        )
+    )
+    values.update(overrides)
+    return RuntimeTasks(**values)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_starts_jobs_when_process_becomes_leader(monkeypatch: pytest.MonkeyPatch) -> None:
+    leader = MagicMock(is_leader=True, jobs_active=False)
+    monkeypatch.setattr(watchdog, 'scheduler_leader_service', leader)
+    monkeypatch.setattr(watchdog, 'monitoring_service', MagicMock(start_monitoring=AsyncMock()))
+    monkeypatch.setattr(watchdog, 'traffic_monitoring_scheduler', MagicMock(is_enabled=lambda: False))
+    monkeypatch.setattr(watchdog, 'daily_subscription_service', MagicMock(is_enabled=lambda: False))
+    monkeypatch.setattr(watchdog, 'auto_payment_verification_service', MagicMock(is_running=lambda: True))
+    start_jobs = AsyncMock()
+    monkeypatch.setattr(watchdog, 'start_leader_service_jobs', start_jobs)
+    tasks = _runtime_tasks()
+
+    auto_verification_active = await _reconcile_scheduler_leadership(MagicMock(), tasks, False)
+
+    assert tasks.monitoring_task is not None
+    assert tasks.traffic_monitoring_task is None
+    assert auto_verification_active is True
+    assert leader.jobs_active is True
+    start_jobs.assert_awaited_once()
+    await tasks.monitoring_task
+
+
+@pytest.mark.asyncio
+async def test_reconcile_stops_jobs_when_leadership_is_lost(monkeypatch: pytest.MonkeyPatch) -> None:
+    leader = MagicMock(is_leader=False, jobs_active=True)
+    monkeypatch.setattr(watchdog, 'scheduler_leader_service', leader)
+    monitoring = MagicMock()
+    monkeypatch.setattr(watchdog, 'monitoring_service', monitoring)
+    stop_jobs = AsyncMock()
+    monkeypatch.setattr(watchdog, 'stop_leader_service_jobs', stop_jobs)
+    monitoring_task = asyncio.create_task(asyncio.sleep(3600))
+    tasks = _runtime_tasks(monitoring_task=monitoring_task)
+
+    auto_verification_active = await _reconcile_scheduler_leadership(MagicMock(), tasks, True)
+
+    assert monitoring_task.cancelled()
+    monitoring.stop_monitoring.assert_called_once()
+    assert tasks.monitoring_task is None
+    assert auto_verification_active is False
+    assert leader.jobs_active is False
+    stop_jobs.assert_awaited_once()
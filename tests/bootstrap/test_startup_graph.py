@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.bootstrap.startup_graph import StartupNode, run_startup_graph
+from app.utils.startup_timeline import StartupTimeline
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def _sleeper(events: list[str], name: str, delay: float, value: object = None):
+    async def run(_done):
+        events.append(f'start:{name}')
+        await asyncio.sleep(delay)
+        events.append(f'end:{name}')
+        return value
+
+    return run
+
+
+async def test_independent_nodes_run_concurrently() -> None:
+    events: list[str] = []
+    timeline = StartupTimeline(MagicMock(), 'test')
+    nodes = [
+        StartupNode('root', _sleeper(events, 'root', 0)),
+        StartupNode('slow', _sleeper(events, 'slow', 0.05), ('root',)),
+        StartupNode('fast', _sleeper(events, 'fast', 0.01), ('root',)),
+        StartupNode('tail', lambda done: done['fast'] or 'tail', ('fast',)),
+    ]
+
+    result = await run_startup_graph(timeline, nodes)
+
+    assert events.index('start:fast') < events.index('end:slow')
+    assert result.results['tail'] == 'tail'
+    assert result.critical_path == ['root', 'slow']
+    assert timeline.critical_path == ['root', 'slow']
+
+
+async def test_failure_cancels_pending_nodes_and_propagates() -> None:
+    events: list[str] = []
+
+    async def broken(_done):
+        raise RuntimeError('migration failed')
+
+    nodes = [
+        StartupNode('migration', broken),
+        StartupNode('slow', _sleeper(events, 'slow', 1)),
+        StartupNode('after', _sleeper(events, 'after', 0), ('migration',)),
+    ]
+
+    with pytest.raises(RuntimeError, match='migration failed'):
+        await run_startup_graph(StartupTimeline(MagicMock(), 'test'), nodes)
+
+    assert 'end:slow' not in events
+    assert 'start:after' not in events
+
+
+@pytest.mark.parametrize(
+    'nodes',
+    [
+        [StartupNode('a', lambda _done: None, ('missing',))],
+        [StartupNode('a', lambda _done: None, ('b',)), StartupNode('b', lambda _done: None, ('a',))],
+        [StartupNode('a', lambda _done: None), StartupNode('a', lambda _done: None)],
+    ],
+)
+async def test_invalid_graphs_are_rejected(nodes: list[StartupNode]) -> None:
+    with pytest.raises(ValueError):
+        await run_startup_graph(StartupTimeline(MagicMock(), 'test'), nodes)
+
+
+async def test_summary_and_report_include_critical_path() -> None:
+    logger = MagicMock()
+    timeline = StartupTimeline(logger, 'test')
+
+    async def stage(_done):
+        async with timeline.stage('Миграции', '🧬'):
+            await asyncio.sleep(0)
+
+    await run_startup_graph(timeline, [StartupNode('db_migration', stage)])
+    timeline.log_summary()
+
+    logged = ' '.join(call.args[0] for call in logger.info.call_args_list if call.args)
+    assert 'Критический путь' in logged
+    assert 'Миграции' in logged
+    report = timeline.build_report()
+    assert report['critical_path'] == ['db_migration']
+    assert report['steps'][0]['node'] == 'db_migration'
@@ -20,6 +20,7 @@ class _TimelineRecorder:
 def _build_fake_settings(**overrides):
     defaults = {
         'WEBHOOK_URL': '',
+        'STARTUP_REPORT_PATH': '',
         'WEB_API_HOST': '127.0.0.1',
         'WEB_API_PORT': 8080,
         'TRIBUTE_ENABLED': False,
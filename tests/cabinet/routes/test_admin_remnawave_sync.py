@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.cabinet.routes import admin_remnawave
+from app.webapi.routes import remnawave as webapi_remnawave
+
+
+pytestmark = pytest.mark.asyncio
+
+STATS = {'created': 0, 'updated': 1, 'skipped': 0, 'errors': 0}
+
+
+@pytest.fixture
+def panel_service(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    service = SimpleNamespace(sync_users_to_panel=AsyncMock(return_value=STATS))
+    for module in (admin_remnawave, webapi_remnawave):
+        monkeypatch.setattr(module, '_get_service', lambda: service)
+    monkeypatch.setattr(admin_remnawave, '_ensure_configured', lambda _service: None)
+    monkeypatch.setattr(webapi_remnawave, '_ensure_service_configured', lambda _service: None)
+    return service
+
+
+@pytest.mark.parametrize('force', [False, True])
+async def test_cabinet_sync_to_panel_passes_force(panel_service: SimpleNamespace, force: bool) -> None:
+    db = object()
+
+    response = await admin_remnawave.sync_to_panel(force=force, admin=SimpleNamespace(telegram_id=1), db=db)
+
+    assert response.data == STATS
+    panel_service.sync_users_to_panel.assert_awaited_once_with(db, force=force)
+
+
+@pytest.mark.parametrize('force', [False, True])
+async def test_web_api_sync_to_panel_passes_force(panel_service: SimpleNamespace, force: bool) -> None:
+    db = object()
+
+    await webapi_remnawave.sync_to_panel(force=force, _=None, db=db)
+
+    panel_service.sync_users_to_panel.assert_awaited_once_with(db, force=force)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from app.cabinet.routes import websocket
+from app.cabinet.routes.websocket import CabinetConnectionManager
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeWebSocket:
+    def __init__(self, *, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+
+    async def send_text(self, data: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+async def _settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_slow_admin_does_not_delay_other_admins(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket.settings, 'CABINET_WS_PUBSUB_ENABLED', False, raising=False)
+    manager = CabinetConnectionManager(queue_size=10, send_timeout=5.0)
+    slow = FakeWebSocket(delay=1.0)
+    fast = FakeWebSocket()
+    await manager.connect(slow, 1, is_admin=True)
+    await manager.connect(fast, 2, is_admin=True)
+
+    await asyncio.wait_for(manager.send_to_admins({'type': 'ticket.new', 'ticket_id': 5}), timeout=0.1)
+    await _settle()
+
+    assert [json.loads(item)['ticket_id'] for item in fast.sent] == [5]
+    assert slow.sent == []
+
+    await manager.disconnect(slow, 1)
+    await manager.disconnect(fast, 2)
+
+
+async def test_timed_out_socket_is_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket.settings, 'CABINET_WS_PUBSUB_ENABLED', False, raising=False)
+    manager = CabinetConnectionManager(queue_size=10, send_timeout=0.01)
+    stuck = FakeWebSocket(delay=1.0)
+    await manager.connect(stuck, 7, is_admin=False)
+
+    await manager.send_to_user(7, {'type': 'balance.change'})
+    await asyncio.sleep(0.05)
+    await _settle()
+
+    assert stuck.closed_with == 1011
+    assert 7 not in manager._user_connections
+
+
+async def test_queue_overflow_drops_socket(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket.settings, 'CABINET_WS_PUBSUB_ENABLED', False, raising=False)
+    manager = CabinetConnectionManager(queue_size=1, send_timeout=5.0)
+    slow = FakeWebSocket(delay=1.0)
+    await manager.connect(slow, 3, is_admin=False)
+    sender = manager._senders[slow]
+
+    for index in range(3):
+        await manager.send_to_user(3, {'index': index})
+    await _settle()
+
+    assert slow.closed_with == 1011
+    assert 3 not in manager._user_connections
+    # Задача отправки, застрявшая на медленном сокете, остановлена вместе с ним
+    assert sender._task.done()
+    assert sender._failure_task.done()
+
+
+async def test_publishes_and_delivers_remote_events(monkeypatch: pytest.MonkeyPatch, fake_redis: FakeRedis) -> None:
+    monkeypatch.setattr(websocket.settings, 'CABINET_WS_PUBSUB_ENABLED', True, raising=False)
+
+    sender = CabinetConnectionManager(queue_size=10, send_timeout=5.0)
+    receiver = CabinetConnectionManager(queue_size=10, send_timeout=5.0)
+    remote_socket = FakeWebSocket()
+    await receiver.connect(remote_socket, 9, is_admin=False)
+
+    await sender.send_to_user(9, {'type': 'payment.received'})
+
+    assert len(fake_redis.published) == 1
+    channel, payload = fake_redis.published[0]
+    assert channel == CabinetConnectionManager.PUBSUB_CHANNEL
+
+    # Собственные события процесс игнорирует, чужие — доставляет локально
+    sender._handle_pubsub_message(payload)
+    receiver._handle_pubsub_message(payload)
+    await _settle()
+
+    assert [json.loads(item)['type'] for item in remote_socket.sent] == ['payment.received']
+
+    await receiver.disconnect(remote_socket, 9)
+
+
+async def test_greeting_and_pong_go_through_socket_queue(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket.settings, 'CABINET_WS_PUBSUB_ENABLED', False, raising=False)
+    manager = CabinetConnectionManager(queue_size=10, send_timeout=5.0)
+    socket = FakeWebSocket()
+    await manager.connect(socket, 4, is_admin=False, greeting={'type': 'connected'})
+
+    await manager.send_to_user(4, {'type': 'balance.change'})
+    assert manager.send_to_socket(socket, {'type': 'pong'})
+    await _settle()
+
+    assert [json.loads(item)['type'] for item in socket.sent] == ['connected', 'balance.change', 'pong']
+
+    await manager.disconnect(socket, 4)
+    assert not manager.send_to_socket(socket, {'type': 'pong'})
+
+
+@pytest.mark.parametrize(
+    'payload',
+    [
+        '[]',
+        json.dumps({'target': 'user', 'data': '{}'}),
+        json.dumps({'target': 'user', 'user_id': 'abc', 'data': '{}'}),
+        json.dumps({'target': 'user', 'user_id': None, 'data': '{}'}),
+    ],
+)
+async def test_malformed_pubsub_envelope_is_skipped(monkeypatch: pytest.MonkeyPatch, payload: str) -> None:
+    monkeypatch.setattr(websocket.settings, 'CABINET_WS_PUBSUB_ENABLED', False, raising=False)
+    manager = CabinetConnectionManager(queue_size=10, send_timeout=5.0)
+
+    manager._handle_pubsub_message(payload)
@@ -0,0 +1,85 @@
+import pytest
+
+import app.services.news_view_counter_service as counter_module
+from app.services.news_view_counter_service import (
+    PENDING_VIEWS_KEY,
+    SEEN_TTL_SECONDS,
+    NewsViewCounterService,
+    seen_views_key,
+)
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+@pytest.fixture
+def applied(monkeypatch: pytest.MonkeyPatch) -> list[dict[int, int]]:
+    batches: list[dict[int, int]] = []
+
+    class _Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *_exc) -> None:
+            return None
+
+    async def fake_apply(_db, deltas: dict[int, int]) -> None:
+        batches.append(dict(deltas))
+
+    monkeypatch.setattr(counter_module, 'AsyncSessionLocal', _Session)
+    monkeypatch.setattr(counter_module, 'apply_views_deltas', fake_apply)
+    return batches
+
+
+@pytest.mark.asyncio
+async def test_views_are_deduplicated_per_user_and_day(fake_redis: FakeRedis) -> None:
+    service = NewsViewCounterService()
+
+    assert await service.record_view(1, 100) == 1
+    assert await service.record_view(1, 100) == 1
+    assert await service.record_view(1, 200) == 2
+    assert await service.record_view(2, 100) == 1
+
+    assert fake_redis.sets[seen_views_key(1)] == {b'100', b'200'}
+    assert fake_redis.ttls[seen_views_key(1)] == SEEN_TTL_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_flush_applies_one_delta_per_article(fake_redis: FakeRedis, applied: list[dict[int, int]]) -> None:
+    service = NewsViewCounterService()
+    for user_id in range(500):
+        await service.record_view(1, user_id)
+    for user_id in range(3):
+        await service.record_view(2, user_id)
+
+    assert await service.flush() == 2
+    assert applied == [{1: 500, 2: 3}]
+    assert PENDING_VIEWS_KEY not in fake_redis.hashes
+
+    assert await service.flush() == 0
+    assert len(applied) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_returns_views_to_redis(
+    fake_redis: FakeRedis, applied: list[dict[int, int]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = NewsViewCounterService()
+    await service.record_view(1, 100)
+
+    async def failing_apply(_db, _deltas) -> None:
+        raise RuntimeError('db down')
+
+    monkeypatch.setattr(counter_module, 'apply_views_deltas', failing_apply)
+    with pytest.raises(RuntimeError):
+        await service.flush()
+    await service.record_view(1, 200)
+
+    assert fake_redis.hashes[PENDING_VIEWS_KEY] == {b'1': b'2'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_without_redis_view_is_left_to_caller() -> None:
+    service = NewsViewCounterService()
+
+    assert await service.record_view(1, 100) is None
+    assert await service.flush() == 0
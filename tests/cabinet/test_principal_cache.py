@@ -0,0 +1,191 @@
+import asyncio
+import time
+from dataclasses import asdict
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import app.services.cabinet_principal_cache_service as principal_module
+from app.cabinet import dependencies
+from app.config import settings
+from app.services.cabinet_principal_cache_service import (
+    CabinetPrincipal,
+    CabinetPrincipalCacheService,
+    principal_cache_key,
+)
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+def _principal(user_id: int = 1, status: str = 'active') -> CabinetPrincipal:
+    return CabinetPrincipal(
+        id=user_id,
+        telegram_id=1000 + user_id,
+        username='user',
+        email=None,
+        email_verified=False,
+        status=status,
+    )
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> CabinetPrincipalCacheService:
+    monkeypatch.setattr(settings, 'CABINET_PRINCIPAL_CACHE_TTL_SECONDS', 30, raising=False)
+    return CabinetPrincipalCacheService()
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_per_token_in_redis(
+    service: CabinetPrincipalCacheService, fake_redis: FakeRedis
+) -> None:
+    await service.store('token-a', _principal())
+
+    assert await service.get(1, 'token-a') == _principal()
+    assert await service.get(1, 'token-b') is None
+
+    await service.invalidate(1)
+
+    assert principal_cache_key(1) not in fake_redis.hashes
+    assert await service.get(1, 'token-a') is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('fake_redis')
+async def test_stale_redis_entry_is_ignored(
+    service: CabinetPrincipalCacheService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await service.store('token', _principal())
+
+    now = time.time()
+    monkeypatch.setattr(principal_module.time, 'time', lambda: now + 31)
+
+    assert await service.get(1, 'token') is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_local_fallback_and_disabled_ttl(
+    service: CabinetPrincipalCacheService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await service.store('token', _principal())
+    assert await service.get(1, 'token') == _principal()
+
+    service.schedule_invalidation({1})
+    assert await service.get(1, 'token') is None
+
+    monkeypatch.setattr(settings, 'CABINET_PRINCIPAL_CACHE_TTL_SECONDS', 0, raising=False)
+    await service.store('token', _principal())
+    assert await service.get(1, 'token') is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_status_change_is_invalidated_after_commit(
+    service: CabinetPrincipalCacheService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(principal_module, 'cabinet_principal_cache_service', service)
+    await service.store('token', _principal(5))
+    session = SimpleNamespace(info={})
+    user = SimpleNamespace(id=5)
+    monkeypatch.setattr(principal_module, 'object_session', lambda _target: session)
+
+    principal_module._mark_user_changed(user, 'blocked', 'active', None)
+    principal_module._invalidate_after_commit(session)
+
+    assert await service.get(5, 'token') is None
+    assert principal_module._PENDING_INVALIDATION_KEY not in session.info
+
+
+def test_rollback_discards_pending_invalidation() -> None:
+    session = SimpleNamespace(info={principal_module._PENDING_INVALIDATION_KEY: {1}})
+
+    principal_module._discard_after_rollback(session)
+
+    assert session.info == {}
+
+
+def test_require_cabinet_user_rejects_unknown_relationship() -> None:
+    dependencies.require_cabinet_user('subscription', 'promo_groups')
+
+    with pytest.raises(ValueError, match='balance'):
+        dependencies.require_cabinet_user('balance')
+
+
+def _credentials(user_id: int) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme='Bearer', credentials=f'token-{user_id}')
+
+
+@pytest.fixture
+def auth_env(
+    monkeypatch: pytest.MonkeyPatch, service: CabinetPrincipalCacheService, redis_unavailable: None
+) -> dict[str, int]:
+    """Окружение _authenticate без БД: считает обращения к таблице пользователей."""
+    calls = {'db': 0}
+    users = {1: SimpleNamespace(**asdict(_principal(1))), 2: SimpleNamespace(**asdict(_principal(2, status='blocked')))}
+
+    async def fake_load(_db, user_id: int):
+        calls['db'] += 1
+        # Имитация сетевой задержки запроса к БД
+        await asyncio.sleep(0.002)
+        return users.get(user_id)
+
+    async def not_blacklisted(*_args):
+        return False, None
+
+    monkeypatch.setattr(dependencies, 'cabinet_principal_cache_service', service)
+    monkeypatch.setattr(dependencies, '_load_user_row', fake_load)
+    monkeypatch.setattr(dependencies, 'get_token_payload', lambda token, expected_type: {'sub': token.split('-')[1]})
+    monkeypatch.setattr(dependencies.blacklist_service, 'is_user_blacklisted', not_blacklisted)
+    monkeypatch.setattr(dependencies.maintenance_service, 'is_maintenance_active', lambda: False)
+    monkeypatch.setattr(settings, 'CHANNEL_IS_REQUIRED_SUB', False, raising=False)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_hit_skips_user_query(auth_env: dict[str, int]) -> None:
+    request = SimpleNamespace(headers={})
+
+    first = await dependencies.get_cabinet_principal(request, _credentials(1), db=None)
+    second = await dependencies.get_cabinet_principal(request, _credentials(1), db=None)
+
+    assert first == second == _principal(1)
+    assert auth_env['db'] == 1
+
+
+@pytest.mark.asyncio
+async def test_inactive_user_is_rejected_and_not_cached(auth_env: dict[str, int]) -> None:
+    request = SimpleNamespace(headers={})
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await dependencies.get_cabinet_principal(request, _credentials(2), db=None)
+        assert error.value.status_code == 403
+
+    assert auth_env['db'] == 2
+
+
+@pytest.mark.asyncio
+async def test_page_burst_benchmark(auth_env: dict[str, int], monkeypatch: pytest.MonkeyPatch) -> None:
+    """Страница кабинета: вход, затем пачка из 8 параллельных запросов."""
+    request = SimpleNamespace(headers={})
+    burst = 8
+
+    async def page_load() -> float:
+        await dependencies.get_cabinet_principal(request, _credentials(1), db=None)
+        started_at = time.perf_counter()
+        await asyncio.gather(
+            *(dependencies.get_cabinet_principal(request, _credentials(1), db=None) for _ in range(burst))
+        )
+        return time.perf_counter() - started_at
+
+    cached_elapsed = await page_load()
+    cached_queries = auth_env['db']
+
+    auth_env['db'] = 0
+    monkeypatch.setattr(settings, 'CABINET_PRINCIPAL_CACHE_TTL_SECONDS', 0, raising=False)
+    uncached_elapsed = await page_load()
+
+    assert cached_queries == 1
+    assert auth_env['db'] == burst + 1
+    print(f'burst={burst} cached={cached_elapsed * 1000:.2f}ms uncached={uncached_elapsed * 1000:.2f}ms')
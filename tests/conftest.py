@@ -16,7 +16,7 @@ from pathlib import Path
 import pytest
 
 
-pytest_plugins = ['tests.fixtures.promocode_fixtures']
+pytest_plugins = ['tests.fixtures.promocode_fixtures', 'tests.fixtures.redis_fixtures']
 
 
 def _install_secrets_fallback_for_sandbox() -> None:
@@ -0,0 +1,101 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import app.database.query_stats as stats_module
+from app.database.query_stats import QueryStatsRegistry, install_query_stats, query_scope
+from app.middlewares.query_stats import handler_scope_name
+from app.webapi.middleware import QueryStatsMiddleware
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> QueryStatsRegistry:
+    fresh = QueryStatsRegistry()
+    monkeypatch.setattr(stats_module, 'query_stats', fresh)
+    return fresh
+
+
+def test_queries_are_counted_per_scope(registry: QueryStatsRegistry) -> None:
+    engine = create_engine('sqlite://')
+    install_query_stats(engine)
+    install_query_stats(engine)
+
+    with engine.connect() as conn:
+        for _ in range(3):
+            with query_scope('callback_query:menu.show_main_menu'):
+                for _ in range(4):
+                    conn.execute(text('SELECT 1'))
+        with query_scope('message:start.cmd_start'):
+            conn.execute(text('SELECT 1'))
+        conn.execute(text('SELECT 1'))
+        with query_scope('message:broken'), pytest.raises(OperationalError):
+            conn.execute(text('SELECT * FROM missing_table'))
+        assert not conn.info['query_stats_start']
+    engine.dispose()
+
+    metrics = registry.get_metrics()
+    menu = metrics['scopes']['callback_query:menu.show_main_menu']
+    assert (menu['count'], menu['queries'], menu['avg_queries'], menu['max_queries']) == (3, 12, 4.0, 4)
+    assert menu['queries_histogram']['le_5'] == 3
+    assert next(iter(metrics['scopes'])) == 'callback_query:menu.show_main_menu'
+    assert metrics['scopes']['message:start.cmd_start']['queries'] == 1
+    assert metrics['scopes']['message:broken']['queries'] == 0
+    assert metrics['unscoped']['queries'] == 1
+    assert sum(metrics['query_time_histogram_ms'].values()) == 14
+
+
+def test_nested_scope_takes_over_and_overflow_is_bounded(
+    registry: QueryStatsRegistry, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(stats_module, 'MAX_SCOPES', 2)
+    with query_scope('POST /webhook') as outer:
+        registry.observe_query(stats_module._current_scope.get(), 0.001)
+        with query_scope('message:start.cmd_start') as inner:
+            registry.observe_query(stats_module._current_scope.get(), 0.001)
+    for name in ('a', 'b'):
+        with query_scope(name):
+            pass
+
+    assert (outer.queries, inner.queries) == (1, 1)
+    assert set(registry.get_metrics()['scopes']) == {'POST /webhook', 'message:start.cmd_start', '<other>'}
+
+
+def test_http_scope_is_named_by_route_template(registry: QueryStatsRegistry) -> None:
+    app = FastAPI()
+
+    @app.get('/users/{user_id}')
+    async def get_user(user_id: int) -> dict:
+        with query_scope('inner'):
+            pass
+        registry.observe_query(stats_module._current_scope.get(), 0.002)
+        return {'id': user_id}
+
+    app.add_middleware(QueryStatsMiddleware)
+    client = TestClient(app)
+    client.get('/users/1')
+    client.get('/users/2')
+    client.get('/missing')
+
+    scopes = registry.get_metrics()['scopes']
+    assert scopes['GET /users/{user_id}']['count'] == 2
+    assert scopes['GET /users/{user_id}']['queries'] == 2
+    assert scopes['GET <unmatched>']['count'] == 1
+
+
+def test_handler_scope_name_uses_handler_callback() -> None:
+    from aiogram.types import CallbackQuery
+
+    async def show_main_menu(*_args) -> None:
+        return None
+
+    show_main_menu.__module__ = 'app.handlers.menu'
+    handler = type('Handler', (), {'callback': show_main_menu})()
+    event = CallbackQuery.model_construct(id='1', data='menu')
+
+    name = handler_scope_name(event, handler)
+
+    assert name.startswith('callback_query:menu.')
+    assert name.endswith('show_main_menu')
+    assert handler_scope_name(event, None) == 'callback_query:<unhandled>'
@@ -0,0 +1,429 @@
+"""
+Общий in-memory Redis для тестов сервисов, работающих через ``cache.redis_client``.
+
+Фикстура ``fake_redis`` подключает ``cache`` к ``FakeRedis``, ``redis_unavailable`` —
+отключает его. ``FakeRedis`` хранит строки, хэши, множества, списки, sorted set-ы
+и битовые карты и, как redis-py без ``decode_responses``, отдаёт значения в байтах.
+Lua-скрипты исполняются интерпретатором Lua 5.1 из ``lupa`` (как во встроенном
+Lua Redis): ``redis.call`` вызывает те же команды ``FakeRedis``, а аргументы и ответы
+преобразуются по правилам Redis. Тест, запустивший скрипт без ``lupa``, пропускается.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+from typing import Any, Self
+
+import pytest
+
+from app.utils.cache import NoScriptError, cache
+
+
+def _key(key: str | bytes) -> str:
+    return key.decode() if isinstance(key, bytes) else str(key)
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, float):
+        return repr(value).encode()
+    return str(value).encode()
+
+
+def _sha(script: str) -> str:
+    return hashlib.sha1(script.encode(), usedforsecurity=False).hexdigest()
+
+
+def _run_sync(awaitable: Coroutine[Any, Any, Any]) -> Any:
+    """Выполняет команду ``FakeRedis`` без event loop: хранилище в памяти не уступает управление."""
+    try:
+        awaitable.send(None)
+    except StopIteration as stop:
+        return stop.value
+    awaitable.close()
+    raise RuntimeError('Команда FakeRedis приостановилась внутри Lua-скрипта')
+
+
+def _lua_argument(value: Any) -> bytes:
+    """Аргумент ``redis.call``: число Lua Redis передаёт строкой в формате ``%.17g``."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return b'%.17g' % value
+    raise TypeError('Аргументы redis.call должны быть строками или числами')
+
+
+# Команды, доступные скриптам через redis.call; аргументы приходят строками
+_LUA_COMMANDS: dict[bytes, Callable[..., Coroutine[Any, Any, Any]]] = {
+    b'GET': lambda redis, key: redis.get(key),
+    b'SET': lambda redis, key, value: redis.set(key, value),
+    b'DEL': lambda redis, *keys: redis.delete(*keys),
+    b'EXISTS': lambda redis, *keys: redis.exists(*keys),
+    b'EXPIRE': lambda redis, key, seconds: redis.expire(key, int(seconds)),
+    b'PEXPIRE': lambda redis, key, milliseconds: redis.pexpire(key, int(milliseconds)),
+    b'INCR': lambda redis, key: redis.incr(key),
+    b'HGET': lambda redis, key, field: redis.hget(key, field),
+    b'HGETALL': lambda redis, key: redis.hgetall(key),
+    b'HMGET': lambda redis, key, *fields: redis.hmget(key, fields),
+    b'HEXISTS': lambda redis, key, field: redis.hexists(key, field),
+    b'HINCRBY': lambda redis, key, field, amount: redis.hincrby(key, field, int(amount)),
+    b'HDEL': lambda redis, key, *fields: redis.hdel(key, *fields),
+    b'SADD': lambda redis, key, *members: redis.sadd(key, *members),
+    b'ZADD': lambda redis, key, *pairs: redis.zadd(key, dict(zip(pairs[1::2], map(float, pairs[::2]), strict=True))),
+    b'ZREM': lambda redis, key, *members: redis.zrem(key, *members),
+}
+
+
+def _range(items: list, start: int, stop: int) -> list:
+    """Срез с включительной правой границей и отрицательными индексами, как в LRANGE/ZRANGE."""
+    length = len(items)
+    start = max(0, length + start) if start < 0 else start
+    stop = length + stop if stop < 0 else stop
+    return items[start : stop + 1]
+
+
+class FakePipeline:
+    """Копит команды и выполняет их по порядку в ``execute``."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._commands: list[tuple[Callable[..., Awaitable[Any]], tuple, dict]] = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str) -> Callable[..., Self]:
+        command = getattr(self._redis, name)
+
+        def queue(*args, **kwargs) -> Self:
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list[Any]:
+        commands, self._commands = self._commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.strings: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.sets: dict[str, set[bytes]] = {}
+        self.lists: dict[str, list[bytes]] = {}
+        self.zsets: dict[str, dict[bytes, float]] = {}
+        self.bitmaps: dict[str, set[int]] = {}
+        # TTL только запоминается: ключи сами не истекают, тест управляет этим явно
+        self.ttls: dict[str, float] = {}
+        self.published: list[tuple[str, bytes]] = []
+        # Загруженные через SCRIPT LOAD скрипты: SHA -> текст и скомпилированная функция Lua
+        self.loaded_scripts: dict[str, str] = {}
+        self._lua_functions: dict[str, Any] = {}
+        self._lua: Any = None
+        self._lupa: Any = None
+
+    def _spaces(self) -> tuple[dict, ...]:
+        return (self.strings, self.hashes, self.sets, self.lists, self.zsets, self.bitmaps)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    # --- ключи ---
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in map(_key, keys):
+            found = [space.pop(key, None) is not None for space in self._spaces()]
+            self.ttls.pop(key, None)
+            removed += any(found)
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(any(_key(key) in space for space in self._spaces()) for key in keys)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not await self.exists(key):
+            return False
+        self.ttls[_key(key)] = float(seconds)
+        return True
+
+    async def pexpire(self, key: str, milliseconds: int) -> bool:
+        return await self.expire(key, milliseconds / 1000)
+
+    # --- строки ---
+
+    async def get(self, key: str) -> bytes | None:
+        return self.strings.get(_key(key))
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ex: int | None = None,
+        px: int | None = None,
+        nx: bool = False,
+        xx: bool = False,
+    ) -> bool | None:
+        key = _key(key)
+        if (nx and key in self.strings) or (xx and key not in self.strings):
+            return None
+        self.strings[key] = _encode(value)
+        if ex is not None or px is not None:
+            self.ttls[key] = float(ex) if ex is not None else px / 1000
+        else:
+            self.ttls.pop(key, None)
+        return True
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self.strings.get(_key(key), b'0')) + amount
+        self.strings[_key(key)] = _encode(value)
+        return value
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    # --- хэши ---
+
+    async def hset(self, key: str, field: Any = None, value: Any = None, mapping: dict[Any, Any] | None = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        values = self.hashes.setdefault(_key(key), {})
+        added = 0
+        for item_field, item_value in items.items():
+            added += _encode(item_field) not in values
+            values[_encode(item_field)] = _encode(item_value)
+        return added
+
+    async def hget(self, key: str, field: Any) -> bytes | None:
+        return self.hashes.get(_key(key), {}).get(_encode(field))
+
+    async def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return dict(self.hashes.get(_key(key), {}))
+
+    async def hmget(self, key: str, fields: Iterable[Any], *more_fields: Any) -> list[bytes | None]:
+        values = self.hashes.get(_key(key), {})
+        return [values.get(_encode(field)) for field in (*fields, *more_fields)]
+
+    async def hexists(self, key: str, field: Any) -> bool:
+        return _encode(field) in self.hashes.get(_key(key), {})
+
+    async def hincrby(self, key: str, field: Any, amount: int = 1) -> int:
+        values = self.hashes.setdefault(_key(key), {})
+        current = int(values.get(_encode(field), b'0')) + amount
+        values[_encode(field)] = _encode(current)
+        return current
+
+    async def hdel(self, key: str, *fields: Any) -> int:
+        values = self.hashes.get(_key(key), {})
+        return sum(values.pop(_encode(field), None) is not None for field in fields)
+
+    # --- множества и битовые карты ---
+
+    async def sadd(self, key: str, *members: Any) -> int:
+        values = self.sets.setdefault(_key(key), set())
+        before = len(values)
+        values.update(map(_encode, members))
+        return len(values) - before
+
+    async def smembers(self, key: str) -> set[bytes]:
+        return set(self.sets.get(_key(key), set()))
+
+    async def sismember(self, key: str, member: Any) -> bool:
+        return _encode(member) in self.sets.get(_key(key), set())
+
+    async def scard(self, key: str) -> int:
+        return len(self.sets.get(_key(key), set()))
+
+    async def setbit(self, key: str, offset: int, value: int) -> int:
+        bits = self.bitmaps.setdefault(_key(key), set())
+        previous = int(offset in bits)
+        if value:
+            bits.add(offset)
+        else:
+            bits.discard(offset)
+        return previous
+
+    async def getbit(self, key: str, offset: int) -> int:
+        return int(offset in self.bitmaps.get(_key(key), set()))
+
+    # --- списки ---
+
+    async def lpush(self, key: str, *values: Any) -> int:
+        items = self.lists.setdefault(_key(key), [])
+        for value in values:
+            items.insert(0, _encode(value))
+        return len(items)
+
+    async def rpush(self, key: str, *values: Any) -> int:
+        items = self.lists.setdefault(_key(key), [])
+        items.extend(map(_encode, values))
+        return len(items)
+
+    async def llen(self, key: str) -> int:
+        return len(self.lists.get(_key(key), []))
+
+    async def lrange(self, key: str, start: int, stop: int) -> list[bytes]:
+        return _range(self.lists.get(_key(key), []), start, stop)
+
+    async def lrem(self, key: str, count: int, value: Any) -> int:
+        items = self.lists.get(_key(key), [])
+        target = _encode(value)
+        positions = [index for index, item in enumerate(items) if item == target]
+        if count < 0:
+            positions = positions[::-1][:-count]
+        elif count > 0:
+            positions = positions[:count]
+        for index in sorted(positions, reverse=True):
+            del items[index]
+        return len(positions)
+
+    async def lmove(self, source: str, destination: str, src: str = 'LEFT', dest: str = 'RIGHT') -> bytes | None:
+        items = self.lists.get(_key(source))
+        if not items:
+            return None
+        value = items.pop() if src.upper() == 'RIGHT' else items.pop(0)
+        target = self.lists.setdefault(_key(destination), [])
+        if dest.upper() == 'LEFT':
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    # --- sorted set-ы ---
+
+    def _ordered(self, key: str) -> list[bytes]:
+        members = self.zsets.get(_key(key), {})
+        return sorted(members, key=lambda member: (members[member], member), reverse=True)
+
+    async def zadd(self, key: str, mapping: dict[Any, float]) -> int:
+        members = self.zsets.setdefault(_key(key), {})
+        added = sum(_encode(member) not in members for member in mapping)
+        members.update({_encode(member): float(score) for member, score in mapping.items()})
+        return added
+
+    async def zincrby(self, key: str, amount: float, member: Any) -> float:
+        members = self.zsets.setdefault(_key(key), {})
+        members[_encode(member)] = members.get(_encode(member), 0.0) + amount
+        return members[_encode(member)]
+
+    async def zrem(self, key: str, *members: Any) -> int:
+        values = self.zsets.get(_key(key), {})
+        return sum(values.pop(_encode(member), None) is not None for member in members)
+
+    async def zscore(self, key: str, member: Any) -> float | None:
+        return self.zsets.get(_key(key), {}).get(_encode(member))
+
+    async def zcard(self, key: str) -> int:
+        return len(self.zsets.get(_key(key), {}))
+
+    async def zrevrange(
+        self, key: str, start: int, stop: int, withscores: bool = False
+    ) -> list[bytes] | list[tuple[bytes, float]]:
+        members = _range(self._ordered(key), start, stop)
+        if not withscores:
+            return members
+        scores = self.zsets.get(_key(key), {})
+        return [(member, scores[member]) for member in members]
+
+    async def zrevrangebyscore(self, key: str, max: float, min: float) -> list[bytes]:
+        scores = self.zsets.get(_key(key), {})
+        return [member for member in self._ordered(key) if float(min) <= scores[member] <= float(max)]
+
+    async def zrevrank(self, key: str, member: Any) -> int | None:
+        ordered = self._ordered(key)
+        return ordered.index(_encode(member)) if _encode(member) in ordered else None
+
+    # --- скрипты и pub/sub ---
+
+    def _lua_call(self, command: bytes, *args: Any) -> Any:
+        handler = _LUA_COMMANDS.get(command.upper())
+        if handler is None:
+            raise NotImplementedError(f'Команда {command.decode()} не поддерживается Lua-скриптами FakeRedis')
+        return self._to_lua(_run_sync(handler(self, *map(_lua_argument, args))))
+
+    def _to_lua(self, reply: Any) -> Any:
+        """Ответ команды в значение Lua: nil — ``false``, целые — числа, массивы — таблицы."""
+        if reply is None:
+            return False
+        if isinstance(reply, bool):
+            return int(reply)
+        if isinstance(reply, float):
+            return _encode(reply)
+        if isinstance(reply, dict):
+            reply = [item for pair in reply.items() for item in pair]
+        if isinstance(reply, list | tuple | set):
+            return self._lua.table_from([self._to_lua(item) for item in reply])
+        return reply
+
+    def _from_lua(self, value: Any) -> Any:
+        """Результат скрипта в ответ Redis: числа усекаются до целых, массив читается до первого nil."""
+        if value is None or value is False:
+            return None
+        if value is True:
+            return 1
+        if isinstance(value, int | float):
+            return int(value)
+        if self._lupa.lua_type(value) == 'table':
+            items = []
+            index = 1
+            while value[index] is not None:
+                items.append(self._from_lua(value[index]))
+                index += 1
+            return items
+        return value
+
+    def _lua_function(self, sha: str) -> Any:
+        function = self._lua_functions.get(sha)
+        if function is not None:
+            return function
+        script = self.loaded_scripts.get(sha)
+        if script is None:
+            raise NoScriptError('NOSCRIPT No matching script. Please use EVAL.')
+        if self._lua is None:
+            self._lupa = pytest.importorskip('lupa.lua51')
+            self._lua = self._lupa.LuaRuntime(encoding=None)
+            self._lua.eval('function(call) redis = {call = call} end')(self._lua_call)
+        function = self._lua_functions[sha] = self._lua.eval(f'function(KEYS, ARGV)\n{script}\nend')
+        return function
+
+    async def script_load(self, script: str) -> str:
+        sha = _sha(script)
+        self.loaded_scripts[sha] = script
+        return sha
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any:
+        function = self._lua_function(sha)
+        keys = self._lua.table_from([_encode(key) for key in keys_and_args[:numkeys]])
+        args = self._lua.table_from([_encode(arg) for arg in keys_and_args[numkeys:]])
+        return self._from_lua(function(keys, args))
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        return await self.evalsha(await self.script_load(script), numkeys, *keys_and_args)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        self.published.append((_key(channel), _encode(message)))
+        return 0
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    """Подключённый ``cache`` поверх in-memory Redis."""
+    redis = FakeRedis()
+    monkeypatch.setattr(cache, 'redis_client', redis)
+    monkeypatch.setattr(cache, '_connected', True)
+    return redis
+
+
+@pytest.fixture
+def redis_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """``cache`` без подключения к Redis."""
+    monkeypatch.setattr(cache, 'redis_client', None)
+    monkeypatch.setattr(cache, '_connected', False)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.config import settings
+from app.services.broadcast_checkpoint import (
+    BroadcastCheckpoint,
+    BroadcastDeliveryLedger,
+    read_checkpoint,
+    write_checkpoint,
+)
+from app.services.broadcast_recipients import TelegramRecipient
+from app.services.broadcast_service import BroadcastConfig, BroadcastService, EmailBroadcastService
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_checkpoint_roundtrip_keeps_other_channels() -> None:
+    raw = write_checkpoint({'email': {'cursor': 3}}, 'telegram', BroadcastCheckpoint(target='all', cursor=7, sent=2))
+
+    assert read_checkpoint(raw, 'telegram') == BroadcastCheckpoint(target='all', cursor=7, sent=2)
+    assert read_checkpoint(raw, 'email').cursor == 3
+    assert read_checkpoint(None, 'telegram') is None
+
+
+async def test_ledger_reports_handled_recipients(fake_redis: FakeRedis) -> None:
+    ledger = BroadcastDeliveryLedger(1, 'telegram')
+
+    await ledger.record(delivered=[1, 2], blocked=[3], failed=[4])
+
+    assert await ledger.lookup([1, 2, 3, 4, 5]) == {1: 'delivered', 2: 'delivered', 3: 'blocked'}
+
+
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_ledger_is_noop_without_redis() -> None:
+    ledger = BroadcastDeliveryLedger(1, 'telegram')
+
+    await ledger.record(delivered=[1])
+
+    assert await ledger.lookup([1]) == {}
+
+
+async def test_send_batched_skips_recipients_delivered_before_restart(fake_redis: FakeRedis) -> None:
+    await BroadcastDeliveryLedger(7, 'telegram').record(delivered=[1], blocked=[2])
+
+    service = BroadcastService()
+    service._deliver_message = AsyncMock()
+    service._update_progress = AsyncMock()
+
+    async def pages():
+        yield [TelegramRecipient(user_id=user_id, telegram_id=user_id * 10) for user_id in (1, 2, 3)]
+
+    progress = BroadcastCheckpoint()
+    await service._send_batched(
+        7,
+        pages(),
+        BroadcastConfig(target='all', message_text='hi', selected_buttons=[]),
+        None,
+        asyncio.Event(),
+        progress,
+    )
+
+    service._deliver_message.assert_awaited_once()
+    assert service._deliver_message.await_args.args[0] == 30
+    assert (progress.sent, progress.blocked, progress.cursor) == (2, 1, 3)
+    assert 3 in fake_redis.bitmaps['broadcast:7:telegram:delivered']
+
+
+async def test_shutdown_cancellation_keeps_broadcast_resumable(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'BROADCAST_AUTO_RESUME_ENABLED', True, raising=False)
+    service = BroadcastService()
+    service._update_progress = AsyncMock()
+    service._mark_cancelled = AsyncMock()
+
+    record = SimpleNamespace(status='in_progress', delivery_checkpoint={'telegram': {'cursor': 5, 'sent': 4}})
+
+    class _Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, *_args, **_kwargs):
+            return record
+
+        async def commit(self):
+            return None
+
+    monkeypatch.setattr('app.services.broadcast_service.AsyncSessionLocal', _Session)
+    service._send_batched = AsyncMock(side_effect=asyncio.CancelledError)
+
+    with pytest.raises(asyncio.CancelledError):
+        await service._run_broadcast(
+            9, BroadcastConfig(target='all', message_text='hi', selected_buttons=['home']), asyncio.Event()
+        )
+
+    service._mark_cancelled.assert_not_awaited()
+    checkpoint = service._update_progress.await_args.kwargs['checkpoint']
+    assert (checkpoint.cursor, checkpoint.sent, checkpoint.selected_buttons) == (5, 4, ['home'])
+
+
+async def test_config_is_restored_from_record() -> None:
+    record = SimpleNamespace(
+        target_type='all',
+        message_text='hello',
+        has_media=True,
+        media_type='photo',
+        media_file_id='file-1',
+        media_caption=None,
+        admin_name='admin',
+        delivery_checkpoint={'telegram': {'target': 'active', 'selected_buttons': ['balance']}},
+    )
+
+    config = BroadcastService._config_from_record(record)
+
+    assert config.target == 'active'
+    assert config.selected_buttons == ['balance']
+    assert config.media.file_id == 'file-1'
+    assert config.media.caption == 'hello'
+
+
+class _ResumeSession:
+    def __init__(self, records: list) -> None:
+        self.records = records
+        self.statements: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.records))
+
+
+def _history(broadcast_id: int, checkpoint: dict | None, **fields) -> SimpleNamespace:
+    values = {
+        'id': broadcast_id,
+        'channel': 'both',
+        'target_type': 'all',
+        'message_text': 'hi',
+        'has_media': False,
+        'media_type': None,
+        'media_file_id': None,
+        'media_caption': None,
+        'admin_name': 'admin',
+        'email_subject': 'subject',
+        'email_html_content': '<p>hi</p>',
+        'delivery_checkpoint': checkpoint,
+    }
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+async def test_resume_skips_broadcasts_without_checkpoint(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _ResumeSession(
+        [
+            # Рассылка из бота и запись до обновления: контрольной точки канала нет
+            _history(1, None),
+            _history(2, {'email': {'cursor': 10}}),
+            _history(3, {'telegram': {'target': 'active', 'cursor': 40, 'selected_buttons': ['home']}}),
+        ]
+    )
+    monkeypatch.setattr('app.services.broadcast_service.AsyncSessionLocal', lambda: session)
+    service = BroadcastService()
+    service.set_bot(AsyncMock())
+    service.start_broadcast = AsyncMock()
+
+    assert await service.resume_interrupted() == [3]
+
+    config = service.start_broadcast.await_args.args[1]
+    assert (config.target, config.selected_buttons) == ('active', ['home'])
+    assert 'broadcast_history.created_at >=' in str(session.statements[0])
+
+
+async def test_email_resume_skips_broadcasts_without_checkpoint(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _ResumeSession([_history(1, None), _history(2, {'email': {'cursor': 10}})])
+    monkeypatch.setattr('app.services.broadcast_service.AsyncSessionLocal', lambda: session)
+    service = EmailBroadcastService()
+    service.set_email_service(SimpleNamespace(is_configured=lambda: True))
+    service.start_broadcast = AsyncMock()
+
+    assert await service.resume_interrupted() == [2]
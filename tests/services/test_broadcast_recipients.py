@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from sqlalchemy.dialects import postgresql
+
+import app.services.broadcast_recipients as recipients_module
+from app.services.broadcast_checkpoint import BroadcastCheckpoint
+from app.services.broadcast_recipients import (
+    TelegramRecipient,
+    build_email_target_condition,
+    build_telegram_target_condition,
+    iter_telegram_recipients,
+)
+from app.services.broadcast_service import BroadcastConfig, BroadcastService
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, pages: list[list[SimpleNamespace]], statements: list) -> None:
+        self._pages = pages
+        self._statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self._statements.append(statement)
+        return _FakeResult(self._pages.pop(0) if self._pages else [])
+
+
+def _compile(condition) -> str:
+    return str(condition.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize(
+    'target',
+    ['all', 'active', 'trial', 'no', 'expiring', 'expired', 'zero', 'autopay_failed', 'custom_week', 'tariff_3'],
+)
+async def test_known_telegram_targets_compile_to_sql(target: str) -> None:
+    sql = _compile(build_telegram_target_condition(target))
+
+    assert 'users.status' in sql
+    assert 'users.telegram_id IS NOT NULL' in sql
+
+
+async def test_unknown_targets_have_no_condition() -> None:
+    assert build_telegram_target_condition('unknown') is None
+    assert build_telegram_target_condition('custom_unknown') is None
+    assert build_telegram_target_condition('tariff_x') is None
+    assert build_email_target_condition('all') is None
+
+
+async def test_iter_telegram_recipients_uses_keyset_pages(monkeypatch: pytest.MonkeyPatch) -> None:
+    statements: list = []
+    pages = [
+        [SimpleNamespace(id=3, telegram_id=30), SimpleNamespace(id=7, telegram_id=70)],
+        [SimpleNamespace(id=9, telegram_id=90)],
+    ]
+    monkeypatch.setattr(recipients_module, 'AsyncSessionLocal', lambda: _FakeSession(pages, statements))
+
+    received = [page async for page in iter_telegram_recipients('all', after_user_id=1, page_size=2)]
+
+    assert received == [
+        [TelegramRecipient(user_id=3, telegram_id=30), TelegramRecipient(user_id=7, telegram_id=70)],
+        [TelegramRecipient(user_id=9, telegram_id=90)],
+    ]
+    assert len(statements) == 2
+    first, second = (statement.compile(dialect=postgresql.dialect()).params for statement in statements)
+    assert 1 in first.values()
+    assert 7 in second.values()
+
+
+async def test_send_batched_persists_recipient_cursor(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = BroadcastService()
+    service._deliver_message = AsyncMock()
+    service._update_progress = AsyncMock()
+    monkeypatch.setattr('app.services.broadcast_service._PROGRESS_MIN_INTERVAL_SEC', 0.0)
+
+    async def pages():
+        yield [TelegramRecipient(user_id=5, telegram_id=50), TelegramRecipient(user_id=8, telegram_id=80)]
+
+    progress = BroadcastCheckpoint(sent=10, cursor=4)
+    cancelled = await service._send_batched(
+        1,
+        pages(),
+        BroadcastConfig(target='all', message_text='hi', selected_buttons=[]),
+        None,
+        asyncio.Event(),
+        progress,
+    )
+
+    assert cancelled is False
+    assert progress.sent == 12
+    assert progress.cursor == 8
+    service._update_progress.assert_awaited_with(1, 12, 0, 0, checkpoint=progress)
+
+
+async def test_send_batched_does_not_resubmit_after_flood_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = BroadcastService()
+    service._update_progress = AsyncMock()
+    submit = AsyncMock(
+        side_effect=TelegramRetryAfter(method=MagicMock(), message='Flood control exceeded', retry_after=1)
+    )
+    monkeypatch.setattr('app.services.broadcast_service.telegram_send_scheduler.submit', submit)
+
+    async def pages():
+        yield [TelegramRecipient(user_id=5, telegram_id=50)]
+
+    progress = BroadcastCheckpoint()
+    await service._send_batched(
+        1,
+        pages(),
+        BroadcastConfig(target='all', message_text='hi', selected_buttons=[]),
+        None,
+        asyncio.Event(),
+        progress,
+    )
+
+    submit.assert_awaited_once()
+    assert progress.failed == 1
+    assert progress.sent == 0
@@ -0,0 +1,95 @@
+"""Тесты скомпилированного плана меню."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.menu_layout.context import MenuContext
+from app.services.menu_layout.plan import compile_conditions, tokenize_template
+from app.services.menu_layout.service import MenuLayoutService
+
+
+CONFIG = {
+    'rows': [
+        {'id': 'main', 'buttons': ['balance', 'support'], 'max_per_row': 1},
+        {'id': 'admin', 'buttons': ['admin'], 'conditions': {'is_admin': True}},
+    ],
+    'buttons': {
+        'balance': {
+            'type': 'builtin',
+            'text': {'ru': 'Баланс: {balance}', 'en': 'Balance: {balance}'},
+            'action': 'menu_balance',
+            'icon': '💰',
+            'dynamic_text': True,
+        },
+        'support': {'type': 'builtin', 'text': {'en': 'Support'}, 'action': 'menu_support'},
+        'admin': {'type': 'builtin', 'text': {'ru': 'Админка'}, 'action': 'admin_panel', 'visibility': 'admins'},
+    },
+}
+
+
+@pytest.fixture
+def menu_config(monkeypatch):
+    MenuLayoutService.invalidate_cache()
+    monkeypatch.setattr(MenuLayoutService, 'get_config', AsyncMock(return_value=CONFIG))
+    yield CONFIG
+    MenuLayoutService.invalidate_cache()
+
+
+@pytest.mark.asyncio
+async def test_repeated_render_reuses_cached_keyboard(menu_config):
+    context = MenuContext(language='ru', balance_kopeks=10000, registration_days=5)
+
+    first = await MenuLayoutService.build_keyboard(None, context)
+    # Поля, не влияющие на вывод, не меняют ключ кеша
+    second = await MenuLayoutService.build_keyboard(
+        None, MenuContext(language='ru', balance_kopeks=10000, registration_days=400)
+    )
+
+    assert second is first
+    texts = [[button.text for button in row] for row in first.inline_keyboard]
+    assert texts[0][0].startswith('💰 Баланс: ')
+    assert texts[1] == ['Support']
+
+
+@pytest.mark.asyncio
+async def test_output_changes_with_relevant_context(menu_config):
+    base = await MenuLayoutService.build_keyboard(None, MenuContext(language='ru', balance_kopeks=10000))
+    richer = await MenuLayoutService.build_keyboard(None, MenuContext(language='ru', balance_kopeks=20000))
+    admin = await MenuLayoutService.build_keyboard(
+        None, MenuContext(language='ru', balance_kopeks=10000, is_admin=True)
+    )
+
+    assert richer is not base
+    assert richer.inline_keyboard[0][0].text != base.inline_keyboard[0][0].text
+    assert len(base.inline_keyboard) == 2
+    assert admin.inline_keyboard[-1][0].callback_data == 'admin_panel'
+
+
+@pytest.mark.asyncio
+async def test_plan_is_recompiled_after_invalidation(menu_config):
+    plan = await MenuLayoutService.get_plan(None)
+    assert await MenuLayoutService.get_plan(None) is plan
+
+    MenuLayoutService.invalidate_cache()
+
+    assert await MenuLayoutService.get_plan(None) is not plan
+
+
+def test_compiled_conditions_match_semantics():
+    predicate = compile_conditions({'min_balance_kopeks': 100, 'show_trial': True, 'promo_group_ids': [1, 2]})
+
+    assert predicate(MenuContext(balance_kopeks=100, promo_group_id=2))
+    assert not predicate(MenuContext(balance_kopeks=99, promo_group_id=2))
+    assert not predicate(MenuContext(balance_kopeks=100, promo_group_id=3))
+    assert not predicate(MenuContext(balance_kopeks=100, promo_group_id=1, has_active_subscription=True))
+    assert compile_conditions({'is_admin': False})(MenuContext())
+
+
+def test_template_tokens_substitute_once():
+    assert tokenize_template('Без плейсхолдеров') is None
+    assert tokenize_template('{username}: {referral_count} шт.') == (
+        ('', 'username'),
+        (': ', 'referral_count'),
+        (' шт.', None),
+    )
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.lib.nalogo._http import AsyncHTTPClient, AuthProvider
+from app.services.nalogo_queue_service import NalogoQueueService
+from app.services.nalogo_service import NALOGO_PROCESSING_KEY, NALOGO_QUEUE_KEY, NaloGoService
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class _StubNaloGoService(NaloGoService):
+    def __init__(self, outcomes: dict[str, str | None]) -> None:
+        self.configured = True
+        self._auth_lock = asyncio.Lock()
+        self.outcomes = outcomes
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create_receipt(self, *, payment_id: str, **_kwargs) -> str | None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.outcomes.get(payment_id, f'uuid-{payment_id}')
+
+
+@pytest.fixture
+def queue_redis(fake_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    monkeypatch.setattr(settings, 'NALOGO_QUEUE_RECEIPT_DELAY', 0, raising=False)
+    monkeypatch.setattr(settings, 'NALOGO_QUEUE_CONCURRENCY', 3, raising=False)
+    return fake_redis
+
+
+async def _enqueue(redis: FakeRedis, *payment_ids: str) -> None:
+    for payment_id in payment_ids:
+        await redis.lpush(NALOGO_QUEUE_KEY, json.dumps({'payment_id': payment_id, 'amount': 10, 'attempts': 0}))
+
+
+async def test_queue_is_drained_concurrently(queue_redis: FakeRedis) -> None:
+    await _enqueue(queue_redis, *(f'p{index}' for index in range(6)))
+    nalogo = _StubNaloGoService({})
+    service = NalogoQueueService(nalogo)
+
+    await service._process_pending_receipts()
+
+    assert nalogo.max_in_flight == 3
+    assert queue_redis.lists[NALOGO_QUEUE_KEY] == []
+    assert queue_redis.lists[NALOGO_PROCESSING_KEY] == []
+
+
+async def test_failed_receipt_is_requeued_and_drain_stops(
+    queue_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, 'NALOGO_QUEUE_CONCURRENCY', 1, raising=False)
+    await _enqueue(queue_redis, 'p1', 'p2')
+    service = NalogoQueueService(_StubNaloGoService({'p1': None}))
+
+    await service._process_pending_receipts()
+
+    queued = [json.loads(item) for item in queue_redis.lists[NALOGO_QUEUE_KEY]]
+    assert [(item['payment_id'], item['attempts']) for item in queued] == [('p1', 1), ('p2', 0)]
+    assert queue_redis.lists[NALOGO_PROCESSING_KEY] == []
+
+
+async def test_receipts_left_in_processing_are_recovered(queue_redis: FakeRedis) -> None:
+    queue_redis.lists[NALOGO_PROCESSING_KEY] = [json.dumps({'payment_id': 'lost'}).encode()]
+    nalogo = _StubNaloGoService({})
+
+    assert await nalogo.recover_processing_receipts() == 1
+    assert json.loads(queue_redis.lists[NALOGO_QUEUE_KEY][-1])['payment_id'] == 'lost'
+    assert queue_redis.lists[NALOGO_PROCESSING_KEY] == []
+
+
+async def test_concurrent_receipts_share_one_login() -> None:
+    nalogo = _StubNaloGoService({})
+    token: dict = {}
+    logins = 0
+
+    async def authenticate() -> bool:
+        nonlocal logins
+        logins += 1
+        await asyncio.sleep(0.01)
+        token['token'] = 'access'
+        return True
+
+    async def get_token():
+        return token
+
+    nalogo.client = SimpleNamespace(auth_provider=SimpleNamespace(get_token=get_token))
+    nalogo.authenticate = authenticate
+
+    results = await asyncio.gather(*(nalogo._ensure_authenticated() for _ in range(5)))
+
+    assert all(results)
+    assert logins == 1
+
+
+class _StaticAuth(AuthProvider):
+    async def get_token(self):
+        return {'token': 'access'}
+
+    async def refresh(self, refresh_token: str):
+        return None
+
+
+async def test_http_client_reuses_pooled_session() -> None:
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers['Authorization'])
+        return httpx.Response(200, json={'ok': True})
+
+    http_client = AsyncHTTPClient('https://nalog.test/api', _StaticAuth())
+    http_client._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    session = http_client.session()
+
+    await http_client.get('/income')
+    await http_client.get('/income')
+
+    assert http_client.session() is session
+    assert seen == ['Bearer access', 'Bearer access']
+    await http_client.aclose()
+    assert session.is_closed
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.referral_contest_leaderboard_service as leaderboard_module
+from app.services.referral_contest_leaderboard_service import (
+    ContestScore,
+    ReferralContestLeaderboardService,
+    _zset_score,
+    contest_leaderboard_key,
+    contest_scores_key,
+)
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+START = datetime(2026, 10, 1, tzinfo=UTC)
+END = datetime(2026, 10, 31, tzinfo=UTC)
+
+
+@pytest.fixture
+def db_scores(monkeypatch: pytest.MonkeyPatch) -> dict:
+    state = {'rows': [(1, 2, 500), (2, 5, 0), (3, 2, 900)], 'calls': 0}
+
+    async def fake_get_contest_scores(_db, _contest_id, *, start, end):
+        state['calls'] += 1
+        return list(state['rows'])
+
+    monkeypatch.setattr(leaderboard_module, 'get_contest_scores', fake_get_contest_scores)
+    return state
+
+
+def _contest(contest_id: int = 7) -> SimpleNamespace:
+    return SimpleNamespace(id=contest_id, start_at=START, end_at=END)
+
+
+@pytest.mark.asyncio
+async def test_top_is_seeded_once_and_then_served_from_redis(fake_redis: FakeRedis, db_scores: dict) -> None:
+    service = ReferralContestLeaderboardService()
+
+    first = await service.get_top(None, _contest(), limit=2)
+    second = await service.get_top(None, _contest(), limit=2)
+
+    assert first == second == [ContestScore(2, 5, 0), ContestScore(3, 2, 900)]
+    assert db_scores['calls'] == 1
+
+
+@pytest.mark.asyncio
+async def test_recorded_events_update_top(fake_redis: FakeRedis, db_scores: dict) -> None:
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+    await service.rebuild(None, contest)
+    now = START + timedelta(days=3)
+
+    for _ in range(4):
+        await service.record_event(contest.id, 1, occurred_at=now, count_delta=1, amount_delta=100)
+    await service.record_event(contest.id, 4, occurred_at=now, count_delta=1)
+
+    assert await service.get_top(None, contest, limit=2) == [ContestScore(1, 6, 900), ContestScore(2, 5, 0)]
+    assert (await service.get_top(None, contest))[-1] == ContestScore(4, 1, 0)
+    assert db_scores['calls'] == 1
+
+
+@pytest.mark.asyncio
+async def test_top_cutoff_breaks_ties_by_id_like_database(fake_redis: FakeRedis, db_scores: dict) -> None:
+    # В sorted set при равных очках '20' > '12', а БД сортирует по возрастанию id
+    db_scores['rows'] = [(20, 3, 100), (12, 3, 100), (5, 4, 0), (7, 1, 0)]
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+    await service.rebuild(None, contest)
+
+    assert await service.get_top(None, contest, limit=2) == [ContestScore(5, 4, 0), ContestScore(12, 3, 100)]
+    assert [score.referrer_id for score in await service.get_top(None, contest, limit=3)] == [5, 12, 20]
+
+
+@pytest.mark.asyncio
+async def test_amount_update_breaks_ties(fake_redis: FakeRedis, db_scores: dict) -> None:
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+    await service.rebuild(None, contest)
+
+    await service.record_event(contest.id, 1, occurred_at=START, amount_delta=1000)
+
+    top = await service.get_top(None, contest)
+    assert [score.referrer_id for score in top] == [2, 1, 3]
+
+
+@pytest.mark.asyncio
+async def test_event_script_keeps_zset_score_in_sync_and_drops_emptied_referrer(
+    fake_redis: FakeRedis, db_scores: dict
+) -> None:
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+    await service.rebuild(None, contest)
+    leaderboard_key = contest_leaderboard_key(contest.id)
+
+    await service.record_event(contest.id, 3, occurred_at=START, count_delta=1, amount_delta=100)
+    assert await fake_redis.zscore(leaderboard_key, '3') == _zset_score(3, 1000)
+
+    await service.record_event(contest.id, 1, occurred_at=START, count_delta=-2, amount_delta=-500)
+    assert await fake_redis.zscore(leaderboard_key, '1') is None
+    assert await fake_redis.hmget(contest_scores_key(contest.id), ['1:count', '1:amount']) == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_failed_event_script_drops_both_keys(fake_redis: FakeRedis, db_scores: dict) -> None:
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+    await service.rebuild(None, contest)
+    # HINCRBY по счётчику пройдёт, по испорченной сумме — упадёт посреди скрипта
+    await fake_redis.hset(contest_scores_key(contest.id), '1:amount', 'oops')
+
+    await service.record_event(contest.id, 1, occurred_at=START, count_delta=1, amount_delta=100)
+
+    assert contest_scores_key(contest.id) not in fake_redis.hashes
+    assert contest_leaderboard_key(contest.id) not in fake_redis.zsets
+    assert await service.get_top(None, contest, limit=1) == [ContestScore(2, 5, 0)]
+    assert db_scores['calls'] == 2
+
+
+@pytest.mark.asyncio
+async def test_events_are_ignored_outside_period_or_before_seeding(fake_redis: FakeRedis, db_scores: dict) -> None:
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+
+    await service.record_event(contest.id, 1, occurred_at=START, count_delta=1)
+    assert contest_scores_key(contest.id) not in fake_redis.hashes
+
+    await service.rebuild(None, contest)
+    # Полночный end_at означает конец дня: событие в 23:00 последнего дня учитывается
+    await service.record_event(contest.id, 5, occurred_at=END + timedelta(hours=23), count_delta=1)
+    await service.record_event(contest.id, 6, occurred_at=END + timedelta(days=1), count_delta=1)
+    await service.record_event(contest.id, 6, occurred_at=START - timedelta(seconds=1), count_delta=1)
+
+    referrer_ids = {score.referrer_id for score in await service.get_top(None, contest)}
+    assert 5 in referrer_ids
+    assert 6 not in referrer_ids
+
+
+@pytest.mark.asyncio
+async def test_reconcile_rebuilds_drifted_leaderboard(
+    fake_redis: FakeRedis, db_scores: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = ReferralContestLeaderboardService()
+    contest = _contest()
+    await service.rebuild(None, contest)
+
+    # Событие удалено каскадом вместе с пользователем — инкремента не было
+    db_scores['rows'] = [(1, 2, 500), (3, 2, 900)]
+
+    async def fake_contests(_db):
+        return [contest]
+
+    monkeypatch.setattr(leaderboard_module, 'get_contests_for_summaries', fake_contests)
+
+    assert await service.reconcile(None) == 1
+    assert await service.get_top(None, contest) == [ContestScore(3, 2, 900), ContestScore(1, 2, 500)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_without_redis_caller_falls_back_to_database(db_scores: dict) -> None:
+    service = ReferralContestLeaderboardService()
+
+    assert await service.get_top(None, _contest()) is None
+    await service.record_event(7, 1, occurred_at=START, count_delta=1)
@@ -0,0 +1,201 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+import app.services.referral_diagnostics_service as diagnostics_module
+from app.services.referral_diagnostics_service import LogParseState, ReferralDiagnosticsService
+from app.services.referral_log_parser import ParsedRange, parse_log_range, split_at_line_boundaries
+
+
+DAY = datetime(2026, 10, 1, tzinfo=UTC)
+
+
+def _log_lines(first: int, count: int) -> str:
+    lines = []
+    for index in range(first, first + count):
+        timestamp = (DAY + timedelta(minutes=index)).strftime('%Y-%m-%d %H:%M:%S')
+        if index % 5 == 0:
+            message = f'📩 Сообщение от ID:{1000 + index} текст: /start ref_refCODE{index}'
+        elif index % 7 == 0:
+            message = f"💾 Сохранен start payload 'refP{index}' для пользователя {2000 + index}"
+        else:
+            message = f'обычная строка {index}'
+        lines.append(f'{timestamp},123 - app.handlers - INFO - {message}\n')
+    return ''.join(lines)
+
+
+class _FakeCache:
+    def __init__(self) -> None:
+        self.values: dict[str, dict] = {}
+
+    async def get(self, key: str):
+        return self.values.get(key)
+
+    async def set(self, key: str, value: dict, expire=None) -> bool:
+        self.values[key] = value
+        return True
+
+
+@pytest.fixture
+def fake_cache(monkeypatch: pytest.MonkeyPatch) -> _FakeCache:
+    fake = _FakeCache()
+    monkeypatch.setattr(diagnostics_module, 'cache', fake)
+    return fake
+
+
+@pytest.fixture
+def parsed_ranges(monkeypatch: pytest.MonkeyPatch) -> list[tuple[int, int]]:
+    ranges: list[tuple[int, int]] = []
+
+    def recording(path: str, start: int, end: int) -> ParsedRange:
+        ranges.append((start, end))
+        return parse_log_range(path, start, end)
+
+    monkeypatch.setattr(diagnostics_module, 'parse_log_range', recording)
+    return ranges
+
+
+@pytest.mark.asyncio
+async def test_repeat_diagnostics_parse_only_appended_tail(
+    tmp_path: Path, fake_cache: _FakeCache, parsed_ranges: list[tuple[int, int]]
+) -> None:
+    log_path = tmp_path / 'bot.log'
+    log_path.write_text(_log_lines(0, 100), encoding='utf-8')
+    service = ReferralDiagnosticsService(str(log_path))
+    day_end = DAY + timedelta(days=1)
+
+    clicks, total_lines, lines_in_period = await service._parse_clicks(DAY, day_end)
+    assert (len(clicks), total_lines, lines_in_period) == (32, 100, 100)
+    assert clicks[0].clean_code == 'refCODE0'
+
+    first_size = log_path.stat().st_size
+    with log_path.open('a', encoding='utf-8') as handle:
+        handle.write(_log_lines(100, 10))
+
+    clicks, total_lines, _ = await service._parse_clicks(DAY, day_end)
+
+    assert parsed_ranges == [(0, first_size), (first_size, log_path.stat().st_size)]
+    assert (len(clicks), total_lines) == (34, 110)
+
+    # Состояние переживает перезапуск через Redis
+    restarted = ReferralDiagnosticsService(str(log_path))
+    clicks, _, _ = await restarted._parse_clicks(DAY, DAY + timedelta(hours=1))
+    assert len(parsed_ranges) == 2
+    assert [click.telegram_id for click in clicks][:3] == [1000, 1005, 2007]
+    assert len(clicks) == 19
+
+
+@pytest.mark.asyncio
+async def test_partial_last_line_waits_until_completed(
+    tmp_path: Path, fake_cache: _FakeCache, parsed_ranges: list[tuple[int, int]]
+) -> None:
+    log_path = tmp_path / 'bot.log'
+    complete = _log_lines(0, 5)
+    log_path.write_text(complete + _log_lines(5, 1).rstrip('\n')[:40], encoding='utf-8')
+    service = ReferralDiagnosticsService(str(log_path))
+
+    _, total_lines, _ = await service._parse_clicks(DAY, DAY + timedelta(days=1))
+    assert total_lines == 5
+
+    log_path.write_text(complete + _log_lines(5, 1), encoding='utf-8')
+    clicks, total_lines, _ = await service._parse_clicks(DAY, DAY + timedelta(days=1))
+
+    assert total_lines == 6
+    assert clicks[-1].telegram_id == 1005
+
+
+@pytest.mark.asyncio
+async def test_rotated_log_is_parsed_from_scratch(
+    tmp_path: Path, fake_cache: _FakeCache, parsed_ranges: list[tuple[int, int]]
+) -> None:
+    log_path = tmp_path / 'bot.log'
+    log_path.write_text(_log_lines(0, 50), encoding='utf-8')
+    service = ReferralDiagnosticsService(str(log_path))
+    await service._parse_clicks(DAY, DAY + timedelta(days=1))
+
+    rotated = tmp_path / 'bot.log.new'
+    rotated.write_text(_log_lines(200, 5), encoding='utf-8')
+    rotated.replace(log_path)
+
+    clicks, total_lines, _ = await service._parse_clicks(DAY, DAY + timedelta(days=1))
+
+    assert parsed_ranges[-1][0] == 0
+    assert total_lines == 5
+    assert [click.telegram_id for click in clicks] == [1200, 2203]
+
+
+def test_parse_state_round_trips_through_dict(tmp_path: Path) -> None:
+    log_path = tmp_path / 'bot.log'
+    log_path.write_text(_log_lines(0, 20), encoding='utf-8')
+    state = LogParseState(log_path=str(log_path), device=1, inode=2, offset=10)
+    state.parsed = parse_log_range(str(log_path), 0, log_path.stat().st_size)
+
+    assert LogParseState.from_dict(state.to_dict()) == state
+
+
+def test_chunks_split_at_line_boundaries(tmp_path: Path) -> None:
+    log_path = tmp_path / 'bot.log'
+    log_path.write_text(_log_lines(0, 300), encoding='utf-8')
+    size = log_path.stat().st_size
+
+    ranges = split_at_line_boundaries(str(log_path), 0, size, 1000)
+    merged = ParsedRange()
+    for start, end in ranges:
+        merged.merge(parse_log_range(str(log_path), start, end))
+
+    assert len(ranges) > 10
+    assert merged == parse_log_range(str(log_path), 0, size)
+
+
+@pytest.mark.asyncio
+async def test_large_backfill_is_parsed_in_process_pool(
+    tmp_path: Path, fake_cache: _FakeCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    log_path = tmp_path / 'bot.log'
+    log_path.write_text(_log_lines(0, 2000), encoding='utf-8')
+    monkeypatch.setattr(diagnostics_module, 'PARALLEL_PARSE_MIN_BYTES', 1024)
+    monkeypatch.setattr(diagnostics_module, 'PARSE_CHUNK_BYTES', 64 * 1024)
+    monkeypatch.setattr(diagnostics_module, 'PARSE_MAX_WORKERS', 2)
+    service = ReferralDiagnosticsService(str(log_path))
+
+    try:
+        clicks, total_lines, lines_in_period = await service._parse_clicks(DAY, DAY + timedelta(days=2))
+        pool = service._parse_pool
+
+        expected = parse_log_range(str(log_path), 0, log_path.stat().st_size)
+        assert total_lines == lines_in_period == 2000
+        assert [(click.telegram_id, click.raw_code) for click in clicks] == [
+            (click.telegram_id, click.raw_code) for click in expected.clicks
+        ]
+
+        # Повторный большой разбор идёт в том же пуле, а не в новых процессах
+        assert await service._parse_range(log_path, 0, log_path.stat().st_size) == expected
+        assert service._parse_pool is pool
+    finally:
+        service.close()
+
+    assert service._parse_pool is None
+
+
+@pytest.mark.asyncio
+async def test_parse_state_keeps_only_retention_window_aggregates(
+    tmp_path: Path, fake_cache: _FakeCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    log_path = tmp_path / 'bot.log'
+    # 60 строк с шагом в сутки: окно хранения — 31 день до последней записи
+    lines = []
+    for index in range(60):
+        timestamp = (DAY + timedelta(days=index)).strftime('%Y-%m-%d %H:%M:%S')
+        lines.append(f'{timestamp},123 - app.handlers - INFO - 📩 Сообщение от ID:{index} текст: /start refC{index}\n')
+    log_path.write_text(''.join(lines), encoding='utf-8')
+    monkeypatch.setattr(diagnostics_module, 'PARSE_STATE_MAX_CLICKS', 20)
+    service = ReferralDiagnosticsService(str(log_path))
+
+    clicks, total_lines, _ = await service._parse_clicks(DAY, DAY + timedelta(days=60))
+
+    assert total_lines == 60
+    assert [click.telegram_id for click in clicks] == list(range(40, 60))
+    assert len(service._parse_state.parsed.hourly_lines) == 32
+    [stored] = fake_cache.values.values()
+    assert all(len(click) == 3 for click in stored['clicks'])
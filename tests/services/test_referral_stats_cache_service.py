@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.referral_stats_cache_service import ReferralStatsCacheService, referral_stats_key
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> ReferralStatsCacheService:
+    service = ReferralStatsCacheService()
+    loader = AsyncMock(return_value={'invited_count': 2, 'total_earned_kopeks': 5000})
+    monkeypatch.setattr(service, '_load_from_db', loader)
+    return service
+
+
+async def test_menu_stats_hit_db_only_once(fake_redis: FakeRedis, service: ReferralStatsCacheService) -> None:
+    first = await service.get_menu_stats(object(), 7)
+    second = await service.get_menu_stats(object(), 7)
+
+    assert first == second == {'invited_count': 2, 'total_earned_kopeks': 5000}
+    assert service._load_from_db.await_count == 1
+    assert fake_redis.ttls[referral_stats_key(7)] > 0
+
+
+async def test_counters_are_incremented_in_place(fake_redis: FakeRedis, service: ReferralStatsCacheService) -> None:
+    await service.get_menu_stats(object(), 7)
+
+    await service.record_registration(7)
+    await service.record_earning(7, 1500)
+
+    assert await service.get_menu_stats(object(), 7) == {'invited_count': 3, 'total_earned_kopeks': 6500}
+    assert service._load_from_db.await_count == 1
+
+
+async def test_increment_without_seeded_hash_is_skipped(
+    fake_redis: FakeRedis, service: ReferralStatsCacheService
+) -> None:
+    await service.record_earning(7, 1500)
+
+    assert referral_stats_key(7) not in fake_redis.hashes
+    assert await service.get_menu_stats(object(), 7) == {'invited_count': 2, 'total_earned_kopeks': 5000}
+
+
+async def test_failed_increment_drops_counters(fake_redis: FakeRedis, service: ReferralStatsCacheService) -> None:
+    await service.get_menu_stats(object(), 7)
+    await fake_redis.hset(referral_stats_key(7), 'total_earned_kopeks', 'oops')
+
+    await service.record_earning(7, 1500)
+
+    assert referral_stats_key(7) not in fake_redis.hashes
+
+
+async def test_invalidate_forces_reload(fake_redis: FakeRedis, service: ReferralStatsCacheService) -> None:
+    await service.get_menu_stats(object(), 7)
+    await service.invalidate(7)
+    await service.get_menu_stats(object(), 7)
+
+    assert service._load_from_db.await_count == 2
+
+
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_falls_back_to_db_without_redis(service: ReferralStatsCacheService) -> None:
+
+    assert await service.get_menu_stats(object(), 7) == {'invited_count': 2, 'total_earned_kopeks': 5000}
+    await service.record_registration(7)
@@ -118,3 +118,115 @@ async def test_get_or_create_user_creates_new(monkeypatch):
         last_name=None,
         language='ru',
     )
+
+
+class _FakePanelApi:
+    def __init__(self) -> None:
+        self.updated: list[str] = []
+        self.created: list[str] = []
+
+    async def get_user_by_telegram_id(self, _telegram_id: int) -> list:
+        return []
+
+    async def update_user(self, **kwargs) -> None:
+        self.updated.append(kwargs['uuid'])
+
+    async def create_user(self, **kwargs):
+        self.created.append(kwargs['username'])
+        return SimpleNamespace(uuid=f'new-{kwargs["telegram_id"]}', short_uuid='short')
+
+
+def _make_subscription(sub_id: int, *, remnawave_uuid: str | None = 'uuid') -> SimpleNamespace:
+    user = SimpleNamespace(
+        id=sub_id,
+        telegram_id=1000 + sub_id,
+        username=f'user{sub_id}',
+        full_name=f'User {sub_id}',
+        email=None,
+        remnawave_uuid=remnawave_uuid and f'{remnawave_uuid}-{sub_id}',
+    )
+    return SimpleNamespace(
+        id=sub_id,
+        user=user,
+        status='active',
+        end_date=datetime(2030, 1, 1, tzinfo=UTC),
+        traffic_limit_gb=0,
+        connected_squads=['squad-b', 'squad-a'],
+        device_limit=3,
+        panel_sync_hash=None,
+        remnawave_short_uuid=None,
+    )
+
+
+@pytest.fixture
+def panel_sync_env(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    import app.database.crud.subscription as subscription_crud
+    import app.services.remnawave_service as remnawave_module
+
+    service = _create_service()
+    api = _FakePanelApi()
+    subscriptions = [_make_subscription(sub_id) for sub_id in range(1, 6)]
+    subscriptions.append(_make_subscription(6, remnawave_uuid=None))
+    batch_calls: list[int] = []
+
+    @asynccontextmanager
+    async def fake_client():
+        yield api
+
+    async def fake_batch(_db, *, after_id: int = 0, limit: int = 500):
+        batch_calls.append(after_id)
+        return [sub for sub in subscriptions if sub.id > after_id][:limit]
+
+    service.get_api_client = fake_client
+    monkeypatch.setattr(subscription_crud, 'get_subscriptions_batch', fake_batch)
+    monkeypatch.setattr(remnawave_module, 'resolve_hwid_device_limit_for_payload', lambda sub: sub.device_limit)
+    db = SimpleNamespace(commit=AsyncMock(), rollback=AsyncMock())
+    return SimpleNamespace(service=service, api=api, subscriptions=subscriptions, batch_calls=batch_calls, db=db)
+
+
+@pytest.mark.asyncio
+async def test_sync_to_panel_pushes_only_changed_subscriptions(panel_sync_env):
+    env = panel_sync_env
+
+    first = await env.service.sync_users_to_panel(env.db)
+    assert first == {'created': 1, 'updated': 5, 'skipped': 0, 'errors': 0}
+    assert env.subscriptions[5].user.remnawave_uuid == 'new-1006'
+
+    env.api.updated.clear()
+    env.api.created.clear()
+    env.subscriptions[1].device_limit = 5
+    # Порядок сквадов не влияет на отпечаток
+    env.subscriptions[2].connected_squads = ['squad-a', 'squad-b']
+
+    second = await env.service.sync_users_to_panel(env.db)
+
+    assert second == {'created': 0, 'updated': 1, 'skipped': 5, 'errors': 0}
+    assert env.api.updated == ['uuid-2']
+    assert env.api.created == []
+
+
+@pytest.mark.asyncio
+async def test_sync_to_panel_uses_keyset_batches_and_force(panel_sync_env):
+    env = panel_sync_env
+    env.service.PANEL_SYNC_BATCH_SIZE = 4
+
+    await env.service.sync_users_to_panel(env.db)
+    assert env.batch_calls == [0, 4]
+
+    forced = await env.service.sync_users_to_panel(env.db, force=True)
+    assert forced['skipped'] == 0
+    assert forced['updated'] == 6
+
+
+@pytest.mark.asyncio
+async def test_expired_subscription_is_not_repushed_every_run(panel_sync_env):
+    env = panel_sync_env
+    for sub in env.subscriptions:
+        sub.end_date = datetime(2020, 1, 1, tzinfo=UTC)
+
+    await env.service.sync_users_to_panel(env.db)
+    repeated = await env.service.sync_users_to_panel(env.db)
+
+    assert repeated['skipped'] == 6
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.services import maintenance_service as maintenance_module
+from app.services.maintenance_service import MaintenanceService, MaintenanceStatus
+from app.services.runtime_sync_service import RuntimeSyncService, runtime_sync_service
+from app.services.system_settings_service import bot_configuration_service
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def config_overrides(monkeypatch: pytest.MonkeyPatch) -> None:
+    bot_configuration_service.initialize_definitions()
+    monkeypatch.setattr(settings, 'SUPPORT_USERNAME', 'env_support')
+    original_values = dict(bot_configuration_service._original_values)
+    original_values['SUPPORT_USERNAME'] = 'env_support'
+    monkeypatch.setattr(bot_configuration_service, '_original_values', original_values)
+    monkeypatch.setattr(
+        bot_configuration_service,
+        '_env_override_keys',
+        set(bot_configuration_service._env_override_keys) - {'SUPPORT_USERNAME'},
+    )
+    monkeypatch.setattr(bot_configuration_service, '_overrides_raw', {})
+
+    async def fake_upsert(db, key, value, description=None):
+        return None
+
+    async def fake_delete(db, key):
+        return None
+
+    monkeypatch.setattr('app.services.system_settings_service.upsert_system_setting', fake_upsert)
+    monkeypatch.setattr('app.services.system_settings_service.delete_system_setting', fake_delete)
+
+
+def _published(redis: FakeRedis) -> list[bytes]:
+    return [payload for channel, payload in redis.published if channel == RuntimeSyncService.CHANNEL]
+
+
+@pytest.mark.usefixtures('config_overrides')
+async def test_setting_change_is_applied_in_other_process(fake_redis: FakeRedis) -> None:
+    await bot_configuration_service.set_value(object(), 'SUPPORT_USERNAME', 'db_support')
+
+    [payload] = _published(fake_redis)
+    assert json.loads(payload)['key'] == 'SUPPORT_USERNAME'
+
+    # Другой процесс ещё видит старое значение
+    settings.SUPPORT_USERNAME = 'env_support'
+    bot_configuration_service._overrides_raw.clear()
+
+    await RuntimeSyncService().handle_message(payload)
+
+    assert settings.SUPPORT_USERNAME == 'db_support'
+    assert bot_configuration_service.has_override('SUPPORT_USERNAME')
+
+
+@pytest.mark.usefixtures('config_overrides')
+async def test_setting_reset_is_applied_in_other_process(fake_redis: FakeRedis) -> None:
+    await bot_configuration_service.set_value(object(), 'SUPPORT_USERNAME', 'db_support')
+    await bot_configuration_service.reset_value(object(), 'SUPPORT_USERNAME')
+    set_payload, reset_payload = _published(fake_redis)
+
+    other_process = RuntimeSyncService()
+    await other_process.handle_message(set_payload)
+    await other_process.handle_message(reset_payload)
+
+    assert settings.SUPPORT_USERNAME == 'env_support'
+    assert not bot_configuration_service.has_override('SUPPORT_USERNAME')
+
+
+@pytest.mark.usefixtures('config_overrides')
+async def test_own_messages_are_ignored(fake_redis: FakeRedis) -> None:
+    await bot_configuration_service.set_value(object(), 'SUPPORT_USERNAME', 'db_support')
+    [payload] = _published(fake_redis)
+    settings.SUPPORT_USERNAME = 'env_support'
+
+    await runtime_sync_service.handle_message(payload)
+
+    assert settings.SUPPORT_USERNAME == 'env_support'
+
+
+async def test_maintenance_toggle_reaches_other_process(monkeypatch: pytest.MonkeyPatch, fake_redis: FakeRedis) -> None:
+    worker_status = MaintenanceStatus(is_active=False)
+    monkeypatch.setattr(maintenance_module.maintenance_service, '_status', worker_status)
+
+    await MaintenanceService().enable_maintenance(reason='Обновление панели')
+    [payload] = _published(fake_redis)
+
+    assert not maintenance_module.maintenance_service.is_maintenance_active()
+
+    await RuntimeSyncService().handle_message(payload)
+
+    assert maintenance_module.maintenance_service.is_maintenance_active()
+    assert worker_status.reason == 'Обновление панели'
+
+
+async def test_publish_is_noop_without_redis(redis_unavailable: None) -> None:
+    await runtime_sync_service.publish('maintenance')
+
+    assert not await RuntimeSyncService().start()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from app.config import settings
+from app.services.scheduler_leader_service import LEASE_KEY, SchedulerLeaderService
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def leader_redis(fake_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    monkeypatch.setattr(settings, 'PROCESS_ROLE', 'all', raising=False)
+    monkeypatch.setattr(settings, 'SCHEDULER_LEADER_ELECTION_ENABLED', True, raising=False)
+    return fake_redis
+
+
+async def test_only_one_replica_becomes_leader(leader_redis: FakeRedis) -> None:
+    first, second = SchedulerLeaderService(), SchedulerLeaderService()
+
+    assert await first.start() is True
+    assert await second.start() is False
+    assert leader_redis.strings[LEASE_KEY] == first.instance_id.encode()
+
+    await first.stop()
+    await second.stop()
+
+
+async def test_standby_takes_over_after_leader_releases_lease(leader_redis: FakeRedis) -> None:
+    leader, standby = SchedulerLeaderService(), SchedulerLeaderService()
+    await leader.start()
+    await standby.start()
+
+    await leader.stop()
+    assert LEASE_KEY not in leader_redis.strings
+
+    assert await standby._try_acquire() is True
+    standby._set_leader(True)
+    assert standby.get_metrics()['acquisitions'] == 1
+
+    await standby.stop()
+
+
+async def test_lease_is_renewed_only_while_owned(leader_redis: FakeRedis) -> None:
+    service = SchedulerLeaderService()
+    await service.start()
+    leader_redis.ttls.pop(LEASE_KEY)
+
+    assert await service._renew() is True
+    assert leader_redis.ttls[LEASE_KEY] == settings.get_scheduler_lease_ttl()
+
+    leader_redis.strings[LEASE_KEY] = b'someone-else'
+
+    assert await service._renew() is False
+    await service.stop()
+    assert leader_redis.strings[LEASE_KEY] == b'someone-else'
+
+
+async def test_non_candidate_roles_never_run_jobs(leader_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'PROCESS_ROLE', 'web', raising=False)
+    service = SchedulerLeaderService()
+
+    assert await service.start() is False
+    assert LEASE_KEY not in leader_redis.strings
+
+
+async def test_job_metrics_are_tracked() -> None:
+    service = SchedulerLeaderService()
+
+    service.record_job_start('backup')
+    service.record_job_failure('backup', RuntimeError('disk full'))
+    service.record_job_stop('backup')
+
+    stats = service.get_metrics()['jobs']['backup']
+    assert (stats['starts'], stats['stops'], stats['failures']) == (1, 1, 1)
+    assert stats['running'] is False
+    assert stats['last_error'] == 'disk full'
@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import app.services.server_status_service as status_module
+from app.services.server_status_service import ServerStatusError, ServerStatusService
+
+
+METRICS = """# HELP xray_proxy_latency_ms Proxy latency
+# TYPE xray_proxy_latency_ms gauge
+xray_proxy_latency_ms{address="1.1.1.1",name="🇩🇪 Frankfurt",protocol="vless"} 42.6
+xray_proxy_latency_ms{address="2.2.2.2",name="Офис \\"B\\"",protocol="trojan"} NaN 1700000000000
+xray_proxy_status{address="1.1.1.1",name="🇩🇪 Frankfurt",protocol="vless"} 1
+xray_proxy_status{address="2.2.2.2",name="Офис \\"B\\"",protocol="trojan"} 0
+xray_proxy_status{address="3.3.3.3",name="Amsterdam",protocol="vless"} 1 1700000000000
+go_goroutines 12
+"""
+
+
+@pytest.fixture
+def xray_settings(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    fake = SimpleNamespace(
+        get_server_status_mode=lambda: 'xray',
+        get_server_status_metrics_url=lambda: 'http://checker/metrics',
+        get_server_status_refresh_seconds=lambda: 30,
+    )
+    monkeypatch.setattr(status_module, 'settings', fake)
+    return fake
+
+
+def test_metrics_are_parsed_in_single_pass() -> None:
+    servers = ServerStatusService()._parse_metrics(METRICS)
+
+    assert [(item.display_name, item.is_online, item.latency_ms) for item in servers] == [
+        ('Amsterdam', True, None),
+        ('Frankfurt', True, 43),
+        ('Офис "B"', False, None),
+    ]
+    assert servers[1].flag == '🇩🇪'
+    assert servers[1].protocol == 'vless'
+
+
+@pytest.mark.asyncio
+async def test_concurrent_views_share_one_fetch(xray_settings: SimpleNamespace) -> None:
+    service = ServerStatusService()
+    fetches = 0
+    release = asyncio.Event()
+
+    async def fake_fetch(_url: str) -> str:
+        nonlocal fetches
+        fetches += 1
+        await release.wait()
+        return METRICS
+
+    service._fetch_metrics = fake_fetch
+    views = [asyncio.create_task(service.get_servers()) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*views)
+
+    assert fetches == 1
+    assert all(len(servers) == 3 for servers in results)
+
+    # Пока снимок свежий, показ статуса не ходит за метриками
+    await service.get_servers()
+    assert fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_shown_without_waiting_for_refresh(
+    xray_settings: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = ServerStatusService()
+    endpoint_down = asyncio.Event()
+
+    async def fetch_ok(_url: str) -> str:
+        return METRICS
+
+    async def fetch_hanging(_url: str) -> str:
+        await endpoint_down.wait()
+        raise ServerStatusError('Request to metrics endpoint timed out')
+
+    service._fetch_metrics = fetch_ok
+    await service.refresh()
+    service._fetch_metrics = fetch_hanging
+
+    clock = service.snapshot.fetched_monotonic
+    monkeypatch.setattr(status_module.time, 'monotonic', lambda: clock + 60)
+    servers = await asyncio.wait_for(service.get_servers(), timeout=1)
+
+    assert len(servers) == 3
+    refresh_task = service._refresh_task
+    assert refresh_task is not None and not refresh_task.done()
+
+    # Следующий показ не запускает вторую загрузку
+    await service.get_servers()
+    assert service._refresh_task is refresh_task
+
+    endpoint_down.set()
+    await asyncio.gather(refresh_task, return_exceptions=True)
+
+    monkeypatch.setattr(status_module.time, 'monotonic', lambda: clock + 30 * 5)
+    with pytest.raises(ServerStatusError):
+        await service.get_servers()
+
+
+@pytest.mark.asyncio
+async def test_refresher_skips_while_integration_disabled(
+    xray_settings: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = ServerStatusService()
+    xray_settings.get_server_status_mode = lambda: 'disabled'
+    fetches = 0
+
+    async def fake_fetch(_url: str) -> str:
+        nonlocal fetches
+        fetches += 1
+        return METRICS
+
+    service._fetch_metrics = fake_fetch
+    logger = MagicMock()
+    monkeypatch.setattr(status_module, 'logger', logger)
+    sleeps = 0
+
+    async def fake_sleep(_seconds: float) -> None:
+        nonlocal sleeps
+        sleeps += 1
+        if sleeps == 3:
+            xray_settings.get_server_status_mode = lambda: 'xray'
+        if sleeps == 4:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(status_module.asyncio, 'sleep', fake_sleep)
+    with pytest.raises(asyncio.CancelledError):
+        await service._run_loop()
+
+    assert fetches == 1
+    logger.warning.assert_not_called()
+    assert logger.info.call_count == 3  # пауза, возобновление, остановка
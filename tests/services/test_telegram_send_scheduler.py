@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from app.services.telegram_send_scheduler import SendPriority, TelegramSendScheduler
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def _retry_after(seconds: int) -> TelegramRetryAfter:
+    return TelegramRetryAfter(method=MagicMock(), message='Flood control exceeded', retry_after=seconds)
+
+
+async def test_submit_returns_result_and_counts_metrics() -> None:
+    scheduler = TelegramSendScheduler(rate_per_second=100, per_chat_interval=0)
+
+    async def send() -> str:
+        return 'ok'
+
+    assert await scheduler.submit(1, send, priority=SendPriority.TRANSACTIONAL) == 'ok'
+
+    metrics = scheduler.get_metrics()
+    assert metrics['sent']['transactional'] == 1
+    assert metrics['queue_depth'] == {'transactional': 0, 'notification': 0, 'broadcast': 0}
+
+
+async def test_per_chat_interval_is_respected() -> None:
+    scheduler = TelegramSendScheduler(rate_per_second=100, per_chat_interval=0.05)
+    loop = asyncio.get_running_loop()
+    sent_at: dict[int, list[float]] = {1: [], 2: []}
+
+    def sender(chat_id: int):
+        async def send() -> None:
+            sent_at[chat_id].append(loop.time())
+
+        return send
+
+    await asyncio.gather(
+        scheduler.submit(1, sender(1)),
+        scheduler.submit(1, sender(1)),
+        scheduler.submit(2, sender(2)),
+    )
+
+    assert sent_at[1][1] - sent_at[1][0] >= 0.045
+    # Другой чат не ждёт интервала первого
+    assert sent_at[2][0] - sent_at[1][0] < 0.045
+
+
+async def test_transactional_messages_preempt_broadcast() -> None:
+    scheduler = TelegramSendScheduler(rate_per_second=20, per_chat_interval=0)
+    order: list[str] = []
+
+    def sender(label: str):
+        async def send() -> None:
+            order.append(label)
+
+        return send
+
+    # Опустошаем bucket, чтобы все последующие отправки встали в очередь
+    scheduler._refill(scheduler._clock())
+    scheduler._tokens = 0.0
+
+    broadcast = [
+        asyncio.create_task(scheduler.submit(100 + i, sender(f'b{i}'), priority=SendPriority.BROADCAST))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    urgent = asyncio.create_task(scheduler.submit(1, sender('tx'), priority=SendPriority.TRANSACTIONAL))
+
+    await asyncio.gather(*broadcast, urgent)
+
+    assert order[0] == 'tx'
+
+
+async def test_flood_wait_pauses_and_retries() -> None:
+    scheduler = TelegramSendScheduler(rate_per_second=100, per_chat_interval=0)
+    attempts = 0
+
+    async def send() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise _retry_after(0)
+        return 'ok'
+
+    assert await scheduler.submit(5, send) == 'ok'
+    assert attempts == 2
+    assert scheduler.get_metrics()['flood_waits'] == 1
+
+
+async def test_non_flood_errors_are_propagated() -> None:
+    scheduler = TelegramSendScheduler(rate_per_second=100, per_chat_interval=0)
+
+    async def send() -> None:
+        raise TelegramForbiddenError(method=MagicMock(), message='bot was blocked by the user')
+
+    with pytest.raises(TelegramForbiddenError):
+        await scheduler.submit(5, send, priority=SendPriority.BROADCAST)
+
+    assert scheduler.get_metrics()['failed']['broadcast'] == 1
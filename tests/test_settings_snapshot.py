@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.config import settings
+from app.services.system_settings_service import bot_configuration_service
+
+
+def test_snapshot_is_rebuilt_after_field_change(monkeypatch):
+    monkeypatch.setattr(settings, 'ADMIN_IDS', '1, 2,2', raising=False)
+    monkeypatch.setattr(settings, 'ADMIN_EMAILS', 'Root@Example.com', raising=False)
+    snapshot = settings.snapshot
+
+    assert settings.snapshot is snapshot
+    assert settings.get_admin_ids() == [1, 2]
+    assert settings.is_admin(2)
+    assert settings.is_admin(email='root@EXAMPLE.com')
+    assert not settings.is_admin(3)
+
+    monkeypatch.setattr(settings, 'ADMIN_IDS', '3', raising=False)
+
+    assert settings.snapshot is not snapshot
+    assert settings.is_admin(3)
+    assert not settings.is_admin(2)
+
+
+def test_snapshot_getters_return_independent_copies(monkeypatch):
+    monkeypatch.setattr(settings, 'TRAFFIC_PACKAGES_CONFIG', '10:100:true,0:500:false', raising=False)
+
+    packages = settings.get_traffic_packages()
+    packages[0]['price'] = 1
+
+    assert settings.get_traffic_packages()[0] == {'gb': 10, 'price': 100, 'enabled': True}
+    assert settings.get_traffic_price(10) == 100
+
+
+@pytest.mark.asyncio
+async def test_set_value_rebuilds_snapshot(monkeypatch):
+    bot_configuration_service.initialize_definitions()
+    monkeypatch.setattr(settings, 'SUPPORT_USERNAME', '@old_support', raising=False)
+    monkeypatch.setattr(bot_configuration_service, '_env_override_keys', set())
+    monkeypatch.setattr(bot_configuration_service, '_overrides_raw', {})
+
+    async def fake_upsert(db, key, value, description=None):
+        return None
+
+    monkeypatch.setattr('app.services.system_settings_service.upsert_system_setting', fake_upsert)
+    assert settings.get_support_contact_url() == 'https://t.me/old_support'
+
+    await bot_configuration_service.set_value(object(), 'SUPPORT_USERNAME', '@new_support')
+
+    assert settings._snapshot is not None
+    assert settings.get_support_contact_url() == 'https://t.me/new_support'
+
+
+def test_admin_check_does_not_parse_admin_ids(monkeypatch):
+    """Проверка администратора в middleware читает снимок и не разбирает ADMIN_IDS на каждый вызов.
+
+    Сравнение скорости со старым разбором — в scripts/hot_path_benchmark.py.
+    """
+    monkeypatch.setattr(settings, 'ADMIN_IDS', ','.join(str(100_000 + index) for index in range(50)), raising=False)
+    settings.rebuild_snapshot()
+    parse_admin_ids = MagicMock(side_effect=AssertionError('ADMIN_IDS разобран на горячем пути'))
+    monkeypatch.setattr(type(settings), '_parse_admin_ids', parse_admin_ids)
+
+    assert settings.is_admin(100_000)
+    assert not settings.is_admin(42)
+    assert settings.get_admin_ids()[0] == 100_000
+
+    parse_admin_ids.assert_not_called()
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils import http_clients as http_clients_module
+from app.utils.http_clients import HttpClientProfile, HttpClientRegistry
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_within_loop() -> None:
+    registry = HttpClientRegistry()
+    profile = HttpClientProfile(timeout_seconds=3, limit_per_host=2, headers={'Accept': 'application/json'})
+
+    session = registry.session('github', profile)
+
+    assert registry.session('github', profile) is session
+    assert registry.session('currency_rates') is not session
+    assert session.timeout.total == 3
+    assert session.connector.limit_per_host == 2
+    assert session.headers['Accept'] == 'application/json'
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_closed_session_is_recreated() -> None:
+    registry = HttpClientRegistry()
+    session = registry.session('github')
+    await session.close()
+
+    recreated = registry.session('github')
+
+    assert recreated is not session
+    assert not recreated.closed
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_close_closes_all_sessions() -> None:
+    registry = HttpClientRegistry()
+    sessions = [registry.session('github'), registry.session('currency_rates')]
+
+    await registry.close()
+
+    assert all(session.closed for session in sessions)
+    assert registry.session('github') not in sessions
+    await registry.close()
+
+
+def test_session_from_other_loop_is_not_reused() -> None:
+    registry = HttpClientRegistry()
+
+    async def take_session():
+        return registry.session('github')
+
+    first = asyncio.run(take_session())
+    second = asyncio.run(take_session())
+
+    assert second is not first
+
+
+def test_session_from_running_loop_is_closed_on_replace() -> None:
+    registry = HttpClientRegistry()
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def take_session():
+        return registry.session('github')
+
+    async def replace_session():
+        registry.session('github')
+        for _ in range(100):
+            if first.closed:
+                break
+            await asyncio.sleep(0.01)
+        await registry.close()
+
+    try:
+        first = asyncio.run_coroutine_threadsafe(take_session(), other_loop).result(timeout=5)
+        asyncio.run(replace_session())
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(timeout=5)
+        other_loop.close()
+
+    assert first.closed
+
+
+def test_session_from_finished_loop_is_reported(monkeypatch: pytest.MonkeyPatch) -> None:
+    registry = HttpClientRegistry()
+    logger = MagicMock()
+    monkeypatch.setattr(http_clients_module, 'logger', logger)
+
+    async def take_session():
+        return registry.session('github')
+
+    asyncio.run(take_session())
+    asyncio.run(take_session())
+
+    logger.warning.assert_called_once()
+    assert logger.warning.call_args.kwargs['client'] == 'github'
@@ -0,0 +1,149 @@
+import io
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.utils import log_reader
+from app.utils.log_reader import LogOffsetIndex, count_log_chars, iter_lines_reversed, read_log_tail
+
+
+START = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def _write_log(path: Path, records: int, *, traceback_every: int = 0) -> None:
+    lines = []
+    for index in range(records):
+        timestamp = (START + timedelta(seconds=index)).strftime('%Y-%m-%d %H:%M:%S')
+        level = 'error' if traceback_every and index % traceback_every == 0 else 'info'
+        lines.append(f'{timestamp} [{level}] [app.test] запись {index}')
+        if level == 'error':
+            lines.append('Traceback (most recent call last):')
+            lines.append(f'ValueError: ошибка {index}')
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.fixture(autouse=True)
+def _small_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_reader, 'LOG_READ_BLOCK_SIZE', 256)
+    monkeypatch.setattr(log_reader, '_indexes', {})
+    monkeypatch.setattr(log_reader, '_char_counters', {})
+    monkeypatch.setattr(log_reader, 'LOG_COUNT_BLOCK_SIZE', 7)
+
+
+def test_reversed_lines_match_file_across_block_boundaries() -> None:
+    content = '\n'.join(f'строка {index}' for index in range(200)).encode()
+    handle = io.BytesIO(content)
+
+    lines = list(iter_lines_reversed(handle, len(content), block_size=7))
+
+    assert list(reversed(lines)) == content.split(b'\n')
+
+
+def test_tail_matches_end_of_file(tmp_path: Path) -> None:
+    path = tmp_path / 'bot.log'
+    _write_log(path, 500)
+    content = path.read_text(encoding='utf-8')
+
+    tail = read_log_tail(path, max_chars=300)
+
+    assert tail.text == content[-300:]
+    assert tail.truncated is True
+    assert tail.size_bytes == path.stat().st_size
+
+    whole = read_log_tail(path, max_chars=len(content) + 10)
+    assert whole.text == content
+    assert whole.truncated is False
+
+
+def test_tail_reads_only_the_end_of_a_large_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / 'bot.log'
+    _write_log(path, 20000)
+    read_bytes = []
+    original = iter_lines_reversed
+
+    def counting(handle, end, start=0, block_size=None):
+        for line in original(handle, end, start, block_size):
+            read_bytes.append(len(line) + 1)
+            yield line
+
+    monkeypatch.setattr(log_reader, 'iter_lines_reversed', counting)
+
+    read_log_tail(path, max_chars=2000)
+
+    assert sum(read_bytes) < 3000
+    assert path.stat().st_size > 500_000
+
+
+def test_level_filter_keeps_multiline_records(tmp_path: Path) -> None:
+    path = tmp_path / 'bot.log'
+    _write_log(path, 100, traceback_every=10)
+
+    tail = read_log_tail(path, max_chars=10_000, min_level='warning')
+
+    records = tail.text.split('\n')
+    assert len(records) == 30
+    assert records[-3:] == [
+        '2026-10-01 12:01:30 [error] [app.test] запись 90',
+        'Traceback (most recent call last):',
+        'ValueError: ошибка 90',
+    ]
+    assert tail.truncated is False
+
+    with pytest.raises(ValueError):
+        read_log_tail(path, max_chars=100, min_level='verbose')
+
+
+def test_time_window_uses_index_to_seek(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / 'bot.log'
+    _write_log(path, 20000)
+    index = LogOffsetIndex(stride=4096)
+    monkeypatch.setattr(log_reader, 'get_log_index', lambda _path: index)
+    windows = []
+    original_window = index.window
+
+    def recording_window(*args):
+        result = original_window(*args)
+        windows.append(result)
+        return result
+
+    monkeypatch.setattr(index, 'window', recording_window)
+
+    since = START + timedelta(seconds=5000)
+    until = START + timedelta(seconds=5009)
+    tail = read_log_tail(path, max_chars=10_000, since=since, until=until)
+
+    lines = tail.text.split('\n')
+    assert [line.rsplit(' ', 1)[-1] for line in lines] == [str(index) for index in range(5000, 5010)]
+    window_start, window_end = windows[0]
+    assert window_end - window_start < 4096 * 4
+
+
+def test_index_resets_after_rotation(tmp_path: Path) -> None:
+    path = tmp_path / 'bot.log'
+    _write_log(path, 2000)
+    index = log_reader.get_log_index(path)
+    read_log_tail(path, max_chars=100, since=START)
+
+    rotated = tmp_path / 'bot.log.new'
+    rotated.write_text('2026-10-02 09:00:00 [info] [app.test] после ротации\n', encoding='utf-8')
+    rotated.replace(path)
+
+    tail = read_log_tail(path, max_chars=1000, since=START)
+
+    assert tail.text == '2026-10-02 09:00:00 [info] [app.test] после ротации'
+    assert log_reader.get_log_index(path) is index
+
+
+def test_char_count_matches_decoded_file_and_follows_appends(tmp_path: Path) -> None:
+    path = tmp_path / 'bot.log'
+    _write_log(path, 300)
+
+    assert count_log_chars(path) == len(path.read_text(encoding='utf-8'))
+
+    with path.open('a', encoding='utf-8') as handle:
+        handle.write('2026-10-02 09:00:00 [info] [app.test] ещё запись ✓\n')
+    assert count_log_chars(path) == len(path.read_text(encoding='utf-8'))
+
+    path.write_text('короче\n', encoding='utf-8')
+    assert count_log_chars(path) == len('короче\n')
@@ -0,0 +1,94 @@
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from app.utils import telegram_webapp
+from app.utils.telegram_webapp import TelegramWebAppAuthError, parse_webapp_init_data
+
+
+BOT_TOKEN = '123456:TEST'
+
+
+def _build_init_data(user_id: int = 555, auth_date: int | None = None, bot_token: str = BOT_TOKEN) -> str:
+    data = {
+        'auth_date': str(auth_date if auth_date is not None else int(time.time())),
+        'query_id': 'AAE',
+        'user': json.dumps({'id': user_id, 'first_name': 'Test'}),
+    }
+    check_string = '\n'.join(f'{key}={value}' for key, value in sorted(data.items()))
+    secret = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+    data['hash'] = hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(data)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    telegram_webapp.clear_init_data_cache()
+    yield
+    telegram_webapp.clear_init_data_cache()
+
+
+@pytest.fixture
+def validation_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    original = telegram_webapp._validate_signature_and_parse
+
+    def counting(init_data: str, bot_token: str):
+        calls.append(init_data)
+        return original(init_data, bot_token)
+
+    monkeypatch.setattr(telegram_webapp, '_validate_signature_and_parse', counting)
+    return calls
+
+
+def test_repeated_init_data_is_validated_once(validation_calls: list[str]) -> None:
+    init_data = _build_init_data()
+
+    first = parse_webapp_init_data(init_data, BOT_TOKEN)
+    second = parse_webapp_init_data(init_data, BOT_TOKEN)
+
+    assert first == second
+    assert first['user']['id'] == 555
+    assert len(validation_calls) == 1
+
+
+def test_cached_payload_is_not_shared_with_callers() -> None:
+    init_data = _build_init_data()
+
+    parse_webapp_init_data(init_data, BOT_TOKEN)['user']['id'] = 1
+
+    assert parse_webapp_init_data(init_data, BOT_TOKEN)['user']['id'] == 555
+
+
+def test_cached_init_data_still_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    auth_date = int(time.time())
+    init_data = _build_init_data(auth_date=auth_date)
+    parse_webapp_init_data(init_data, BOT_TOKEN, max_age_seconds=60)
+
+    monkeypatch.setattr(telegram_webapp.time, 'time', lambda: auth_date + 61)
+
+    with pytest.raises(TelegramWebAppAuthError, match='too old'):
+        parse_webapp_init_data(init_data, BOT_TOKEN, max_age_seconds=60)
+
+
+def test_invalid_signature_is_not_cached(validation_calls: list[str]) -> None:
+    init_data = _build_init_data(bot_token='654321:OTHER')
+
+    for _ in range(2):
+        with pytest.raises(TelegramWebAppAuthError, match='signature'):
+            parse_webapp_init_data(init_data, BOT_TOKEN)
+
+    assert len(validation_calls) == 2
+
+
+def test_cache_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(telegram_webapp, 'INIT_DATA_CACHE_MAX_ENTRIES', 2)
+
+    for user_id in range(3):
+        parse_webapp_init_data(_build_init_data(user_id=user_id), BOT_TOKEN)
+
+    assert len(telegram_webapp._validated_init_data) == 2
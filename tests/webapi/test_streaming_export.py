@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.webapi import streaming
+from app.webapi.dependencies import require_api_token
+from app.webapi.routes import transactions
+
+
+class _Partitions:
+    def __init__(self, rows: list, batch_size: int) -> None:
+        self._rows = rows
+        self._batch_size = batch_size
+
+    def partitions(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for index in range(0, len(self._rows), self._batch_size):
+            yield self._rows[index : index + self._batch_size]
+
+
+class _FakeSession:
+    """Сессия с серверным курсором: отдаёт строки пачками по yield_per."""
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.statements: list = []
+        self.expunged = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        return None
+
+    async def stream(self, statement):
+        self.statements.append(statement)
+        batch_size = statement.get_execution_options()['yield_per']
+        return SimpleNamespace(scalars=lambda: _Partitions(self.rows, batch_size))
+
+    def expunge_all(self) -> None:
+        self.expunged += 1
+
+
+def _transaction(transaction_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=transaction_id,
+        user_id=10,
+        type='deposit',
+        amount_kopeks=15000,
+        description='Пополнение, "тест"',
+        payment_method='yookassa',
+        external_id=None,
+        is_completed=True,
+        created_at=datetime(2026, 10, 1, tzinfo=UTC),
+        completed_at=None,
+    )
+
+
+@pytest.fixture
+def fake_session(monkeypatch: pytest.MonkeyPatch) -> _FakeSession:
+    session = _FakeSession([_transaction(transaction_id) for transaction_id in range(11, 16)])
+    monkeypatch.setattr(streaming, 'AsyncSessionLocal', lambda: session)
+    monkeypatch.setattr(streaming, 'EXPORT_BATCH_SIZE', 2)
+    return session
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(transactions.router, prefix='/transactions')
+    app.dependency_overrides[require_api_token] = lambda: None
+    return TestClient(app)
+
+
+def test_ndjson_export_streams_every_row(client: TestClient, fake_session: _FakeSession) -> None:
+    response = client.get('/transactions/export', params={'after_id': 10, 'user_id': 10})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert response.headers['content-disposition'].endswith('.ndjson"')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['id'] for line in lines] == [11, 12, 13, 14, 15]
+    assert lines[0]['amount_rubles'] == 150.0
+
+    sql = str(fake_session.statements[0])
+    assert 'transactions.id >' in sql
+    assert 'ORDER BY transactions.id' in sql
+    assert 'transactions.user_id =' in sql
+    # Идентификационная карта очищается после каждой пачки курсора
+    assert fake_session.expunged == 3
+
+
+def test_csv_export_has_header_and_escaped_values(client: TestClient, fake_session: _FakeSession) -> None:
+    response = client.get('/transactions/export', params={'format': 'csv'})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'text/csv; charset=utf-8'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[0]['description'] == 'Пополнение, "тест"'
+    assert rows[0]['completed_at'] == ''
+
+
+class _Nested(BaseModel):
+    name: str
+    tags: list[str] = []
+
+
+class _Row(BaseModel):
+    id: int
+    nested: _Nested | None = None
+
+
+@pytest.mark.asyncio
+async def test_csv_flattens_nested_models() -> None:
+    async def batches():
+        yield [_Row(id=1, nested=_Nested(name='a', tags=['x', 'y'])), _Row(id=2)]
+
+    columns = streaming.csv_columns(_Row)
+    body = ''.join([chunk async for chunk in streaming._csv_body(batches(), columns)])
+
+    assert columns == ['id', 'nested.name', 'nested.tags']
+    assert list(csv.reader(io.StringIO(body))) == [columns, ['1', 'a', 'x;y'], ['2', '', '']]
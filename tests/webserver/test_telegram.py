@@ -1,15 +1,20 @@
+import asyncio
 import json
 from typing import Any
 from unittest.mock import AsyncMock
 
 import pytest
+from aiogram.types import Update
 from fastapi import HTTPException
 from starlette.requests import Request
 
 from app.config import settings
 from app.webserver.telegram import (
+    TelegramWebhookChatLimitExceededError,
     TelegramWebhookProcessor,
     create_telegram_router,
+    is_payment_update,
+    resolve_update_shard_key,
 )
 
 
@@ -334,3 +339,213 @@ async def test_health_endpoint(monkeypatch: pytest.MonkeyPatch) -> None:
     assert payload['webhook_configured'] is True
     assert payload['queue_maxsize'] == 42
     assert payload['workers'] == 2
+
+
+def _message_update(update_id: int, user_id: int) -> Update:
+    return Update.model_validate(
+        {
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'date': 1715700000,
+                'chat': {'id': user_id, 'type': 'private'},
+                'from': {'id': user_id, 'is_bot': False, 'first_name': 'u'},
+                'text': str(update_id),
+            },
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_processor_keeps_per_user_order_and_parallelism() -> None:
+    bot = AsyncMock()
+    dispatcher = AsyncMock()
+    processed: list[tuple[int, int]] = []
+    slow_started = asyncio.Event()
+    release_slow = asyncio.Event()
+
+    async def feed_update(_bot, update: Update) -> None:
+        user_id = update.message.from_user.id
+        if update.update_id == 1:
+            slow_started.set()
+            await release_slow.wait()
+        processed.append((user_id, update.update_id))
+
+    dispatcher.feed_update = AsyncMock(side_effect=feed_update)
+
+    processor = TelegramWebhookProcessor(
+        bot=bot,
+        dispatcher=dispatcher,
+        queue_maxsize=16,
+        worker_count=2,
+        enqueue_timeout=0.0,
+        shutdown_timeout=1.0,
+    )
+    await processor.start()
+
+    # user 10 -> lane 0 (slow), user 11 -> lane 1
+    await processor.enqueue(_message_update(1, 10))
+    await processor.enqueue(_message_update(2, 10))
+    await slow_started.wait()
+    await processor.enqueue(_message_update(3, 11))
+    await processor.enqueue(_message_update(4, 11))
+
+    for _ in range(50):
+        if len(processed) == 2:
+            break
+        await asyncio.sleep(0)
+
+    # Другой пользователь не ждёт медленного обработчика
+    assert processed == [(11, 3), (11, 4)]
+
+    release_slow.set()
+    await processor.wait_until_drained(timeout=1.0)
+
+    assert [update_id for user_id, update_id in processed if user_id == 10] == [1, 2]
+    metrics = processor.get_metrics()
+    assert [lane['processed'] for lane in metrics['lanes']] == [2, 2]
+    assert metrics['pending_chats'] == 0
+
+    await processor.stop()
+
+
+@pytest.mark.asyncio
+async def test_processor_rejects_updates_over_chat_limit() -> None:
+    bot = AsyncMock()
+    dispatcher = AsyncMock()
+    dispatcher.feed_update = AsyncMock()
+
+    processor = TelegramWebhookProcessor(
+        bot=bot,
+        dispatcher=dispatcher,
+        queue_maxsize=16,
+        worker_count=0,
+        enqueue_timeout=0.0,
+        shutdown_timeout=1.0,
+        max_pending_per_chat=2,
+    )
+    await processor.start()
+
+    await processor.enqueue(_message_update(1, 42))
+    await processor.enqueue(_message_update(2, 42))
+    with pytest.raises(TelegramWebhookChatLimitExceededError):
+        await processor.enqueue(_message_update(3, 42))
+    await processor.enqueue(_message_update(4, 43))
+
+    metrics = processor.get_metrics()
+    assert metrics['rejected_chat_limit'] == 1
+    assert metrics['pending_chats'] == 2
+
+    await processor.stop()
+
+
+@pytest.mark.asyncio
+async def test_webhook_drops_update_over_chat_limit() -> None:
+    bot = AsyncMock()
+    dispatcher = AsyncMock()
+    dispatcher.feed_update = AsyncMock()
+
+    processor = TelegramWebhookProcessor(
+        bot=bot,
+        dispatcher=dispatcher,
+        queue_maxsize=16,
+        worker_count=0,
+        enqueue_timeout=0.0,
+        shutdown_timeout=1.0,
+        max_pending_per_chat=1,
+    )
+    await processor.start()
+
+    router = create_telegram_router(bot, dispatcher, processor=processor)
+    path = _webhook_path()
+    route = _get_route(router, path)
+    payload = _message_update(1, 7).model_dump_json(exclude_none=True).encode('utf-8')
+
+    first = await route.endpoint(_build_request(path, payload))
+    second = await route.endpoint(_build_request(path, payload))
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert processor.get_metrics()['rejected_chat_limit'] == 1
+
+    await processor.stop()
+
+
+def _payment_updates(user_id: int) -> list[Update]:
+    user = {'id': user_id, 'is_bot': False, 'first_name': 'u'}
+    return [
+        Update.model_validate(
+            {
+                'update_id': 100,
+                'pre_checkout_query': {
+                    'id': 'q1',
+                    'from': user,
+                    'currency': 'XTR',
+                    'total_amount': 100,
+                    'invoice_payload': 'balance',
+                },
+            }
+        ),
+        Update.model_validate(
+            {
+                'update_id': 101,
+                'message': {
+                    'message_id': 101,
+                    'date': 1715700000,
+                    'chat': {'id': user_id, 'type': 'private'},
+                    'from': user,
+                    'successful_payment': {
+                        'currency': 'XTR',
+                        'total_amount': 100,
+                        'invoice_payload': 'balance',
+                        'telegram_payment_charge_id': 'tg',
+                        'provider_payment_charge_id': 'pr',
+                    },
+                },
+            }
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_processor_never_drops_payment_updates_over_chat_limit() -> None:
+    processor = TelegramWebhookProcessor(
+        bot=AsyncMock(),
+        dispatcher=AsyncMock(),
+        queue_maxsize=16,
+        worker_count=0,
+        enqueue_timeout=0.0,
+        shutdown_timeout=1.0,
+        max_pending_per_chat=1,
+    )
+    await processor.start()
+
+    await processor.enqueue(_message_update(1, 42))
+    for update in _payment_updates(42):
+        assert is_payment_update(update)
+        await processor.enqueue(update)
+
+    metrics = processor.get_metrics()
+    assert metrics['rejected_chat_limit'] == 0
+    assert sum(lane['depth'] for lane in metrics['lanes']) == 3
+    assert not is_payment_update(_message_update(2, 42))
+
+    await processor.stop()
+
+
+def test_resolve_update_shard_key_prefers_user() -> None:
+    update = Update.model_validate(
+        {
+            'update_id': 1,
+            'message': {
+                'message_id': 1,
+                'date': 1715700000,
+                'chat': {'id': -100500, 'type': 'supergroup'},
+                'from': {'id': 77, 'is_bot': False, 'first_name': 'u'},
+                'text': 'hi',
+            },
+        }
+    )
+
+    assert resolve_update_shard_key(update) == 77
+    assert resolve_update_shard_key(Update.model_validate({'update_id': 2})) is None
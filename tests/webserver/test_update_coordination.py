@@ -0,0 +1,186 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.types import Update
+
+from app.config import settings
+from app.services.runtime_sync_service import runtime_sync_service
+from app.webapi.server import WebAPIServer
+from app.webserver.telegram import TelegramWebhookProcessor
+from app.webserver.update_coordination import WebhookUpdateCoordinator, shard_lock_key
+from tests.fixtures.redis_fixtures import FakeRedis
+
+
+def _message_update(update_id: int, user_id: int) -> Update:
+    return Update.model_validate(
+        {
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'date': 1715700000,
+                'chat': {'id': user_id, 'type': 'private'},
+                'from': {'id': user_id, 'is_bot': False, 'first_name': 'User'},
+                'text': 'ping',
+            },
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_is_claimed_once_across_processes(fake_redis: FakeRedis) -> None:
+    first, second = WebhookUpdateCoordinator(), WebhookUpdateCoordinator()
+
+    assert await first.claim_update(100)
+    assert not await second.claim_update(100)
+
+    await first.release_update(100)
+
+    assert await second.claim_update(100)
+
+
+@pytest.mark.asyncio
+async def test_shard_lock_serializes_processes(fake_redis: FakeRedis) -> None:
+    first = WebhookUpdateCoordinator(poll_interval=0.001)
+    second = WebhookUpdateCoordinator(poll_interval=0.001)
+    events: list[str] = []
+    release_first = asyncio.Event()
+
+    async def hold(coordinator: WebhookUpdateCoordinator, name: str, wait_for: asyncio.Event | None) -> None:
+        async with coordinator.hold_shard(42):
+            events.append(f'{name}:start')
+            if wait_for is not None:
+                await wait_for.wait()
+            events.append(f'{name}:end')
+
+    first_task = asyncio.create_task(hold(first, 'first', release_first))
+    await asyncio.sleep(0.01)
+    second_task = asyncio.create_task(hold(second, 'second', None))
+    await asyncio.sleep(0.01)
+
+    assert events == ['first:start']
+
+    release_first.set()
+    await asyncio.gather(first_task, second_task)
+
+    assert events == ['first:start', 'first:end', 'second:start', 'second:end']
+    assert shard_lock_key(42) not in fake_redis.strings
+
+
+@pytest.mark.asyncio
+async def test_expired_lock_taken_by_other_process_is_not_released(fake_redis: FakeRedis) -> None:
+    coordinator = WebhookUpdateCoordinator()
+
+    async with coordinator.hold_shard(7):
+        # TTL истёк, блокировку забрал другой процесс
+        fake_redis.strings[shard_lock_key(7)] = b'other-token'
+
+    assert fake_redis.strings[shard_lock_key(7)] == b'other-token'
+
+
+@pytest.mark.asyncio
+async def test_shard_lock_is_renewed_while_held(fake_redis: FakeRedis) -> None:
+    coordinator = WebhookUpdateCoordinator(lock_ttl_ms=30)
+    renewals: list[float] = []
+    pexpire = fake_redis.pexpire
+
+    async def tracking_pexpire(key: str, milliseconds: int) -> bool:
+        renewals.append(milliseconds)
+        return await pexpire(key, milliseconds)
+
+    fake_redis.pexpire = tracking_pexpire
+
+    async with coordinator.hold_shard(3):
+        await asyncio.sleep(0.05)
+
+    assert len(renewals) >= 2
+    assert shard_lock_key(3) not in fake_redis.strings
+    count = len(renewals)
+    await asyncio.sleep(0.03)
+    assert len(renewals) == count
+
+
+@pytest.mark.asyncio
+async def test_lost_shard_lock_is_not_renewed(fake_redis: FakeRedis) -> None:
+    coordinator = WebhookUpdateCoordinator(lock_ttl_ms=30)
+
+    async with coordinator.hold_shard(4):
+        fake_redis.strings[shard_lock_key(4)] = b'other-token'
+        fake_redis.ttls.pop(shard_lock_key(4), None)
+        await asyncio.sleep(0.05)
+        assert shard_lock_key(4) not in fake_redis.ttls
+
+    assert fake_redis.strings[shard_lock_key(4)] == b'other-token'
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('redis_unavailable')
+async def test_coordinator_is_noop_without_redis() -> None:
+    coordinator = WebhookUpdateCoordinator()
+
+    assert await coordinator.claim_update(1)
+    assert await coordinator.claim_update(1)
+    async with coordinator.hold_shard(1):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_processors_share_update_deduplication(fake_redis: FakeRedis) -> None:
+    dispatcher = AsyncMock()
+    dispatcher.feed_update = AsyncMock()
+    processors = [
+        TelegramWebhookProcessor(
+            bot=AsyncMock(),
+            dispatcher=dispatcher,
+            queue_maxsize=8,
+            worker_count=1,
+            enqueue_timeout=0.0,
+            shutdown_timeout=1.0,
+            coordinator=WebhookUpdateCoordinator(),
+        )
+        for _ in range(2)
+    ]
+    for processor in processors:
+        await processor.start()
+
+    # Повторная доставка того же update попала в другой процесс
+    await processors[0].enqueue(_message_update(5, 10))
+    await processors[1].enqueue(_message_update(5, 10))
+    for processor in processors:
+        await processor.wait_until_drained(timeout=1.0)
+
+    assert dispatcher.feed_update.await_count == 1
+    assert processors[1].get_metrics()['skipped_duplicates'] == 1
+    assert shard_lock_key(10) not in fake_redis.strings
+
+    for processor in processors:
+        await processor.stop()
+
+
+@pytest.mark.usefixtures('redis_unavailable')
+def test_web_server_uses_single_process_without_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'WEB_API_WORKERS', 4, raising=False)
+
+    server = WebAPIServer(app=AsyncMock())
+
+    assert settings.get_web_api_worker_count() == 4
+    assert server._bind_shared_socket() is None
+
+
+def test_web_server_uses_single_process_without_runtime_sync(
+    monkeypatch: pytest.MonkeyPatch, fake_redis: FakeRedis
+) -> None:
+    monkeypatch.setattr(settings, 'WEB_API_WORKERS', 4, raising=False)
+    monkeypatch.setattr(runtime_sync_service, 'is_running', lambda: False)
+
+    server = WebAPIServer(app=AsyncMock())
+
+    assert server._bind_shared_socket() is None
+
+
+def test_web_api_worker_count_is_clamped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'WEB_API_WORKERS', 0, raising=False)
+    assert settings.get_web_api_worker_count() == 1
+
+    monkeypatch.setattr(settings, 'WEB_API_WORKERS', 1000, raising=False)
+    assert settings.get_web_api_worker_count() == 64